@@ -0,0 +1,118 @@
+#pragma once
+
+#include <algorithm>
+#include <chrono>
+#include <cstdint>
+#include <cstdio>
+#include <functional>
+#include <vector>
+
+#include "verilated.h"
+
+// Event-driven scheduler for all clock domains of a harness.
+//
+// Rather than advancing time in fixed steps and checking which clocks toggle
+// at each step, every domain tracks the time of its next edge, and `step()`
+// jumps straight to the earliest one. All domains with an edge at that time
+// are toggled (and their drivers called) together, followed by a single
+// `eval()`. Time is in picoseconds, as in the rest of the harnesses.
+template <typename DutT> class ClockScheduler {
+private:
+    static constexpr uint64_t PS_IN_S = 1000000000000ull;
+
+    struct Domain {
+        const char* name;
+        CData* clk;
+        std::function<void()> post_edge;
+        // Half periods are rarely an integer number of picoseconds, so
+        // the remainder is accumulated to avoid drift over long runs.
+        uint64_t hz2;
+        uint64_t half_period_ps;
+        uint64_t half_period_rem;
+        uint64_t rem_acc = 0;
+        uint64_t next_edge_ps;
+        uint64_t n_edges = 0;
+    };
+
+    VerilatedContext* contextp;
+    DutT* dut;
+    std::vector<Domain> domains;
+
+    uint64_t start_ps;
+    std::chrono::steady_clock::time_point start_wall;
+    uint64_t n_edges = 0;
+    uint64_t n_evals = 0;
+
+public:
+    explicit ClockScheduler(VerilatedContext* contextp, DutT* dut) :
+        contextp(contextp), dut(dut) {
+        start_ps = contextp->time();
+        start_wall = std::chrono::steady_clock::now();
+    }
+
+    // Add a clock domain, with the first edge at the current time. `post_edge`
+    // is called after every edge of this clock, before the model is evaluated.
+    // Returns a mask to check against the result of `step()`.
+    uint32_t add(const char* name, CData* clk, uint64_t hz,
+                 std::function<void()> post_edge = nullptr) {
+        Domain d;
+        d.name = name;
+        d.clk = clk;
+        d.post_edge = post_edge;
+        d.hz2 = 2*hz;
+        d.half_period_ps = PS_IN_S / d.hz2;
+        d.half_period_rem = PS_IN_S % d.hz2;
+        d.next_edge_ps = contextp->time();
+        domains.push_back(d);
+        return 1u << (domains.size() - 1);
+    }
+
+    // Advance to the next edge of any clock, toggle all clocks with an edge
+    // at that time, and evaluate the model once. Returns a mask of the clock
+    // domains that had an edge.
+    uint32_t step() {
+        uint64_t t = UINT64_MAX;
+        for (auto &d : domains) {
+            t = std::min(t, d.next_edge_ps);
+        }
+
+        contextp->timeInc(t - contextp->time());
+
+        uint32_t edges = 0;
+        for (size_t n = 0; n != domains.size(); ++n) {
+            Domain &d = domains[n];
+            if (d.next_edge_ps != t) {
+                continue;
+            }
+            *d.clk = !*d.clk;
+            d.next_edge_ps += d.half_period_ps;
+            d.rem_acc += d.half_period_rem;
+            if (d.rem_acc >= d.hz2) {
+                d.rem_acc -= d.hz2;
+                d.next_edge_ps += 1;
+            }
+            if (d.post_edge) {
+                d.post_edge();
+            }
+            edges |= 1u << n;
+            ++d.n_edges;
+            ++n_edges;
+        }
+
+        dut->eval();
+        ++n_evals;
+        return edges;
+    }
+
+    void report() {
+        double sim_s = (double)(contextp->time() - start_ps) / (double)PS_IN_S;
+        double wall_s = std::chrono::duration<double>(
+            std::chrono::steady_clock::now() - start_wall).count();
+        printf("Simulated %f s in %f s wall time (%f simulated s per wall s)\n",
+               sim_s, wall_s, wall_s > 0 ? sim_s / wall_s : 0.0);
+        printf("  %lu clock edges, %lu evals\n", n_edges, n_evals);
+        for (auto &d : domains) {
+            printf("  %-8s %lu edges\n", d.name, d.n_edges);
+        }
+    }
+};
@@ -1,10 +1,47 @@
 #pragma once
 
+#include <algorithm>
+
 template <typename DutT> class PSRAMDriver {
 private:
     DutT* dut;
     uint64_t idle_lo = 0;
     uint64_t idle_hi = 0;
+    uint64_t data_cycles = 0;
+
+    // Per-arbiter-port statistics (port 0 is the CPU bus, followed by DMA
+    // masters in the order they were added to the PSRAM peripheral).
+    static constexpr int N_PORTS = 32;
+    static constexpr int N_BUCKETS = 4;
+    static constexpr uint32_t BUCKET_BOUNDS[N_BUCKETS-1] = {1, 4, 16};
+
+    struct PortStats {
+        uint64_t words = 0;
+        uint64_t transactions = 0;
+        uint64_t latency_total = 0;
+        uint64_t latency_max = 0;
+        uint64_t histogram[N_BUCKETS] = {0};
+        // Current transaction
+        uint32_t latency = 0;
+        uint32_t beats = 0;
+        bool waiting = true;
+    };
+
+    PortStats ports[N_PORTS];
+
+    void end_transaction(PortStats &p) {
+        if (p.beats) {
+            p.transactions += 1;
+            int bucket = 0;
+            while (bucket < N_BUCKETS-1 && p.beats > BUCKET_BOUNDS[bucket]) {
+                ++bucket;
+            }
+            p.histogram[bucket] += 1;
+        }
+        p.beats = 0;
+        p.latency = 0;
+        p.waiting = true;
+    }
 
 public:
     uint8_t *psram_data = nullptr;
@@ -32,6 +69,26 @@ public:
                 psram_data[dut->address_ptr+3] = (uint8_t)(dut->write_data >> 24);
             }
 
+            // Transactions are approximated as everything between cyc rising
+            // and falling, as the burst type is not visible from here.
+            for (int n = 0; n != N_PORTS; ++n) {
+                PortStats &p = ports[n];
+                bool cyc = (dut->psram_port_cyc >> n) & 1;
+                bool ack = (dut->psram_port_ack >> n) & 1;
+                if (!cyc) {
+                    end_transaction(p);
+                } else if (ack) {
+                    if (p.waiting) {
+                        p.latency_total += p.latency;
+                        p.latency_max = std::max(p.latency_max, (uint64_t)p.latency);
+                        p.waiting = false;
+                    }
+                    p.words += 1;
+                    p.beats += 1;
+                } else if (p.waiting) {
+                    p.latency += 1;
+                }
+            }
         }
 
         // Track PSRAM usage to see how close we are to saturation
@@ -40,10 +97,37 @@ public:
         } else {
             idle_lo += 1;
         }
+        if (dut->read_ready || dut->write_ready) {
+            data_cycles += 1;
+        }
     }
 
     void post_sim() {
+#ifdef PSRAM_TIMING_NAME
+        printf("RAM timing model: %s\n", PSRAM_TIMING_NAME);
+#endif
         printf("RAM bandwidth: idle: %i, !idle: %i, percent_used: %f\n", idle_hi, idle_lo,
                 100.0f * (float)idle_lo / (float)(idle_hi + idle_lo));
+        // The rest of the busy time is command, latency and recovery overhead.
+        printf("RAM efficiency: %f words per busy cycle\n",
+                (float)data_cycles / (float)idle_lo);
+        uint64_t total_words = 0;
+        for (int n = 0; n != N_PORTS; ++n) {
+            total_words += ports[n].words;
+        }
+        printf("RAM bandwidth per arbiter port (port 0 is the CPU):\n");
+        printf("  port     words  share  transactions  latency(avg/max)  burst length 1/2-4/5-16/17+\n");
+        for (int n = 0; n != N_PORTS; ++n) {
+            const PortStats &p = ports[n];
+            if (p.words == 0) {
+                continue;
+            }
+            printf("  %4i  %8lu  %4.1f%%  %12lu  %7.1f/%-8lu  %lu/%lu/%lu/%lu\n",
+                   n, p.words, 100.0f * (float)p.words / (float)total_words,
+                   p.transactions,
+                   p.transactions ? (float)p.latency_total / (float)p.transactions : 0.0f,
+                   p.latency_max,
+                   p.histogram[0], p.histogram[1], p.histogram[2], p.histogram[3]);
+        }
     }
 };
@@ -13,6 +13,7 @@
 #include "i2s.h"
 #include "psram.h"
 #include "dvi.h"
+#include "clocks.h"
 
 #include <fstream>
 
@@ -95,38 +96,27 @@ int main(int argc, char** argv) {
 #endif
 
 
-    while (contextp->time() < sim_time && !contextp->gotFinish()) {
+    ClockScheduler clocks(contextp, top);
+    clocks.add("dvi", &top->clk_dvi, DVI_CLK_HZ,
+               [&] { dvi_driver.post_edge(); });
+    uint32_t sync = clocks.add("sync", &top->clk_sync, SYNC_CLK_HZ,
+               [&] { psram_driver.post_edge(); });
+    clocks.add("audio", &top->clk_audio, AUDIO_CLK_HZ,
+               [&] { i2s_driver.post_edge(); });
 
-        uint64_t timestamp_ns = contextp->time() / 1000;
+    while (contextp->time() < sim_time && !contextp->gotFinish()) {
 
         top->spiflash_data = ((uint32_t*)spiflash_data)[top->spiflash_addr];
 
-        // DVI clock domain (PHY output simulation to bitmap image)
-        if (timestamp_ns % (ns_in_dvi_cycle/2) == 0) {
-            top->clk_dvi = !top->clk_dvi;
-            dvi_driver.post_edge();
-        }
+        uint32_t edges = clocks.step();
 
-        // Sync clock domain (PSRAM read/write simulation, UART printouts)
-        if (timestamp_ns % (ns_in_sync_cycle/2) == 0) {
-            top->clk_sync = !top->clk_sync;
-            psram_driver.post_edge();
-            top->eval();
-            if (top->clk_sync) {
-                if (top->uart0_w_stb) {
-                    putchar(top->uart0_w_data);
-                }
+        // UART printouts
+        if ((edges & sync) && top->clk_sync) {
+            if (top->uart0_w_stb) {
+                putchar(top->uart0_w_data);
             }
         }
 
-        // Audio clock domain (Audio stimulation)
-        if (timestamp_ns % (ns_in_audio_cycle/2) == 0) {
-            top->clk_audio = !top->clk_audio;
-            i2s_driver.post_edge();
-        }
-
-        contextp->timeInc(1000);
-        top->eval();
 #if VM_TRACE_FST == 1
         tfp->dump(contextp->time());
 #endif
@@ -134,5 +124,7 @@ int main(int argc, char** argv) {
 #if VM_TRACE_FST == 1
     tfp->close();
 #endif
+    psram_driver.post_sim();
+    clocks.report();
     return 0;
 }
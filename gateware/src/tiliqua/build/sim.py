@@ -9,6 +9,7 @@ import glob
 import os
 import shutil
 import subprocess
+from dataclasses import dataclass
 
 from amaranth              import *
 from amaranth.back         import verilog
@@ -16,6 +17,8 @@ from amaranth.build        import *
 from amaranth.lib          import wiring
 from amaranth.lib.wiring   import In, Out
 
+from vendor.dqs_phy import DQSPHYSignature
+
 from .types import FirmwareLocation
 
 class FakeTiliquaDomainGenerator(Elaboratable):
@@ -45,6 +48,115 @@ class FakePSRAMSimulationInterface(wiring.Signature):
             "write_data":     Out(unsigned(32)),
         })
 
+class PSRAMPortSimulationInterface(wiring.Signature):
+    # One bit per PSRAM arbiter port, bit 0 is the CPU bus,
+    # followed by DMA masters in the order they were added.
+    def __init__(self):
+        super().__init__({
+            "cyc":            Out(unsigned(32)),
+            "ack":            Out(unsigned(32)),
+        })
+
+@dataclass
+class PSRAMTiming:
+    """
+    Timing model of a PSRAM part (and our controller for it), in 'sync' domain
+    cycles at 60MHz. Used to make simulated PSRAM bandwidth representative of
+    real hardware, both by :class:`FakeDQSPHY` (for simulating the real PSRAM
+    controllers) and by the wishbone-level ``tiliqua.test.psram.FakePSRAM``.
+    """
+    name:                    str
+    # Cycles from start of a transaction until the latency period starts
+    # (chip select, command and address).
+    command_cycles:          int
+    # Cycles from end of command until the first word is transferred.
+    read_latency_cycles:     int
+    write_latency_cycles:    int
+    # Cycles from the PHY starting a read until DATAVALID (PHY + board delays).
+    phy_read_latency_cycles: int
+    # Cycles chip select must be high between transactions (and on page crossings).
+    cs_high_cycles:          int
+    # Bursts crossing a page boundary must be split, paying for
+    # another command and latency. None if the part has no pages.
+    page_size_bytes:         int | None
+    # Cycles between internal refreshes, and the duration of each. Transactions
+    # that would start during a refresh are delayed until it completes.
+    refresh_interval_cycles: int
+    refresh_cycles:          int
+
+    @staticmethod
+    def get(psram_id: str):
+        """Timing model for the given ``platform.psram_id``."""
+        all_timings = [
+            PSRAMTiming(
+                name                    = "APS256XXN",
+                command_cycles          = 3,
+                read_latency_cycles     = 10,
+                write_latency_cycles    = 2,
+                phy_read_latency_cycles = 9,
+                cs_high_cycles          = 3,
+                page_size_bytes         = 2048,
+                refresh_interval_cycles = 234,
+                refresh_cycles          = 5,
+            ),
+            PSRAMTiming(
+                name                    = "7KL1282GA",
+                command_cycles          = 3,
+                read_latency_cycles     = 15,
+                write_latency_cycles    = 6,
+                phy_read_latency_cycles = 9,
+                cs_high_cycles          = 2,
+                page_size_bytes         = None,
+                refresh_interval_cycles = 234,
+                refresh_cycles          = 5,
+            ),
+        ]
+        for timing in all_timings:
+            if timing.name in psram_id:
+                return timing
+        raise ValueError(f"No PSRAM timing model for {psram_id}")
+
+class FakeDQSPHY(wiring.Component):
+    """
+    Stand-in for the ``DQSPHY`` when simulating the real PSRAM controllers,
+    asserting the minimum PHY signals needed for them to make progress. Reads
+    take ``timing.phy_read_latency_cycles`` until DATAVALID, plus the rest of any
+    refresh they collide with.
+    """
+
+    phy: In(DQSPHYSignature())
+
+    def __init__(self, timing):
+        self.timing = timing
+        super().__init__()
+
+    def elaborate(self, platform):
+        m = Module()
+
+        timing = self.timing
+
+        refresh_timer = Signal(range(timing.refresh_interval_cycles))
+        refreshing    = Signal()
+        m.d.sync += refresh_timer.eq(Mux(refresh_timer == timing.refresh_interval_cycles - 1,
+                                         0, refresh_timer + 1))
+        m.d.comb += refreshing.eq(refresh_timer < timing.refresh_cycles)
+
+        # DATAVALID some time after READ, but a read can't start mid-refresh.
+        phy_read_cnt = Signal(range(timing.phy_read_latency_cycles + 1))
+        with m.If(self.phy.read == 0):
+            m.d.sync += phy_read_cnt.eq(0)
+        with m.Elif((phy_read_cnt != 0) | ~refreshing):
+            with m.If(phy_read_cnt != timing.phy_read_latency_cycles):
+                m.d.sync += phy_read_cnt.eq(phy_read_cnt + 1)
+
+        m.d.comb += [
+            self.phy.ready.eq(1),
+            self.phy.burstdet.eq(1),
+            self.phy.datavalid.eq(phy_read_cnt == timing.phy_read_latency_cycles),
+        ]
+
+        return m
+
 # Main purpose of using this custom platform instead of
 # simply None is to track extra files added to the build.
 class VerilatorPlatform():
@@ -83,6 +195,8 @@ def soc_simulation_ports(fragment):
         "read_ready":     (fragment.psram_periph.simif.read_ready,       None),
         "write_ready":    (fragment.psram_periph.simif.write_ready,      None),
         "idle":           (fragment.psram_periph.simif.idle,             None),
+        "psram_port_cyc": (fragment.psram_periph.simif_ports.cyc,        None),
+        "psram_port_ack": (fragment.psram_periph.simif_ports.ack,        None),
         "spiflash_addr":  (fragment.spiflash_periph.spi_mmap.simif_addr, None),
         "spiflash_data":  (fragment.spiflash_periph.spi_mmap.simif_data, None),
         "dvi_de":         (fragment.fb.simif.de,                    None),
@@ -162,8 +276,10 @@ def simulate(fragment, ports, harness, hw_platform, clock_settings, tracing=Fals
         video_cflags = []
 
     if hasattr(fragment, "psram_periph"):
+        psram_timing = PSRAMTiming.get(hw_platform.psram_id)
         psram_cflags = [
            "-CFLAGS", f"-DPSRAM_SIM=1",
+           "-CFLAGS", f"-DPSRAM_TIMING_NAME=\\\"{psram_timing.name}\\\"",
        ]
     else:
         psram_cflags = []
@@ -14,25 +14,74 @@ from amaranth.utils import exact_log2
 from amaranth_soc import wishbone
 
 
+def _plru_path(way, waybits):
+    """
+    Walk a tree pseudo-LRU from the root to the leaf ``way``, yielding
+    ``(node, direction)`` for every node visited. Node ``n`` has children
+    ``2n+1`` (direction 0) and ``2n+2`` (direction 1), so a tree for
+    ``2**waybits`` ways has ``2**waybits - 1`` nodes.
+    """
+    node = 0
+    for level in reversed(range(waybits)):
+        direction = (way >> level) & 1
+        yield node, direction
+        node = 2*node + 1 + direction
+
+
 class WishboneL2Cache(wiring.Component):
 
     """
     Wishbone cache, designed to go between a wishbone master and backing store.
 
-    This cache is direct-mapped and write-back.
+    This cache is write-back, and either direct-mapped (``ways == 1``, default)
+    or N-way set-associative with pseudo-LRU replacement (``ways > 1``).
     - 'direct-mapped': https://en.wikipedia.org/wiki/Cache_placement_policies
     - 'write-back': https://en.wikipedia.org/wiki/Cache_(computing)#Writing_policies
+    - 'pseudo-LRU': https://en.wikipedia.org/wiki/Pseudo-LRU#Tree-PLRU
 
     The 'master' bus is for the wishbone master that uses the cache. It may only
-    issue classic transactions (i.e no burst transactions).
+    issue classic transactions (i.e no burst transactions), unless `pipelined`
+    is set (see below).
     The 'slave' bus is for the backing store. The cache acts as a master on
     this bus in order to fill / evict cache lines. The cache will issue burst
     transactions of length `burst_len` whenever a cache line is to be evicted
     (written to the backing store) or refilled (read from the backing store).
 
+    If `pipelined` is set, the 'master' bus must issue wishbone B4 pipelined
+    transactions (it has a 'stall' signal). In classic mode, every hit takes 3
+    cycles (IDLE -> TEST_HIT -> WAIT). In pipelined mode, hits are tested as soon
+    as they are presented and acknowledged on the following cycle, so back-to-back
+    hits are accepted every cycle. 'stall' is asserted while misses (or flushes)
+    are serviced. This lengthens the combinatorial tag lookup path a bit.
+
+    If `writeback_buffer` is set, dirty lines are not evicted before the refill.
+    Instead, the victim line is copied into a single-line write-back buffer while
+    the refill burst is in flight (each word is read out just before the refill
+    overwrites it), so the requester only waits for one burst. The buffer is
+    drained to the backing store later, whenever the master is idle, or before
+    it is needed again (another dirty miss, or a miss to the buffered line).
+    Autoflush also copies dirty lines into this buffer rather than bursting them
+    out directly.
+
+    If `autoflush` is set, one line is written back (if dirty) and invalidated
+    every 1024 idle cycles, so that other masters of the backing store (e.g. video
+    scanout) eventually see everything written through the cache. In this mode,
+    strobing `flush` writes back and invalidates *every* line as fast as possible,
+    with `flush_busy` asserted until this has completed (and the write-back
+    buffer, if any, is empty). This is useful before another master
+    overwrites the backing store directly.
+
     `cachesize_words` (in `data_width` words) is the size of the data store
     and must be a power of 2.
 
+    `ways` (a power of 2) splits the data store into that many ways. Each set
+    of `ways` lines shares an index, each way has its own tag/valid/dirty
+    storage, and each set has `ways-1` bits of tree pseudo-LRU state which are
+    updated on every hit. On a miss, an invalid way is refilled if the set has
+    one, otherwise the pseudo-LRU victim is (evicted and) refilled. This costs
+    one tag comparator per way, but stops masters that touch addresses aliasing
+    to the same line from thrashing the cache (e.g. multiple plot streams).
+
     This cache is a partial rewrite of the equivalent LiteX component:
     https://github.com/enjoy-digital/litex/blob/master/litex/soc/interconnect/wishbone.py
 
@@ -43,30 +92,44 @@ class WishboneL2Cache(wiring.Component):
     - Translation of bus data widths is removed and replaced with wishbone burst
       transactions of length matching the cache line. Cache lines themselves have
       have size (in bits) of `data_width*burst_len`.
+    - Optional set-associativity (see `ways` above).
     """
 
     def __init__(self, cachesize_words=64, addr_width=22, data_width=32,
-                 granularity=8, burst_len=4, autoflush=False):
+                 granularity=8, burst_len=4, ways=1, pipelined=False,
+                 writeback_buffer=False, autoflush=False):
 
         # Technically we should issue classic transactions to the backing
         # store if burst_len == 1, but this cache will always issue bursts.
         assert burst_len > 1
+        # Every way must contain at least one cache line.
+        assert cachesize_words >= burst_len * ways
 
         self.cachesize_words = cachesize_words
         self.data_width      = data_width
         self.burst_len       = burst_len
+        self.ways            = ways
+        self.pipelined       = pipelined
+        self.writeback_buffer = writeback_buffer
         self.granularity     = granularity
         self.autoflush       = autoflush
 
-        super().__init__({
+        members = {
             "master": In(wishbone.Signature(addr_width=addr_width,
                                             data_width=data_width,
-                                            granularity=granularity)),
+                                            granularity=granularity,
+                                            features={"stall"} if pipelined else ())),
             "slave": Out(wishbone.Signature(addr_width=addr_width,
                                             data_width=data_width,
                                             granularity=granularity,
                                             features={"cti", "bte"})),
-        })
+        }
+        if autoflush:
+            members.update({
+                "flush": In(1),
+                "flush_busy": Out(1),
+            })
+        super().__init__(members)
 
     def elaborate(self, platform):
         m = Module()
@@ -78,9 +141,11 @@ class WishboneL2Cache(wiring.Component):
 
         # Slice master.addr into 3 fields:
         # (MSB) adr_tag .. adr_line .. adr_offset (LSB)
+        # For set-associative caches, `adr_line` selects a set of `ways` lines.
         addressbits = len(slave.adr)
         offsetbits  = exact_log2(self.burst_len)
-        linebits    = exact_log2(self.cachesize_words // self.burst_len)
+        waybits     = exact_log2(self.ways)
+        linebits    = exact_log2(self.cachesize_words // self.burst_len) - waybits
         tagbits     = addressbits - linebits - offsetbits
         adr_offset  = master.adr.bit_select(0, offsetbits)
         adr_line    = Signal(linebits)
@@ -89,6 +154,11 @@ class WishboneL2Cache(wiring.Component):
         # Sig/comb assignment so we can override this for flushing.
         m.d.comb += adr_line.eq(master.adr.bit_select(offsetbits, linebits))
 
+        # Way (within the set at `adr_line`) that is being accessed. By default
+        # this is the way that hit, overridden with the victim way on misses,
+        # and for flushing. Zero-width for direct-mapped caches.
+        way = Signal(waybits)
+
         # Similar usage as adr_offset, iterates from 0..burst_len when
         # refilling/evicting cache lines.
         burst_offset = Signal.like(adr_offset)
@@ -96,20 +166,21 @@ class WishboneL2Cache(wiring.Component):
         m.d.comb += burst_offset_lookahead.eq(burst_offset)
 
         # Cache line (data) memory. Each line has (virtual) size `data_width*burst_len`.
-        # 'burst_offset'/'adr_offset' index are just extra concatenated address lines.
+        # 'burst_offset'/'adr_offset' index and 'way' are just extra concatenated address lines.
         # This ensures DPRAM inference still works (it doesn't for shape > 32bits).
         m.submodules.data_mem = data_mem = Memory(
-            shape=unsigned(self.data_width), depth=2**linebits*self.burst_len, init=[])
+            shape=unsigned(self.data_width), depth=self.cachesize_words, init=[])
         wr_port = data_mem.write_port(granularity=self.granularity)
         rd_port = data_mem.read_port()
 
 
         write_from_slave = Signal()
+        master_write = Signal()
 
         word_select = Const(1).replicate(dw_to//self.granularity)
 
         m.d.comb += [
-            rd_port.addr.eq(Cat(adr_offset, adr_line)),
+            rd_port.addr.eq(Cat(adr_offset, adr_line, way)),
             slave.sel.eq(word_select),
             master.dat_r.eq(rd_port.data),
             slave.dat_w.eq(rd_port.data),
@@ -117,121 +188,289 @@ class WishboneL2Cache(wiring.Component):
 
         with m.If(write_from_slave):
             m.d.comb += [
-                wr_port.addr.eq(Cat(burst_offset, adr_line)),
+                wr_port.addr.eq(Cat(burst_offset, adr_line, way)),
                 wr_port.data.eq(slave.dat_r),
                 wr_port.en.eq(word_select),
             ]
         with m.Else():
-            m.d.comb += wr_port.addr.eq(Cat(adr_offset, adr_line)),
+            m.d.comb += wr_port.addr.eq(Cat(adr_offset, adr_line, way)),
             m.d.comb += wr_port.data.eq(master.dat_w),
-            with m.If(master.cyc & master.stb & master.we & master.ack):
+            # Classic mode: written on the ack cycle. Pipelined mode: written
+            # as soon as the transaction is accepted (ack follows a cycle later).
+            with m.If(master_write):
                 m.d.comb += wr_port.en.eq(master.sel)
 
-        # Tag storage memory. Maps addr_line (cache line address) to the higher order
-        # bits of master.adr (adr_tag). If the adr_tag in the tag storage matches
-        # the requested adr_tag, we know the cache line has the data we want.
+        # Tag storage memory (one per way). Maps addr_line (cache line address) to the
+        # higher order bits of master.adr (adr_tag). If the adr_tag in the tag storage
+        # matches the requested adr_tag, we know the cache line has the data we want.
         tag_layout = data.StructLayout({
             "tag": unsigned(tagbits),
             "dirty": unsigned(1),
             "valid": unsigned(1),
         })
-        m.submodules.tag_mem = tag_mem= Memory(shape=tag_layout, depth=2**linebits, init=[])
-        tag_wr_port = tag_mem.write_port()
-        tag_rd_port = tag_mem.read_port(domain='comb')
-        tag_do = Signal(shape=tag_layout)
-        tag_di = Signal(shape=tag_layout)
-        m.d.comb += [
-            tag_do.eq(tag_rd_port.data),
-            tag_wr_port.data.eq(tag_di),
-        ]
+        tag_do = Signal(shape=tag_layout) # Tag of the selected 'way'
+        tag_di = Signal(shape=tag_layout) # Written to the selected 'way'
+        tag_we = Signal()
+        way_hit = Signal(self.ways)
+        way_valid = Signal(self.ways)
+        for n in range(self.ways):
+            tag_mem = Memory(shape=tag_layout, depth=2**linebits, init=[])
+            m.submodules[f"tag_mem{n}"] = tag_mem
+            tag_wr_port = tag_mem.write_port()
+            tag_rd_port = tag_mem.read_port(domain='comb')
+            m.d.comb += [
+                tag_wr_port.addr.eq(adr_line),
+                tag_wr_port.data.eq(tag_di),
+                tag_wr_port.en.eq(tag_we & (way == n)),
+                tag_rd_port.addr.eq(adr_line),
+                way_valid[n].eq(tag_rd_port.data.valid),
+                way_hit[n].eq(tag_rd_port.data.valid & (tag_rd_port.data.tag == adr_tag)),
+            ]
+            with m.If(way == n):
+                m.d.comb += tag_do.eq(tag_rd_port.data)
 
+        m.d.comb += tag_di.tag.eq(adr_tag)
+
+        # Which way (if any) contains the requested address.
+        hit = Signal()
+        hit_way = Signal(waybits)
         m.d.comb += [
-            tag_wr_port.addr.eq(adr_line),
-            tag_rd_port.addr.eq(adr_line),
-            tag_di.tag.eq(adr_tag)
+            hit.eq(way_hit.any()),
+            way.eq(hit_way),
         ]
+        for n in range(self.ways):
+            with m.If(way_hit[n]):
+                m.d.comb += hit_way.eq(n)
+
+        # Which way to replace on a miss. Registered, as the pseudo-LRU state
+        # and tags may change before the refill completes.
+        victim_way = Signal(waybits)
+        miss_way = Signal(waybits)
+
+        if self.ways > 1:
+            # Tree pseudo-LRU state, 'ways-1' bits per set. Each bit points
+            # toward the less recently used half of its subtree.
+            m.submodules.plru_mem = plru_mem = Memory(
+                shape=unsigned(self.ways-1), depth=2**linebits, init=[])
+            plru_wr_port = plru_mem.write_port()
+            plru_rd_port = plru_mem.read_port(domain='comb')
+            plru_we = Signal()
+            m.d.comb += [
+                plru_rd_port.addr.eq(adr_line),
+                plru_wr_port.addr.eq(adr_line),
+                plru_wr_port.en.eq(plru_we),
+                plru_wr_port.data.eq(plru_rd_port.data),
+            ]
+            for n in range(self.ways):
+                path = list(_plru_path(n, waybits))
+                # Follow the tree to find the pseudo-LRU way.
+                with m.If(Cat([plru_rd_port.data[node] == d for node, d in path]).all()):
+                    m.d.comb += victim_way.eq(n)
+                # On a hit, point every node on the path away from the hit way.
+                with m.If(hit_way == n):
+                    m.d.comb += [plru_wr_port.data[node].eq(1-d) for node, d in path]
+            # Invalid ways are always preferred over evicting anything.
+            for n in reversed(range(self.ways)):
+                with m.If(~way_valid[n]):
+                    m.d.comb += victim_way.eq(n)
 
         m.d.comb += slave.adr.eq(Cat(burst_offset, adr_line, tag_do.tag))
 
         m.d.sync += master.ack.eq(0)
 
+        if self.pipelined:
+            m.d.comb += master.stall.eq(1)
+        else:
+            m.d.comb += master_write.eq(master.cyc & master.stb & master.we & master.ack)
+
         if self.autoflush:
             flush_wait = Signal(10, init=1)
-            adr_line_flush = Signal.like(adr_line)
-
-        with m.FSM() as fsm:
-
-            with m.State("IDLE"):
-
-                with m.If(master.cyc & master.stb):
-                    m.next = "TEST_HIT"
-
-                if self.autoflush:
-                    m.d.sync += flush_wait.eq(flush_wait+1)
-                    with m.If(flush_wait == 0):
-                        m.d.comb += adr_line.eq(adr_line_flush)
-                        m.next = "TEST_FLUSH"
+            # Iterates across every way of every line.
+            flush_index = Signal(linebits + waybits)
+            adr_line_flush = flush_index[waybits:]
+            way_flush = flush_index[:waybits]
+            # Lines left to flush after a `flush` strobe. While nonzero, lines are
+            # flushed back-to-back and clean lines are also invalidated.
+            flush_remaining = Signal(linebits + waybits + 1)
+            flush_all = Signal()
+            m.d.comb += flush_all.eq(flush_remaining != 0)
+
+            def flush_next():
+                m.d.sync += flush_index.eq(flush_index+1)
+                with m.If(flush_all):
+                    m.d.sync += flush_remaining.eq(flush_remaining-1)
+
+        if self.writeback_buffer:
+            # Single-line write-back buffer, and the line address (adr_line, tag)
+            # in the backing store that its contents belong to.
+            m.submodules.wb_mem = wb_mem = Memory(
+                shape=unsigned(self.data_width), depth=self.burst_len, init=[])
+            wb_wr_port = wb_mem.write_port()
+            wb_rd_port = wb_mem.read_port()
+            wb_adr  = Signal(linebits + tagbits)
+            wb_full = Signal()
+
+            # Copy the line at (adr_line, way) from the data memory into the
+            # buffer while 'capture' is asserted. One word is read per cycle,
+            # and written to the buffer on the next cycle (when the data from
+            # the read port is available).
+            capture           = Signal()
+            capture_on_refill = Signal()
+            capture_offset    = Signal(offsetbits + 1)
+            capture_we        = Signal()
+            capture_wr_addr   = Signal(offsetbits)
+            m.d.sync += capture_we.eq(0)
+            with m.If(capture & (capture_offset != self.burst_len)):
+                m.d.comb += rd_port.addr.eq(Cat(capture_offset[:offsetbits], adr_line, way))
+                m.d.sync += [
+                    capture_offset.eq(capture_offset + 1),
+                    capture_we.eq(1),
+                    capture_wr_addr.eq(capture_offset),
+                ]
+            with m.Elif(~capture):
+                m.d.sync += capture_offset.eq(0)
 
-            with m.State("WAIT"):
-                m.next = "IDLE"
+            m.d.comb += [
+                wb_wr_port.addr.eq(capture_wr_addr),
+                wb_wr_port.data.eq(rd_port.data),
+                wb_wr_port.en.eq(capture_we),
+                wb_rd_port.addr.eq(burst_offset_lookahead),
+            ]
 
-            with m.State("TEST_HIT"):
-                with m.If((tag_do.tag == adr_tag) & tag_do.valid):
-                    m.d.sync += master.ack.eq(1)
-                    with m.If(master.we):
+            # The requested line is sitting in the buffer, so it must be
+            # drained before the line can be refilled.
+            wb_conflict = wb_full & (wb_adr == Cat(adr_line, adr_tag))
+
+        def test_hit(next_on_hit):
+            # Shared by TEST_HIT (classic) and IDLE (pipelined) states.
+            with m.If(hit):
+                m.d.sync += master.ack.eq(1)
+                if self.ways > 1:
+                    m.d.comb += plru_we.eq(1)
+                with m.If(master.we):
+                    m.d.comb += [
+                        tag_di.valid.eq(1),
+                        tag_di.dirty.eq(1),
+                        tag_we.eq(1)
+                    ]
+                    if self.pipelined:
+                        m.d.comb += master_write.eq(1)
+                if self.pipelined:
+                    m.d.comb += master.stall.eq(0)
+                m.next = next_on_hit
+            with m.Else():
+                m.d.comb += way.eq(victim_way)
+                m.d.sync += miss_way.eq(victim_way)
+                if self.writeback_buffer:
+                    with m.If(wb_conflict | (tag_do.dirty & wb_full)):
+                        m.next = "DRAIN"
+                    with m.Else():
+                        # A dirty victim is captured into the write-back buffer
+                        # while the refill is in flight.
+                        m.d.sync += capture_on_refill.eq(tag_do.dirty)
+                        with m.If(tag_do.dirty):
+                            m.d.sync += [
+                                wb_full.eq(1),
+                                wb_adr.eq(Cat(adr_line, tag_do.tag)),
+                            ]
+                        # Write the tag to set the slave address for the cache refill.
                         m.d.comb += [
                             tag_di.valid.eq(1),
-                            tag_di.dirty.eq(1),
-                            tag_wr_port.en.eq(1)
+                            tag_we.eq(1),
                         ]
-                    m.next = "WAIT"
-                with m.Else():
+                        m.next = "REFILL"
+                else:
                     with m.If(tag_do.dirty):
-                        m.d.comb += rd_port.addr.eq(Cat(burst_offset_lookahead, adr_line)),
+                        m.d.comb += rd_port.addr.eq(Cat(burst_offset_lookahead, adr_line, way)),
                         m.next = "EVICT"
                     with m.Else():
                         # Write the tag to set the slave address for the cache refill.
                         m.d.comb += [
                             tag_di.valid.eq(1),
-                            tag_wr_port.en.eq(1),
+                            tag_we.eq(1),
                         ]
                         m.next = "REFILL"
 
-            with m.State("EVICT"):
+        with m.FSM() as fsm:
 
-                m.d.comb += [
-                    slave.stb.eq(1),
-                    slave.cyc.eq(1),
-                    slave.we.eq(1),
-                    slave.cti.eq(wishbone.CycleType.INCR_BURST),
-                    rd_port.addr.eq(Cat(burst_offset_lookahead, adr_line)),
-                ]
+            with m.State("IDLE"):
 
-                with m.If(burst_offset == (self.burst_len - 1)):
-                    m.d.comb += slave.cti.eq(wishbone.CycleType.END_OF_BURST)
+                def request():
+                    if self.pipelined:
+                        test_hit(next_on_hit="IDLE")
+                    else:
+                        m.next = "TEST_HIT"
+
+                if self.autoflush:
+                    m.d.sync += flush_wait.eq(flush_wait+1)
+                    # Flushes take priority over (stall) incoming requests.
+                    with m.If((flush_wait == 0) | flush_all):
+                        m.d.comb += [
+                            adr_line.eq(adr_line_flush),
+                            way.eq(way_flush),
+                        ]
+                        m.next = "TEST_FLUSH"
+                    with m.Elif(master.cyc & master.stb):
+                        request()
+                else:
+                    with m.If(master.cyc & master.stb):
+                        request()
+
+                if self.writeback_buffer:
+                    # Drain the write-back buffer whenever the master is idle.
+                    with m.Elif(wb_full):
+                        m.next = "DRAIN"
+
+            if not self.pipelined:
+                with m.State("WAIT"):
+                    m.next = "IDLE"
+
+                with m.State("TEST_HIT"):
+                    test_hit(next_on_hit="WAIT")
+
+            if not self.writeback_buffer:
+                with m.State("EVICT"):
+
+                    m.d.comb += [
+                        way.eq(miss_way),
+                        slave.stb.eq(1),
+                        slave.cyc.eq(1),
+                        slave.we.eq(1),
+                        slave.cti.eq(wishbone.CycleType.INCR_BURST),
+                        rd_port.addr.eq(Cat(burst_offset_lookahead, adr_line, way)),
+                    ]
 
-                with m.If(slave.ack):
-                    m.d.comb += burst_offset_lookahead.eq(burst_offset+1)
-                    m.d.sync += burst_offset.eq(burst_offset + 1)
                     with m.If(burst_offset == (self.burst_len - 1)):
-                        m.next = "WAIT-REFILL"
+                        m.d.comb += slave.cti.eq(wishbone.CycleType.END_OF_BURST)
 
-            with m.State("WAIT-REFILL"):
-                # Write the tag to set the slave address for the cache refill.
-                m.d.comb += [
-                    tag_di.valid.eq(1),
-                    tag_wr_port.en.eq(1),
-                ]
-                # Deassert stb between EVICT/REFILL
-                m.next = "REFILL"
+                    with m.If(slave.ack):
+                        m.d.comb += burst_offset_lookahead.eq(burst_offset+1)
+                        m.d.sync += burst_offset.eq(burst_offset + 1)
+                        with m.If(burst_offset == (self.burst_len - 1)):
+                            m.next = "WAIT-REFILL"
+
+                with m.State("WAIT-REFILL"):
+                    # Write the tag to set the slave address for the cache refill.
+                    m.d.comb += [
+                        way.eq(miss_way),
+                        tag_di.valid.eq(1),
+                        tag_we.eq(1),
+                    ]
+                    # Deassert stb between EVICT/REFILL
+                    m.next = "REFILL"
 
             with m.State("REFILL"):
                 m.d.comb += [
+                    way.eq(miss_way),
                     slave.stb.eq(1),
                     slave.cyc.eq(1),
                     slave.we.eq(0),
                     slave.cti.eq(wishbone.CycleType.INCR_BURST),
                 ]
+                if self.writeback_buffer:
+                    # Each victim word is read out (1 per cycle) no later than the
+                    # cycle it is overwritten by the refill (which sees the old value).
+                    m.d.comb += capture.eq(capture_on_refill)
                 with m.If(burst_offset == (self.burst_len - 1)):
                     m.d.comb += slave.cti.eq(wishbone.CycleType.END_OF_BURST)
                 with m.If(slave.ack):
@@ -240,25 +479,17 @@ class WishboneL2Cache(wiring.Component):
                     ]
                     m.d.sync += burst_offset.eq(burst_offset + 1)
                     with m.If(burst_offset == (self.burst_len - 1)):
-                        m.next = "TEST_HIT"
+                        m.next = "IDLE" if self.pipelined else "TEST_HIT"
 
-            if self.autoflush:
-                with m.State("TEST_FLUSH"):
-                    m.d.comb += adr_line.eq(adr_line_flush)
-                    with m.If(tag_do.valid & tag_do.dirty):
-                        m.next = "FLUSH_LINE"
-                    with m.Else():
-                        m.d.sync += adr_line_flush.eq(adr_line_flush+1)
-                        m.next = "IDLE"
-
-                with m.State("FLUSH_LINE"):
+            if self.writeback_buffer:
+                with m.State("DRAIN"):
                     m.d.comb += [
-                        adr_line.eq(adr_line_flush),
                         slave.stb.eq(1),
                         slave.cyc.eq(1),
                         slave.we.eq(1),
                         slave.cti.eq(wishbone.CycleType.INCR_BURST),
-                        rd_port.addr.eq(Cat(burst_offset_lookahead, adr_line)),
+                        slave.adr.eq(Cat(burst_offset, wb_adr)),
+                        slave.dat_w.eq(wb_rd_port.data),
                     ]
                     with m.If(burst_offset == (self.burst_len - 1)):
                         m.d.comb += slave.cti.eq(wishbone.CycleType.END_OF_BURST)
@@ -266,11 +497,82 @@ class WishboneL2Cache(wiring.Component):
                         m.d.comb += burst_offset_lookahead.eq(burst_offset+1)
                         m.d.sync += burst_offset.eq(burst_offset + 1)
                         with m.If(burst_offset == (self.burst_len - 1)):
+                            m.d.sync += wb_full.eq(0)
+                            m.next = "IDLE"
+
+            if self.autoflush:
+                with m.State("TEST_FLUSH"):
+                    m.d.comb += [
+                        adr_line.eq(adr_line_flush),
+                        way.eq(way_flush),
+                    ]
+                    with m.If(tag_do.valid & tag_do.dirty):
+                        if self.writeback_buffer:
+                            with m.If(wb_full):
+                                # This line is retried on the next flush.
+                                m.next = "DRAIN"
+                            with m.Else():
+                                m.d.sync += [
+                                    wb_full.eq(1),
+                                    wb_adr.eq(Cat(adr_line, tag_do.tag)),
+                                ]
+                                m.next = "FLUSH_CAPTURE"
+                        else:
+                            m.next = "FLUSH_LINE"
+                    with m.Else():
+                        with m.If(flush_all):
                             m.d.comb += [
                                 tag_di.valid.eq(0),
-                                tag_wr_port.en.eq(1)
+                                tag_we.eq(1)
                             ]
-                            m.d.sync += adr_line_flush.eq(adr_line_flush+1)
+                        flush_next()
+                        m.next = "IDLE"
+
+                if self.writeback_buffer:
+                    with m.State("FLUSH_CAPTURE"):
+                        m.d.comb += [
+                            adr_line.eq(adr_line_flush),
+                            way.eq(way_flush),
+                            capture.eq(1),
+                        ]
+                        with m.If(capture_offset == (self.burst_len - 1)):
+                            m.d.comb += [
+                                tag_di.valid.eq(0),
+                                tag_we.eq(1)
+                            ]
+                            flush_next()
                             m.next = "IDLE"
+                else:
+                    with m.State("FLUSH_LINE"):
+                        m.d.comb += [
+                            adr_line.eq(adr_line_flush),
+                            way.eq(way_flush),
+                            slave.stb.eq(1),
+                            slave.cyc.eq(1),
+                            slave.we.eq(1),
+                            slave.cti.eq(wishbone.CycleType.INCR_BURST),
+                            rd_port.addr.eq(Cat(burst_offset_lookahead, adr_line, way)),
+                        ]
+                        with m.If(burst_offset == (self.burst_len - 1)):
+                            m.d.comb += slave.cti.eq(wishbone.CycleType.END_OF_BURST)
+                        with m.If(slave.ack):
+                            m.d.comb += burst_offset_lookahead.eq(burst_offset+1)
+                            m.d.sync += burst_offset.eq(burst_offset + 1)
+                            with m.If(burst_offset == (self.burst_len - 1)):
+                                m.d.comb += [
+                                    tag_di.valid.eq(0),
+                                    tag_we.eq(1)
+                                ]
+                                flush_next()
+                                m.next = "IDLE"
+
+        if self.autoflush:
+            # Flush requests restart the count (after any decrement above).
+            with m.If(self.flush):
+                m.d.sync += flush_remaining.eq(2**(linebits + waybits))
+            if self.writeback_buffer:
+                m.d.comb += self.flush_busy.eq(flush_all | wb_full)
+            else:
+                m.d.comb += self.flush_busy.eq(flush_all)
 
         return m
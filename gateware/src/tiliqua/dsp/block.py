@@ -32,19 +32,27 @@ class Block(data.StructLayout):
     Most cores here are assuming they are working with blocks of some predefined
     size - that is, each producer/consumer must expect the same size of :class:`Block`.
 
+    If ``n_channels`` is specified, each element is also tagged with the index of
+    the channel its block belongs to, so blocks from several channels can be
+    interleaved on a single stream (see :class:`STFTProcessorMultichannel`).
+
     Members
     -------
     first : :py:`unsigned(1)`
         Strobe asserted for first sample in a block, deasserted otherwise.
     sample : :py:`shape`
         Payload of this sample in the block.
+    channel : :py:`range(n_channels)`
+        Channel index of this block. *Only present if* ``n_channels`` *is specified.*
     """
-    def __init__(self, shape):
+    def __init__(self, shape, n_channels=None):
         # TODO: future - add expected size as metadata and verify on wiring.connect ?
         super().__init__({
             "first": unsigned(1),
             "sample": shape
-        })
+        } | ({
+            "channel": range(n_channels)
+        } if n_channels is not None else {}))
 
 class WrapCore(wiring.Component):
 
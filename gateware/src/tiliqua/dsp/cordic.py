@@ -5,7 +5,7 @@
 
 """Utilities for computing trigonometric functions in hardware."""
 
-from math import atan, pi
+from math import atan, ceil, pi
 
 from amaranth import *
 from amaranth.lib import memory, stream, wiring
@@ -16,6 +16,57 @@ from amaranth_future import fixed
 from .complex import CQ, Polar
 
 
+def _cordic_pipeline(m, advance, valid, x, y, z, *, shape, iterations,
+                     iterations_per_stage, vectoring):
+    """Unrolled CORDIC micro-rotations, with a pipeline register every
+    ``iterations_per_stage`` iterations, enabled by ``advance``.
+
+    ``valid``, ``x``, ``y``, ``z`` come from the (registered) first pipeline stage.
+    In vectoring mode, ``y`` is rotated to 0 and the angle accumulated in ``z``.
+    Otherwise, ``(x, y)`` is rotated by ``z`` until ``z`` reaches 0.
+
+    Returns the registered ``valid``, ``x``, ``y``, ``z`` of the last stage.
+    """
+    for stage, start in enumerate(range(0, iterations, iterations_per_stage)):
+        for i in range(start, min(start + iterations_per_stage, iterations)):
+            x_shift = Signal(shape, name=f"x_shift{i}")
+            y_shift = Signal(shape, name=f"y_shift{i}")
+            x_next = Signal(shape, name=f"x{i}")
+            y_next = Signal(shape, name=f"y{i}")
+            z_next = Signal(shape, name=f"z{i}")
+            atan_i = fixed.Const(atan(1.0 / (1<<i)) / pi, shape=shape)
+            m.d.comb += [
+                x_shift.eq(x >> i),
+                y_shift.eq(y >> i),
+            ]
+            with m.If(((x<0)^(y<0)) if vectoring else (z >= 0)):
+                m.d.comb += [
+                    x_next.eq(x - y_shift),
+                    y_next.eq(y + x_shift),
+                    z_next.eq(z - atan_i),
+                ]
+            with m.Else():
+                m.d.comb += [
+                    x_next.eq(x + y_shift),
+                    y_next.eq(y - x_shift),
+                    z_next.eq(z + atan_i),
+                ]
+            x, y, z = x_next, y_next, z_next
+        x_reg = Signal(shape, name=f"x_stage{stage}")
+        y_reg = Signal(shape, name=f"y_stage{stage}")
+        z_reg = Signal(shape, name=f"z_stage{stage}")
+        valid_reg = Signal(name=f"valid_stage{stage}")
+        with m.If(advance):
+            m.d.sync += [
+                x_reg.eq(x),
+                y_reg.eq(y),
+                z_reg.eq(z),
+                valid_reg.eq(valid),
+            ]
+        valid, x, y, z = valid_reg, x_reg, y_reg, z_reg
+    return valid, x, y, z
+
+
 class RectToPolarCordic(wiring.Component):
 
     """Iteratively compute magnitude and phase of complex numbers.
@@ -34,6 +85,12 @@ class RectToPolarCordic(wiring.Component):
 
         S: =1 if 'magnitude_correction' is True, and =K (CORDIC gain) otherwise
 
+    By default, the core is iterative and takes about ``iterations`` clocks per sample.
+    With ``pipelined=True``, the iterations are unrolled into a pipeline that accepts
+    one sample every clock, with a latency of ``self.latency`` clocks. Each pipeline stage
+    performs ``iterations_per_stage`` iterations, which trades a longer critical path
+    for fewer pipeline registers (and a lower latency).
+
     Members
     -------
     i : :py:`In(stream.Signature(CQ(shape)))`
@@ -46,7 +103,8 @@ class RectToPolarCordic(wiring.Component):
     K = 1.646760258121
 
     def __init__(self, shape: fixed.Shape, iterations: int = None,
-                 magnitude_correction=True):
+                 magnitude_correction=True, pipelined=False,
+                 iterations_per_stage: int = 1):
         """
         shape : Shape
             Shape of fixed-point number to use for incoming :class:`CQ` stream.
@@ -58,19 +116,80 @@ class RectToPolarCordic(wiring.Component):
             Whether to consume an additional multiplier to correct for the CORDIC gain
             constant. For some applications, this is not needed and can be used to
             save a multiplier.
+        pipelined : bool
+            Unroll the iterations into a pipeline accepting one sample per clock.
+        iterations_per_stage : int
+            Number of iterations folded into each pipeline stage (``pipelined`` only).
         """
 
         self.shape = shape
         self.iterations = iterations or shape.i_bits + shape.f_bits
         self.internal_shape = fixed.SQ(self.shape.i_bits + 2, self.shape.f_bits)
         self.magnitude_correction = magnitude_correction
+        self.pipelined = pipelined
+        self.iterations_per_stage = iterations_per_stage
+        # Quadrant stage, followed by the iteration stages.
+        self.latency = 1 + ceil(self.iterations / iterations_per_stage)
 
         super().__init__({
             "i": In(stream.Signature(CQ(shape))),
             "o": Out(stream.Signature(Polar(self.internal_shape))),
         })
 
+    def _elaborate_pipelined(self) -> Module:
+        m = Module()
+
+        # The whole pipeline advances whenever the output is free.
+        advance = Signal()
+        m.d.comb += [
+            advance.eq(~self.o.valid | self.o.ready),
+            self.i.ready.eq(advance),
+        ]
+
+        # Quadrant stage. The quadrant adjustment is the initial phase.
+        x = Signal(self.internal_shape)
+        y = Signal(self.internal_shape)
+        z = Signal(self.internal_shape)
+        valid = Signal()
+        with m.If(advance):
+            m.d.sync += valid.eq(self.i.valid)
+            with m.If(self.i.payload.real >= 0):  # Q1, Q4
+                m.d.sync += [
+                    x.eq(self.i.payload.real),
+                    y.eq(self.i.payload.imag),
+                    z.eq(0),
+                ]
+            with m.Else():
+                m.d.sync += [
+                    x.eq(-self.i.payload.real),
+                    y.eq(-self.i.payload.imag),
+                ]
+                with m.If(self.i.payload.imag >= 0):
+                    m.d.sync += z.eq(fixed.Const(1.0))  # Q2
+                with m.Else():
+                    m.d.sync += z.eq(fixed.Const(-1.0)) # Q3
+
+        valid, x, y, z = _cordic_pipeline(
+            m, advance, valid, x, y, z, shape=self.internal_shape,
+            iterations=self.iterations, iterations_per_stage=self.iterations_per_stage,
+            vectoring=True)
+
+        m.d.comb += [
+            self.o.valid.eq(valid),
+            self.o.payload.phase.eq(z),
+        ]
+        if self.magnitude_correction:
+            m.d.comb += self.o.payload.magnitude.eq(
+                x * fixed.Const(1.0/self.K, self.internal_shape))
+        else:
+            m.d.comb += self.o.payload.magnitude.eq(x)
+
+        return m
+
     def elaborate(self, platform) -> Module:
+        if self.pipelined:
+            return self._elaborate_pipelined()
+
         m = Module()
 
         #
@@ -189,3 +308,181 @@ class RectToPolarCordic(wiring.Component):
                     m.next = "IDLE"
 
         return m
+
+
+class PolarToRectCordic(wiring.Component):
+
+    """Iteratively compute rectangular coordinates of complex numbers.
+
+    This is the inverse of :class:`RectToPolarCordic`, using a CORDIC in 'rotation'
+    mode, so spectral effects can edit the magnitude and phase of frequency-domain
+    blocks and then resynthesize them.
+
+    Given a complex number in polar coordinates (phase in units of ``pi``, as emitted
+    by :class:`RectToPolarCordic`), this core emits:
+
+    .. code-block:: text
+
+        o.payload.real = S*i.payload.magnitude*cos(pi*i.payload.phase)
+        o.payload.imag = S*i.payload.magnitude*sin(pi*i.payload.phase)
+
+        S: =1 if 'magnitude_correction' is True, and =K (CORDIC gain) otherwise
+
+    The ``pipelined`` and ``iterations_per_stage`` options are the same as
+    :class:`RectToPolarCordic`.
+
+    Members
+    -------
+    i : :py:`In(stream.Signature(Polar(shape)))`
+        Stream of incoming complex numbers in polar coordinates.
+    o : :py:`Out(stream.Signature(CQ(self.internal_shape)))`
+        Stream of outgoing complex numbers in rectangular coordinates.
+    """
+
+    #: CORDIC gain constant.
+    K = RectToPolarCordic.K
+
+    def __init__(self, shape: fixed.Shape, iterations: int = None,
+                 magnitude_correction=True, pipelined=False,
+                 iterations_per_stage: int = 1):
+        """
+        shape : Shape
+            Shape of fixed-point number to use for incoming :class:`Polar` stream.
+        iterations : int
+            Number of iterations of computation. This defaults to the number of bits
+            in the provided ``shape``.
+        magnitude_correction : bool
+            Whether to consume an additional multiplier to correct for the CORDIC gain
+            constant (applied to the magnitude before rotation).
+        pipelined : bool
+            Unroll the iterations into a pipeline accepting one sample per clock.
+        iterations_per_stage : int
+            Number of iterations folded into each pipeline stage (``pipelined`` only).
+        """
+
+        self.shape = shape
+        self.iterations = iterations or shape.i_bits + shape.f_bits
+        self.internal_shape = fixed.SQ(self.shape.i_bits + 2, self.shape.f_bits)
+        self.magnitude_correction = magnitude_correction
+        self.pipelined = pipelined
+        self.iterations_per_stage = iterations_per_stage
+        self.latency = 1 + ceil(self.iterations / iterations_per_stage)
+
+        super().__init__({
+            "i": In(stream.Signature(Polar(shape))),
+            "o": Out(stream.Signature(CQ(self.internal_shape))),
+        })
+
+    def _quadrant(self, m, payload, x, y, z):
+        # Rotations only converge for phases within about +/- pi/2. Other phases
+        # are rotated by pi, by negating the starting vector.
+        magnitude = Signal(self.internal_shape)
+        if self.magnitude_correction:
+            m.d.comb += magnitude.eq(payload.magnitude * fixed.Const(1.0/self.K, self.internal_shape))
+        else:
+            m.d.comb += magnitude.eq(payload.magnitude)
+        m.d.sync += y.eq(0)
+        with m.If(payload.phase > fixed.Const(0.5, shape=self.shape)):
+            m.d.sync += [
+                x.eq(-magnitude),
+                z.eq(payload.phase - fixed.Const(1.0)),
+            ]
+        with m.Elif(payload.phase < fixed.Const(-0.5, shape=self.shape)):
+            m.d.sync += [
+                x.eq(-magnitude),
+                z.eq(payload.phase + fixed.Const(1.0)),
+            ]
+        with m.Else():
+            m.d.sync += [
+                x.eq(magnitude),
+                z.eq(payload.phase),
+            ]
+
+    def elaborate(self, platform) -> Module:
+        m = Module()
+
+        x = Signal(self.internal_shape)
+        y = Signal(self.internal_shape)
+        z = Signal(self.internal_shape)
+
+        if self.pipelined:
+            advance = Signal()
+            m.d.comb += [
+                advance.eq(~self.o.valid | self.o.ready),
+                self.i.ready.eq(advance),
+            ]
+            valid = Signal()
+            with m.If(advance):
+                m.d.sync += valid.eq(self.i.valid)
+                self._quadrant(m, self.i.payload, x, y, z)
+            valid, x, y, z = _cordic_pipeline(
+                m, advance, valid, x, y, z, shape=self.internal_shape,
+                iterations=self.iterations, iterations_per_stage=self.iterations_per_stage,
+                vectoring=False)
+            m.d.comb += [
+                self.o.valid.eq(valid),
+                self.o.payload.real.eq(x),
+                self.o.payload.imag.eq(y),
+            ]
+            return m
+
+        atan_values = []
+        for i in range(self.iterations):
+            angle = atan(1.0 / (1<<i)) / pi
+            atan_values.append(angle)
+        m.submodules.atan_rom = atan_rom = memory.Memory(
+            shape=self.internal_shape,
+            depth=self.iterations,
+            init=atan_values
+        )
+        atan_rd = atan_rom.read_port(domain='comb')
+
+        in_latch = Signal.like(self.i.payload)
+        iteration = Signal(range(self.iterations + 1))
+
+        x_shift = Signal(self.internal_shape)
+        y_shift = Signal(self.internal_shape)
+        m.d.comb += [
+            atan_rd.addr.eq(iteration),
+            x_shift.eq(x >> iteration),
+            y_shift.eq(y >> iteration),
+            self.o.payload.real.eq(x),
+            self.o.payload.imag.eq(y),
+        ]
+
+        with m.FSM():
+            with m.State("IDLE"):
+                m.d.comb += self.i.ready.eq(1)
+                with m.If(self.i.valid):
+                    m.d.sync += in_latch.eq(self.i.payload)
+                    m.next = "QUADRANT"
+
+            with m.State("QUADRANT"):
+                m.d.sync += iteration.eq(0)
+                self._quadrant(m, in_latch, x, y, z)
+                m.next = "ITERATE"
+
+            with m.State("ITERATE"):
+                with m.If(iteration < self.iterations):
+                    with m.If(z >= 0):  # rotate counter-clockwise
+                        m.d.sync += [
+                            x.eq(x - y_shift),
+                            y.eq(y + x_shift),
+                            z.eq(z - atan_rd.data),
+                        ]
+                    with m.Else():  # rotate clockwise
+                        m.d.sync += [
+                            x.eq(x + y_shift),
+                            y.eq(y - x_shift),
+                            z.eq(z + atan_rd.data),
+                        ]
+                    m.d.sync += iteration.eq(iteration + 1)
+                with m.Else():
+                    m.next = "OUTPUT"
+
+            with m.State("OUTPUT"):
+                m.d.comb += self.o.valid.eq(1)
+                with m.If(self.o.ready):
+                    m.next = "IDLE"
+
+        return m
@@ -79,8 +79,9 @@ class PingPongDelay(wiring.Component):
             coefficients=[[0.5, 0.0, 0.5, 0.0],  # in0
                           [0.0, 0.5, 0.0, 0.5],  # in1
                           [0.5, 0.0, 0.0, 0.5],  # tap1.o
-                          [0.0, 0.5, 0.5, 0.0]]) # tap2.o
+                          [0.0, 0.5, 0.5, 0.0]], # tap2.o
                         # out0 out1 tap1.i tap2.i
+            sparse=True)
 
         # Split matrix input / output into independent streams
 
@@ -183,8 +184,9 @@ class Diffuser(wiring.Component):
                           [0.4, 0.0, 0.0, 0.0, 0.4,-0.4,-0.4,-0.4], # ds0
                           [0.0, 0.4, 0.0, 0.0,-0.4, 0.4,-0.4,-0.4], #  |
                           [0.0, 0.0, 0.4, 0.0,-0.4,-0.4, 0.4,-0.4], #  |
-                          [0.0, 0.0, 0.0, 0.4,-0.4,-0.4,-0.4, 0.4]])# ds3
+                          [0.0, 0.0, 0.0, 0.4,-0.4,-0.4,-0.4, 0.4]],# ds3
                           # out0 ------- out3  sw0 ---------- sw3
+            sparse=True)
 
     def elaborate(self, platform):
         m = Module()
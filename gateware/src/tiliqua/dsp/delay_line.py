@@ -6,7 +6,8 @@
 """PSRAM- or SRAM-backed streaming audio delay lines."""
 
 from amaranth import *
-from amaranth.lib import stream, wiring
+from amaranth.lib import fifo, stream, wiring
+from amaranth.lib.memory import Memory
 from amaranth.lib.wiring import In, Out
 from amaranth.utils import exact_log2
 from amaranth_soc import wishbone
@@ -110,6 +111,20 @@ class DelayLine(wiring.Component):
         The purpose of this cache is to collect as many read & write operations into
         burstable transactions as possible.
 
+    - **Packed PSRAM-backed delay line** (:py:`packed=True`)
+        For 16-bit samples, each 32-bit word of memory holds 2 adjacent samples.
+        Normally every sample read or write is a separate (sub-word) access. With
+        :py:`packed=True`, pairs of samples are written as a single 32-bit word,
+        and each :class:`DelayLineTap` caches the last word it read, so reading
+        the adjacent sample (either the next sample of a fixed delay tap, or the
+        second sample needed for fractional delay interpolation) does not need
+        another memory access. This halves the number of memory transactions.
+        Tap caches snoop the writes of the parent :class:`DelayLine`, so they
+        never return stale samples.
+
+    Samples wider than 16 bits (i.e. if ``ASQ`` is 24- or 32-bit) are stored
+    one per 32-bit word.
+
     .. note::
         As each delayline contains completely different samples and individually
         has quite a predictable access pattern, it makes sense to have one cache
@@ -131,7 +146,7 @@ class DelayLine(wiring.Component):
     INTERNAL_BUS_GRANULARITY = 8
 
     def __init__(self, max_delay, psram_backed=False, addr_width_o=None, base=None,
-                 write_triggers_read=True, cache_kwargs=None):
+                 write_triggers_read=True, cache_kwargs=None, packed=False):
         """
         max_delay : int
             The maximum delay in samples. This exactly corresponds to the memory
@@ -151,6 +166,10 @@ class DelayLine(wiring.Component):
         cache_kwargs : dict, optional
             *Relevant only for PSRAM-backed delay lines.*
             Arguments to forward to creation of the internal memory cache.
+        packed : bool, optional
+            *Relevant only for PSRAM-backed delay lines with 16-bit samples.*
+            If True, pairs of adjacent samples are written and read as a single
+            32-bit word (see above).
         """
 
         if psram_backed:
@@ -164,24 +183,32 @@ class DelayLine(wiring.Component):
         self.address_width = exact_log2(max_delay)
         self.write_triggers_read = write_triggers_read
         self.psram_backed = psram_backed
+        self.packed = packed
+
+        if packed:
+            assert psram_backed
+            assert self.INTERNAL_BUS_DATA_WIDTH == 16
 
         # reader taps that may read from this delay line
         self.taps = []
 
-        # internal bus is lower footprint than the SoC bus.
-        data_width  = self.INTERNAL_BUS_DATA_WIDTH
+        # internal bus is lower footprint than the SoC bus, unless
+        # samples are packed, where the internal bus carries sample pairs.
+        data_width  = 32 if packed else self.INTERNAL_BUS_DATA_WIDTH
         granularity = self.INTERNAL_BUS_GRANULARITY
+        self.samples_per_word = 2 if packed else 1
+        bus_addr_width = self.address_width - exact_log2(self.samples_per_word)
 
         # bus that this delayline writes samples to
         self.internal_writer_bus = wishbone.Signature(
-            addr_width=self.address_width,
+            addr_width=bus_addr_width,
             data_width=data_width,
             granularity=granularity
         ).create()
 
         # arbiter to round-robin between write transactions (from this
         # DelayLine) and read transactions (from children DelayLineTap)
-        self._arbiter = wishbone.Arbiter(addr_width=self.address_width,
+        self._arbiter = wishbone.Arbiter(addr_width=bus_addr_width,
                                          data_width=data_width,
                                          granularity=granularity,
                                          features={'bte', 'cti'} if not psram_backed else {})
@@ -190,6 +217,8 @@ class DelayLine(wiring.Component):
         # internal signal between DelayLine and DelayLineTap
         self._wrpointer = Signal(unsigned(self.address_width))
         self._mem_zeroed = Signal(init=0 if self.psram_backed else 1)
+        # packed mode: even sample waiting for its pair to be written.
+        self._pending = Signal(16)
 
         # ports exposed to the outside world
         ports = {
@@ -206,7 +235,7 @@ class DelayLine(wiring.Component):
             }
 
             self._adapter = WishboneAdapter(
-                addr_width_i=self.address_width,
+                addr_width_i=bus_addr_width,
                 addr_width_o=addr_width_o,
                 base=base,
                 data_width_internal=data_width
@@ -242,7 +271,8 @@ class DelayLine(wiring.Component):
             assert fixed_delay < self.max_delay
         tap = DelayLineTap(parent_bus=self._arbiter.bus, writer_bus=self.internal_writer_bus,
                            fixed_delay=fixed_delay,
-                           write_triggers_read=self.write_triggers_read)
+                           write_triggers_read=self.write_triggers_read,
+                           packed=self.packed)
         self.taps.append(tap)
         self._arbiter.add(tap._bus)
         return tap
@@ -262,6 +292,7 @@ class DelayLine(wiring.Component):
         for n, tap in enumerate(self.taps):
             m.d.comb += tap._wrpointer.eq(self._wrpointer)
             m.d.comb += tap._mem_zeroed.eq(self._mem_zeroed)
+            m.d.comb += tap._pending.eq(self._pending)
             if self.write_triggers_read:
                 # Every write sample propagates to a read sample without needing
                 # to hook up the 'i' stream on delay taps.
@@ -297,6 +328,9 @@ class DelayLine(wiring.Component):
         # bus for sample writes which sits before the arbiter
         bus = self.internal_writer_bus
 
+        spw = self.samples_per_word
+        wr_word = self._wrpointer[exact_log2(spw):]
+
         with m.FSM() as fsm:
 
             if self.psram_backed:
@@ -308,13 +342,13 @@ class DelayLine(wiring.Component):
                         bus.we.eq(1),
                     ]
                     m.d.sync += [
-                        bus.adr.eq(self._wrpointer),
+                        bus.adr.eq(wr_word),
                         bus.dat_w.eq(0),
                         bus.sel.eq(-1),
                     ]
                     with m.If(bus.ack):
-                        with m.If(self._wrpointer != (self.max_delay - 1)):
-                            m.d.sync += self._wrpointer.eq(self._wrpointer + 1)
+                        with m.If(self._wrpointer != (self.max_delay - spw)):
+                            m.d.sync += self._wrpointer.eq(self._wrpointer + spw)
                         with m.Else():
                             m.next = 'WAIT-VALID'
                             m.d.sync += self._wrpointer.eq(0)
@@ -323,12 +357,27 @@ class DelayLine(wiring.Component):
             with m.State('WAIT-VALID'):
                 m.d.comb += istream.ready.eq(1)
                 with m.If(istream.valid):
-                    m.d.sync += [
-                        bus.adr  .eq(self._wrpointer),
-                        bus.dat_w.eq(istream.payload),
-                        bus.sel  .eq(-1),
-                    ]
-                    m.next = 'WRITE'
+                    if self.packed:
+                        with m.If(~self._wrpointer[0]):
+                            # Even sample, hold it until its pair arrives.
+                            m.d.sync += [
+                                self._pending.eq(istream.payload),
+                                self._wrpointer.eq(self._wrpointer + 1),
+                            ]
+                        with m.Else():
+                            m.d.sync += [
+                                bus.adr  .eq(wr_word),
+                                bus.dat_w.eq(Cat(self._pending, istream.payload)),
+                                bus.sel  .eq(-1),
+                            ]
+                            m.next = 'WRITE'
+                    else:
+                        m.d.sync += [
+                            bus.adr  .eq(self._wrpointer),
+                            bus.dat_w.eq(istream.payload),
+                            bus.sel  .eq(-1),
+                        ]
+                        m.next = 'WRITE'
 
             with m.State('WRITE'):
                 m.d.comb += [
@@ -361,23 +410,27 @@ class DelayLineTap(wiring.Component):
         Stream of samples read from the delay line, one per request
         on :py:`DelayLineTap.i`.
     """
-    def __init__(self, parent_bus, writer_bus, fixed_delay=None, write_triggers_read=True):
+    def __init__(self, parent_bus, writer_bus, fixed_delay=None, write_triggers_read=True,
+                 packed=False):
 
         self.fixed_delay = fixed_delay
         self.write_triggers_read = write_triggers_read
-        self.max_delay   = 2**parent_bus.addr_width
-        self.addr_width  = parent_bus.addr_width
+        self.packed      = packed
+        # address width in samples, the parent bus is word-addressed if packed.
+        self.addr_width  = parent_bus.addr_width + (1 if packed else 0)
+        self.max_delay   = 2**self.addr_width
         self.writer_bus  = writer_bus
 
         # internal signals between parent DelayLine and child DelayLineTap
-        self._wrpointer = Signal(unsigned(parent_bus.addr_width))
+        self._wrpointer = Signal(unsigned(self.addr_width))
         self._mem_zeroed = Signal()
+        self._pending   = Signal(16)
         self._bus = wishbone.Signature(addr_width=parent_bus.addr_width,
                                        data_width=parent_bus.data_width,
                                        granularity=parent_bus.granularity).create()
 
         super().__init__({
-            "i":         In(stream.Signature(unsigned(parent_bus.addr_width))),
+            "i":         In(stream.Signature(unsigned(self.addr_width))),
             "o":         Out(stream.Signature(ASQ)),
         })
 
@@ -386,6 +439,20 @@ class DelayLineTap(wiring.Component):
 
         bus = self._bus
 
+        if self.packed:
+            # Last word read by this tap. Invalidated whenever the parent
+            # DelayLine writes to the same word.
+            c_valid = Signal()
+            c_adr   = Signal.like(bus.adr)
+            c_data  = Signal(32)
+            # sample address of the current read.
+            rd_adr  = Signal(self.addr_width)
+            # write pointer when a zero-delay read was requested.
+            zd_ptr  = Signal(self.addr_width)
+            with m.If(self.writer_bus.cyc & self.writer_bus.stb &
+                      self.writer_bus.we & (self.writer_bus.adr == c_adr)):
+                m.d.sync += c_valid.eq(0)
+
         with m.FSM() as fsm:
             with m.State('WAIT-ZERO'):
                 with m.If(self._mem_zeroed):
@@ -396,14 +463,43 @@ class DelayLineTap(wiring.Component):
                         Mux(self.i.payload == 0, 1, self.i.payload)
                 with m.If(self.i.valid):
                     with m.If(delay == 0):
+                        if self.packed:
+                            m.d.sync += zd_ptr.eq(self._wrpointer)
                         m.next = 'ZDELAY'
+                    if self.packed:
+                        with m.Elif((delay == 1) & self._wrpointer[0]):
+                            # Previous sample has not been written yet.
+                            m.d.sync += self.o.payload.eq(self._pending)
+                            m.next = 'WAIT-READY'
+                        with m.Else():
+                            m.d.sync += rd_adr.eq(self._wrpointer - delay)
+                            m.next = 'LOOKUP'
+                    else:
+                        with m.Else():
+                            m.d.sync += bus.adr.eq(self._wrpointer - delay)
+                            m.next = 'READ'
+            with m.State('ZDELAY'):
+                if self.packed:
+                    # Even samples are only held by the parent until their
+                    # pair arrives, odd samples are written with their pair.
+                    with m.If(~zd_ptr[0] & (self._wrpointer != zd_ptr)):
+                        m.d.sync += self.o.payload.eq(self._pending)
+                        m.next = 'WAIT-READY'
+                    with m.If(zd_ptr[0] & self.writer_bus.stb):
+                        m.d.sync += self.o.payload.eq(self.writer_bus.dat_w[16:])
+                        m.next = 'WAIT-READY'
+                else:
+                    with m.If(self.writer_bus.stb):
+                        m.d.sync += self.o.payload.eq(self.writer_bus.dat_w)
+                        m.next = 'WAIT-READY'
+            if self.packed:
+                with m.State('LOOKUP'):
+                    with m.If(c_valid & (c_adr == rd_adr[1:])):
+                        m.d.sync += self.o.payload.eq(c_data.word_select(rd_adr[0], 16))
+                        m.next = 'WAIT-READY'
                     with m.Else():
-                        m.d.sync += bus.adr.eq(self._wrpointer - delay)
+                        m.d.sync += bus.adr.eq(rd_adr[1:])
                         m.next = 'READ'
-            with m.State('ZDELAY'):
-                with m.If(self.writer_bus.stb):
-                    m.d.sync += self.o.payload.eq(self.writer_bus.dat_w)
-                    m.next = 'WAIT-READY'
             with m.State('READ'):
                 m.d.comb += [
                     bus.stb.eq(1),
@@ -412,7 +508,15 @@ class DelayLineTap(wiring.Component):
                     bus.sel.eq(-1),
                 ]
                 with m.If(bus.ack):
-                    m.d.sync += self.o.payload.eq(bus.dat_r)
+                    if self.packed:
+                        m.d.sync += [
+                            self.o.payload.eq(bus.dat_r.word_select(rd_adr[0], 16)),
+                            c_valid.eq(1),
+                            c_adr.eq(bus.adr),
+                            c_data.eq(bus.dat_r),
+                        ]
+                    else:
+                        m.d.sync += self.o.payload.eq(bus.dat_r)
                     m.next = 'WAIT-READY'
             with m.State('WAIT-READY'):
                 m.d.comb += self.o.valid.eq(1)
@@ -423,18 +527,21 @@ class DelayLineTap(wiring.Component):
 
 class WishboneAdapter(wiring.Component):
     """
-    Adapter between external (dw=32) and internal (dw=ASQ.width) buses of DelayLine.
+    Adapter between external (dw=32) and internal (dw=16 or 32) buses of DelayLine.
     Used to adapt the internal bus to the correct size for external memory.
 
+    16-bit internal buses (16-bit samples) are mapped to the upper or lower
+    half of each 32-bit word. 32-bit internal buses (wider samples, or packed
+    pairs of 16-bit samples) map directly to 32-bit words.
+
     The base address is specified in bytes. Internally, this is converted to
     32-bit word addresses for the external bus.
     """
 
     def __init__(self, addr_width_i, addr_width_o, base, data_width_internal):
         self.base = base
-        # FIXME: this component should be parameterizable beyond 16-bit samples.
-        # 16-bit samples are nice because 2 evenly fit in a 32-bit WB bus.
-        assert data_width_internal == 16
+        self.data_width_internal = data_width_internal
+        assert data_width_internal in (16, 32)
         assert (base & 0x3) == 0, "base address must be 4-byte aligned"
         super().__init__({
             "i": In(wishbone.Signature(addr_width=addr_width_i,
@@ -448,16 +555,27 @@ class WishboneAdapter(wiring.Component):
     def elaborate(self, platform):
         m = Module()
 
-        # base is in bytes, output address is in 32-bit words
-        # sample index >> 1 because two 16-bit samples fit in one 32-bit word
         m.d.comb += [
             self.i.ack.eq(self.o.ack),
-            self.o.adr.eq((self.base>>2) + (self.i.adr>>1)),
             self.o.we.eq(self.i.we),
             self.o.cyc.eq(self.i.cyc),
             self.o.stb.eq(self.i.stb),
         ]
 
+        if self.data_width_internal == 32:
+            # base is in bytes, output address is in 32-bit words
+            m.d.comb += [
+                self.o.adr.eq((self.base>>2) + self.i.adr),
+                self.i.dat_r.eq(self.o.dat_r),
+                self.o.sel  .eq(self.i.sel),
+                self.o.dat_w.eq(self.i.dat_w),
+            ]
+            return m
+
+        # base is in bytes, output address is in 32-bit words
+        # sample index >> 1 because two 16-bit samples fit in one 32-bit word
+        m.d.comb += self.o.adr.eq((self.base>>2) + (self.i.adr>>1))
+
         with m.If(self.i.adr[0]):
             m.d.comb += [
                 self.i.dat_r.eq(self.o.dat_r>>16),
@@ -472,3 +590,443 @@ class WishboneAdapter(wiring.Component):
             ]
 
         return m
+
+class DelayLineEngine(wiring.Component):
+
+    """PSRAM-backed memory engine serving many delay lines over one bus.
+
+    Each PSRAM-backed :class:`DelayLine` carries its own cache, bus adapter
+    and arbiter port. For effects with many delay lines (e.g. chained
+    diffusers), this adds up to a lot of logic. :class:`DelayLineEngine`
+    instead serves many delay lines (and their taps) from a single bus
+    master, which moves whole bursts of samples at a time:
+
+    - **Write combining**: Samples written to each delay line are collected
+      in a small buffer of ``burst_len`` words, which is written back in a
+      single burst once full.
+
+    - **Read prefetching**: As every tap has a fixed delay, the addresses it
+      will read are known ahead of time. Each tap has a FIFO of
+      ``fifo_bursts*burst_len`` words which is refilled a burst at a time,
+      as soon as there is space and the samples have been written back.
+
+    Bursts are scheduled round-robin between all write buffers and taps.
+    On boot, the memory backing every delay line is zeroed (in bursts)
+    before any samples are accepted.
+
+    Usage is the same as for fixed delay taps on a :class:`DelayLine`
+    created with :py:`write_triggers_read=True`, except delay lines are
+    created by the engine:
+
+    .. code-block:: python
+
+        engine  = DelayLineEngine(addr_width_o=22)
+        delayln = engine.add_delay_line(max_delay=0x10000, base=0x0)
+        tap1    = delayln.add_tap(fixed_delay=5000)
+        tap2    = delayln.add_tap(fixed_delay=7000)
+
+    Only :py:`engine` needs to be added to :py:`m.submodules`, and
+    :py:`engine.bus` hooked up to the PSRAM. One sample is emitted on
+    each tap's :py:`o` after every write to :py:`delayln.i`.
+
+    .. note::
+
+        As bursts only read back samples that have already been written back,
+        there are limits on the delay of each tap. Each fixed delay must be
+        at least 2 bursts worth of samples (plus 1), and at least
+        ``fifo_bursts+1`` bursts shorter than ``max_delay``.
+
+    Members
+    -------
+    bus : :py:`Out(wishbone.Signature)`
+        Wishbone bus for connecting to external PSRAM (usually through an arbiter).
+    """
+
+    def __init__(self, addr_width_o, burst_len=8, fifo_bursts=2):
+        """
+        addr_width_o : int
+            The address width of the external memory bus.
+        burst_len : int
+            Length (in 32-bit words) of every burst issued on the external bus.
+        fifo_bursts : int
+            Depth (in bursts) of the prefetch FIFO of each tap.
+        """
+        assert burst_len > 1
+        self.burst_len = burst_len
+        self.fifo_bursts = fifo_bursts
+        self.sample_width = DelayLine.INTERNAL_BUS_DATA_WIDTH
+        self.samples_per_word = 32 // self.sample_width
+        self.samples_per_burst = self.samples_per_word * burst_len
+        self.lines = []
+        super().__init__({
+            "bus": Out(wishbone.Signature(addr_width=addr_width_o,
+                                          data_width=32,
+                                          granularity=8,
+                                          features={'bte', 'cti'})),
+        })
+
+    def add_delay_line(self, max_delay, base):
+        """
+        Add and return a new :class:`EngineDelayLine` served by this engine.
+
+        max_delay : int
+            The maximum delay in samples. Must be a power of 2.
+        base : int
+            The memory slice base address, in bytes. Must be burst-aligned.
+        """
+        assert (base % (4*self.burst_len)) == 0, "base address must be burst-aligned"
+        line = EngineDelayLine(self, max_delay=max_delay, base=base)
+        self.lines.append(line)
+        return line
+
+    def elaborate(self, platform):
+        m = Module()
+
+        named_submodules(m.submodules, self.lines, override_name="line")
+
+        bus = self.bus
+
+        # every burst is either a write-back from a delay line, or a
+        # prefetch for a tap. Requests are checked round-robin.
+        requesters = [("write", line) for line in self.lines] + \
+                     [("read", tap) for line in self.lines for tap in line.taps]
+
+        sel    = Signal(range(max(len(requesters), 2)))
+        offset = Signal(exact_log2(self.burst_len))
+        offset_lookahead = Signal.like(offset)
+        last   = offset == (self.burst_len - 1)
+
+        # latched address and direction of the current (or last) burst. The
+        # address and write data are held after each burst ends.
+        burst_adr = Signal.like(bus.adr)
+        burst_we  = Signal()
+
+        zeroed = Signal()
+        for line in self.lines:
+            m.d.comb += line._zeroed.eq(zeroed)
+
+        m.d.comb += [
+            offset_lookahead.eq(offset),
+            bus.adr.eq(burst_adr + offset),
+            bus.we.eq(burst_we),
+            bus.sel.eq(-1),
+            bus.cti.eq(Mux(last, wishbone.CycleType.END_OF_BURST,
+                                 wishbone.CycleType.INCR_BURST)),
+        ]
+
+        with m.If(bus.ack & ~last):
+            m.d.comb += offset_lookahead.eq(offset + 1)
+            m.d.sync += offset.eq(offset + 1)
+
+        for line in self.lines:
+            # write buffer read port is always one word ahead of the bus.
+            m.d.comb += line._wbuf_addr.eq(offset_lookahead)
+
+        with m.If(zeroed):
+            with m.Switch(sel):
+                for n, (kind, r) in enumerate(requesters):
+                    if kind == "write":
+                        with m.Case(n):
+                            m.d.comb += bus.dat_w.eq(r._wbuf_data)
+
+        def word_address(line, ptr):
+            return (line.base >> 2) + (ptr >> exact_log2(self.samples_per_word))
+
+        with m.FSM():
+
+            # PSRAM is not zeroed on boot, we must do it ourselves.
+            zline = Signal(range(len(self.lines) + 1))
+            zptr  = Signal(max(line.address_width for line in self.lines))
+            with m.State('ZERO-SETUP'):
+                m.d.sync += [
+                    offset.eq(0),
+                    burst_we.eq(1),
+                ]
+                with m.Switch(zline):
+                    for n, line in enumerate(self.lines):
+                        with m.Case(n):
+                            m.d.sync += burst_adr.eq(word_address(line, zptr[:line.address_width]))
+                            m.next = 'ZERO-MEMORY'
+                    with m.Default():
+                        m.d.sync += zeroed.eq(1)
+                        m.next = 'IDLE'
+
+            with m.State('ZERO-MEMORY'):
+                m.d.comb += [
+                    bus.stb.eq(1),
+                    bus.cyc.eq(1),
+                ]
+                with m.If(bus.ack & last):
+                    # Deassert stb between bursts.
+                    m.next = 'ZERO-SETUP'
+                    with m.Switch(zline):
+                        for n, line in enumerate(self.lines):
+                            with m.Case(n):
+                                with m.If(zptr[:line.address_width] !=
+                                          (line.max_delay - self.samples_per_burst)):
+                                    m.d.sync += zptr.eq(zptr + self.samples_per_burst)
+                                with m.Else():
+                                    m.d.sync += [
+                                        zptr.eq(0),
+                                        zline.eq(zline + 1),
+                                    ]
+
+            with m.State('IDLE'):
+                # start each burst from the first word.
+                m.d.comb += offset_lookahead.eq(0)
+                m.d.sync += offset.eq(0)
+                with m.If(sel == len(requesters) - 1):
+                    m.d.sync += sel.eq(0)
+                with m.Else():
+                    m.d.sync += sel.eq(sel + 1)
+                with m.Switch(sel):
+                    for n, (kind, r) in enumerate(requesters):
+                        with m.Case(n):
+                            if kind == "write":
+                                with m.If(r._flush_req):
+                                    m.d.sync += [
+                                        burst_adr.eq(word_address(r, r._flushed)),
+                                        burst_we.eq(1),
+                                        sel.eq(sel),
+                                    ]
+                                    m.next = 'BURST'
+                            else:
+                                with m.If(r._fetch_req):
+                                    m.d.sync += [
+                                        burst_adr.eq(word_address(r.line, r._fptr)),
+                                        burst_we.eq(0),
+                                        sel.eq(sel),
+                                    ]
+                                    m.next = 'BURST'
+
+            with m.State('BURST'):
+                m.d.comb += [
+                    bus.stb.eq(1),
+                    bus.cyc.eq(1),
+                ]
+                with m.Switch(sel):
+                    for n, (kind, r) in enumerate(requesters):
+                        with m.Case(n):
+                            if kind == "write":
+                                with m.If(bus.ack & last):
+                                    m.d.comb += r._flush_done.eq(1)
+                            else:
+                                m.d.comb += [
+                                    r._w_data.eq(bus.dat_r),
+                                    r._w_en.eq(bus.ack),
+                                ]
+                                with m.If(bus.ack & last):
+                                    m.d.comb += r._fetch_done.eq(1)
+                with m.If(bus.ack & last):
+                    m.next = 'GAP'
+
+            with m.State('GAP'):
+                # Deassert stb between bursts, and give the requester a
+                # cycle to update its request before it is checked again.
+                with m.If(sel == len(requesters) - 1):
+                    m.d.sync += sel.eq(0)
+                with m.Else():
+                    m.d.sync += sel.eq(sel + 1)
+                m.next = 'IDLE'
+
+        return m
+
+class EngineDelayLine(wiring.Component):
+
+    """
+    A single delay line served by a :class:`DelayLineEngine`. This behaves like
+    a PSRAM-backed :class:`DelayLine` with :py:`write_triggers_read=True`, and
+    should only be created using :py:`DelayLineEngine.add_delay_line()`.
+
+    Members
+    -------
+    i : :py:`In(stream.Signature(ASQ))`
+        Input stream for writing samples to the delay line.
+    """
+
+    psram_backed = True
+    write_triggers_read = True
+
+    def __init__(self, engine, max_delay, base):
+        self.engine = engine
+        self.max_delay = max_delay
+        self.base = base
+        self.address_width = exact_log2(max_delay)
+        assert max_delay % engine.samples_per_burst == 0
+
+        self.taps = []
+
+        # internal signals between DelayLineEngine and EngineDelayLine
+        self._wrpointer = Signal(unsigned(self.address_width))
+        # next (burst-aligned) sample index to be written back.
+        self._flushed   = Signal(unsigned(self.address_width))
+        self._flush_req = Signal()
+        self._flush_done = Signal()
+        self._wbuf_addr = Signal(exact_log2(engine.burst_len))
+        self._wbuf_data = Signal(32)
+        self._zeroed    = Signal()
+
+        super().__init__({
+            "i": In(stream.Signature(ASQ)),
+        })
+
+    def add_tap(self, fixed_delay):
+        """
+        Add and return a new :class:`EngineDelayLineTap` with a fixed delay.
+
+        fixed_delay : int
+            Delay of this tap, in samples. See :class:`DelayLineEngine` for limits.
+        """
+        spb = self.engine.samples_per_burst
+        assert fixed_delay > 2*spb
+        assert fixed_delay <= self.max_delay - (self.engine.fifo_bursts+1)*spb
+        tap = EngineDelayLineTap(self, fixed_delay)
+        self.taps.append(tap)
+        return tap
+
+    def elaborate(self, platform):
+        m = Module()
+
+        engine = self.engine
+        spw = engine.samples_per_word
+
+        named_submodules(m.submodules, self.taps)
+
+        # write-combining buffer, written back by the engine when full.
+        m.submodules.wbuf = wbuf = Memory(shape=32, depth=engine.burst_len, init=[])
+        wport = wbuf.write_port(granularity=engine.sample_width)
+        rport = wbuf.read_port()
+        m.d.comb += [
+            rport.addr.eq(self._wbuf_addr),
+            self._wbuf_data.eq(rport.data),
+        ]
+
+        # samples currently in the write buffer.
+        fill = Signal(range(engine.samples_per_burst + 1))
+        m.d.comb += self._flush_req.eq(fill == engine.samples_per_burst)
+
+        # every tap must have a sample ready to emit alongside each write.
+        taps_ready = Cat([tap._ready for tap in self.taps]).all()
+
+        sample = Signal(engine.sample_width)
+        m.d.comb += [
+            sample.eq(self.i.payload),
+            self.i.ready.eq(self._zeroed & ~self._flush_req & taps_ready),
+            wport.addr.eq(fill >> exact_log2(spw)),
+            wport.data.eq(sample.replicate(spw)),
+        ]
+
+        with m.If(self.i.valid & self.i.ready):
+            if spw > 1:
+                m.d.comb += wport.en.eq(1 << fill[:exact_log2(spw)])
+            else:
+                m.d.comb += wport.en.eq(1)
+            m.d.sync += [
+                fill.eq(fill + 1),
+                self._wrpointer.eq(self._wrpointer + 1),
+            ]
+            for tap in self.taps:
+                m.d.comb += tap._advance.eq(1)
+
+        with m.If(self._flush_done):
+            m.d.sync += [
+                fill.eq(0),
+                self._flushed.eq(self._flushed + engine.samples_per_burst),
+            ]
+
+        return m
+
+class EngineDelayLineTap(wiring.Component):
+
+    """
+    A single fixed-delay read tap of a parent :class:`EngineDelayLine`.
+    Should only be created using :py:`EngineDelayLine.add_tap()`.
+
+    Members
+    -------
+    o : :py:`Out(stream.Signature(ASQ))`
+        Stream of samples read from the delay line, one per write to
+        the parent :class:`EngineDelayLine`.
+    """
+
+    def __init__(self, line, fixed_delay):
+        self.line = line
+        self.fixed_delay = fixed_delay
+
+        engine = line.engine
+        spb = engine.samples_per_burst
+        spw = engine.samples_per_word
+
+        # The first sample emitted is the one written ``fixed_delay`` before
+        # the first write. Prefetches are burst-aligned, so the start of the
+        # first burst is dropped.
+        start = (-fixed_delay) % line.max_delay
+        skip  = start % spb
+
+        # internal signals between DelayLineEngine and EngineDelayLineTap
+        # next (burst-aligned) sample index to be prefetched.
+        self._fptr       = Signal(unsigned(line.address_width), init=start - skip)
+        self._fetch_req  = Signal()
+        self._fetch_done = Signal()
+        self._w_data     = Signal(32)
+        self._w_en       = Signal()
+        # words of the first burst that should be dropped.
+        self._drop       = Signal(range(engine.burst_len), init=skip // spw)
+        # sample index inside the word at the head of the FIFO.
+        self._half       = Signal(range(max(spw, 2)), init=skip % spw)
+
+        # internal signals between EngineDelayLine and EngineDelayLineTap
+        self._ready   = Signal()
+        self._advance = Signal()
+
+        super().__init__({
+            "o": Out(stream.Signature(ASQ)),
+        })
+
+    def elaborate(self, platform):
+        m = Module()
+
+        line = self.line
+        engine = line.engine
+        spw = engine.samples_per_word
+        depth = engine.fifo_bursts * engine.burst_len
+
+        m.submodules.fifo = prefetch = fifo.SyncFIFOBuffered(width=32, depth=depth)
+
+        # Only prefetch bursts that have already been written back.
+        m.d.comb += self._fetch_req.eq(
+            line._zeroed &
+            (prefetch.level <= (depth - engine.burst_len)) &
+            (line._flushed != self._fptr))
+
+        with m.If(self._fetch_done):
+            m.d.sync += self._fptr.eq(self._fptr + engine.samples_per_burst)
+
+        with m.If(self._w_en):
+            with m.If(self._drop != 0):
+                m.d.sync += self._drop.eq(self._drop - 1)
+            with m.Else():
+                m.d.comb += [
+                    prefetch.w_en.eq(1),
+                    prefetch.w_data.eq(self._w_data),
+                ]
+
+        m.d.comb += self._ready.eq(prefetch.r_rdy & ~self.o.valid)
+
+        with m.If(self._advance):
+            m.d.sync += [
+                self.o.valid.eq(1),
+                self.o.payload.eq(prefetch.r_data.word_select(
+                    self._half, engine.sample_width)),
+            ]
+            if spw > 1:
+                m.d.sync += self._half.eq(self._half + 1)
+                with m.If(self._half == (spw - 1)):
+                    m.d.comb += prefetch.r_en.eq(1)
+            else:
+                m.d.comb += prefetch.r_en.eq(1)
+
+        with m.If(self.o.valid & self.o.ready):
+            m.d.sync += self.o.valid.eq(0)
+
+        return m
@@ -9,14 +9,16 @@ from enum import Enum
 from math import cos, pi, sin, sqrt
 
 from amaranth import *
-from amaranth.lib import fifo, memory, stream, wiring
+from amaranth.lib import data, fifo, memory, stream, wiring
 from amaranth.lib.wiring import In, Out
 from amaranth.utils import exact_log2
+from amaranth_soc import wishbone
 
 from amaranth_future import fixed
 
-from .block import Block
+from .block import Block, connect_without_payload
 from .complex import CQ, connect_real_to_sq, connect_sq_to_real
+from .stream_util import Merge, Split
 
 
 class FFT(wiring.Component):
@@ -72,9 +74,8 @@ class FFT(wiring.Component):
 
     This core instantiates 3 memories, which all scale with ``sz``. A ROM for the
     twiddle factor (coefficient) memory, and 2 RAMs which are shared for input
-    and output sample storage as well as intermediate calculations. An interesting
-    addition to this core in the future may be to support external memory for huge
-    FFT sizes.
+    and output sample storage as well as intermediate calculations. For huge FFT
+    sizes that do not fit in BRAM, see :class:`PSRAMFFT`.
 
     Internals
     ^^^^^^^^^
@@ -122,6 +123,40 @@ class FFT(wiring.Component):
     arithmetic and memory accesses in the same state - in general the timing of each state is
     optimized to hit around 80MHz on a slowest speed-grade ECP5.
 
+    Pipelined mode
+    ^^^^^^^^^^^^^^
+
+    With ``pipelined=True``, the iterative loop above is replaced by a 'Radix-2^2
+    Single-path Delay Feedback' (R2²SDF) pipeline, which accepts (and produces) one
+    sample every system clock, and can overlap the processing of consecutive blocks.
+    The stream interface, ``ifft`` switching and normalization are unchanged, so the
+    pipelined core is a drop-in replacement for the iterative one.
+
+    Each pair of radix-2 decimation-in-frequency stages is a butterfly with a feedback
+    delay line of ``D`` samples, followed by a butterfly with a ``D/2`` delay whose
+    input is rotated by a trivial ``-j`` (``+j`` in inverse mode), followed by a single
+    complex multiplier with its own twiddle ROM. An odd number of stages ends with a
+    lone radix-2 butterfly. The pipeline produces outputs in bit-reversed order, so a
+    ping-pong reordering RAM at the end restores FIFO order.
+
+    .. code-block:: text
+
+          ┌───────┐       ┌───────┐       ┌───────┐
+          │ D     │       │ D/2   │       │ D/4   │
+          └─┬───▲─┘       └─┬───▲─┘       └─┬───▲─┘
+            ▼   │           ▼   │           ▼   │
+        i ─>[ BF ]─>(×-j)─>[ BF ]─>(×W)──>[ BF ]─> ... ─>[REORDER]─> o
+
+    The whole pipeline advances one step for every sample clocked in. Once a block is
+    clocked in and no further input is available, the core clocks in 'phantom' blocks
+    (whose outputs are discarded) to flush the block through the pipeline, so each
+    block appears at ``o`` about ``2*sz`` samples after its last input sample.
+
+    This mode needs ``log4(sz)`` complex multipliers (4 real multipliers each) rather
+    than 2 real multipliers, and about ``3*sz`` complex words of RAM (``sz`` for the
+    delay lines, ``2*sz`` for reordering), in exchange for about ``6*log2(sz)`` times
+    the throughput.
+
     Members
     -------
     i : :py:`In(stream.Signature(Block(CQ(self.shape))))`
@@ -131,13 +166,14 @@ class FFT(wiring.Component):
     ifft : :py:`In(1, init=default_ifft)`
         ``0`` for forward FFT with ``1/N`` normalization. ``1`` for inverse FFT.
         May only be changed when the core is idle ('ready' and not midway through
-        a block!).
+        a block!). For the pipelined core, this means no blocks may be in flight.
     """
 
     def __init__(self,
                  shape:        fixed.SQ=fixed.SQ(1, 15),
                  sz:           int=1024,
-                 default_ifft: bool=False) -> None:
+                 default_ifft: bool=False,
+                 pipelined:    bool=False) -> None:
         """
         shape : fixed.SQ
             Shape of the fixed-point types used for inputs and outputs. This is
@@ -147,9 +183,13 @@ class FFT(wiring.Component):
         default_ifft : bool
             Default state of the ``self.ifft`` signal, can be used to create an IFFT
             instead of an FFT by default, without needing to explicitly connect the signal.
+        pipelined : bool
+            Use the fully pipelined R2²SDF implementation (1 sample per clock) instead of
+            the iterative one. See 'Pipelined mode' above.
         """
         self.sz   = sz
         self.shape = shape
+        self.pipelined = pipelined
         super().__init__({
             "ifft": In(1, init=1 if default_ifft else 0),
             "i": In(stream.Signature(Block(CQ(self.shape)))),
@@ -157,6 +197,9 @@ class FFT(wiring.Component):
         })
 
     def elaborate(self, platform) -> Module:
+        if self.pipelined:
+            return self._elaborate_sdf()
+
         m = Module()
 
         # number of stages in FFT
@@ -399,6 +442,973 @@ class FFT(wiring.Component):
 
         return m
 
+    def _elaborate_sdf(self) -> Module:
+        m = Module()
+
+        # number of stages in FFT
+        n_stages = exact_log2(self.sz)
+        # butterfly / accumulator shape
+        bshape = fixed.SQ(self.shape.i_bits + n_stages, self.shape.f_bits)
+        # twiddle factor / window shape
+        wshape = fixed.SQ(self.shape.i_bits+1, self.shape.f_bits)
+
+        # The whole pipeline advances by one step when 'step' is strobed. 'cnt'
+        # counts steps, its MSB selects the active half of the reordering RAM.
+        step = Signal()
+        cnt = Signal(n_stages+1)
+        with m.If(step):
+            m.d.sync += cnt.eq(cnt+1)
+
+        def position(name, lag):
+            # Index (within a block) of the sample sitting at a point in the
+            # pipeline that is 'lag' steps behind the input.
+            pos = Signal(n_stages+1, name=f"{name}_pos")
+            m.d.comb += pos.eq(cnt - lag)
+            return pos
+
+        def butterfly(name, x, delay, lag, rotate):
+            # Radix-2 DIF butterfly with a feedback delay line of 'delay' samples.
+            # For the first 'delay' samples of each group, inputs are pushed into the
+            # delay line and the differences from the last group are popped out. For
+            # the next 'delay' samples, sums are emitted and differences pushed.
+            pos = position(name, lag)
+            k = exact_log2(delay)
+            xr = Signal(CQ(bshape), name=f"{name}_xr")
+            if rotate:
+                # Trivial -j twiddle on the last quarter of each group.
+                with m.If(pos[k] & pos[k+1]):
+                    with m.If(self.ifft):
+                        m.d.comb += [
+                            xr.real.eq(-x.imag),
+                            xr.imag.eq(x.real),
+                        ]
+                    with m.Else():
+                        m.d.comb += [
+                            xr.real.eq(x.imag),
+                            xr.imag.eq(-x.real),
+                        ]
+                with m.Else():
+                    m.d.comb += xr.eq(x)
+            else:
+                m.d.comb += xr.eq(x)
+
+            dl_i = Signal(CQ(bshape), name=f"{name}_dl_i")
+            dl_o = Signal(CQ(bshape), name=f"{name}_dl_o")
+            if delay == 1:
+                with m.If(step):
+                    m.d.sync += dl_o.eq(dl_i)
+            else:
+                # Read one step ahead, as the read port has 1 cycle of latency.
+                m.submodules[f"{name}_dl"] = dl = memory.Memory(
+                        shape=CQ(bshape), depth=delay, init=[])
+                dl_rd = dl.read_port()
+                dl_wr = dl.write_port()
+                m.d.comb += [
+                    dl_wr.en.eq(step),
+                    dl_wr.addr.eq(cnt),
+                    dl_wr.data.eq(dl_i),
+                    dl_rd.en.eq(step),
+                    dl_rd.addr.eq(cnt+1),
+                    dl_o.eq(dl_rd.data),
+                ]
+
+            s = Signal(CQ(bshape), name=f"{name}_s")
+            with m.If(pos[k]):
+                m.d.comb += [
+                    s.real.eq(dl_o.real + xr.real),
+                    s.imag.eq(dl_o.imag + xr.imag),
+                    dl_i.real.eq(dl_o.real - xr.real),
+                    dl_i.imag.eq(dl_o.imag - xr.imag),
+                ]
+            with m.Else():
+                m.d.comb += [
+                    s.eq(dl_o),
+                    dl_i.eq(xr),
+                ]
+
+            o = Signal(CQ(bshape), name=f"{name}_o")
+            with m.If(step):
+                m.d.sync += o.eq(s)
+            return o
+
+        def twiddle(name, x, span, lag):
+            # Non-trivial twiddle factors after each pair of butterflies. For
+            # the i'th quarter of a group of 'span' samples, the j'th sample
+            # is rotated by W(span)^(j*[0, 2, 1, 3][i]).
+            q = span // 4
+            rom = []
+            for p in range(span):
+                e = (p % q) * [0, 2, 1, 3][p // q]
+                rom.append({'real': cos(e*2*pi/span),
+                            'imag': sin(e*2*pi/span)})
+            m.submodules[f"{name}_W"] = W = memory.Memory(
+                    shape=CQ(wshape), depth=span, init=rom)
+            W_rd = W.read_port()
+            m.d.comb += [
+                W_rd.en.eq(step),
+                W_rd.addr.eq(position(name, lag-1)),
+            ]
+            # conjugate twiddle factors on forward fft.
+            w = Signal(CQ(wshape), name=f"{name}_w")
+            m.d.comb += w.real.eq(W_rd.data.real)
+            with m.If(self.ifft):
+                m.d.comb += w.imag.eq(W_rd.data.imag)
+            with m.Else():
+                m.d.comb += w.imag.eq(-W_rd.data.imag)
+            # Complex multiply, with a register after the multiplies
+            # and another after the accumulation. Products are kept at full
+            # precision, and each sum is rounded (to nearest) only once.
+            pshape = fixed.SQ(bshape.i_bits + wshape.i_bits, bshape.f_bits + wshape.f_bits)
+            rr = Signal(pshape, name=f"{name}_rr")
+            ii = Signal(pshape, name=f"{name}_ii")
+            ri = Signal(pshape, name=f"{name}_ri")
+            ir = Signal(pshape, name=f"{name}_ir")
+            half = 1 << (wshape.f_bits - 1)
+            def rounded(v):
+                return fixed.Value.cast(v.as_value() + half, pshape.f_bits)
+            o = Signal(CQ(bshape), name=f"{name}_o")
+            with m.If(step):
+                m.d.sync += [
+                    rr.eq(x.real * w.real),
+                    ii.eq(x.imag * w.imag),
+                    ri.eq(x.real * w.imag),
+                    ir.eq(x.imag * w.real),
+                    o.real.eq(rounded(rr - ii)),
+                    o.imag.eq(rounded(ri + ir)),
+                ]
+            return o
+
+        # Build the butterfly / twiddle pipeline, tracking how many steps
+        # each point in the pipeline lags the input by.
+        x = Signal(CQ(bshape))
+        m.d.comb += [
+            x.real.eq(self.i.payload.sample.real),
+            x.imag.eq(self.i.payload.sample.imag),
+        ]
+        lag = 0
+        stage = 0
+        while stage < n_stages:
+            delay = self.sz >> (stage+1)
+            x = butterfly(f"bf{stage}", x, delay, lag, rotate=False)
+            lag += delay + 1
+            if stage + 1 < n_stages:
+                x = butterfly(f"bf{stage+1}", x, delay//2, lag, rotate=True)
+                lag += delay//2 + 1
+            if stage + 2 < n_stages:
+                x = twiddle(f"tw{stage+1}", x, 2*delay, lag)
+                lag += 2
+            stage += 2
+
+        # Reorder from bit-reversed to natural order. Each block is written
+        # to one half of the RAM while the last block is read from the other.
+        m.submodules.reorder = reorder = memory.Memory(
+                shape=CQ(bshape), depth=2*self.sz, init=[])
+        reorder_rd = reorder.read_port()
+        reorder_wr = reorder.write_port()
+        pos = position("reorder", lag)
+        revpos = Signal(n_stages)
+        m.d.comb += [
+            revpos.eq(Cat([pos.bit_select(i,1) for i in reversed(range(n_stages))])),
+            reorder_wr.en.eq(step),
+            reorder_wr.addr.eq(Cat(revpos, pos[n_stages])),
+            reorder_wr.data.eq(x),
+            reorder_rd.en.eq(step),
+            reorder_rd.addr.eq(Cat(pos[:n_stages], ~pos[n_stages])),
+        ]
+        lag += self.sz + 1
+
+        # Output and normalization based on ifft / n_stages. Outputs pass through
+        # a small FIFO so the pipeline may stall on backpressure.
+        m.submodules.ofifo = ofifo = fifo.SyncFIFOBuffered(
+            width=self.o.payload.shape().size, depth=4)
+        wiring.connect(m, ofifo.r_stream, wiring.flipped(self.o))
+        o = Signal(Block(CQ(self.shape)))
+        # Normalization is rounded (to nearest), rather than truncated.
+        half = Mux(self.ifft, 0, 1 << (n_stages-1))
+        def normalized(v):
+            return fixed.Value.cast(v.as_value() + half, bshape.f_bits)>>Mux(self.ifft, 0, n_stages)
+        m.d.comb += [
+            o.first.eq(position("o", lag)[:n_stages] == 0),
+            o.sample.real.eq(normalized(reorder_rd.data.real)),
+            o.sample.imag.eq(normalized(reorder_rd.data.imag)),
+            ofifo.w_stream.payload.eq(o),
+        ]
+
+        # Each block in flight is either 'real' (clocked in from 'i') or a 'phantom'
+        # block used to flush the pipeline. 'history' tracks whether the last few
+        # blocks were real, which is used to determine if the block now at the
+        # output of the pipeline (which lags the input by a fixed 'lag') is real.
+        idx = cnt[:n_stages]
+        real = Signal()
+        history = Signal(lag // self.sz + 1)
+        o_real = Signal()
+        o_ok = Signal()
+        m.d.comb += [
+            o_real.eq(Mux(idx >= (lag % self.sz),
+                          history[lag // self.sz - 1],
+                          history[lag // self.sz])),
+            o_ok.eq(~o_real | ofifo.w_stream.ready),
+            ofifo.w_stream.valid.eq(step & o_real),
+        ]
+        with m.If(step & (idx == self.sz - 1)):
+            m.d.sync += history.eq(Cat(real, history[:-1]))
+
+        with m.If(idx == 0):
+            # Start of a block. Discard samples until 'first' is seen, and flush
+            # with phantom blocks if no input is available but real blocks are
+            # still in flight.
+            m.d.comb += self.i.ready.eq(o_ok | ~self.i.payload.first)
+            with m.If(self.i.valid & self.i.payload.first):
+                m.d.comb += step.eq(o_ok)
+                m.d.sync += real.eq(1)
+            with m.Elif(~self.i.valid & history.any()):
+                m.d.comb += step.eq(o_ok)
+                m.d.sync += real.eq(0)
+        with m.Elif(real):
+            m.d.comb += [
+                self.i.ready.eq(o_ok),
+                step.eq(self.i.valid & o_ok),
+            ]
+        with m.Else():
+            m.d.comb += step.eq(o_ok)
+
+        return m
+
+class PSRAMFFT(wiring.Component):
+
+    """Fixed-point Fast Fourier Transform for huge block sizes, using external memory.
+
+    Overview
+    --------
+
+    This core has the same stream interface, ``ifft`` switching and normalization
+    as :class:`FFT`, however the working set is kept in external memory (usually PSRAM)
+    through a wishbone master, rather than in BRAM. This allows block sizes of 16k-64k
+    points and beyond, which would not fit in an ECP5 otherwise.
+
+    Design
+    ------
+
+    This is a 'four-step' (Bailey) FFT. An ``sz``-point block is treated as a matrix of
+    ``N2`` rows by ``N1`` columns, stored in row-major order, where ``N1*N2 == sz`` and
+    ``N1`` is ``N2`` or ``2*N2``. The transform then decomposes into:
+
+        1. ``N2``-point FFTs on each column (input index ``n1 + N1*n2`` over ``n2``).
+        2. Multiplication of each result by a twiddle factor ``W(sz)^(n1*k2)``.
+        3. ``N1``-point FFTs on each row (over ``n1``).
+        4. A transpose, so output index ``k2 + N2*k1`` is clocked out in FIFO order.
+
+    The column and row FFTs are computed by :class:`FFT` instances of size ``N2``
+    and ``N1`` (one shared instance if they are the same size), so 1 or 2 small FFTs
+    replace a single huge one. All memory accesses are bursts of ``tile_width`` words,
+    so they are fast even with PSRAM's high access latency:
+
+        - Rows are contiguous in memory, so they are simply burst in and out.
+        - Columns are handled ``tile_width`` at a time. Every row of the tile is
+          burst into an on-chip 'tile buffer' of ``tile_width*N2`` samples, all
+          columns in the tile are transformed from this buffer, and then the tile
+          is burst back out. The output transpose uses the same tiled reads.
+
+    Each sample is stored in a single bus word, so ``CQ(shape)`` may be at most
+    as wide as the bus. The column FFT outputs are stored in ``shape`` between the
+    passes. As each :class:`FFT` normalizes its own outputs in forward mode, the overall
+    normalization is still ``1/sz``.
+
+    Twiddle factors are not stored in a ``sz``-entry ROM. Instead, each exponent is split
+    into a 'coarse' and 'fine' part, looked up in 2 small ROMs of ``N2`` and ``N1``
+    entries, and multiplied together.
+
+    Resource usage, throughput
+    ^^^^^^^^^^^^^^^^^^^^^^^^^^
+
+    BRAM usage is dominated by the tile buffer (``tile_width*N2`` bus words) and the
+    inner FFTs (which scale with ``N1``, about ``sqrt(sz)``). A 64k-point FFT with
+    the default ``tile_width`` needs around a dozen 18Kbit BRAMs, rather than several hundred.
+
+    Each sample makes 3 round trips to external memory (plus the input and output),
+    and the inner FFTs each take about ``6*log2(N)`` clocks per sample, so a block
+    takes about ``sz*log2(sz)*6`` clocks plus memory access time.
+
+    Members
+    -------
+    i : :py:`In(stream.Signature(Block(CQ(self.shape))))`
+        Incoming stream of blocks of complex samples.
+    o : :py:`Out(stream.Signature(Block(CQ(self.shape))))`
+        Outgoing stream of blocks of complex samples.
+    ifft : :py:`In(1, init=default_ifft)`
+        ``0`` for forward FFT with ``1/N`` normalization. ``1`` for inverse FFT.
+        May only be changed when the core is idle.
+    bus : :py:`Out(bus_signature)`
+        Wishbone bus used to access the working set in external memory.
+    """
+
+    def __init__(self, *, bus_signature, base,
+                 shape:        fixed.SQ=fixed.SQ(1, 15),
+                 sz:           int=16384,
+                 default_ifft: bool=False,
+                 tile_width:   int=8) -> None:
+        """
+        bus_signature : wishbone.Signature
+            Signature of the external memory bus. Must support bursts (``cti``).
+        base : int
+            Word address of the ``sz`` words of working memory on ``bus``.
+        shape : fixed.SQ
+            Shape of the fixed-point types used for inputs and outputs.
+        sz : int
+            Size of the FFT/IFFT blocks. Must be a power of 2.
+        default_ifft : bool
+            Default state of the ``self.ifft`` signal.
+        tile_width : int
+            Number of columns transformed per tile. This is also the length of
+            every burst on ``bus``. Must be a power of 2.
+        """
+        self.sz = sz
+        self.shape = shape
+        self.base = base
+        self.tile_width = tile_width
+
+        n_stages = exact_log2(sz)
+        assert n_stages >= 2
+        self.n1 = 1 << (n_stages - n_stages // 2)
+        self.n2 = 1 << (n_stages // 2)
+        assert Shape.cast(CQ(shape)).width <= bus_signature.data_width
+        assert 2 <= tile_width <= self.n1
+        exact_log2(tile_width)
+
+        self.col_fft = FFT(shape=shape, sz=self.n2)
+        if self.n1 == self.n2:
+            self.row_fft = self.col_fft
+        else:
+            self.row_fft = FFT(shape=shape, sz=self.n1)
+
+        super().__init__({
+            "ifft": In(1, init=1 if default_ifft else 0),
+            "i": In(stream.Signature(Block(CQ(self.shape)))),
+            "o": Out(stream.Signature(Block(CQ(self.shape)))),
+            "bus": Out(bus_signature),
+        })
+
+    def elaborate(self, platform) -> Module:
+        m = Module()
+
+        N1, N2, T = self.n1, self.n2, self.tile_width
+        bus = self.bus
+
+        m.submodules.col_fft = self.col_fft
+        if self.row_fft is not self.col_fft:
+            m.submodules.row_fft = self.row_fft
+        m.d.comb += [
+            self.col_fft.ifft.eq(self.ifft),
+            self.row_fft.ifft.eq(self.ifft),
+        ]
+
+        # Tile buffer. Holds 'T' columns, or a single row.
+        m.submodules.tile = tile = memory.Memory(shape=CQ(self.shape), depth=T*N2, init=[])
+        tile_rd = tile.read_port()
+        tile_wr = tile.write_port()
+
+        # Twiddle factor W(sz)^e is split into W(sz)^(e % N1) * W(N2)^(e // N1)
+        wshape = fixed.SQ(self.shape.i_bits+1, self.shape.f_bits)
+        fine = [
+            {'real': cos(k*2*pi/self.sz),
+             'imag': sin(k*2*pi/self.sz)}
+            for k in range(N1)
+        ]
+        coarse = [
+            {'real': cos(k*2*pi/N2),
+             'imag': sin(k*2*pi/N2)}
+            for k in range(N2)
+        ]
+        m.submodules.W_fine = W_fine = memory.Memory(shape=CQ(wshape), depth=N1, init=fine)
+        m.submodules.W_coarse = W_coarse = memory.Memory(shape=CQ(wshape), depth=N2, init=coarse)
+        W_fine_rd = W_fine.read_port()
+        W_coarse_rd = W_coarse.read_port()
+        e = Signal(exact_log2(self.sz))
+        m.d.comb += [
+            W_fine_rd.addr.eq(e[:exact_log2(N1)]),
+            W_coarse_rd.addr.eq(e[exact_log2(N1):]),
+        ]
+
+        # Outer loop over rows / tiles, column within a tile, sample counter.
+        blk = Signal(range(max(N2, N1//T)))
+        col = Signal(range(T))
+        idx = Signal(range(T*N2))
+
+        # Tile buffer pointers for streaming samples out of / into the tile.
+        feed_tile = Signal(range(T*N2))
+        drain_tile = Signal(range(T*N2))
+
+        # DMA state. Word 'j' of burst 'r' is at 'row_adr + j' and is copied
+        # to/from the tile buffer at 'row_tile + j*B'.
+        dma_adr = Signal.like(bus.adr)
+        row_adr = Signal.like(bus.adr)
+        dma_tile = Signal(range(T*N2))
+        row_tile = Signal(range(T*N2))
+        j = Signal(range(T))
+        r = Signal(range(max(N2, N1//T)))
+        last_word = Signal()
+        m.d.comb += last_word.eq(j == T-1)
+
+        # Column sample latched for twiddle multiplication, and its twiddle factor.
+        s = Signal(CQ(self.shape))
+        w = Signal(CQ(wshape))
+
+        # By default, the tile read port follows the DMA pointer (for writes).
+        m.d.comb += tile_rd.addr.eq(dma_tile)
+
+        # Only whole words are ever accessed.
+        m.d.comb += bus.sel.eq(2**(bus.data_width//8)-1)
+
+        def dma_start(start):
+            m.d.sync += [
+                dma_adr.eq(start),
+                row_adr.eq(start),
+                dma_tile.eq(0),
+                row_tile.eq(0),
+                j.eq(0),
+                r.eq(0),
+            ]
+
+        def dma(name, write, cols, done):
+            # Copy a whole tile ('cols', 'N2' bursts of 'T' words with a stride of 'N1')
+            # or a whole row ('N1/T' contiguous bursts) between the tile buffer and memory.
+            if cols:
+                stride, A, B, R = N1, 1, N2, N2
+            else:
+                stride, A, B, R = T, T, 1, N1//T
+            nxt_tile = Mux(last_word, row_tile + A, dma_tile + B)
+            with m.State(f"{name}-SETUP"):
+                # Release the bus between bursts. Also gives the tile
+                # read port a cycle to fetch the first word of a write.
+                m.next = name
+            with m.State(name):
+                m.d.comb += [
+                    bus.cyc.eq(1),
+                    bus.stb.eq(1),
+                    bus.we.eq(write),
+                    bus.adr.eq(dma_adr),
+                    bus.cti.eq(Mux(last_word,
+                                   wishbone.CycleType.END_OF_BURST,
+                                   wishbone.CycleType.INCR_BURST)),
+                ]
+                if write:
+                    m.d.comb += bus.dat_w.eq(tile_rd.data)
+                with m.If(bus.ack):
+                    if write:
+                        m.d.comb += tile_rd.addr.eq(nxt_tile)
+                    else:
+                        m.d.comb += [
+                            tile_wr.en.eq(1),
+                            tile_wr.addr.eq(dma_tile),
+                            tile_wr.data.eq(bus.dat_r),
+                        ]
+                    m.d.sync += [
+                        dma_adr.eq(Mux(last_word, row_adr + stride, dma_adr + 1)),
+                        dma_tile.eq(nxt_tile),
+                        j.eq(j+1),
+                    ]
+                    with m.If(last_word):
+                        m.d.sync += [
+                            row_adr.eq(row_adr + stride),
+                            row_tile.eq(row_tile + A),
+                            r.eq(r+1),
+                        ]
+                        with m.If(r == R-1):
+                            done()
+                        with m.Else():
+                            m.next = f"{name}-SETUP"
+
+        def feed(name, o, length, first, done):
+            # Stream 'length' samples from the tile buffer, starting at 'feed_tile'.
+            with m.State(f"{name}-SETUP"):
+                m.d.comb += tile_rd.addr.eq(feed_tile)
+                m.next = name
+            with m.State(name):
+                m.d.comb += [
+                    tile_rd.addr.eq(feed_tile),
+                    o.valid.eq(1),
+                    o.payload.first.eq(first),
+                    o.payload.sample.eq(tile_rd.data),
+                ]
+                with m.If(o.ready):
+                    m.d.comb += tile_rd.addr.eq(feed_tile+1)
+                    m.d.sync += [
+                        feed_tile.eq(feed_tile+1),
+                        idx.eq(idx+1),
+                    ]
+                    with m.If(idx == length-1):
+                        m.d.sync += idx.eq(0)
+                        done()
+
+        def drain(name, i, length, done, accept=1, twiddle=False):
+            # Stream 'length' samples into the tile buffer, starting at 'drain_tile'.
+            # Samples that are not 'accept'ed are discarded.
+            with m.State(name):
+                m.d.comb += i.ready.eq(1)
+                with m.If(i.valid & accept):
+                    if twiddle:
+                        m.d.sync += s.eq(i.payload.sample)
+                        m.next = f"{name}-W"
+                    else:
+                        m.d.comb += [
+                            tile_wr.en.eq(1),
+                            tile_wr.addr.eq(drain_tile),
+                            tile_wr.data.eq(i.payload.sample),
+                        ]
+                        m.d.sync += [
+                            drain_tile.eq(drain_tile+1),
+                            idx.eq(idx+1),
+                        ]
+                        with m.If(idx == length-1):
+                            m.d.sync += idx.eq(0)
+                            done()
+            if twiddle:
+                with m.State(f"{name}-W"):
+                    # Assemble twiddle factor from the coarse and fine ROMs
+                    m.d.sync += w.real.eq(W_fine_rd.data.real * W_coarse_rd.data.real -
+                                          W_fine_rd.data.imag * W_coarse_rd.data.imag)
+                    # conjugate twiddle factors on forward fft.
+                    with m.If(self.ifft):
+                        m.d.sync += w.imag.eq(W_fine_rd.data.real * W_coarse_rd.data.imag +
+                                              W_fine_rd.data.imag * W_coarse_rd.data.real)
+                    with m.Else():
+                        m.d.sync += w.imag.eq(-(W_fine_rd.data.real * W_coarse_rd.data.imag +
+                                                W_fine_rd.data.imag * W_coarse_rd.data.real))
+                    m.next = f"{name}-MUL"
+                with m.State(f"{name}-MUL"):
+                    m.d.comb += [
+                        tile_wr.en.eq(1),
+                        tile_wr.addr.eq(drain_tile),
+                        tile_wr.data.real.eq(s.real * w.real - s.imag * w.imag),
+                        tile_wr.data.imag.eq(s.real * w.imag + s.imag * w.real),
+                    ]
+                    # Twiddle exponent is n1*k2, n1 is the column index.
+                    m.d.sync += [
+                        e.eq(e + Cat(col, blk)),
+                        drain_tile.eq(drain_tile+1),
+                        idx.eq(idx+1),
+                    ]
+                    m.next = name
+                    with m.If(idx == length-1):
+                        m.d.sync += idx.eq(0)
+                        done()
+
+        def goto(state, start=None):
+            def fn():
+                if start is not None:
+                    dma_start(start)
+                m.next = state
+            return fn
+
+        def next_blk(n, last, then):
+            # Advance the outer loop, or move on when it's complete.
+            def fn():
+                with m.If(blk == n-1):
+                    m.d.sync += blk.eq(0)
+                    last()
+                with m.Else():
+                    m.d.sync += blk.eq(blk+1)
+                    then()
+            return fn
+
+        with m.FSM():
+
+            # Input: blocks arrive in row-major order. Each row is collected
+            # in the tile buffer and then burst out.
+
+            def load_done():
+                m.d.sync += drain_tile.eq(0)
+                dma_start(self.base + (blk << exact_log2(N1)))
+                m.next = "LOAD-DMA-SETUP"
+
+            drain("LOAD", self.i, N1, load_done,
+                  accept=(blk != 0) | (idx != 0) | self.i.payload.first)
+
+            dma("LOAD-DMA", write=1, cols=False,
+                done=next_blk(N2,
+                    last=goto("COLS-DMA-IN-SETUP", self.base),
+                    then=goto("LOAD")))
+
+            # Step 1 & 2: column FFTs and twiddle factors, a tile at a time.
+
+            def cols_in_done():
+                m.d.sync += [
+                    col.eq(0),
+                    feed_tile.eq(0),
+                    drain_tile.eq(0),
+                ]
+                m.next = "COLS-FEED-SETUP"
+
+            dma("COLS-DMA-IN", write=0, cols=True, done=cols_in_done)
+
+            def cols_feed_done():
+                m.d.sync += e.eq(0)
+                m.next = "COLS-DRAIN"
+
+            feed("COLS-FEED", self.col_fft.i, N2, idx == 0, cols_feed_done)
+
+            def cols_drain_done():
+                with m.If(col == T-1):
+                    dma_start(self.base + (blk << exact_log2(T)))
+                    m.next = "COLS-DMA-OUT-SETUP"
+                with m.Else():
+                    m.d.sync += col.eq(col+1)
+                    m.next = "COLS-FEED-SETUP"
+
+            drain("COLS-DRAIN", self.col_fft.o, N2, cols_drain_done, twiddle=True)
+
+            dma("COLS-DMA-OUT", write=1, cols=True,
+                done=next_blk(N1//T,
+                    last=goto("ROWS-DMA-IN-SETUP", self.base),
+                    then=goto("COLS-DMA-IN-SETUP", self.base + ((blk+1) << exact_log2(T)))))
+
+            # Step 3: row FFTs, in place.
+
+            def rows_in_done():
+                m.d.sync += feed_tile.eq(0)
+                m.next = "ROWS-FEED-SETUP"
+
+            dma("ROWS-DMA-IN", write=0, cols=False, done=rows_in_done)
+
+            def rows_feed_done():
+                m.d.sync += drain_tile.eq(0)
+                m.next = "ROWS-DRAIN"
+
+            feed("ROWS-FEED", self.row_fft.i, N1, idx == 0, rows_feed_done)
+
+            drain("ROWS-DRAIN", self.row_fft.o, N1,
+                  goto("ROWS-DMA-OUT-SETUP", self.base + (blk << exact_log2(N1))))
+
+            dma("ROWS-DMA-OUT", write=1, cols=False,
+                done=next_blk(N2,
+                    last=goto("OUTPUT-DMA-IN-SETUP", self.base),
+                    then=goto("ROWS-DMA-IN-SETUP", self.base + ((blk+1) << exact_log2(N1)))))
+
+            # Step 4: transpose. Columns are read a tile at a time,
+            # and each column is clocked out in order.
+
+            def output_in_done():
+                m.d.sync += feed_tile.eq(0)
+                m.next = "OUTPUT-SETUP"
+
+            dma("OUTPUT-DMA-IN", write=0, cols=True, done=output_in_done)
+
+            def output_done():
+                m.d.sync += drain_tile.eq(0)
+                m.next = "LOAD"
+
+            feed("OUTPUT", self.o, T*N2, (blk == 0) & (idx == 0),
+                 next_blk(N1//T,
+                    last=output_done,
+                    then=goto("OUTPUT-DMA-IN-SETUP", self.base + ((blk+1) << exact_log2(T)))))
+
+        return m
+
+class RealFFT(wiring.Component):
+
+    """Forward FFT of real-valued blocks, packed into a complex :class:`FFT`.
+
+    Overview
+    --------
+
+    Audio is real-valued, so feeding it straight into the (complex) :class:`FFT` wastes
+    half of every transform on an all-zero imaginary part, and half of every output
+    block on mirrored (Hermitian-symmetric) bins. This core packs real samples into
+    both the real and imaginary parts of a complex :class:`FFT`, and unpacks the result
+    into the ``sz/2`` non-redundant bins of each real block. Like :class:`FFT`, outputs
+    are normalized to match ``scipy.fft.rfft(norm="forward")``.
+
+    Packing
+    -------
+
+    There are 2 ways of packing real blocks into a complex FFT (see :class:`Packing`):
+
+        - ``SPLIT``: each block's even and odd samples become the real and imaginary parts
+          of an ``sz/2``-point FFT, which is 'twisted' by a twiddle factor per bin on the way
+          out. This halves the size of the FFT (and all of its memories), and blocks are
+          processed one at a time, so this is usually the right choice for an STFT.
+        - ``PAIR``: 2 consecutive real blocks become the real and imaginary parts of a single
+          ``sz``-point FFT. Unpacking needs no multiplies, but the first block of each pair is
+          buffered (``sz`` real samples) until the second one arrives.
+
+    In both cases, the number of FFT clocks per real block is halved.
+
+    Output format
+    -------------
+
+    Each ``sz``-sample input block produces an output block of ``sz/2`` bins, ``k = 0``
+    to ``sz/2 - 1``. The DC and Nyquist bins are purely real, so they are packed into
+    bin 0 as ``DC + j*Nyquist``. All other bins are ``X[k]`` as usual.
+
+    Unpacking takes 5 (``SPLIT``) or 2 (``PAIR``) clocks per output bin, using a
+    single RAM of FFT output bins and (for ``SPLIT``) 2 multipliers.
+
+    Members
+    -------
+    i : :py:`In(stream.Signature(Block(self.shape)))`
+        Incoming stream of blocks of ``sz`` real samples.
+    o : :py:`Out(stream.Signature(Block(CQ(self.shape))))`
+        Outgoing stream of blocks of ``sz/2`` complex bins.
+    """
+
+    class Packing(Enum):
+        """How real blocks are packed into the complex :class:`FFT` of a :class:`RealFFT`."""
+        #: Even/odd samples of a single block, into an ``sz/2``-point FFT.
+        SPLIT = 0
+        #: Two consecutive blocks, into an ``sz``-point FFT.
+        PAIR  = 1
+
+    def __init__(self,
+                 shape:     fixed.SQ=fixed.SQ(1, 15),
+                 sz:        int=1024,
+                 packing:   Packing=Packing.SPLIT,
+                 pipelined: bool=False) -> None:
+        """
+        shape : fixed.SQ
+            Shape of the fixed-point types used for inputs and outputs.
+        sz : int
+            Size of the real input blocks. Must be a power of 2.
+        packing : Packing
+            How real blocks are packed into the complex FFT.
+        pipelined : bool
+            Use the pipelined (1 sample per clock) :class:`FFT` implementation.
+        """
+        self.sz      = sz
+        self.shape   = shape
+        self.packing = packing
+
+        fft_sz = sz // 2 if packing == self.Packing.SPLIT else sz
+        self.fft = FFT(shape=shape, sz=fft_sz, pipelined=pipelined)
+
+        super().__init__({
+            "i": In(stream.Signature(Block(self.shape))),
+            "o": Out(stream.Signature(Block(CQ(self.shape)))),
+        })
+
+    def elaborate(self, platform) -> Module:
+        m = Module()
+
+        m.submodules.fft = fft = self.fft
+
+        split = self.packing == self.Packing.SPLIT
+        M = fft.sz
+        n_bins = self.sz // 2
+
+        #
+        # Packing: real blocks -> complex FFT input.
+        #
+
+        if split:
+            # Even samples are latched, and sent to the FFT with the next odd sample.
+            even = Signal(self.shape)
+            even_first = Signal()
+            with m.FSM(name="pack"):
+                with m.State("EVEN"):
+                    m.d.comb += self.i.ready.eq(1)
+                    with m.If(self.i.valid):
+                        m.d.sync += [
+                            even.eq(self.i.payload.sample),
+                            even_first.eq(self.i.payload.first),
+                        ]
+                        m.next = "ODD"
+                with m.State("ODD"):
+                    m.d.comb += [
+                        fft.i.valid.eq(self.i.valid),
+                        fft.i.payload.first.eq(even_first),
+                        fft.i.payload.sample.real.eq(even),
+                        fft.i.payload.sample.imag.eq(self.i.payload.sample),
+                        self.i.ready.eq(fft.i.ready),
+                    ]
+                    with m.If(self.i.valid & fft.i.ready):
+                        m.next = "EVEN"
+        else:
+            # The first block of each pair is buffered, and sent to the FFT
+            # alongside the second block.
+            m.submodules.pair = pair = memory.Memory(shape=self.shape, depth=self.sz, init=[])
+            pair_rd = pair.read_port()
+            pair_wr = pair.write_port()
+            pidx = Signal(range(self.sz))
+            m.d.comb += [
+                pair_wr.addr.eq(pidx),
+                pair_wr.data.eq(self.i.payload.sample),
+                fft.i.payload.first.eq(pidx == 0),
+                fft.i.payload.sample.real.eq(pair_rd.data),
+                fft.i.payload.sample.imag.eq(self.i.payload.sample),
+            ]
+            with m.FSM(name="pack"):
+                with m.State("LOAD-A"):
+                    m.d.comb += [
+                        self.i.ready.eq(1),
+                        pair_rd.addr.eq(0),
+                    ]
+                    with m.If(self.i.valid & ((pidx > 0) | self.i.payload.first)):
+                        m.d.comb += pair_wr.en.eq(1)
+                        m.d.sync += pidx.eq(pidx+1)
+                        with m.If(pidx == self.sz - 1):
+                            m.next = "LOAD-B"
+                with m.State("LOAD-B"):
+                    m.d.comb += [
+                        fft.i.valid.eq(self.i.valid),
+                        self.i.ready.eq(fft.i.ready),
+                        pair_rd.addr.eq(pidx),
+                    ]
+                    with m.If(self.i.valid & fft.i.ready):
+                        # Set up the read of the next buffered sample.
+                        m.d.comb += pair_rd.addr.eq(pidx+1)
+                        m.d.sync += pidx.eq(pidx+1)
+                        with m.If(pidx == self.sz - 1):
+                            m.next = "LOAD-A"
+
+        #
+        # Unpacking: complex FFT output -> bins of each real block.
+        #
+
+        # internal shape, for sums of 2 bins and the twiddle product
+        ishape = fixed.SQ(self.shape.i_bits+2, self.shape.f_bits)
+        # twiddle factor shape
+        wshape = fixed.SQ(self.shape.i_bits+1, self.shape.f_bits)
+
+        m.submodules.z = z = memory.Memory(shape=CQ(self.shape), depth=M, init=[])
+        z_wr = z.write_port()
+        z1_rd = z.read_port()
+        z2_rd = z.read_port()
+
+        k = Signal(range(M))
+        blk = Signal()
+
+        # Z[k] and its 'mirror' Z[M-k] (for PAIR, bin 0 reads Z[M/2] for the Nyquist bin)
+        m.d.comb += z1_rd.addr.eq(k)
+        if split:
+            m.d.comb += z2_rd.addr.eq(M - k)
+        else:
+            m.d.comb += z2_rd.addr.eq(Mux(k == 0, M//2, M - k))
+        z1 = z1_rd.data
+        z2 = z2_rd.data
+
+        # Twice the spectra of the 2 real sequences packed into the FFT:
+        #   e  = Z[k] + conj(Z[M-k])
+        #   od = (Z[k] - conj(Z[M-k])) / j
+        e  = Signal(CQ(ishape))
+        od = Signal(CQ(ishape))
+        m.d.comb += [
+            e.real.eq(z1.real + z2.real),
+            e.imag.eq(z1.imag - z2.imag),
+            od.real.eq(z1.imag + z2.imag),
+            od.imag.eq(z2.real - z1.real),
+        ]
+
+        m.d.comb += self.o.payload.first.eq(k == 0)
+
+        if split:
+            # X[k] = (e + W(sz)^k * od) / 4. Like the FFT core, the complex
+            # multiply is spread over 2 clocks using 2 multipliers.
+            twiddle = [
+                {'real': cos(n*2*pi/self.sz),
+                 'imag': -sin(n*2*pi/self.sz)}
+                for n in range(n_bins)
+            ]
+            m.submodules.W = W = memory.Memory(shape=CQ(wshape), depth=n_bins, init=twiddle)
+            W_rd = W.read_port()
+            m.d.comb += W_rd.addr.eq(k)
+
+            mul_a = Signal(ishape)
+            mul_r = Signal(ishape)
+            mul_i = Signal(ishape)
+            m.d.comb += [
+                mul_r.eq(mul_a * W_rd.data.real),
+                mul_i.eq(mul_a * W_rd.data.imag),
+            ]
+            wod = Signal(CQ(ishape))
+
+            m.d.comb += self.o.payload.sample.real.eq((e.real + wod.real) >> 2)
+            with m.If(k == 0):
+                # Nyquist bin is packed into the imaginary part of the DC bin.
+                m.d.comb += self.o.payload.sample.imag.eq((e.real - od.real) >> 2)
+            with m.Else():
+                m.d.comb += self.o.payload.sample.imag.eq((e.imag + wod.imag) >> 2)
+        else:
+            # First block of the pair is e/2, second block is od/2. The DC
+            # and Nyquist bins are the real (imaginary) parts of Z[0] and Z[M/2].
+            with m.If(k == 0):
+                with m.If(~blk):
+                    m.d.comb += [
+                        self.o.payload.sample.real.eq(z1.real),
+                        self.o.payload.sample.imag.eq(z2.real),
+                    ]
+                with m.Else():
+                    m.d.comb += [
+                        self.o.payload.sample.real.eq(z1.imag),
+                        self.o.payload.sample.imag.eq(z2.imag),
+                    ]
+            with m.Elif(~blk):
+                m.d.comb += [
+                    self.o.payload.sample.real.eq(e.real >> 1),
+                    self.o.payload.sample.imag.eq(e.imag >> 1),
+                ]
+            with m.Else():
+                m.d.comb += [
+                    self.o.payload.sample.real.eq(od.real >> 1),
+                    self.o.payload.sample.imag.eq(od.imag >> 1),
+                ]
+
+        with m.FSM(name="unpack"):
+
+            with m.State("LOAD"):
+                m.d.comb += [
+                    fft.o.ready.eq(1),
+                    z_wr.addr.eq(k),
+                    z_wr.data.eq(fft.o.payload.sample),
+                ]
+                with m.If(fft.o.valid):
+                    m.d.comb += z_wr.en.eq(1)
+                    m.d.sync += k.eq(k+1)
+                    with m.If(k == M - 1):
+                        m.d.sync += blk.eq(0)
+                        m.next = "READ"
+
+            with m.State("READ"):
+                # Wait for reads of the bins needed for output 'k'.
+                if split:
+                    m.next = "MUL0"
+                else:
+                    m.next = "OUT"
+
+            if split:
+                with m.State("MUL0"):
+                    m.d.sync += mul_a.eq(od.real)
+                    m.next = "MUL1"
+
+                with m.State("MUL1"):
+                    m.d.sync += [
+                        wod.real.eq(mul_r),
+                        wod.imag.eq(mul_i),
+                        mul_a.eq(od.imag),
+                    ]
+                    m.next = "MUL2"
+
+                with m.State("MUL2"):
+                    m.d.sync += [
+                        wod.real.eq(wod.real - mul_i),
+                        wod.imag.eq(wod.imag + mul_r),
+                    ]
+                    m.next = "OUT"
+
+            with m.State("OUT"):
+                m.d.comb += self.o.valid.eq(1)
+                with m.If(self.o.ready):
+                    m.d.sync += k.eq(k+1)
+                    m.next = "READ"
+                    with m.If(k == n_bins - 1):
+                        m.d.sync += k.eq(0)
+                        if split:
+                            m.next = "LOAD"
+                        else:
+                            m.d.sync += blk.eq(~blk)
+                            with m.If(blk):
+                                m.next = "LOAD"
+
+        return m
+
 class Window(wiring.Component):
 
     """Pointwise window function.
@@ -785,8 +1795,9 @@ class STFTProcessor(wiring.Component):
     """
 
     def __init__(self,
-                 shape: fixed.SQ,
-                 sz:    int):
+                 shape:         fixed.SQ,
+                 sz:            int,
+                 pipelined_fft: bool=False):
         """
         shape : fixed.SQ
             Shape of the fixed-point samples used for inputs and outputs.
@@ -794,6 +1805,8 @@ class STFTProcessor(wiring.Component):
             Size of the frequency-domain blocks used internally and exposed for frequency
             domain processing. ``o_freq`` and ``i_freq`` are delineated by blocks
             with a ``payload.first`` strobe every ``sz`` elements.
+        pipelined_fft : bool
+            Use the pipelined (1 sample per clock) :class:`FFT` implementation.
         """
 
         self.sz        = sz
@@ -801,7 +1814,7 @@ class STFTProcessor(wiring.Component):
 
         self.overlap_blocks = ComputeOverlappingBlocks(sz=sz, shape=shape, n_overlap=sz//2)
         self.window         = Window(sz=sz, shape=shape, window_function=Window.Function.SQRT_HANN)
-        self.fft            = FFT(sz=sz, shape=shape)
+        self.fft            = FFT(sz=sz, shape=shape, pipelined=pipelined_fft)
         self.overlap_add    = OverlapAddBlocks(sz=sz, shape=shape, n_overlap=sz//2)
 
         super().__init__({
@@ -867,6 +1880,173 @@ class STFTProcessor(wiring.Component):
 
         return m
 
+class STFTProcessorMultichannel(wiring.Component):
+
+    """Multi-channel Short-Time Fourier Transform ('Overlap-Add') with shared FFT core.
+
+    This is an ``n_channels`` version of :class:`STFTProcessor`. Blocks from each channel are
+    interleaved (round-robin) through a single :class:`FFT` and :class:`Window` pair, so a
+    multi-channel spectral effect needs no more multipliers than a single-channel one.
+
+    Each channel has its own :class:`ComputeOverlappingBlocks` and :class:`OverlapAddBlocks`
+    (and input/output FIFOs), as this is state that must be kept separately for each channel.
+    Frequency-domain blocks on ``o_freq`` are tagged with the channel they belong to. Blocks
+    must be returned on ``i_freq`` in the same order, the ``channel`` tag on ``i_freq`` is ignored.
+
+    Throughput
+    ----------
+
+    Each channel needs one block (analysis and synthesis) to be processed for every ``sz//2``
+    input samples. With the iterative :class:`FFT`, a block takes roughly
+    ``sz*(6*log2(sz) + 10)`` system clocks (2 FFTs, windowing, and clocking samples between
+    them). With ``pipelined_fft=True`` this drops to roughly ``12*sz``, dominated by the
+    :class:`Window` core. So the maximum number of channels for real-time operation is about:
+
+    .. code-block:: text
+
+        n_channels <= (sz/2) * (f_sync / fs) / (clocks per block)
+
+    For ``sz=512`` and a 60MHz system clock:
+
+    .. code-block:: text
+
+                          fs=48kHz    fs=192kHz
+        iterative FFT     9 channels  2 channels
+        pipelined FFT     52 channels 13 channels
+
+    Members
+    -------
+    i : :py:`In(stream.Signature(data.ArrayLayout(shape, n_channels)))`
+        Continuous time-domain input stream (all channels).
+    o : :py:`Out(stream.Signature(data.ArrayLayout(shape, n_channels)))`
+        Continuous time-domain output stream (all channels, reconstructed).
+    o_freq : :py:`Out(stream.Signature(Block(CQ(shape), n_channels)))`
+        Frequency-domain output blocks for processing by user logic, tagged by channel.
+    i_freq : :py:`In(stream.Signature(Block(CQ(shape), n_channels)))`
+        Frequency-domain input blocks after processing by user logic.
+    """
+
+    def __init__(self,
+                 shape:         fixed.SQ,
+                 sz:            int,
+                 n_channels:    int,
+                 pipelined_fft: bool=False):
+        """
+        shape : fixed.SQ
+            Shape of the fixed-point samples used for inputs and outputs.
+        sz : int
+            Size of the frequency-domain blocks used internally and exposed for frequency
+            domain processing.
+        n_channels : int
+            Number of independent time-domain channels.
+        pipelined_fft : bool
+            Use the pipelined (1 sample per clock) :class:`FFT` implementation.
+        """
+
+        self.sz         = sz
+        self.shape      = shape
+        self.n_channels = n_channels
+
+        self.overlap_blocks = [ComputeOverlappingBlocks(sz=sz, shape=shape, n_overlap=sz//2)
+                               for _ in range(n_channels)]
+        self.window         = Window(sz=sz, shape=shape, window_function=Window.Function.SQRT_HANN)
+        self.fft            = FFT(sz=sz, shape=shape, pipelined=pipelined_fft)
+        self.overlap_add    = [OverlapAddBlocks(sz=sz, shape=shape, n_overlap=sz//2)
+                               for _ in range(n_channels)]
+
+        super().__init__({
+            # Time domain input and resynthesized output
+            "i": In(stream.Signature(data.ArrayLayout(self.shape, n_channels))),
+            "o": Out(stream.Signature(data.ArrayLayout(self.shape, n_channels))),
+            # Frequency domain analysis and resynthesis blocks, tagged by channel.
+            "o_freq": Out(stream.Signature(Block(CQ(self.shape), n_channels))),
+            "i_freq": In(stream.Signature(Block(CQ(self.shape), n_channels))),
+        })
+
+    def elaborate(self, platform) -> Module:
+        m = Module()
+
+        m.submodules.window           = self.window
+        m.submodules.fft              = self.fft
+
+        m.submodules.isplit = isplit = Split(n_channels=self.n_channels, shape=self.shape,
+                                             source=wiring.flipped(self.i))
+        m.submodules.omerge = omerge = Merge(n_channels=self.n_channels, shape=self.shape,
+                                             sink=wiring.flipped(self.o))
+
+        for n in range(self.n_channels):
+            m.submodules[f"overlap_blocks{n}"] = self.overlap_blocks[n]
+            m.submodules[f"overlap_add{n}"] = self.overlap_add[n]
+
+            m.submodules[f"ififo{n}"] = ififo = fifo.SyncFIFOBuffered(
+                width=self.shape.as_shape().width, depth=self.sz//4)
+            wiring.connect(m, isplit.o[n], ififo.w_stream)
+            wiring.connect(m, ififo.r_stream, self.overlap_blocks[n].i)
+
+            m.submodules[f"ofifo{n}"] = ofifo = fifo.SyncFIFOBuffered(
+                width=self.shape.as_shape().width, depth=self.sz)
+            wiring.connect(m, self.overlap_add[n].o, ofifo.w_stream)
+            wiring.connect(m, ofifo.r_stream, omerge.i[n])
+
+        m.submodules.pfifo = pfifo = fifo.SyncFIFOBuffered(
+            width=Block(CQ(self.shape)).size, depth=self.sz)
+
+        # Channel currently occupying the FFT / Window cores.
+        channel = Signal(range(self.n_channels))
+        n_samples = Signal(range(self.sz+1), init=0)
+
+        # Frequency-domain blocks are tagged with their channel on the way out,
+        # and the tag is dropped on the way back in.
+        i_freq_block = Signal(Block(CQ(self.shape)))
+        m.d.comb += [
+            i_freq_block.first.eq(self.i_freq.payload.first),
+            i_freq_block.sample.eq(self.i_freq.payload.sample),
+        ]
+
+        with m.FSM():
+            with m.State("LOAD"):
+                m.d.comb += self.fft.ifft.eq(0)
+                with m.Switch(channel):
+                    for n in range(self.n_channels):
+                        with m.Case(n):
+                            wiring.connect(m, self.overlap_blocks[n].o, self.window.i)
+                connect_sq_to_real(m, self.window.o, self.fft.i)
+                with m.If(self.window.i.valid & self.window.i.ready):
+                    m.d.sync += n_samples.eq(n_samples+1)
+                with m.If(n_samples == self.sz):
+                    m.next = "ANALYZE"
+            with m.State("ANALYZE"):
+                connect_sq_to_real(m, self.window.o, self.fft.i)
+                connect_without_payload(m, self.fft.o, self.o_freq)
+                m.d.comb += [
+                    self.o_freq.payload.sample.eq(self.fft.o.payload.sample),
+                    self.o_freq.payload.channel.eq(channel),
+                    pfifo.w_stream.valid.eq(self.i_freq.valid),
+                    pfifo.w_stream.payload.eq(i_freq_block),
+                    self.i_freq.ready.eq(pfifo.w_stream.ready),
+                ]
+                with m.If(pfifo.w_level == self.sz):
+                    m.next = "SYNTHESIZE"
+            with m.State("SYNTHESIZE"):
+                m.d.comb += self.fft.ifft.eq(1)
+                wiring.connect(m, pfifo.r_stream, self.fft.i)
+                connect_real_to_sq(m, self.fft.o, self.window.i)
+                with m.Switch(channel):
+                    for n in range(self.n_channels):
+                        with m.Case(n):
+                            wiring.connect(m, self.window.o, self.overlap_add[n].i)
+                with m.If(self.window.o.valid & self.window.o.ready):
+                    m.d.sync += n_samples.eq(n_samples-1)
+                with m.If(n_samples == 0):
+                    # Move on to the next channel.
+                    with m.If(channel == self.n_channels - 1):
+                        m.d.sync += channel.eq(0)
+                    with m.Else():
+                        m.d.sync += channel.eq(channel+1)
+                    m.next = "LOAD"
+
+        return m
+
 class STFTAnalyzer(wiring.Component):
 
     """Short-Time Fourier Transform for spectral analysis.
@@ -878,6 +2058,10 @@ class STFTAnalyzer(wiring.Component):
 
     For a more resource-efficient STFT that performs both analysis and synthesis, see :class:`STFTProcessor`.
 
+    With ``real_fft=True``, the :class:`FFT` is replaced by a :class:`RealFFT`, which takes
+    half the FFT clocks and memory, and only emits the ``sz/2`` non-redundant bins of each
+    block (see :class:`RealFFT` for how the DC and Nyquist bins are packed).
+
     Members
     -------
     i : :py:`In(stream.Signature(shape))`
@@ -889,7 +2073,9 @@ class STFTAnalyzer(wiring.Component):
     def __init__(self,
                  shape: fixed.SQ,
                  sz:    int,
-                 window_function = Window.Function.HANN):
+                 window_function = Window.Function.HANN,
+                 pipelined_fft: bool = False,
+                 real_fft: bool = False):
         """
         shape : fixed.SQ
             Shape of the fixed-point samples used for inputs and outputs.
@@ -898,14 +2084,22 @@ class STFTAnalyzer(wiring.Component):
             domain processing.
         window : Window.Function
             Window function applied to time-domain blocks the FFT.
+        pipelined_fft : bool
+            Use the pipelined (1 sample per clock) :class:`FFT` implementation.
+        real_fft : bool
+            Use a :class:`RealFFT`, so output blocks only contain ``sz/2`` bins.
         """
 
         self.sz        = sz
         self.shape     = shape
+        self.real_fft  = real_fft
 
         self.overlap_blocks   = ComputeOverlappingBlocks(sz=sz, shape=shape, n_overlap=sz//2)
         self.window_analysis  = Window(sz=sz, shape=shape, window_function=window_function)
-        self.fft              = FFT(sz=sz, shape=shape)
+        if real_fft:
+            self.fft          = RealFFT(sz=sz, shape=shape, pipelined=pipelined_fft)
+        else:
+            self.fft          = FFT(sz=sz, shape=shape, pipelined=pipelined_fft)
 
         super().__init__({
             "i": In(stream.Signature(self.shape)),
@@ -922,7 +2116,10 @@ class STFTAnalyzer(wiring.Component):
         # Continuous time-domain input -> windowed overlapping frequency domain blocks
         wiring.connect(m, wiring.flipped(self.i), self.overlap_blocks.i)
         wiring.connect(m, self.overlap_blocks.o, self.window_analysis.i)
-        connect_sq_to_real(m, self.window_analysis.o, self.fft.i)
+        if self.real_fft:
+            wiring.connect(m, self.window_analysis.o, self.fft.i)
+        else:
+            connect_sq_to_real(m, self.window_analysis.o, self.fft.i)
         wiring.connect(m, self.fft.o, wiring.flipped(self.o))
 
         return m
@@ -949,7 +2146,8 @@ class STFTSynthesizer(wiring.Component):
     def __init__(self,
                  shape: fixed.SQ,
                  sz:    int,
-                 window_function = Window.Function.HANN):
+                 window_function = Window.Function.HANN,
+                 pipelined_fft: bool = False):
         """
         shape : fixed.SQ
             Shape of the fixed-point samples used for inputs and outputs.
@@ -958,12 +2156,15 @@ class STFTSynthesizer(wiring.Component):
             domain processing.
         window : Window.Function
             Window function applied to time-domain blocks after the IFFT, but before overlap-add.
+        pipelined_fft : bool
+            Use the pipelined (1 sample per clock) :class:`FFT` implementation.
         """
 
         self.sz        = sz
         self.shape     = shape
 
-        self.ifft             = FFT(sz=sz, shape=shape, default_ifft=True)
+        self.ifft             = FFT(sz=sz, shape=shape, default_ifft=True,
+                                    pipelined=pipelined_fft)
         self.window_synthesis = Window(sz=sz, shape=shape, window_function=window_function)
         self.overlap_add      = OverlapAddBlocks(sz=sz, shape=shape, n_overlap=sz//2)
 
@@ -1016,22 +2217,27 @@ class STFTProcessorPipelined(wiring.Component):
     """
 
     def __init__(self,
-                 shape: fixed.SQ,
-                 sz:    int):
+                 shape:         fixed.SQ,
+                 sz:            int,
+                 pipelined_fft: bool=False):
         """
         shape : fixed.SQ
             Shape of the fixed-point samples used for inputs and outputs.
         sz : int
             Size of the frequency-domain blocks used internally and exposed for frequency
             domain processing.
+        pipelined_fft : bool
+            Use the pipelined (1 sample per clock) :class:`FFT` implementation.
         """
 
         self.sz        = sz
         self.shape     = shape
 
         # Symmetric sqrt(Hann) windows for resynthesis.
-        self.analyzer    = STFTAnalyzer(shape=shape, sz=sz, window_function=Window.Function.SQRT_HANN)
-        self.synthesizer = STFTSynthesizer(shape=shape, sz=sz, window_function=Window.Function.SQRT_HANN)
+        self.analyzer    = STFTAnalyzer(shape=shape, sz=sz, window_function=Window.Function.SQRT_HANN,
+                                        pipelined_fft=pipelined_fft)
+        self.synthesizer = STFTSynthesizer(shape=shape, sz=sz, window_function=Window.Function.SQRT_HANN,
+                                           pipelined_fft=pipelined_fft)
 
         super().__init__({
             # Time domain input and resynthesized output
@@ -256,6 +256,28 @@ class FIR(wiring.Component):
     This filter contains some optional optimizations to act as an efficient
     interpolator/decimator. For details, see :py:`stride_i`, :py:`stride_o` below.
 
+    By default, one MAC is performed per clock. For long filters at high sample
+    rates, :py:`symmetric` and :py:`n_mults` reduce the number of clocks per output:
+
+        - :py:`symmetric`: :py:`signal.firwin` designs are linear-phase, so
+          ``h[k] == h[n-1-k]``. Pairs of samples sharing a tap are added before
+          multiplying, halving the number of MACs.
+        - :py:`n_mults`: taps are split into :py:`n_mults` contiguous sections,
+          each with its own multiplier (and sample memory read port), which are
+          all summed at the output.
+
+    With :py:`n_channels` set, ``i`` and ``o`` carry ``data.ArrayLayout(shape, n_channels)``
+    frames, which are all filtered with the same taps. The tap memory is shared, and
+    each sample memory word holds one sample of every channel, so no memory is
+    duplicated per channel. The single multiplier is time-multiplexed across channels,
+    so an output frame takes ``n_channels`` times as long.
+
+    In these modes, an output is presented ``ceil(terms/n_mults)+2`` cycles after
+    the input sample, where ``terms`` is ``filter_order/stride_i``, or
+    ``ceil(filter_order/2)`` if :py:`symmetric`. Alternatively, multiplies may be
+    performed by a :py:`macp` provider (with :py:`n_mults == 1`), in which case
+    each MAC takes (at least) 2 cycles.
+
     Members
     -------
     i : :py:`In(stream.Signature(ASQ))`
@@ -275,7 +297,11 @@ class FIR(wiring.Component):
                  prescale:         float=1,
                  stride_i:         int=1,
                  stride_o:         int=1,
-                 shape=ASQ):
+                 shape=ASQ,
+                 symmetric:        bool=False,
+                 n_mults:          int=1,
+                 macp=None,
+                 n_channels:       int=None):
         """
         fs : int
             Sample rate of the filter, used for calculating FIR coefficients.
@@ -309,6 +335,17 @@ class FIR(wiring.Component):
             MACs to produce samples that will be discarded.
         shape : fixed.Shape
             Fixed-point shape for input/output samples. Defaults to ASQ.
+        symmetric : bool
+            Pre-add sample pairs that share a (symmetric) tap, halving the
+            number of MACs. Only supported for :py:`stride_i == 1`.
+        n_mults : int
+            Number of parallel multipliers the taps are spread over.
+        macp : mac.MAC
+            Optional :class:`mac.MAC` provider used for multiplies instead of
+            a dedicated multiplier. Requires :py:`n_mults == 1`.
+        n_channels : int
+            If set, filter frames of :py:`n_channels` samples with shared taps.
+            Not supported with :py:`symmetric`, :py:`n_mults` or :py:`macp`.
         """
         self.shape = shape
         taps = signal.firwin(numtaps=filter_order, cutoff=filter_cutoff_hz,
@@ -318,11 +355,201 @@ class FIR(wiring.Component):
         self.prescale   = prescale
         self.stride_i   = stride_i
         self.stride_o   = stride_o
+        self.symmetric  = symmetric
+        self.n_mults    = n_mults
+        self.macp       = macp
+        if symmetric:
+            assert stride_i == 1, "symmetric FIR folding requires stride_i == 1"
+            assert all(abs(t - u) < 1e-12 for t, u in zip(taps, taps[::-1])), \
+                "symmetric FIR folding requires symmetric taps"
+        assert macp is None or n_mults == 1, "macp requires n_mults == 1"
+        self.n_channels = n_channels
+        if n_channels is not None:
+            assert not symmetric and n_mults == 1 and macp is None
+            io_shape = data.ArrayLayout(shape, n_channels)
+        else:
+            io_shape = shape
         super().__init__({
-            "i": In(stream.Signature(shape)),
-            "o": Out(stream.Signature(shape)),
+            "i": In(stream.Signature(io_shape)),
+            "o": Out(stream.Signature(io_shape)),
         })
 
+    def _elaborate_parallel(self, m):
+
+        n = len(self.taps_float)
+        S = self.stride_i
+        L = n // S
+        P = self.n_mults
+        fold = self.symmetric
+        # Number of MAC terms per output, and per multiplier.
+        n_terms = (n + 1) // 2 if fold else L
+        C = -(-n_terms // P)
+
+        # Filter tap memories, one per multiplier. Multiplier 'p' handles terms
+        # 'k = p*C + j' for 'j' in 0..C, stored at 'j*S + stride_i_pos'. Terms
+        # past the end of the filter are zero.
+
+        def tap(k, phase):
+            if k >= n_terms:
+                return 0.
+            if fold:
+                t = self.taps_float[k]
+                # The middle tap of an odd-length filter has no pair, but
+                # its sample is still added to itself.
+                return t/2 if k == n - 1 - k else t
+            return self.taps_float[phase + k*S]
+
+        taps_rd = []
+        for p in range(P):
+            m.submodules[f"taps_mem{p}"] = taps_mem = Memory(
+                shape=self.ctype, depth=C*S, init=[
+                    fixed.Const(tap(p*C + j, phase)*self.prescale, shape=self.ctype)
+                    for j in range(C) for phase in range(S)
+                ]
+            )
+            taps_rd.append(taps_mem.read_port())
+
+        # Input sample memory, with 1 read port per multiplier (2 if folding)
+
+        m.submodules.x_mem = x_mem = Memory(shape=self.ctype, depth=L, init=[])
+        x_wport = x_mem.write_port()
+        xa_rd = [x_mem.read_port() for _ in range(P)]
+        xb_rd = [x_mem.read_port() for _ in range(P)] if fold else []
+
+        w_pos        = Signal(range(L), init=1)
+        stride_i_pos = Signal(range(S), init=0)
+        stride_o_pos = Signal(range(self.stride_o), init=0)
+
+        # Newest sample is always written (or, if zero-padded, already) here.
+        w_addr = Signal(range(L))
+        with m.If(w_pos == (L - 1)):
+            m.d.comb += w_addr.eq(0)
+        with m.Else():
+            m.d.comb += w_addr.eq(w_pos+1)
+        m.d.comb += [
+            x_wport.addr.eq(w_addr),
+            x_wport.data.eq(self.i.payload),
+        ]
+
+        def wrap(v):
+            return Mux(v >= L, v - L, v)
+
+        # Per-multiplier read positions: 'ixa' moves from newer to older samples,
+        # and (when folding) 'ixb' from the oldest sample to newer samples.
+        ix_tap = Signal(range(C*S+1))
+        ixa = [Signal(range(L), name=f"ixa{p}") for p in range(P)]
+        ixb = [Signal(range(L), name=f"ixb{p}") for p in range(P)]
+        j = Signal(range(C+1))
+
+        pre  = [Signal(self.ctype, name=f"pre{p}") for p in range(P)]
+        acc  = [Signal(self.ctype, name=f"acc{p}") for p in range(P)]
+        for p in range(P):
+            m.d.comb += [
+                taps_rd[p].addr.eq(ix_tap),
+                xa_rd[p].addr.eq(ixa[p]),
+            ]
+            if fold:
+                m.d.comb += [
+                    xb_rd[p].addr.eq(ixb[p]),
+                    pre[p].eq(xa_rd[p].data + xb_rd[p].data),
+                ]
+            else:
+                m.d.comb += pre[p].eq(xa_rd[p].data)
+
+        def start():
+            m.d.sync += [
+                ix_tap.eq(stride_i_pos),
+                j.eq(0),
+            ]
+            for p in range(P):
+                m.d.sync += [
+                    ixa[p].eq(wrap(w_addr + (L - (p*C) % L))),
+                    ixb[p].eq(wrap(w_addr + (1 + p*C) % L)),
+                    acc[p].eq(0),
+                ]
+
+        def advance():
+            m.d.sync += [
+                ix_tap.eq(ix_tap + S),
+                j.eq(j + 1),
+            ]
+            for p in range(P):
+                m.d.sync += [
+                    ixa[p].eq(Mux(ixa[p] == 0, L - 1, ixa[p] - 1)),
+                    ixb[p].eq(Mux(ixb[p] == L - 1, 0, ixb[p] + 1)),
+                ]
+
+        # Sum of all multiplier sections
+        y = Signal(self.ctype)
+        m.d.comb += y.eq(sum(acc[1:], acc[0]))
+
+        if self.macp is None:
+            # Products of the reads issued in the previous cycle.
+            pipe = Signal()
+            m.d.sync += pipe.eq(0)
+            with m.If(pipe):
+                for p in range(P):
+                    m.d.sync += acc[p].eq(acc[p] + pre[p] * taps_rd[p].data)
+        else:
+            m.submodules.macp = mp = self.macp
+
+        with m.FSM() as fsm:
+            with m.State('WAIT-VALID'):
+                m.d.comb += self.i.ready.eq(1),
+                with m.If(self.i.valid):
+                    with m.If(stride_i_pos == 0):
+                        m.d.comb += x_wport.en.eq(1)
+                    start()
+                    with m.If(stride_o_pos == 0):
+                        m.next = "MAC" if self.macp is None else "READ"
+                    with m.Else():
+                        m.next = "WAIT-READY"
+
+            if self.macp is None:
+                with m.State("MAC"):
+                    m.d.sync += pipe.eq(1)
+                    advance()
+                    with m.If(j == C - 1):
+                        m.next = "FLUSH"
+
+                with m.State("FLUSH"):
+                    # Last products are accumulated on this clock.
+                    m.next = "WAIT-READY"
+            else:
+                with m.State("READ"):
+                    m.next = "MAC"
+
+                with m.State("MAC"):
+                    with mp.Multiply(m, a=pre[0], b=taps_rd[0].data):
+                        m.d.sync += acc[0].eq(acc[0] + mp.result.z)
+                        advance()
+                        with m.If(j == C - 1):
+                            m.next = "WAIT-READY"
+                        with m.Else():
+                            m.next = "READ"
+
+            with m.State('WAIT-READY'):
+                m.d.comb += [
+                    self.o.valid.eq(stride_o_pos == 0),
+                    self.o.payload.eq(y)
+                ]
+                with m.If(self.o.ready | (stride_o_pos != 0)):
+                    with m.If(stride_i_pos == (S - 1)):
+                        m.d.sync += stride_i_pos.eq(0)
+                        with m.If(w_pos == (L - 1)):
+                            m.d.sync += w_pos.eq(0)
+                        with m.Else():
+                            m.d.sync += w_pos.eq(w_pos+1)
+                    with m.Else():
+                        m.d.sync += stride_i_pos.eq(stride_i_pos+1)
+                    with m.If(stride_o_pos == (self.stride_o - 1)):
+                        m.d.sync += stride_o_pos.eq(0)
+                    with m.Else():
+                        m.d.sync += stride_o_pos.eq(stride_o_pos + 1)
+                    m.next = 'WAIT-VALID'
+
+        return m
+
     def elaborate(self, platform):
         m = Module()
 
@@ -330,6 +557,9 @@ class FIR(wiring.Component):
 
         self.ctype = fixed.SQ(2, self.shape.f_bits)
 
+        if self.symmetric or self.n_mults > 1 or self.macp is not None:
+            return self._elaborate_parallel(m)
+
         n = len(self.taps_float)
 
         # Filter tap memory and read port
@@ -344,15 +574,29 @@ class FIR(wiring.Component):
 
         taps_rport = taps_mem.read_port()
 
-        # Input sample memory, write and read port
+        # Input sample memory, write and read port. For multiple channels,
+        # each word holds a sample of every channel.
+
+        if self.n_channels is not None:
+            x_shape = data.ArrayLayout(self.ctype, self.n_channels)
+        else:
+            x_shape = self.ctype
 
         m.submodules.x_mem = x_mem = Memory(
-            shape=self.ctype, depth=n//self.stride_i, init=[]
+            shape=x_shape, depth=n//self.stride_i, init=[]
         )
 
         x_wport = x_mem.write_port()
         x_rport = x_mem.read_port(transparent_for=(x_wport,))
 
+        # Current channel (multiple channels only)
+        if self.n_channels is not None:
+            ch = Signal(range(self.n_channels))
+            x_rdata = x_rport.data[ch]
+            y_out = Signal(data.ArrayLayout(self.shape, self.n_channels))
+        else:
+            x_rdata = x_rport.data
+
         # FIR filter logic
 
         # Number of MACs performed per sample, up to n/self.stride
@@ -382,7 +626,11 @@ class FIR(wiring.Component):
 
         m.d.comb += taps_rport.en.eq(1)
         m.d.comb += taps_rport.addr.eq(ix_tap)
-        m.d.comb += x_wport.data.eq(self.i.payload)
+        if self.n_channels is not None:
+            for c in range(self.n_channels):
+                m.d.comb += x_wport.data[c].eq(self.i.payload[c])
+        else:
+            m.d.comb += x_wport.data.eq(self.i.payload)
         m.d.comb += x_rport.addr.eq(ix_rd)
         m.d.comb += x_rport.en.eq(1)
 
@@ -410,14 +658,30 @@ class FIR(wiring.Component):
                         macs.eq(0),
                     ]
 
+                    if self.n_channels is not None:
+                        m.d.sync += ch.eq(0)
+
                     with m.If(stride_o_pos == 0):
                         m.next = "MAC"
                     with m.Else():
                         m.next = "WAIT-READY"
 
+            if self.n_channels is not None:
+                with m.State("NEXT-CHANNEL"):
+                    # Same as 'WAIT-VALID', for the next channel of the same frame.
+                    m.d.comb += x_rport.addr.eq(x_wport.addr)
+                    m.d.comb += taps_rport.addr.eq(stride_i_pos)
+                    m.d.sync += [
+                        ix_rd.eq(w_pos),
+                        ix_tap.eq(stride_i_pos + self.stride_i),
+                        y.eq(0),
+                        macs.eq(0),
+                    ]
+                    m.next = "MAC"
+
             with m.State("MAC"):
                 m.d.comb += [
-                    a.eq(x_rport.data),
+                    a.eq(x_rdata),
                     b.eq(taps_rport.data),
                 ]
                 m.d.sync += [
@@ -433,7 +697,19 @@ class FIR(wiring.Component):
                     m.d.sync += ix_rd.eq(ix_rd - 1),
                 # done?
                 with m.If(macs == (n//self.stride_i - 1)):
-                    m.next = "WAIT-READY"
+                    if self.n_channels is not None:
+                        m.next = "CHANNEL-DONE"
+                    else:
+                        m.next = "WAIT-READY"
+
+            if self.n_channels is not None:
+                with m.State("CHANNEL-DONE"):
+                    m.d.sync += y_out[ch].eq(y)
+                    with m.If(ch == (self.n_channels - 1)):
+                        m.next = "WAIT-READY"
+                    with m.Else():
+                        m.d.sync += ch.eq(ch + 1)
+                        m.next = "NEXT-CHANNEL"
 
             with m.State('WAIT-READY'):
 
@@ -443,7 +719,7 @@ class FIR(wiring.Component):
 
                 m.d.comb += [
                     self.o.valid.eq(stride_o_pos == 0),
-                    self.o.payload.eq(y)
+                    self.o.payload.eq(y_out if self.n_channels is not None else y)
                 ]
 
                 with m.If(self.o.ready | (stride_o_pos != 0)):
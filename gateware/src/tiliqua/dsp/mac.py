@@ -19,6 +19,8 @@ amongst multiple components using 2 different strategies:
        in a message ring (essentially a large circular shift register).
        On each ring, there is a single DSP tile processing multiplies. DSP tile
        throughput of near 100% is still achievable, however latency is higher.
+       Using :py:`RingMACServer(lanes=K)`, clients are split across K rings
+       (K DSP tiles) to reduce latency and increase throughput.
 
 """
 
@@ -220,7 +222,7 @@ class RingMAC(MAC):
 
         return m
 
-def RingMACServer(max_clients=16, mtype=SQNative):
+def RingMACServer(max_clients=16, mtype=SQNative, lanes=1):
     """
     Factory for creating a MAC message ring.
 
@@ -228,15 +230,33 @@ def RingMACServer(max_clients=16, mtype=SQNative):
     add additional client nodes to this ring. During elaboration, all clients (and this server) are connected in
     a ring, and a single shared DSP tile is instantiated to serve requests.
 
+    With ``lanes > 1``, there are ``lanes`` independent rings, each with its own DSP
+    tile, so up to ``lanes`` multiplies are processed per clock. :py:`new_client(load=...)`
+    adds each client to the ring with the least expected load (for example, the number of
+    multiplies per sample of the client), so heavy clients are spread out. A client's
+    latency is proportional to the number of clients on its ring, so ``lanes``
+    rings have about ``1/lanes`` of the latency of a single ring. ``max_clients`` applies
+    to each ring.
+
     Returns:
-        ringnoc.Server configured for DSP tile sharing of ``operands.a * operands.b``.
+        ringnoc.Server (or ringnoc.ServerGroup if ``lanes > 1``) configured for DSP tile
+        sharing of ``operands.a * operands.b``.
     """
+    cfg = ringnoc.Config(
+        tag_bits=exact_log2(max_clients),
+        payload_type_client=MAC.operands_layout(mtype),
+        payload_type_server=MAC.result_layout(mtype),
+    )
+    process_request = lambda m, operands: operands.a * operands.b
+    if lanes > 1:
+        return ringnoc.ServerGroup(
+            n_rings=lanes,
+            cfg=cfg,
+            process_request=process_request,
+            client_class=RingMAC,
+        )
     return ringnoc.Server(
-        cfg=ringnoc.Config(
-            tag_bits=exact_log2(max_clients),
-            payload_type_client=MAC.operands_layout(mtype),
-            payload_type_server=MAC.result_layout(mtype),
-        ),
-        process_request=lambda m, operands: operands.a * operands.b,
+        cfg=cfg,
+        process_request=process_request,
         client_class=RingMAC,
     )
@@ -33,6 +33,15 @@ class MatrixMix(wiring.Component):
     A single multiplier is shared, where total latency is of the order
     ``2*i_channels*o_channels`` from input to output.
 
+    If ``sparse`` is set, only non-zero coefficients are visited. A compact list
+    of ``(o_x, i_y, v)`` terms is kept alongside the coefficient memory, and the
+    mixer walks this list at one term per clock, so total latency is of the order
+    ``n_nonzero + 3``. Coefficients of exactly ``1.0`` or ``-1.0`` are accumulated
+    without touching the multiplier. Whenever a coefficient is updated, the list is
+    rebuilt in the background (this takes ``i_channels*o_channels`` clocks) and
+    swapped in between samples, so updates take effect a sample or so later
+    than in the dense mode.
+
     All coefficients must fit inside the self.ctype declared below.
 
     Coefficients may be updated dynamically, depending on ``coeff_update``:
@@ -53,8 +62,14 @@ class MatrixMix(wiring.Component):
         Optional coefficient update port, type depends on ``self.coeff_update``.
     """
 
+    # Kind of each term in the sparse term list.
+    class Term(enum.IntEnum):
+        MUL = 0
+        ONE = 1
+        NEG = 2
+
     def __init__(self, i_channels, o_channels, coefficients,
-                 coeff_update=CoeffUpdate.XY, ctype=mac.SQNative):
+                 coeff_update=CoeffUpdate.XY, ctype=mac.SQNative, sparse=False):
         """
         i_channels : int
             Number of input channels.
@@ -67,6 +82,9 @@ class MatrixMix(wiring.Component):
             Whether a dynamic coefficient update port should be added (see above).
         ctype : fixed.SQ
             Fixed-point type of coefficients in the coefficient ROM.
+        sparse : bool
+            Skip zero coefficients and bypass the multiplier for unity
+            coefficients (see above).
         """
 
         assert(len(coefficients)       == i_channels)
@@ -75,6 +93,7 @@ class MatrixMix(wiring.Component):
         self.i_channels = i_channels
         self.o_channels = o_channels
         self.coeff_update = coeff_update
+        self.sparse = sparse
 
         self.ctype = ctype
 
@@ -86,6 +105,25 @@ class MatrixMix(wiring.Component):
 
         assert(len(coefficients_flat) == i_channels*o_channels)
 
+        if sparse:
+            # (o_x, i_y, kind, v) of each non-zero term. Double-buffered, so
+            # that the list can be rebuilt while the other copy is in use.
+            self.term = data.StructLayout({
+                "o_x":  unsigned(exact_log2(o_channels)),
+                "i_y":  unsigned(exact_log2(i_channels)),
+                "kind": self.Term,
+                "v":    self.ctype,
+            })
+            terms = [
+                {"o_x": n % o_channels, "i_y": n // o_channels,
+                 "kind": self._term_kind(c.as_float()), "v": c}
+                for n, c in enumerate(coefficients_flat)
+                if c.as_float() != 0
+            ]
+            self.n_terms_init = len(terms)
+            self.terms = Memory(
+                shape=self.term, depth=2*i_channels*o_channels, init=terms)
+
         # matrix coefficient memory
         self.mem = Memory(
             shape=self.ctype,
@@ -107,6 +145,14 @@ class MatrixMix(wiring.Component):
 
         super().__init__(ports)
 
+    @staticmethod
+    def _term_kind(v):
+        if v == 1.0:
+            return MatrixMix.Term.ONE
+        if v == -1.0:
+            return MatrixMix.Term.NEG
+        return MatrixMix.Term.MUL
+
     def elaborate(self, platform):
         m = Module()
 
@@ -126,10 +172,7 @@ class MatrixMix(wiring.Component):
         # we've finished all accumulation steps.
         done = Signal(1)
 
-        m.d.comb += [
-            rport.en.eq(1),
-            rport.addr.eq(Cat(o_ch, i_ch)),
-        ]
+        m.d.comb += rport.en.eq(1)
 
         read0 = Signal(self.ctype)
 
@@ -156,6 +199,12 @@ class MatrixMix(wiring.Component):
             with m.If(self.c.valid):
                 m.d.sync += blk_ix_reg.eq(blk_ix + 1)
 
+        if self.sparse:
+            self._elaborate_sparse(m, wport, rport, i_latch, o_accum)
+            return m
+
+        m.d.comb += rport.addr.eq(Cat(o_ch, i_ch))
+
         # main multiplications state machine
 
         with m.FSM() as fsm:
@@ -213,3 +262,141 @@ class MatrixMix(wiring.Component):
                     m.next = 'WAIT-VALID'
 
         return m
+
+    def _elaborate_sparse(self, m, wport, rport, i_latch, o_accum):
+
+        n_coeffs = self.i_channels*self.o_channels
+
+        m.submodules.terms = self.terms
+        t_wport = self.terms.write_port()
+        t_rport = self.terms.read_port()
+
+        # which half of the term list is in use, and how many terms it holds.
+        bank    = Signal()
+        n_terms = Signal(range(n_coeffs+1), init=self.n_terms_init)
+        # term index into the active half of the term list.
+        t_ix    = Signal(range(n_coeffs))
+        # a rebuilt term list is waiting to be swapped in.
+        swap    = Signal()
+        # terms written to the inactive half of the term list by a rebuild.
+        w_terms = Signal(range(n_coeffs+1))
+
+        # term list rebuild logic. Every coefficient update marks the list
+        # as dirty, after which the dense coefficient memory is scanned and
+        # all non-zero coefficients are copied to the inactive half of the
+        # term list, then swapped in by the main state machine.
+
+        if self.coeff_update != CoeffUpdate.NONE:
+
+            dirty  = Signal()
+            scan   = Signal(range(n_coeffs))
+            # scan index and strobe, one cycle behind (matching rport.data).
+            scan_l = Signal(range(n_coeffs))
+            scan_v = Signal()
+
+            m.d.comb += rport.addr.eq(scan)
+
+            one = fixed.Const(1.0, shape=self.ctype).as_value()
+            neg = fixed.Const(-1.0, shape=self.ctype).as_value()
+            kind = Signal(self.Term)
+            with m.If(rport.data.as_value() == one):
+                m.d.comb += kind.eq(self.Term.ONE)
+            with m.Elif(rport.data.as_value() == neg):
+                m.d.comb += kind.eq(self.Term.NEG)
+            with m.Else():
+                m.d.comb += kind.eq(self.Term.MUL)
+
+            m.d.comb += [
+                t_wport.addr.eq(Cat(w_terms[:exact_log2(n_coeffs)], ~bank)),
+                t_wport.data.o_x.eq(scan_l[:exact_log2(self.o_channels)]),
+                t_wport.data.i_y.eq(scan_l[exact_log2(self.o_channels):]),
+                t_wport.data.kind.eq(kind),
+                t_wport.data.v.eq(rport.data),
+            ]
+            with m.If(scan_v & (rport.data.as_value() != 0)):
+                m.d.comb += t_wport.en.eq(1)
+                m.d.sync += w_terms.eq(w_terms + 1)
+
+            m.d.sync += scan_l.eq(scan)
+
+            with m.FSM(name='rebuild'):
+                with m.State('IDLE'):
+                    with m.If(dirty):
+                        m.d.sync += [
+                            dirty.eq(0),
+                            scan.eq(0),
+                            w_terms.eq(0),
+                        ]
+                        m.next = 'SCAN'
+                with m.State('SCAN'):
+                    m.d.sync += [
+                        scan.eq(scan + 1),
+                        scan_v.eq(1),
+                    ]
+                    with m.If(scan == n_coeffs - 1):
+                        m.next = 'FLUSH'
+                with m.State('FLUSH'):
+                    m.d.sync += [
+                        scan_v.eq(0),
+                        swap.eq(1),
+                    ]
+                    m.next = 'SWAP'
+                with m.State('SWAP'):
+                    with m.If(~swap):
+                        m.next = 'IDLE'
+
+            # an update landing during a scan triggers another scan.
+            with m.If(wport.en):
+                m.d.sync += dirty.eq(1)
+
+        # main accumulation state machine. Terms are read from the term
+        # list one cycle ahead, so one term is accumulated per clock.
+
+        with m.FSM() as fsm:
+            with m.State('WAIT-VALID'):
+                m.d.comb += t_rport.addr.eq(Cat(C(0, exact_log2(n_coeffs)), bank))
+                with m.If(swap):
+                    m.d.sync += [
+                        bank.eq(~bank),
+                        n_terms.eq(w_terms),
+                        swap.eq(0),
+                    ]
+                with m.Else():
+                    m.d.comb += self.i.ready.eq(1)
+                    with m.If(self.i.valid):
+                        m.d.sync += [
+                            o_accum.eq(0),
+                            t_ix.eq(0),
+                        ]
+                        m.d.sync += [
+                            i_latch[n].eq(self.i.payload[n])
+                            for n in range(self.i_channels)
+                        ]
+                        with m.If(n_terms == 0):
+                            m.next = 'LATCH'
+                        with m.Else():
+                            m.next = 'MAC'
+            with m.State('MAC'):
+                m.d.comb += t_rport.addr.eq(Cat((t_ix + 1)[:exact_log2(n_coeffs)], bank))
+                term = t_rport.data
+                x = i_latch[term.i_y]
+                with m.Switch(term.kind):
+                    with m.Case(self.Term.ONE):
+                        m.d.sync += o_accum[term.o_x].eq(o_accum[term.o_x] + x)
+                    with m.Case(self.Term.NEG):
+                        m.d.sync += o_accum[term.o_x].eq(o_accum[term.o_x] - x)
+                    with m.Default():
+                        m.d.sync += o_accum[term.o_x].eq(o_accum[term.o_x] + term.v * x)
+                m.d.sync += t_ix.eq(t_ix + 1)
+                with m.If(t_ix == n_terms - 1):
+                    m.next = 'LATCH'
+            with m.State('LATCH'):
+                m.d.sync += [
+                    self.o.payload[n].eq(o_accum[n].saturate(ASQ))
+                    for n in range(self.o_channels)
+                ]
+                m.next = 'WAIT-READY'
+            with m.State('WAIT-READY'):
+                m.d.comb += self.o.valid.eq(1)
+                with m.If(self.o.ready):
+                    m.next = 'WAIT-VALID'
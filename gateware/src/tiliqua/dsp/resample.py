@@ -5,7 +5,7 @@
 import math
 
 from amaranth import *
-from amaranth.lib import stream, wiring
+from amaranth.lib import data, stream, wiring
 from amaranth.lib.wiring import In, Out
 
 from . import ASQ
@@ -26,6 +26,11 @@ class Resample(wiring.Component):
     for large upsampling/interpolating ratios, and is what makes this a polyphase
     resampler - time complexity per output sample proportional to O(fir_order/N).
 
+    With :py:`n_channels` set, ``i`` and ``o`` carry ``data.ArrayLayout(shape, n_channels)``
+    frames. All channels share one FIR tap memory and one (interleaved) sample memory,
+    and a single multiplier is time-multiplexed across channels, so N channels use about
+    the same memory as one, at N times the MAC time per frame.
+
     Members
     -------
     i : :py:`In(stream.Signature(ASQ))`
@@ -41,7 +46,10 @@ class Resample(wiring.Component):
                  m_down:     int,
                  bw:         float=0.4,
                  order_mult: int=5,
-                 shape=ASQ):
+                 shape=ASQ,
+                 symmetric:  bool=False,
+                 n_mults:    int=1,
+                 n_channels: int=None):
         """
         fs_in : int
             Expected sample rate of incoming samples, used for calculating filter coefficients.
@@ -59,6 +67,13 @@ class Resample(wiring.Component):
             rounded up to the next multiple of :py:`n_up` (required for even zero padding).
         shape : fixed.Shape
             Fixed-point shape for input/output samples. Defaults to ASQ.
+        symmetric : bool
+            Fold symmetric taps of the underlying :class:`FIR`, halving its MACs.
+            Only supported for :py:`n_up == 1` (pure decimation).
+        n_mults : int
+            Number of parallel multipliers used by the underlying :class:`FIR`.
+        n_channels : int
+            If set, resample frames of :py:`n_channels` samples with shared filter memories.
         """
 
         gcd = math.gcd(n_up, m_down)
@@ -87,11 +102,15 @@ class Resample(wiring.Component):
             prescale=self.n_up,
             stride_i=self.n_up,
             stride_o=self.m_down,
-            shape=shape)
+            shape=shape,
+            symmetric=symmetric,
+            n_mults=n_mults,
+            n_channels=n_channels)
 
+        io_shape = shape if n_channels is None else data.ArrayLayout(shape, n_channels)
         super().__init__({
-            "i": In(stream.Signature(shape)),
-            "o": Out(stream.Signature(shape)),
+            "i": In(stream.Signature(io_shape)),
+            "o": Out(stream.Signature(io_shape)),
         })
 
     def elaborate(self, platform):
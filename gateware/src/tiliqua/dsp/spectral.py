@@ -155,6 +155,10 @@ class SpectralEnvelope(wiring.Component):
     saves another multiplier at the cost of everything being multiplied
     by a constant factor (may or may not matter depending on the use).
 
+    With ``pipelined_cordic=True``, the CORDIC accepts a sample every clock
+    instead of every ~``iterations`` clocks, so it is no longer the bottleneck
+    behind a fast FFT (the :class:`BlockLPF` then takes 6 clocks per sample).
+
     Members
     -------
     i : :py:`In(stream.Signature(Block(CQ(self.shape))))`
@@ -165,15 +169,19 @@ class SpectralEnvelope(wiring.Component):
 
     def __init__(self,
                  shape: fixed.Shape,
-                 sz: int):
+                 sz: int,
+                 pipelined_cordic: bool = False):
         """
         shape : Shape
             Shape of fixed-point number to use for streams.
         sz : int
             The size of each input block and outgoing spectral envelope blocks.
+        pipelined_cordic : bool
+            Use the pipelined (1 sample per clock) :class:`cordic.RectToPolarCordic`.
         """
         self.shape = shape
         self.sz    = sz
+        self.pipelined_cordic = pipelined_cordic
         super().__init__({
             "i": In(stream.Signature(Block(CQ(self.shape)))),
             "o": Out(stream.Signature(Block(self.shape))),
@@ -181,8 +189,10 @@ class SpectralEnvelope(wiring.Component):
 
     def elaborate(self, platform) -> Module:
         m = Module()
-        m.submodules.rect_to_polar = rect_to_polar = block.WrapCore(cordic.RectToPolarCordic(
-                self.shape, magnitude_correction=False))
+        rect_to_polar = cordic.RectToPolarCordic(
+                self.shape, magnitude_correction=False, pipelined=self.pipelined_cordic)
+        m.submodules.rect_to_polar = rect_to_polar = block.WrapCore(
+                rect_to_polar, max_latency=max(16, rect_to_polar.latency+1))
         m.submodules.block_lpf = block_lpf = BlockLPF(
                 self.shape, self.sz)
         wiring.connect(m, wiring.flipped(self.i), rect_to_polar.i)
@@ -222,15 +232,19 @@ class SpectralCrossSynthesis(wiring.Component):
 
     def __init__(self,
                  shape: fixed.Shape,
-                 sz: int):
+                 sz: int,
+                 pipelined_cordic: bool = False):
         """
         shape : Shape
             Shape of fixed-point number to use for block streams.
         sz : int
             Size of each block of complex spectra.
+        pipelined_cordic : bool
+            Use a pipelined CORDIC for the modulator envelope, see :class:`SpectralEnvelope`.
         """
         self.shape = shape
         self.sz    = sz
+        self.pipelined_cordic = pipelined_cordic
         super().__init__({
             # All frequency domain spectra in blocks.
             "i_carrier": In(stream.Signature(Block(CQ(self.shape)))),
@@ -244,7 +258,7 @@ class SpectralCrossSynthesis(wiring.Component):
         # Connect modulator spectra to spectral envelope detector
 
         m.submodules.spectral_envelope = spectral_envelope = SpectralEnvelope(
-            shape=self.shape, sz=self.sz)
+            shape=self.shape, sz=self.sz, pipelined_cordic=self.pipelined_cordic)
         wiring.connect(m, wiring.flipped(self.i_modulator), spectral_envelope.i)
 
         # Time-synchronize output of 'spectral_envelope' with 'i_carrier' by
@@ -6,8 +6,8 @@
 # SPDX-License-Identifier: BSD-3-Clause
 
 from amaranth import *
-from amaranth.lib import wiring
-from amaranth.lib.wiring import In, flipped
+from amaranth.lib import data, wiring
+from amaranth.lib.wiring import In, Out, flipped
 from amaranth.utils import exact_log2
 from amaranth_soc import csr, wishbone
 from amaranth_soc.memory import MemoryMap
@@ -18,6 +18,401 @@ from vendor.psram_hyper import HyperPSRAM
 from vendor.psram_ospi import OSPIPSRAM
 
 
+class QoSArbiter(wiring.Component):
+
+    """
+    Wishbone arbiter with priority classes, bandwidth budgets and urgent requests.
+
+    Like :class:`wishbone.Arbiter`, the bus is granted to one master at a
+    time, for as long as that master holds ``cyc``. Whenever the bus is
+    released, the next master is chosen from those requesting it, in order:
+
+    - Masters whose ``urgent`` signal is asserted (e.g. a scanout FIFO that
+      is running low). These always win.
+    - Masters that are within their bandwidth budget, highest ``priority``
+      class first.
+    - Masters that have exhausted their bandwidth budget. These are only
+      served when nobody else wants the bus.
+
+    Ties within each of the above are broken round-robin. If all masters
+    are added with the same (default) settings, this is the same as a plain
+    round-robin :class:`wishbone.Arbiter`.
+
+    Each master may have a token-bucket bandwidth budget of ``(words, window)``,
+    that is, it may transfer up to ``words`` words every ``window`` cycles
+    before dropping below every other master. This stops a bursty best-effort
+    master from starving everyone else, without leaving the bus idle if it is
+    the only one that wants it.
+    """
+
+    BEST_EFFORT = 0
+    NORMAL      = 1
+    REALTIME    = 2
+
+    def __init__(self, *, addr_width, data_width, granularity, features=frozenset()):
+        self._masters = []
+        super().__init__({
+            "bus": Out(wishbone.Signature(addr_width=addr_width,
+                                          data_width=data_width,
+                                          granularity=granularity,
+                                          features=features)),
+        })
+
+    def add(self, intr_bus, *, priority=NORMAL, budget=None, urgent=None):
+        """
+        Add a master to the arbiter.
+
+        intr_bus : wishbone.Interface
+            Bus of the master.
+        priority : int
+            Priority class, higher is more important. See ``BEST_EFFORT``,
+            ``NORMAL`` and ``REALTIME``.
+        budget : (int, int), optional
+            ``(words, window)`` token-bucket bandwidth budget. ``None`` for unlimited.
+        urgent : Signal, optional
+            If asserted, this master is granted the bus before anyone else.
+        """
+        if budget is not None:
+            words, window = budget
+            assert 0 < words <= window
+        self._masters.append((intr_bus, priority, budget, urgent))
+
+    def elaborate(self, platform):
+        m = Module()
+
+        n = len(self._masters)
+        assert n > 0
+
+        grant = Signal(range(max(n, 2)))
+        bus = self.bus
+
+        # Bus multiplexing, same as wishbone.Arbiter.
+
+        with m.Switch(grant):
+            for i, (intr_bus, _, _, _) in enumerate(self._masters):
+                with m.Case(i):
+                    m.d.comb += [
+                        bus.adr.eq(intr_bus.adr),
+                        bus.dat_w.eq(intr_bus.dat_w),
+                        bus.sel.eq(intr_bus.sel),
+                        bus.we.eq(intr_bus.we),
+                        bus.stb.eq(intr_bus.stb),
+                        bus.cyc.eq(intr_bus.cyc),
+                    ]
+                    for feature in ("cti", "bte"):
+                        if hasattr(intr_bus, feature) and hasattr(bus, feature):
+                            m.d.comb += getattr(bus, feature).eq(getattr(intr_bus, feature))
+
+        for i, (intr_bus, _, _, _) in enumerate(self._masters):
+            m.d.comb += [
+                intr_bus.dat_r.eq(bus.dat_r),
+                intr_bus.ack.eq(bus.ack & (grant == i)),
+            ]
+
+        # Token buckets. Every word transferred costs one token, and the
+        # bucket is refilled at the start of every window.
+
+        in_budget = []
+        for i, (intr_bus, _, budget, _) in enumerate(self._masters):
+            if budget is None:
+                in_budget.append(C(1))
+                continue
+            words, window = budget
+            tokens = Signal(range(words + 1), init=words, name=f"tokens{i}")
+            window_cnt = Signal(range(window), name=f"window{i}")
+            m.d.sync += window_cnt.eq(Mux(window_cnt == window - 1, 0, window_cnt + 1))
+            with m.If(window_cnt == window - 1):
+                m.d.sync += tokens.eq(words)
+            with m.Elif(intr_bus.ack & (tokens != 0)):
+                m.d.sync += tokens.eq(tokens - 1)
+            in_budget.append(tokens != 0)
+
+        # Arbitration tiers, from highest to lowest.
+
+        priorities = sorted({priority for _, priority, _, _ in self._masters}, reverse=True)
+        tiers = []
+        tiers.append([
+            urgent if urgent is not None else C(0)
+            for _, _, _, urgent in self._masters
+        ])
+        for tier_priority in priorities:
+            tiers.append([
+                in_budget[i] if priority == tier_priority else C(0)
+                for i, (_, priority, _, _) in enumerate(self._masters)
+            ])
+        tiers.append([C(1) for _ in self._masters])
+
+        requests = [intr_bus.cyc for intr_bus, _, _, _ in self._masters]
+
+        with m.If(~bus.cyc):
+            with m.Switch(grant):
+                for current in range(n):
+                    with m.Case(current):
+                        # Round-robin within each tier, starting after the current grant.
+                        first = True
+                        for tier in tiers:
+                            for offset in range(1, n+1):
+                                j = (current + offset) % n
+                                cond = requests[j] & tier[j]
+                                with (m.If(cond) if first else m.Elif(cond)):
+                                    m.d.sync += grant.eq(j)
+                                first = False
+
+        return m
+
+
+class PortStatistics(wiring.Component):
+
+    """
+    Bandwidth and latency counters for a single wishbone master.
+
+    A 'transaction' is a single classic cycle, or an entire burst up to
+    and including the word where ``cti`` is not ``INCR_BURST``. For each
+    transaction, the latency is the number of cycles the master spent
+    waiting for its first word (i.e. arbitration and memory latency).
+
+    All counters are zeroed on ``clear`` and only count while ``collect``
+    is asserted. ``histogram`` counts transactions by length, with bucket
+    ``n`` holding transactions of at most ``HISTOGRAM_BOUNDS[n]`` words
+    (and the last bucket holding everything longer).
+    """
+
+    HISTOGRAM_BOUNDS = [1, 4, 16]
+
+    def __init__(self):
+        super().__init__({
+            # Bus activity of the master under observation.
+            "cyc":           In(1),
+            "stb":           In(1),
+            "ack":           In(1),
+            "last":          In(1),
+            # Control
+            "collect":       In(1),
+            "clear":         In(1),
+            # Statistics
+            "words":         Out(32),
+            "transactions":  Out(32),
+            "latency_total": Out(32),
+            "latency_max":   Out(16),
+            "histogram":     Out(data.ArrayLayout(32, len(self.HISTOGRAM_BOUNDS) + 1)),
+        })
+
+    def elaborate(self, platform):
+        m = Module()
+
+        # Track transaction boundaries even when not collecting,
+        # so we never start collecting mid-transaction.
+        first   = Signal(init=1)
+        latency = Signal(16)
+        beats   = Signal(16)
+
+        with m.If(~self.cyc):
+            m.d.sync += [
+                first.eq(1),
+                latency.eq(0),
+                beats.eq(0),
+            ]
+        with m.Elif(self.ack):
+            m.d.sync += [
+                first.eq(0),
+                latency.eq(0),
+                beats.eq(beats + 1),
+            ]
+            with m.If(self.last):
+                m.d.sync += [
+                    first.eq(1),
+                    beats.eq(0),
+                ]
+        with m.Elif(self.stb & first & (latency != 2**len(latency)-1)):
+            m.d.sync += latency.eq(latency + 1)
+
+        with m.If(self.clear):
+            m.d.sync += [
+                self.words.eq(0),
+                self.transactions.eq(0),
+                self.latency_total.eq(0),
+                self.latency_max.eq(0),
+            ]
+            m.d.sync += [self.histogram[n].eq(0)
+                         for n in range(len(self.HISTOGRAM_BOUNDS) + 1)]
+        with m.Elif(self.collect & self.cyc & self.ack):
+            m.d.sync += self.words.eq(self.words + 1)
+            with m.If(first):
+                m.d.sync += self.latency_total.eq(self.latency_total + latency)
+                with m.If(latency > self.latency_max):
+                    m.d.sync += self.latency_max.eq(latency)
+            with m.If(self.last):
+                m.d.sync += self.transactions.eq(self.transactions + 1)
+                n_words = beats + 1
+                with m.If(n_words <= self.HISTOGRAM_BOUNDS[0]):
+                    m.d.sync += self.histogram[0].eq(self.histogram[0] + 1)
+                for n, bound in enumerate(self.HISTOGRAM_BOUNDS[1:]):
+                    with m.Elif(n_words <= bound):
+                        m.d.sync += self.histogram[n+1].eq(self.histogram[n+1] + 1)
+                with m.Else():
+                    m.d.sync += self.histogram[-1].eq(self.histogram[-1] + 1)
+
+        return m
+
+
+class Frontend(wiring.Component):
+
+    """
+    Wishbone front-end for the PSRAM controllers (``OSPIPSRAM``, ``HyperPSRAM``).
+
+    Every wishbone transaction (classic cycle or burst) becomes a PSRAM
+    transaction, each of which pays for a command, address and latency period
+    (and a recovery period after it). To reduce this overhead:
+
+    - Command pipelining: the next request (address and direction) is handed
+      to the controller in the same cycle that it becomes idle after the
+      previous transaction, rather than being registered first. The wishbone
+      side is released as soon as the last word of a transaction is
+      acknowledged, so the arbiter can select the next master while the
+      controller is still in recovery.
+
+    - Burst merging (``merge_bursts=True``): after the last word of a burst
+      (``cti == END_OF_BURST``), the PSRAM transaction is held open for one
+      more word. If a request for that word (same direction, next sequential
+      address, same page) arrives in time, it simply continues the PSRAM burst,
+      skipping the command and latency overhead entirely. Otherwise the
+      extra word is dropped (reads) or fully masked (writes), costing 1 cycle.
+
+    Merging only pays off for masters that issue back-to-back sequential
+    bursts without releasing the bus, so it is disabled by default. The
+    ``command``, ``merged`` and ``wasted`` strobes are for measuring this.
+    """
+
+    def __init__(self, *, addr_width, data_width=32, granularity=8,
+                 page_size_bytes=None, merge_bursts=False):
+        self.page_size_bytes = page_size_bytes
+        self.merge_bursts    = merge_bursts
+        self.bytes_per_word  = data_width // granularity
+        super().__init__({
+            "bus": In(wishbone.Signature(addr_width=addr_width,
+                                         data_width=data_width,
+                                         granularity=granularity,
+                                         features={"cti", "bte"})),
+            # Only accept transactions when the controller is ready.
+            "enable":         In(1),
+            # PSRAM controller control/status.
+            "start_transfer": Out(1),
+            "address":        Out(32),
+            "perform_write":  Out(1),
+            "final_word":     Out(1),
+            "write_data":     Out(data_width),
+            "write_mask":     Out(self.bytes_per_word),
+            "idle":           In(1),
+            "read_ready":     In(1),
+            "write_ready":    In(1),
+            "read_data":      In(data_width),
+            # Statistics strobes.
+            "command":        Out(1), # a PSRAM transaction was started
+            "merged":         Out(1), # a request continued the previous transaction
+            "wasted":         Out(1), # a speculative word was dropped
+        })
+
+    def elaborate(self, platform):
+        m = Module()
+
+        bus = self.bus
+
+        request   = Signal()
+        ready     = Signal()
+        end       = Signal()
+        next_adr  = Signal.like(bus.adr)
+        last_we   = Signal()
+
+        m.d.comb += [
+            request.eq(self.enable & bus.cyc & bus.stb),
+            ready.eq(self.read_ready | self.write_ready),
+            end.eq(bus.cti != wishbone.CycleType.INCR_BURST),
+            self.write_data.eq(bus.dat_w),
+            self.write_mask.eq(~bus.sel),
+            bus.dat_r.eq(self.read_data),
+        ]
+
+        # Only merge if the next word is in the same page, as the controller
+        # would otherwise have to reissue the command anyway.
+        page_end = Const(0)
+        if self.page_size_bytes is not None:
+            page_words = self.page_size_bytes // self.bytes_per_word
+            page_end = bus.adr[:exact_log2(page_words)] == page_words - 1
+
+        def transfer():
+            # Acknowledge the current word, and decide what happens after it.
+            m.d.comb += bus.ack.eq(1)
+            with m.If(end):
+                if self.merge_bursts:
+                    with m.If((bus.cti == wishbone.CycleType.END_OF_BURST) & ~page_end):
+                        m.d.sync += [
+                            next_adr.eq(bus.adr + 1),
+                            last_we.eq(bus.we),
+                        ]
+                        m.next = 'LINGER'
+                    with m.Else():
+                        m.next = 'IDLE'
+                else:
+                    m.next = 'IDLE'
+            with m.Else():
+                m.next = 'GO'
+
+        with m.FSM():
+
+            with m.State('IDLE'):
+                with m.If(request & self.idle):
+                    m.d.comb += [
+                        self.start_transfer.eq(1),
+                        self.address.eq(bus.adr << exact_log2(self.bytes_per_word)),
+                        self.perform_write.eq(bus.we),
+                        self.command.eq(1),
+                    ]
+                    m.next = 'GO'
+
+            with m.State('GO'):
+                m.d.comb += self.final_word.eq(end)
+                if self.merge_bursts:
+                    # The PSRAM only samples this on the last word. If we want
+                    # to linger, we must not end the transaction.
+                    with m.If((bus.cti == wishbone.CycleType.END_OF_BURST) & ~page_end):
+                        m.d.comb += self.final_word.eq(0)
+                with m.If(ready):
+                    transfer()
+                # FIXME: odd case --
+                # We have a page crossing during final word assertion, so psram doesn't
+                # pick it up, so we have to keep final_word asserted until psram is idle.
+                with m.If(~bus.cyc & ~bus.stb):
+                    m.d.comb += self.final_word.eq(1)
+                    m.next = 'ABORT'
+
+            if self.merge_bursts:
+                with m.State('LINGER'):
+                    match = request & (bus.adr == next_adr) & (bus.we == last_we)
+                    with m.If(match):
+                        m.d.comb += self.final_word.eq(
+                            end & ~((bus.cti == wishbone.CycleType.END_OF_BURST) & ~page_end))
+                        with m.If(ready):
+                            m.d.comb += self.merged.eq(1)
+                            transfer()
+                    with m.Else():
+                        # Nobody wants the next word, end the transaction. Writes
+                        # are masked so the extra word does not touch memory.
+                        m.d.comb += [
+                            self.final_word.eq(1),
+                            self.write_mask.eq(2**self.bytes_per_word - 1),
+                        ]
+                        with m.If(ready):
+                            m.d.comb += self.wasted.eq(1)
+                            m.next = 'IDLE'
+
+            with m.State('ABORT'):
+                m.d.comb += self.final_word.eq(1)
+                with m.If(self.idle):
+                    m.next = 'IDLE'
+
+        return m
+
+
 class Peripheral(wiring.Component):
 
     """
@@ -26,6 +421,16 @@ class Peripheral(wiring.Component):
 
     You can add this to an SoC as an ordinary peripheral, however it also
     has an internal arbiter (for multiple DMA masters) using add_master().
+    Each DMA master may be given a priority class, bandwidth budget and
+    urgent signal, see :class:`QoSArbiter`.
+
+    Wishbone transactions are passed to the PSRAM controller by a
+    :class:`Frontend`. With ``merge_bursts``, sequential bursts are merged
+    into a single PSRAM transaction where possible.
+
+    In simulation, the PHY is replaced by a :class:`sim.FakeDQSPHY`, using
+    ``sim_timing`` (by default, the :class:`sim.PSRAMTiming` of the platform's
+    PSRAM part).
 
     Default region name is "ram" as that is accepted by luna-soc SVD generation
     as a memory region, in the future "psram" might also be acceptable.
@@ -40,6 +445,10 @@ class Peripheral(wiring.Component):
     # - Read each of the register contents.
     # - When 'collect' is set to 1 again, statistics are re-zeroed before
     #   collection starts.
+    #
+    # The same applies to the per-master statistics (PsramPortReg*), which
+    # show the counters of the arbiter port selected by 'port_sel'. Port 0
+    # is the CPU bus, followed by DMA masters in the order they were added.
 
     class PsramStatsCtrl(csr.Register, access="w"):
         collect:        csr.Field(csr.action.W, unsigned(1))
@@ -67,7 +476,51 @@ class Peripheral(wiring.Component):
         # data (4 bytes) to the PSRAM controller.
         cycles_ack_w:   csr.Field(csr.action.R, unsigned(32))
 
-    def __init__(self, *, size, data_width=32, granularity=8, name="psram"):
+    class PsramPortSel(csr.Register, access="rw"):
+        # Arbiter port to show in the PsramPortReg* registers.
+        port:           csr.Field(csr.action.RW, unsigned(8))
+
+    class PsramPortReg0(csr.Register, access="r"):
+        # Number of words transferred by this port.
+        words:          csr.Field(csr.action.R, unsigned(32))
+
+    class PsramPortReg1(csr.Register, access="r"):
+        # Number of transactions (single cycles or bursts) by this port.
+        transactions:   csr.Field(csr.action.R, unsigned(32))
+
+    class PsramPortReg2(csr.Register, access="r"):
+        # Sum of the cycles spent waiting for the first word of each
+        # transaction. Divide by 'transactions' for the average latency.
+        latency_total:  csr.Field(csr.action.R, unsigned(32))
+
+    class PsramPortReg3(csr.Register, access="r"):
+        # Worst-case cycles spent waiting for the first word of a transaction.
+        latency_max:    csr.Field(csr.action.R, unsigned(32))
+
+    class PsramPortHistogram(csr.Register, access="r"):
+        # Number of transactions by length (see PortStatistics.HISTOGRAM_BOUNDS)
+        transactions:   csr.Field(csr.action.R, unsigned(32))
+
+    class PsramStatsReg4(csr.Register, access="r"):
+        # Number of PSRAM transactions (command + address + latency)
+        # issued. Each of these pays for the same latency overhead.
+        commands:       csr.Field(csr.action.R, unsigned(32))
+
+    class PsramStatsReg5(csr.Register, access="r"):
+        # Number of bursts that were merged into the previous PSRAM
+        # transaction, each saving one latency overhead (see Frontend).
+        bursts_merged:  csr.Field(csr.action.R, unsigned(32))
+
+    class PsramStatsReg6(csr.Register, access="r"):
+        # Number of cycles spent on speculative words that were dropped
+        # because no burst could be merged.
+        cycles_wasted:  csr.Field(csr.action.R, unsigned(32))
+
+    # Maximum number of arbiter ports (CPU bus + DMA masters)
+    MAX_PORTS = 16
+
+    def __init__(self, *, size, data_width=32, granularity=8, name="psram",
+                 merge_bursts=False, sim_timing=None):
         if not isinstance(size, int) or size <= 0 or size & size-1:
             raise ValueError("Size must be an integer power of two, not {!r}"
                              .format(size))
@@ -78,6 +531,9 @@ class Peripheral(wiring.Component):
 
         self.size        = size
         self.granularity = granularity
+        self.data_width  = data_width
+        self.merge_bursts = merge_bursts
+        self.sim_timing  = sim_timing
         self.name        = name
         self.mem_depth   = (size * granularity) // data_width
 
@@ -86,12 +542,24 @@ class Peripheral(wiring.Component):
         memory_map.add_resource(name=("memory", self.name,), size=size, resource=self)
 
         # csrs
-        regs = csr.Builder(addr_width=5, data_width=8)
+        regs = csr.Builder(addr_width=7, data_width=8)
         self._ctrl   = regs.add("ctrl",   self.PsramStatsCtrl(), offset=0x0)
         self._stats0 = regs.add("stats0", self.PsramStatsReg0(), offset=0x4)
         self._stats1 = regs.add("stats1", self.PsramStatsReg1(), offset=0x8)
         self._stats2 = regs.add("stats2", self.PsramStatsReg2(), offset=0xC)
         self._stats3 = regs.add("stats3", self.PsramStatsReg3(), offset=0x10)
+        self._port_sel = regs.add("port_sel", self.PsramPortSel(), offset=0x14)
+        self._port0 = regs.add("port0", self.PsramPortReg0(), offset=0x18)
+        self._port1 = regs.add("port1", self.PsramPortReg1(), offset=0x1C)
+        self._port2 = regs.add("port2", self.PsramPortReg2(), offset=0x20)
+        self._port3 = regs.add("port3", self.PsramPortReg3(), offset=0x24)
+        self._port_hist = [
+            regs.add(f"port_hist{n}", self.PsramPortHistogram(), offset=0x28+4*n)
+            for n in range(len(PortStatistics.HISTOGRAM_BOUNDS) + 1)
+        ]
+        self._stats4 = regs.add("stats4", self.PsramStatsReg4(), offset=0x40)
+        self._stats5 = regs.add("stats5", self.PsramStatsReg5(), offset=0x44)
+        self._stats6 = regs.add("stats6", self.PsramStatsReg6(), offset=0x48)
         self._bridge = csr.Bridge(regs.as_memory_map())
 
         # bus
@@ -103,21 +571,30 @@ class Peripheral(wiring.Component):
                                          features={"cti", "bte"})),
             # internal psram simulation interface
             # should be optimized out in non-sim builds.
-            "simif": In(sim.FakePSRAMSimulationInterface())
+            "simif": In(sim.FakePSRAMSimulationInterface()),
+            # per-port activity for the simulation harness
+            "simif_ports": Out(sim.PSRAMPortSimulationInterface()),
         })
         self.csr_bus.memory_map = self._bridge.bus.memory_map
         self.bus.memory_map = memory_map
 
         # hram arbiter
-        self._hram_arbiter = wishbone.Arbiter(addr_width=exact_log2(self.mem_depth),
-                                              data_width=data_width,
-                                              granularity=granularity,
-                                              features={"cti", "bte"})
+        self._hram_arbiter = QoSArbiter(addr_width=exact_log2(self.mem_depth),
+                                        data_width=data_width,
+                                        granularity=granularity,
+                                        features={"cti", "bte"})
         self._hram_arbiter.add(flipped(self.bus))
         self.shared_bus = self._hram_arbiter.bus
+        self._port_buses = [flipped(self.bus)]
 
-    def add_master(self, bus):
-        self._hram_arbiter.add(bus)
+    def add_master(self, bus, *, priority=QoSArbiter.NORMAL, budget=None, urgent=None):
+        """
+        Add a DMA master. See :py:`QoSArbiter.add` for the meaning of ``priority``,
+        ``budget`` and ``urgent``.
+        """
+        assert len(self._port_buses) < self.MAX_PORTS
+        self._hram_arbiter.add(bus, priority=priority, budget=budget, urgent=urgent)
+        self._port_buses.append(bus)
 
     def elaborate(self, platform):
         m = Module()
@@ -145,24 +622,21 @@ class Peripheral(wiring.Component):
             # PSRAM controller only, with fake PHY signals and simulation interface.
             m.submodules.psram = psram
             wiring.connect(m, self.simif, flipped(psram.simif))
-            # Simulate DATAVALID delay after READ of ~ 8 cycles.
-            phy_read_cnt = Signal(8)
-            with m.If(psram.phy.read != 0):
-                m.d.sync += phy_read_cnt.eq(phy_read_cnt + 1)
-            with m.Else():
-                m.d.sync += phy_read_cnt.eq(0)
-            # Assert minimum PHY signals needed for psram to progress.
-            m.d.comb += [
-                psram.phy.ready.eq(1),
-                psram.phy.burstdet.eq(1),
-                psram.phy.datavalid.eq(phy_read_cnt > 8),
-            ]
+            timing = self.sim_timing or sim.PSRAMTiming.get(platform.psram_id)
+            self.psram_phy = sim.FakeDQSPHY(timing)
+            wiring.connect(m, psram.phy, self.psram_phy.phy)
+            m.submodules.psram_phy = self.psram_phy
 
         counter      = Signal(range(128))
         timeout      = Signal(range(128))
         read_counter = Signal(range(32))
         readclksel   = Signal(3, reset=0)
 
+        # Control signals used during initialization and training.
+        start_transfer = Signal()
+        address        = Signal(32)
+        perform_write  = Signal()
+
         m.d.comb += [
             psram.single_page            .eq(0),
             psram.phy.readclksel         .eq(readclksel)
@@ -170,27 +644,54 @@ class Peripheral(wiring.Component):
 
         m.d.sync += [
             psram.register_space         .eq(0),
-            psram.start_transfer         .eq(0),
-            psram.perform_write          .eq(0),
+            start_transfer               .eq(0),
+            perform_write                .eq(0),
         ]
 
+        # Once training is complete, the wishbone front-end takes over.
+        m.submodules.frontend = frontend = Frontend(
+            addr_width=exact_log2(self.mem_depth),
+            data_width=self.data_width,
+            granularity=self.granularity,
+            page_size_bytes=getattr(psram, "PAGE_SIZE_BYTES", None),
+            merge_bursts=self.merge_bursts)
+        wiring.connect(m, self.shared_bus, frontend.bus)
+
         m.d.comb += [
-            psram.write_data              .eq(self.shared_bus.dat_w),
-            psram.write_mask              .eq(~self.shared_bus.sel),
+            frontend.idle                 .eq(psram.idle),
+            frontend.read_ready           .eq(psram.read_ready),
+            frontend.write_ready          .eq(psram.write_ready),
+            frontend.read_data            .eq(psram.read_data),
+            psram.write_data              .eq(frontend.write_data),
+            psram.write_mask              .eq(frontend.write_mask),
         ]
 
+        with m.If(frontend.enable):
+            m.d.comb += [
+                psram.start_transfer      .eq(frontend.start_transfer),
+                psram.address             .eq(frontend.address),
+                psram.perform_write       .eq(frontend.perform_write),
+                psram.final_word          .eq(frontend.final_word),
+            ]
+        with m.Else():
+            m.d.comb += [
+                psram.start_transfer      .eq(start_transfer),
+                psram.address             .eq(address),
+                psram.perform_write       .eq(perform_write),
+            ]
+
         with m.FSM() as fsm:
 
             # Initialize memory registers (read/write timings) before
             # we kick off memory training.
             for state, state_next, reg_mr, reg_data in platform.psram_registers:
                 with m.State(state):
-                    with m.If(psram.idle & ~psram.start_transfer):
+                    with m.If(psram.idle & ~start_transfer):
                         m.d.sync += [
-                            psram.start_transfer.eq(1),
+                            start_transfer      .eq(1),
                             psram.register_space.eq(1),
-                            psram.perform_write .eq(1),
-                            psram.address       .eq(reg_mr),
+                            perform_write       .eq(1),
+                            address             .eq(reg_mr),
                             psram.register_data .eq(reg_data),
                         ]
                         m.next = state_next
@@ -201,11 +702,11 @@ class Peripheral(wiring.Component):
                     m.d.sync += [
                         timeout.eq(0),
                         read_counter.eq(3),
-                        psram.start_transfer.eq(1),
+                        start_transfer.eq(1),
                     ]
                     m.next = "TRAIN"
             with m.State("TRAIN"):
-                m.d.sync += psram.start_transfer.eq(0),
+                m.d.sync += start_transfer.eq(0),
                 m.d.sync += timeout.eq(timeout + 1)
                 m.d.comb += psram.final_word.eq(read_counter == 1)
                 with m.If(psram.read_ready):
@@ -214,7 +715,7 @@ class Peripheral(wiring.Component):
                     m.next = "WAIT1"
                     m.d.sync += counter.eq(counter + 1)
                     with m.If(counter == 127):
-                        m.next = "IDLE"
+                        m.next = "READY"
                     with m.If(~psram.phy.burstdet):
                         m.d.sync += readclksel.eq(readclksel + 1)
                         m.d.sync += counter.eq(0)
@@ -222,35 +723,8 @@ class Peripheral(wiring.Component):
                 m.next = "TRAIN_INIT"
 
             # Training complete, now we can accept transactions.
-            with m.State('IDLE'):
-                with m.If(self.shared_bus.cyc & self.shared_bus.stb & psram.idle):
-                    m.d.sync += [
-                        psram.start_transfer          .eq(1),
-                        psram.address                 .eq(self.shared_bus.adr << 2),
-                        psram.perform_write           .eq(self.shared_bus.we),
-                    ]
-                    m.next = 'GO'
-            with m.State('GO'):
-                with m.If(self.shared_bus.cti != wishbone.CycleType.INCR_BURST):
-                    m.d.comb += psram.final_word      .eq(1)
-                with m.If(psram.read_ready | psram.write_ready):
-                    m.d.comb += [
-                        self.shared_bus.dat_r         .eq(psram.read_data),
-                        self.shared_bus.ack           .eq(1),
-                    ]
-                    with m.If(self.shared_bus.cti != wishbone.CycleType.INCR_BURST):
-                        m.d.comb += psram.final_word  .eq(1)
-                        m.next = 'IDLE'
-                # FIXME: odd case --
-                # We have a page crossing during final word assertion, so psram doesn't
-                # pick it up, so we have to keep final_word asserted until psram is idle.
-                with m.If(~self.shared_bus.cyc & ~self.shared_bus.stb):
-                    m.d.comb += psram.final_word.eq(1)
-                    m.next = 'ABORT'
-            with m.State('ABORT'):
-                m.d.comb += psram.final_word.eq(1)
-                with m.If(psram.idle):
-                    m.next = 'IDLE'
+            with m.State('READY'):
+                m.d.comb += frontend.enable.eq(1)
 
         # Logic for tracking PSRAM bandwidth consumption.
 
@@ -264,6 +738,12 @@ class Peripheral(wiring.Component):
                 m.d.sync += self._stats2.f.cycles_ack_r.r_data.eq(self._stats2.f.cycles_ack_r.r_data+1)
             with m.If(psram.write_ready):
                 m.d.sync += self._stats3.f.cycles_ack_w.r_data.eq(self._stats3.f.cycles_ack_w.r_data+1)
+            with m.If(frontend.command):
+                m.d.sync += self._stats4.f.commands.r_data.eq(self._stats4.f.commands.r_data+1)
+            with m.If(frontend.merged):
+                m.d.sync += self._stats5.f.bursts_merged.r_data.eq(self._stats5.f.bursts_merged.r_data+1)
+            with m.If(frontend.wasted):
+                m.d.sync += self._stats6.f.cycles_wasted.r_data.eq(self._stats6.f.cycles_wasted.r_data+1)
 
         with m.If(self._ctrl.f.collect.w_stb):
             m.d.sync += stats_collect.eq(self._ctrl.f.collect.w_data)
@@ -274,6 +754,37 @@ class Peripheral(wiring.Component):
                     self._stats1.f.cycles_idle.r_data.eq(0),
                     self._stats2.f.cycles_ack_r.r_data.eq(0),
                     self._stats3.f.cycles_ack_w.r_data.eq(0),
+                    self._stats4.f.commands.r_data.eq(0),
+                    self._stats5.f.bursts_merged.r_data.eq(0),
+                    self._stats6.f.cycles_wasted.r_data.eq(0),
+                ]
+
+        # Per-port statistics, muxed onto the same CSRs by 'port_sel'.
+
+        for n, bus in enumerate(self._port_buses):
+            port_stats = PortStatistics()
+            m.submodules[f"port_stats{n}"] = port_stats
+            m.d.comb += [
+                port_stats.cyc.eq(bus.cyc),
+                port_stats.stb.eq(bus.stb),
+                port_stats.ack.eq(bus.ack),
+                port_stats.last.eq(bus.cti != wishbone.CycleType.INCR_BURST
+                                   if hasattr(bus, "cti") else 1),
+                port_stats.collect.eq(stats_collect),
+                port_stats.clear.eq(self._ctrl.f.collect.w_stb & self._ctrl.f.collect.w_data),
+                self.simif_ports.cyc[n].eq(bus.cyc),
+                self.simif_ports.ack[n].eq(bus.ack),
+            ]
+            with m.If(self._port_sel.f.port.data == n):
+                m.d.comb += [
+                    self._port0.f.words.r_data.eq(port_stats.words),
+                    self._port1.f.transactions.r_data.eq(port_stats.transactions),
+                    self._port2.f.latency_total.r_data.eq(port_stats.latency_total),
+                    self._port3.f.latency_max.r_data.eq(port_stats.latency_max),
+                ]
+                m.d.comb += [
+                    reg.f.transactions.r_data.eq(port_stats.histogram[k])
+                    for k, reg in enumerate(self._port_hist)
                 ]
 
 
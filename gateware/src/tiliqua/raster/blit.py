@@ -18,7 +18,7 @@ from amaranth_soc.memory import MemoryMap
 
 from ..video.types import Pixel
 from ..dsp import stream_util
-from .plot import BlendMode, OffsetMode, PlotRequest
+from .plot import BlendMode, FillCmd, OffsetMode, PlotRequest
 
 
 class Peripheral(wiring.Component):
@@ -52,6 +52,13 @@ class Peripheral(wiring.Component):
       asserted before each op, as this is used to indicate the command FIFO
       has no space left for new ops.
 
+    Solid rectangles (e.g. backgrounds) may also be filled without a spritesheet:
+    - SoC sets the rectangle size with a single write to ``fill_size``.
+    - SoC fills a rectangle of that size at the desired position and color with a
+      single write to the ``fill`` register. This is enqueued in the same command
+      FIFO as blits, and is emitted on ``fill_o``, which should be connected to a
+      ``FramebufferPlotter`` fill port (much faster than plotting every pixel).
+
     WARN: at the moment, sprite sheet width (in pixels) MUST be divisible by 8
     for the indexing logic below to work correctly.
     """
@@ -83,6 +90,18 @@ class Peripheral(wiring.Component):
         dst_y: csr.Field(csr.action.W, signed(12))
         pixel: csr.Field(csr.action.W, Pixel)
 
+    class FillSizeReg(csr.Register, access="w"):
+        # Size of rectangles filled by subsequent FillReg commands.
+        width: csr.Field(csr.action.W, unsigned(12))
+        height: csr.Field(csr.action.W, unsigned(12))
+
+    class FillReg(csr.Register, access="w"):
+        # Command to fill a rectangle of the last FillSizeReg size at the provided
+        # position, with the provided color. Should always be a single-word write for all fields.
+        x: csr.Field(csr.action.W, signed(12))
+        y: csr.Field(csr.action.W, signed(12))
+        pixel: csr.Field(csr.action.W, Pixel)
+
     class BlitCmd(data.Struct):
         """
         Single entry in internal command FIFO, used to store pending
@@ -91,6 +110,7 @@ class Peripheral(wiring.Component):
         class Kind(enum.Enum):
             SRC = 0
             BLIT = 1
+            FILL = 2
         kind: Kind
         params: data.UnionLayout({
             "src": data.StructLayout({
@@ -104,6 +124,7 @@ class Peripheral(wiring.Component):
                 "dst_y": signed(12),
                 "pixel": Pixel,
             }),
+            "fill": FillCmd,
         })
 
     def __init__(self, memory_words=1024, fifo_depth=8):
@@ -120,6 +141,8 @@ class Peripheral(wiring.Component):
         self._src = regs.add("src", self.SrcReg(), offset=0x04)
         self._blit = regs.add("blit", self.BlitReg(), offset=0x08)
         self._sheet_width = regs.add("sheet_width", self.SheetWidthReg(), offset=0x0C)
+        self._fill_size = regs.add("fill_size", self.FillSizeReg(), offset=0x10)
+        self._fill = regs.add("fill", self.FillReg(), offset=0x14)
         self._bridge = csr.Bridge(regs.as_memory_map())
 
         super().__init__({
@@ -127,6 +150,7 @@ class Peripheral(wiring.Component):
             "sprite_mem_bus": In(wishbone.Signature(addr_width=self.memory_addr_width,
                                                     data_width=32, granularity=8)),
             "o": Out(stream.Signature(PlotRequest)),
+            "fill_o": Out(stream.Signature(FillCmd)),
         })
 
         self.csr_bus.memory_map = self._bridge.bus.memory_map
@@ -153,6 +177,15 @@ class Peripheral(wiring.Component):
         with m.If(self._sheet_width.element.w_stb):
             m.d.sync += sheet_width_px.eq(self._sheet_width.f.width.w_data)
 
+        # Fill size CSR (latched for subsequent fill commands)
+        fill_width = Signal(12)
+        fill_height = Signal(12)
+        with m.If(self._fill_size.element.w_stb):
+            m.d.sync += [
+                fill_width.eq(self._fill_size.f.width.w_data),
+                fill_height.eq(self._fill_size.f.height.w_data),
+            ]
+
         # Status register (SoC must check this before issuing commands)
         m.d.comb += [
             # full = FIFO can't accept new commands
@@ -191,6 +224,18 @@ class Peripheral(wiring.Component):
                 cmd_fifo.i.payload.params.blit.pixel.eq(self._blit.f.pixel.w_data),
             ]
 
+        # Enqueue command on 'fill' register write
+        with m.If(self._fill.element.w_stb & cmd_fifo.i.ready):
+            m.d.comb += [
+                cmd_fifo.i.valid.eq(1),
+                cmd_fifo.i.payload.kind.eq(self.BlitCmd.Kind.FILL),
+                cmd_fifo.i.payload.params.fill.x.eq(self._fill.f.x.w_data),
+                cmd_fifo.i.payload.params.fill.y.eq(self._fill.f.y.w_data),
+                cmd_fifo.i.payload.params.fill.width.eq(fill_width),
+                cmd_fifo.i.payload.params.fill.height.eq(fill_height),
+                cmd_fifo.i.payload.params.fill.pixel.eq(self._fill.f.pixel.w_data),
+            ]
+
         # Current command being executed (i.e. last command taken from command FIFO)
         current_src_x = Signal(8)
         current_src_y = Signal(8)
@@ -199,6 +244,7 @@ class Peripheral(wiring.Component):
         current_dst_x = Signal(signed(12))
         current_dst_y = Signal(signed(12))
         current_pixel = Signal(Pixel)
+        current_fill = Signal(FillCmd)
 
         # Calculate source position within the sprite sheet.
         # `plot_x` and `plot_y` are the relative position within the sprite
@@ -267,6 +313,18 @@ class Peripheral(wiring.Component):
                                 current_pixel.eq(cmd_fifo.o.payload.params.blit.pixel),
                             ]
                             m.next = 'READ_SPRITE_DATA'
+                        with m.Case(self.BlitCmd.Kind.FILL):
+                            m.d.sync += current_fill.eq(cmd_fifo.o.payload.params.fill)
+                            m.next = 'FILL'
+
+            with m.State('FILL'):
+                # Send fill to plotting backend, wait until it is accepted.
+                m.d.comb += [
+                    self.fill_o.valid.eq(1),
+                    self.fill_o.payload.eq(current_fill),
+                ]
+                with m.If(self.fill_o.ready):
+                    m.next = 'IDLE'
 
             with m.State('READ_SPRITE_DATA'):
                 m.next = 'CHECK_PIXEL'
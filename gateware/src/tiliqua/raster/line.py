@@ -15,7 +15,7 @@ from amaranth_soc import csr
 
 from ..dsp import stream_util
 from ..video.types import Pixel
-from .plot import BlendMode, OffsetMode, PlotRequest
+from .plot import BlendMode, FillCmd, OffsetMode, PlotRequest
 
 
 class LineStripCmd(enum.Enum, shape=unsigned(1)):
@@ -32,6 +32,10 @@ class LineCmd(data.Struct):
     pixel: Pixel
     # Whether this is completing or continuing an existing line strip.
     cmd:   LineStripCmd
+    # If set, this is a rectangle fill at (x, y) rather than a point.
+    fill:   unsigned(1)
+    width:  unsigned(12)
+    height: unsigned(12)
 
 
 class _LinePlotter(wiring.Component):
@@ -41,10 +45,12 @@ class _LinePlotter(wiring.Component):
 
     This core turns an incoming stream of ``LineCmd``s into an outgoing
     stream of (many more) ``PlotRequest``s, using Bresenham's algorithm.
+    Fill commands are passed through (in order) to ``fill_o``.
     """
 
     i: In(stream.Signature(LineCmd))
     o: Out(stream.Signature(PlotRequest))
+    fill_o: Out(stream.Signature(FillCmd))
 
     def elaborate(self, platform) -> Module:
         m = Module()
@@ -62,6 +68,9 @@ class _LinePlotter(wiring.Component):
         current_pixel = Signal(Pixel)
         end_strip = Signal()
 
+        # Pending rectangle fill
+        fill_cmd = Signal(FillCmd)
+
         # Bresenham algorithm
         dx = Signal(signed(13))
         dy = Signal(signed(13))
@@ -75,7 +84,17 @@ class _LinePlotter(wiring.Component):
             with m.State('IDLE'):
                 m.d.comb += self.i.ready.eq(1)
                 with m.If(self.i.valid):
-                    with m.If(has_prev_point):
+                    with m.If(self.i.payload.fill):
+                        # Rectangle fill, does not affect any line strip in progress.
+                        m.d.sync += [
+                            fill_cmd.x.eq(self.i.payload.x),
+                            fill_cmd.y.eq(self.i.payload.y),
+                            fill_cmd.width.eq(self.i.payload.width),
+                            fill_cmd.height.eq(self.i.payload.height),
+                            fill_cmd.pixel.eq(self.i.payload.pixel),
+                        ]
+                        m.next = 'FILL'
+                    with m.Elif(has_prev_point):
                         # Draw line from previous to new point
                         m.d.sync += [
                             current_x.eq(prev_x),
@@ -96,6 +115,14 @@ class _LinePlotter(wiring.Component):
                         ]
                         m.next = 'PLOT_SINGLE_POINT'
 
+            with m.State('FILL'):
+                m.d.comb += [
+                    self.fill_o.valid.eq(1),
+                    self.fill_o.payload.eq(fill_cmd),
+                ]
+                with m.If(self.fill_o.ready):
+                    m.next = 'IDLE'
+
             with m.State('PLOT_SINGLE_POINT'):
                 # First point in strip, or isolated point in zero-length line
                 m.d.comb += [
@@ -212,6 +239,14 @@ class Peripheral(wiring.Component):
     - SoC must use ``point.cmd == END`` on the final segment in each strip.
     - SoC must always check that ``status.full`` is not asserted before
       enqueuing more line strips.
+
+    Solid rectangles (e.g. horizontal spans, or axis backgrounds) may also be
+    filled, ordered with respect to the line strips around them:
+    - SoC sets the rectangle size with a single write to ``fill_size``.
+    - SoC writes the position and color of the rectangle to the ``fill`` CSR
+      (single store), which enqueues the fill in the same FIFO as points. Fills
+      are emitted on ``fill_o``, which should be connected to a
+      ``FramebufferPlotter`` fill port (much faster than plotting every pixel).
     """
 
     class StatusReg(csr.Register, access="r"):
@@ -226,6 +261,18 @@ class Peripheral(wiring.Component):
         pixel: csr.Field(csr.action.W, Pixel)
         cmd: csr.Field(csr.action.W, LineStripCmd)
 
+    class FillSizeReg(csr.Register, access="w"):
+        # Size of rectangles filled by subsequent FillReg commands.
+        width: csr.Field(csr.action.W, unsigned(12))
+        height: csr.Field(csr.action.W, unsigned(12))
+
+    class FillReg(csr.Register, access="w"):
+        # Note: Writing to this register enqueues the fill
+        # be careful the CPU issues a single store for each fill.
+        x: csr.Field(csr.action.W, signed(12))
+        y: csr.Field(csr.action.W, signed(11))
+        pixel: csr.Field(csr.action.W, Pixel)
+
     def __init__(self, fifo_depth=8):
         self.fifo_depth = fifo_depth
 
@@ -235,11 +282,14 @@ class Peripheral(wiring.Component):
         regs = csr.Builder(addr_width=6, data_width=8)
         self._status = regs.add("status", self.StatusReg(), offset=0x00)
         self._point = regs.add("point", self.PointReg(), offset=0x04)
+        self._fill_size = regs.add("fill_size", self.FillSizeReg(), offset=0x08)
+        self._fill = regs.add("fill", self.FillReg(), offset=0x0C)
         self._bridge = csr.Bridge(regs.as_memory_map())
 
         super().__init__({
             "csr_bus": In(csr.Signature(addr_width=regs.addr_width, data_width=regs.data_width)),
             "o": Out(stream.Signature(PlotRequest)),
+            "fill_o": Out(stream.Signature(FillCmd)),
         })
 
         self.csr_bus.memory_map = self._bridge.bus.memory_map
@@ -263,6 +313,26 @@ class Peripheral(wiring.Component):
         with m.If(self._point.element.w_stb & cmd_fifo.i.ready):
             m.d.comb += cmd_fifo.i.valid.eq(1),
 
+        # Fill size CSR (latched for subsequent fill commands)
+        fill_width = Signal(12)
+        fill_height = Signal(12)
+        with m.If(self._fill_size.element.w_stb):
+            m.d.sync += [
+                fill_width.eq(self._fill_size.f.width.w_data),
+                fill_height.eq(self._fill_size.f.height.w_data),
+            ]
+
+        with m.If(self._fill.element.w_stb & cmd_fifo.i.ready):
+            m.d.comb += [
+                cmd_fifo.i.valid.eq(1),
+                cmd_fifo.i.payload.x.eq(self._fill.f.x.w_data),
+                cmd_fifo.i.payload.y.eq(self._fill.f.y.w_data),
+                cmd_fifo.i.payload.pixel.eq(self._fill.f.pixel.w_data),
+                cmd_fifo.i.payload.fill.eq(1),
+                cmd_fifo.i.payload.width.eq(fill_width),
+                cmd_fifo.i.payload.height.eq(fill_height),
+            ]
+
         m.d.comb += [
             self._status.f.full.r_data.eq(~cmd_fifo.i.ready),
             self._status.f.empty.r_data.eq(~cmd_fifo.o.valid),
@@ -271,5 +341,6 @@ class Peripheral(wiring.Component):
         wiring.connect(m, cmd_fifo.o, line_plotter.i)
 
         wiring.connect(m, line_plotter.o, wiring.flipped(self.o))
+        wiring.connect(m, line_plotter.fill_o, wiring.flipped(self.fill_o))
 
         return m
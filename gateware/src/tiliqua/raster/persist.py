@@ -6,11 +6,14 @@
 
 from amaranth import *
 from amaranth.build import *
-from amaranth.lib import data, wiring
+from amaranth.lib import data, stream, wiring
 from amaranth.lib.fifo import SyncFIFOBuffered
+from amaranth.lib.memory import Memory
 from amaranth.lib.wiring import In, Out
+from amaranth.utils import exact_log2
 from amaranth_soc import csr, wishbone
 
+from ..periph.psram import QoSArbiter
 from ..video.framebuffer import DMAFramebuffer
 from ..video.types import Pixel
 
@@ -23,11 +26,38 @@ class Persistance(wiring.Component):
     The block of pixels has its intensity reduced and is then DMA'd back to the bus.
 
     'holdoff' is used to keep this core from saturating the bus between bursts.
+
+    By default, the framebuffer is decayed in-place, continuously. With ``bulk=True``
+    (for use with a multi-buffered ``DMAFramebuffer``), this core instead idles until
+    ``start`` is strobed, then does a single pass over the whole frame: reading every
+    pixel from ``src_base``, decaying it, and writing it to the buffer at ``fbp.base``.
+    That is, the new back buffer is seeded from a decayed copy of the last frame,
+    once per flip, rather than competing with scanout at random times. As a pass must
+    finish well within a frame, ``holdoff`` is not applied between its bursts (the bus
+    is still released between bursts, and scanout is protected by the arbiter). ``busy``
+    is high from ``start`` until the pass is complete. It should be used to hold off
+    anything drawing into the buffer at ``fbp.base`` (for example, ``pause`` of
+    :class:`tiliqua.raster.plot.FramebufferPlotter`), as such pixels could otherwise
+    be overwritten by the pass.
+
+    With ``skip_empty_tiles=True``, a bitmap in BRAM tracks which 'tiles' (``fifo_depth``
+    words, i.e. one burst) may contain pixels with nonzero intensity, and DMA is skipped
+    entirely for the others. Bits are set from ``snoop`` (address of every nonzero write
+    to PSRAM, e.g. from the plotter), and cleared once a tile has fully decayed. Skipped
+    tiles still take ``holdoff`` cycles, so a pass over the framebuffer takes about the
+    same time, and the visual decay rate does not change. Tiles beyond ``max_tiles``
+    are never skipped.
     """
 
     def __init__(self, *, bus_signature,
-                 fifo_depth=16, holdoff_default=256):
+                 fifo_depth=16, holdoff_default=256, bulk=False,
+                 skip_empty_tiles=False, max_tiles=16384):
+        # The tile bitmap only tracks a single buffer.
+        assert not (bulk and skip_empty_tiles)
         self.fifo_depth = fifo_depth
+        self.bulk = bulk
+        self.skip_empty_tiles = skip_empty_tiles
+        self.max_tiles = max_tiles
         super().__init__({
             # Tweakables
             "holdoff": In(16, init=holdoff_default),
@@ -36,7 +66,15 @@ class Persistance(wiring.Component):
             # DMA bus / fb
             "bus":  Out(bus_signature),
             "fbp": In(DMAFramebuffer.Properties()),
-        })
+        } | ({
+            # Strobe to start a pass from 'src_base' to 'fbp.base'
+            "start": In(1),
+            "src_base": In(22),
+            "busy": Out(1),
+        } if bulk else {}) | ({
+            # Word address of every nonzero write to the backing store.
+            "snoop": In(stream.Signature(unsigned(22), always_ready=True)),
+        } if skip_empty_tiles else {}))
 
     def elaborate(self, platform) -> Module:
         m = Module()
@@ -56,8 +94,12 @@ class Persistance(wiring.Component):
 
         # Track framebuffer position by tracking fifo reads/writes
         dma_offs_in = Signal(self.bus.addr_width, init=0)
+        # Last word of the frame is being read (ends a bulk pass, and
+        # the last tile, so tiles are always aligned to the start of the frame).
+        last_in = Signal()
+        m.d.comb += last_in.eq(dma_offs_in == (fb_len_words-1))
         with m.If(self.fifo.w_en & self.fifo.w_rdy):
-            with m.If(dma_offs_in < (fb_len_words-1)):
+            with m.If(~last_in):
                 m.d.sync += dma_offs_in.eq(dma_offs_in + 1)
             with m.Else():
                 m.d.sync += dma_offs_in.eq(0)
@@ -69,6 +111,11 @@ class Persistance(wiring.Component):
             with m.Else():
                 m.d.sync += dma_offs_out.eq(0)
 
+        # Offset of the word in 'pixels_r' (the FIFO word before 'dma_offs_out').
+        dma_offs_out_prev = Signal.like(dma_offs_out)
+        m.d.comb += dma_offs_out_prev.eq(
+            Mux(dma_offs_out == 0, fb_len_words - 1, dma_offs_out - 1))
+
         # Latched version of decay speed control input
         decay_latch = Signal.like(self.decay)
         # Latched version of skip probability control input
@@ -88,8 +135,23 @@ class Persistance(wiring.Component):
 
         lfsr_beat = Signal(unsigned(32))
 
+        # Bulk mode: source / destination of current pass.
+        src_base = Signal.like(self.fbp.base)
+        if self.bulk:
+            start_pending = Signal()
+            pass_done = Signal()
+            with m.If(self.start):
+                m.d.sync += start_pending.eq(1)
+            with m.If(self.fifo.w_en & self.fifo.w_rdy & last_in):
+                m.d.sync += pass_done.eq(1)
+        else:
+            m.d.comb += src_base.eq(self.fbp.base)
+
         m.d.comb += self.fifo.w_data.eq(bus.dat_r)
 
+        # Only whole words are ever accessed.
+        m.d.comb += bus.sel.eq(2**(bus.data_width//8)-1)
+
         # Used for fastpath when all pixels are zero
         any_nonzero_reads = Signal()
         pixels_peek = Signal(data.ArrayLayout(Pixel, 4))
@@ -101,6 +163,55 @@ class Persistance(wiring.Component):
                       (pixels_peek[3].intensity != 0)):
                 m.d.sync += any_nonzero_reads.eq(1)
 
+        if self.skip_empty_tiles:
+            tile_bits = exact_log2(self.fifo_depth)
+            m.submodules.tile_mem = tile_mem = Memory(
+                shape=1, depth=self.max_tiles, init=[])
+            tile_wr = tile_mem.write_port()
+            tile_rd = tile_mem.read_port(transparent_for=(tile_wr,))
+            # Tile about to be / being processed
+            cur_tile = Signal(self.bus.addr_width)
+            m.d.comb += [
+                cur_tile.eq(dma_offs_in >> tile_bits),
+                tile_rd.addr.eq(cur_tile),
+            ]
+            # Snooped writes that may make a tile nonzero.
+            snoop_offset = Signal(len(self.snoop.payload))
+            snoop_tile = Signal(len(self.snoop.payload))
+            snoop_hit = Signal()
+            m.d.comb += [
+                snoop_offset.eq(self.snoop.payload - self.fbp.base),
+                snoop_tile.eq(snoop_offset >> tile_bits),
+                snoop_hit.eq(self.snoop.valid & (snoop_offset < fb_len_words) &
+                             (snoop_tile < self.max_tiles)),
+            ]
+            # Tile of the burst in progress, and whether it was written to since
+            # it was read (by something else), or had anything nonzero written back.
+            burst_tile = Signal.like(cur_tile)
+            tile_touched = Signal()
+            any_nonzero_writes = Signal()
+            tile_clear = Signal()
+            with m.If(snoop_hit & (snoop_tile == burst_tile)):
+                m.d.sync += tile_touched.eq(1)
+            # Write port is shared, with priority: init > set > clear. A dropped
+            # clear only means the tile is processed for one more pass.
+            init_tile = Signal(range(self.max_tiles))
+            with m.If(snoop_hit):
+                m.d.comb += [
+                    tile_wr.addr.eq(snoop_tile),
+                    tile_wr.data.eq(1),
+                    tile_wr.en.eq(1),
+                ]
+            with m.Elif(tile_clear & ~tile_touched & (burst_tile < self.max_tiles)):
+                m.d.comb += [
+                    tile_wr.addr.eq(burst_tile),
+                    tile_wr.data.eq(0),
+                    tile_wr.en.eq(1),
+                ]
+
+        # State to enter at the start of every burst.
+        burst_start = 'TILE-LOOKUP' if self.skip_empty_tiles else 'BURST-IN'
+
         with m.FSM() as fsm:
 
             with m.State('INIT'):
@@ -110,7 +221,60 @@ class Persistance(wiring.Component):
                     bus.stb.eq(0),
                     bus.cyc.eq(0),
                 ]
-                m.next = 'BURST-IN'
+                if self.bulk:
+                    m.next = 'WAIT-START'
+                elif self.skip_empty_tiles:
+                    m.next = 'TILE-INIT'
+                else:
+                    m.next = 'BURST-IN'
+
+            if self.skip_empty_tiles:
+                with m.State('TILE-INIT'):
+                    # Start with every tile dirty, so everything is processed
+                    # at least once after each reset.
+                    m.d.comb += [
+                        tile_wr.addr.eq(init_tile),
+                        tile_wr.data.eq(1),
+                        tile_wr.en.eq(1),
+                    ]
+                    m.d.sync += init_tile.eq(init_tile + 1)
+                    with m.If(init_tile == (self.max_tiles - 1)):
+                        m.next = 'TILE-LOOKUP'
+
+                with m.State('TILE-LOOKUP'):
+                    # Wait for synchronous bitmap read.
+                    m.d.sync += [
+                        burst_tile.eq(cur_tile),
+                        tile_touched.eq(0),
+                        any_nonzero_writes.eq(0),
+                    ]
+                    m.next = 'TILE-DECIDE'
+
+                with m.State('TILE-DECIDE'):
+                    with m.If(tile_rd.data | (cur_tile >= self.max_tiles)):
+                        m.next = 'BURST-IN'
+                    with m.Else():
+                        # Empty tile, skip it without touching the bus.
+                        next_offs = Signal.like(dma_offs_in)
+                        m.d.comb += next_offs.eq(dma_offs_in + self.fifo_depth)
+                        with m.If(next_offs >= fb_len_words):
+                            m.d.comb += next_offs.eq(0)
+                        m.d.sync += [
+                            dma_offs_in.eq(next_offs),
+                            dma_offs_out.eq(next_offs),
+                            holdoff_count.eq(0),
+                        ]
+                        m.next = 'HOLDOFF'
+
+            if self.bulk:
+                with m.State('WAIT-START'):
+                    with m.If(start_pending | self.start):
+                        m.d.sync += [
+                            start_pending.eq(0),
+                            pass_done.eq(0),
+                            src_base.eq(self.src_base),
+                        ]
+                        m.next = 'BURST-IN'
 
             with m.State('BURST-IN'):
                 m.d.sync += decay_latch.eq(self.decay)
@@ -119,13 +283,15 @@ class Persistance(wiring.Component):
                     bus.stb.eq(1),
                     bus.cyc.eq(1),
                     bus.we.eq(0),
-                    bus.sel.eq(2**(bus.data_width//8)-1),
-                    bus.adr.eq(self.fbp.base + dma_offs_in),
+                    bus.adr.eq(src_base + dma_offs_in),
                     self.fifo.w_en.eq(bus.ack),
                     bus.cti.eq(
                         wishbone.CycleType.INCR_BURST),
                 ]
-                with m.If(self.fifo.w_level == (self.fifo_depth-1)):
+                end_of_burst = self.fifo.w_level == (self.fifo_depth-1)
+                if self.bulk or self.skip_empty_tiles:
+                    end_of_burst |= last_in
+                with m.If(end_of_burst):
                     m.d.comb += bus.cti.eq(
                             wishbone.CycleType.END_OF_BURST)
                     with m.If(bus.ack):
@@ -137,7 +303,8 @@ class Persistance(wiring.Component):
                 m.d.comb += self.fifo.w_en.eq(bus.ack)
                 m.d.sync += holdoff_count.eq(0)
                 with m.If(~bus.ack):
-                    with m.If(any_nonzero_reads):
+                    # Copying between buffers, so the destination must always be written.
+                    with m.If(any_nonzero_reads | self.bulk):
                         # Prefetch first FIFO entry before burst
                         m.d.comb += self.fifo.r_en.eq(1)
                         m.d.sync += pixels_r.eq(self.fifo.r_data)
@@ -170,8 +337,7 @@ class Persistance(wiring.Component):
                     bus.stb.eq(1),
                     bus.cyc.eq(1),
                     bus.we.eq(1),
-                    bus.sel.eq(2**(bus.data_width//8)-1),
-                    bus.adr.eq(self.fbp.base + dma_offs_out - 1),
+                    bus.adr.eq(self.fbp.base + dma_offs_out_prev),
                     bus.dat_w.eq(pixels_w),
                     bus.cti.eq(
                         wishbone.CycleType.INCR_BURST)
@@ -180,22 +346,48 @@ class Persistance(wiring.Component):
                     m.d.comb += self.fifo.r_en.eq(1)
                     m.d.sync += pixels_r.eq(self.fifo.r_data)
                     m.d.sync += lfsr_beat.eq(lfsr1)
+                    if self.skip_empty_tiles:
+                        with m.If((pixels_w[0].intensity != 0) |
+                                  (pixels_w[1].intensity != 0) |
+                                  (pixels_w[2].intensity != 0) |
+                                  (pixels_w[3].intensity != 0)):
+                            m.d.sync += any_nonzero_writes.eq(1)
                 with m.If(~self.fifo.r_rdy):
                     m.d.comb += bus.cti.eq(
                             wishbone.CycleType.END_OF_BURST)
                     with m.If(bus.ack):
+                        if self.skip_empty_tiles:
+                            # Tile has fully decayed.
+                            m.d.comb += tile_clear.eq(~any_nonzero_writes & (
+                                (pixels_w[0].intensity == 0) &
+                                (pixels_w[1].intensity == 0) &
+                                (pixels_w[2].intensity == 0) &
+                                (pixels_w[3].intensity == 0)))
                         m.next = 'HOLDOFF'
 
             with m.State('DRAIN'):
                 m.d.comb += self.fifo.r_en.eq(1)
                 with m.If(~self.fifo.r_rdy):
+                    if self.skip_empty_tiles:
+                        # Tile was already empty.
+                        m.d.comb += tile_clear.eq(1)
                     m.next = 'HOLDOFF'
 
             with m.State('HOLDOFF'):
                 m.d.sync += any_nonzero_reads.eq(0)
                 m.d.sync += holdoff_count.eq(holdoff_count + 1)
-                with m.If(holdoff_count > self.holdoff):
-                    m.next = 'BURST-IN'
+                if self.bulk:
+                    # Only release the bus for a cycle between bursts.
+                    with m.If(pass_done):
+                        m.next = 'WAIT-START'
+                    with m.Else():
+                        m.next = 'BURST-IN'
+                else:
+                    with m.If(holdoff_count > self.holdoff):
+                        m.next = burst_start
+
+        if self.bulk:
+            m.d.comb += self.busy.eq(~fsm.ongoing('WAIT-START') | start_pending | self.start)
 
         return ResetInserter({'sync': ~self.fbp.enable})(m)
 
@@ -210,23 +402,39 @@ class Peripheral(wiring.Component):
     class SkipReg(csr.Register, access="w"):
         skip: csr.Field(csr.action.W, unsigned(8))
 
-    def __init__(self, bus_dma):
+    class StatusReg(csr.Register, access="r"):
+        # Bulk decay pass in progress
+        busy: csr.Field(csr.action.R, unsigned(1))
+
+    def __init__(self, bus_dma, bulk=False, skip_empty_tiles=False):
         self.en = Signal()
-        self.persist = Persistance(bus_signature=bus_dma.bus.signature.flip())
-        bus_dma.add_master(self.persist.bus)
+        self.bulk = bulk
+        self.skip_empty_tiles = skip_empty_tiles
+        self.persist = Persistance(bus_signature=bus_dma.bus.signature.flip(), bulk=bulk,
+                                   skip_empty_tiles=skip_empty_tiles)
+        bus_dma.add_master(self.persist.bus, priority=QoSArbiter.BEST_EFFORT,
+                           budget=(256, 1024))
 
         regs = csr.Builder(addr_width=5, data_width=8)
 
         self._persist      = regs.add("persist",      self.PersistReg(),     offset=0x0)
         self._decay        = regs.add("decay",        self.DecayReg(),       offset=0x4)
         self._skip         = regs.add("skip",         self.SkipReg(),        offset=0x8)
+        if bulk:
+            self._status   = regs.add("status",       self.StatusReg(),      offset=0xC)
 
         self._bridge = csr.Bridge(regs.as_memory_map())
 
         super().__init__({
             "bus": In(csr.Signature(addr_width=regs.addr_width, data_width=regs.data_width)),
             "fbp": In(DMAFramebuffer.Properties()),
-        })
+        } | ({
+            "start": In(1),
+            "src_base": In(22),
+            "busy": Out(1),
+        } if bulk else {}) | ({
+            "snoop": In(stream.Signature(unsigned(22), always_ready=True)),
+        } if skip_empty_tiles else {}))
         self.bus.memory_map = self._bridge.bus.memory_map
 
     def elaborate(self, platform):
@@ -246,4 +454,15 @@ class Peripheral(wiring.Component):
         with m.If(self._skip.f.skip.w_stb):
             m.d.sync += self.persist.skip.eq(self._skip.f.skip.w_data)
 
+        if self.bulk:
+            m.d.comb += [
+                self.persist.start.eq(self.start),
+                self.persist.src_base.eq(self.src_base),
+                self.busy.eq(self.persist.busy),
+                self._status.f.busy.r_data.eq(self.persist.busy),
+            ]
+
+        if self.skip_empty_tiles:
+            wiring.connect(m, wiring.flipped(self.snoop), self.persist.snoop)
+
         return m
@@ -27,9 +27,11 @@ the ``_FramebufferBackend`` to perform blending (and handle screen rotation). Th
 resulting memory accesses go through a  cache ``raster.cache.Cache``, before eventually
 issuing requests on the PSRAM bus.
 
-If higher pixel throughput is needed, one can instantiate multiple hardware accelerators
-and ``FramebufferPlotters`` on the same (shared) PSRAM bus, at least as many as you
-want until you run out of memory bandwidth or FPGA resources :). For the best performance,
+If higher pixel throughput is needed, a ``FramebufferPlotter`` can be banked into
+multiple lanes (``n_lanes``), each with their own backend and cache. One can also
+instantiate multiple hardware accelerators and ``FramebufferPlotters`` on the same
+(shared) PSRAM bus, at least as many as you want until you run out of memory
+bandwidth or FPGA resources :). For the best performance,
 it makes sense to share ``FramebufferPlotter``s between components that want to draw to
 the same part of the screen, to avoid cache thrashing.
 """
@@ -38,6 +40,7 @@ from amaranth import *
 from amaranth.build import *
 from amaranth.lib import data, enum, fifo, stream, wiring
 from amaranth.lib.wiring import In, Out
+from amaranth.utils import exact_log2
 from amaranth_soc import csr, wishbone
 
 from ..video.framebuffer import DMAFramebuffer
@@ -73,6 +76,18 @@ class PlotRequest(data.Struct):
     blend:     BlendMode  # Blending mode (replace/additive)
     offset:    OffsetMode # Coordinate system (absolute/center-relative)
 
+class FillCmd(data.Struct):
+    """
+    Command to fill a rectangle with a single pixel value, always using
+    ``OffsetMode.ABSOLUTE`` and ``BlendMode.REPLACE``. A horizontal span
+    is just a rectangle with ``height == 1``.
+    """
+    x:      signed(12)  # Top-left X coordinate
+    y:      signed(12)  # Top-left Y coordinate
+    width:  unsigned(12)
+    height: unsigned(12)
+    pixel:  Pixel
+
 
 class Peripheral(wiring.Component):
     """
@@ -147,6 +162,67 @@ class Peripheral(wiring.Component):
         return m
 
 
+def _transform_coordinates(m, fbp, req):
+    """
+    Translate the coordinates of a ``PlotRequest`` into (unchecked) framebuffer
+    coordinates, taking into account the offset mode and screen rotation.
+    Returns ``(final_x, final_y)``, which are driven combinatorially.
+    """
+
+    # Pixel position calculations
+    abs_x = Signal(signed(16))
+    abs_y = Signal(signed(16))
+
+    # Maybe convert absolute coordinates to center-relative, which depends
+    # on the current rotation settings.
+    with m.If(req.offset == OffsetMode.CENTER):
+        with m.Switch(fbp.rotation):
+            # Landscape centering
+            with m.Case(Rotation.NORMAL, Rotation.INVERTED):
+                m.d.comb += [
+                    abs_x.eq(req.x + (fbp.timings.h_active >> 1)),
+                    abs_y.eq(req.y + (fbp.timings.v_active >> 1)),
+                ]
+            # Portrait centering
+            with m.Case(Rotation.LEFT, Rotation.RIGHT):
+                m.d.comb += [
+                    abs_x.eq(req.x + (fbp.timings.v_active >> 1)),
+                    abs_y.eq(req.y + (fbp.timings.h_active >> 1)),
+                ]
+    with m.Else():
+        m.d.comb += [
+            abs_x.eq(req.x),
+            abs_y.eq(req.y),
+        ]
+
+    # Handle rotation and pixel addressing
+    final_x = Signal(signed(16))
+    final_y = Signal(signed(16))
+    with m.Switch(fbp.rotation):
+        with m.Case(Rotation.NORMAL):
+            m.d.comb += [
+                final_x.eq(abs_x),
+                final_y.eq(abs_y),
+            ]
+        with m.Case(Rotation.LEFT):
+            m.d.comb += [
+                final_x.eq(fbp.timings.h_active - 1 - abs_y),
+                final_y.eq(abs_x),
+            ]
+        with m.Case(Rotation.INVERTED):
+            m.d.comb += [
+                final_x.eq(fbp.timings.h_active - 1 - abs_x),
+                final_y.eq(fbp.timings.v_active - 1 - abs_y),
+            ]
+        with m.Case(Rotation.RIGHT):
+            m.d.comb += [
+                final_x.eq(abs_y),
+                final_y.eq(fbp.timings.v_active - 1 - abs_x),
+            ]
+
+    return final_x, final_y
+
+
 class _FramebufferBackend(wiring.Component):
 
     """
@@ -160,9 +236,19 @@ class _FramebufferBackend(wiring.Component):
 
     Note that ``BlendMode.REPLACE`` performs a (fast) WRITE operation, however
     ``BlendMode.ADDITIVE`` performs a READ-BLEND-WRITE operation, which is slower.
+
+    With ``write_combine=True``, consecutive requests that land in the same
+    framebuffer word are merged in-register (blending where needed) instead of
+    each performing a bus access. The word is only emitted (as a single, byte-masked
+    READ-BLEND-WRITE, or just a WRITE if all merged pixels are ``REPLACE``)
+    when a request for a different word arrives, or after ``combine_timeout``
+    cycles without any incoming requests. This massively reduces bus traffic for
+    dense strokes and lines, where neighbouring pixels share a word.
     """
 
-    def __init__(self, bus_signature):
+    def __init__(self, bus_signature, write_combine=False, combine_timeout=8):
+        self.write_combine = write_combine
+        self.combine_timeout = combine_timeout
         self.pixel_bits = Pixel.as_shape().size
         self.pixel_bytes = self.pixel_bits // 8
         self.pixels_per_word = bus_signature.data_width // self.pixel_bits
@@ -173,6 +259,8 @@ class _FramebufferBackend(wiring.Component):
             "bus": Out(bus_signature),
             # Dynamic attributes of framebuffer needed for plotting.
             "fbp": In(DMAFramebuffer.Properties()),
+            # No requests in flight (all previous requests are on the bus).
+            "idle": Out(1),
         })
 
     def elaborate(self, platform) -> Module:
@@ -183,56 +271,7 @@ class _FramebufferBackend(wiring.Component):
         # Current request being processed
         current_req = Signal(PlotRequest)
 
-        # Pixel position calculations
-        abs_x = Signal(signed(16))
-        abs_y = Signal(signed(16))
-
-        # Maybe convert absolute coordinates to center-relative, which depends
-        # on the current rotation settings.
-        with m.If(current_req.offset == OffsetMode.CENTER):
-            with m.Switch(self.fbp.rotation):
-                # Landscape centering
-                with m.Case(Rotation.NORMAL, Rotation.INVERTED):
-                    m.d.comb += [
-                        abs_x.eq(current_req.x + (self.fbp.timings.h_active >> 1)),
-                        abs_y.eq(current_req.y + (self.fbp.timings.v_active >> 1)),
-                    ]
-                # Portrait centering
-                with m.Case(Rotation.LEFT, Rotation.RIGHT):
-                    m.d.comb += [
-                        abs_x.eq(current_req.x + (self.fbp.timings.v_active >> 1)),
-                        abs_y.eq(current_req.y + (self.fbp.timings.h_active >> 1)),
-                    ]
-        with m.Else():
-            m.d.comb += [
-                abs_x.eq(current_req.x),
-                abs_y.eq(current_req.y),
-            ]
-
-        # Handle rotation and pixel addressing
-        final_x = Signal(signed(16))
-        final_y = Signal(signed(16))
-        with m.Switch(self.fbp.rotation):
-            with m.Case(Rotation.NORMAL):
-                m.d.comb += [
-                    final_x.eq(abs_x),
-                    final_y.eq(abs_y),
-                ]
-            with m.Case(Rotation.LEFT):
-                m.d.comb += [
-                    final_x.eq(self.fbp.timings.h_active - 1 - abs_y),
-                    final_y.eq(abs_x),
-                ]
-            with m.Case(Rotation.INVERTED):
-                m.d.comb += [
-                    final_x.eq(self.fbp.timings.h_active - 1 - abs_x),
-                    final_y.eq(self.fbp.timings.v_active - 1 - abs_y),
-                ]
-            with m.Case(Rotation.RIGHT):
-                m.d.comb += [
-                    final_x.eq(abs_y),
-                    final_y.eq(self.fbp.timings.v_active - 1 - abs_x),
-                ]
+        final_x, final_y = _transform_coordinates(m, self.fbp, current_req)
 
         # pipeline: break critical path between rotation / pixel position.
         final_x_r = Signal(signed(16))
@@ -259,6 +298,54 @@ class _FramebufferBackend(wiring.Component):
         pixel_read = Signal(Pixel)
         pixel_write = Signal(Pixel)
 
+        in_bounds = (x_offs < fb_hwords) & (y_offs < self.fbp.timings.v_active)
+
+        def saturating_add(a, b):
+            return Mux(a + b >= Pixel.intensity_max(), Pixel.intensity_max(), a + b)
+
+        if self.write_combine:
+            # Pending (combined) framebuffer word. For each pixel in the word, track
+            # whether it has been touched, and whether it needs the current memory
+            # contents for blending. Touched pixels in REPLACE mode hold the final
+            # pixel value. Pixels in ADDITIVE mode hold the accumulated intensity
+            # that will be added to the current contents of memory.
+            word_layout = data.ArrayLayout(Pixel, self.pixels_per_word)
+            pending = Signal()
+            pending_adr = Signal.like(pixel_addr)
+            pending_mask = Signal(self.pixels_per_word)
+            pending_add = Signal(self.pixels_per_word)
+            pending_pix = Signal(word_layout)
+            word_read = Signal(word_layout)
+            word_write = Signal(word_layout)
+            idle_count = Signal(range(self.combine_timeout))
+            merge_after_flush = Signal()
+
+            m.d.comb += [
+                bus.adr.eq(pending_adr),
+                bus.sel.eq(pending_mask),
+            ]
+
+            def merge():
+                m.d.sync += [
+                    pending.eq(1),
+                    pending_adr.eq(pixel_addr),
+                ]
+                for n in range(self.pixels_per_word):
+                    with m.If(pixel_index == n):
+                        with m.If(~pending_mask[n] | (current_req.blend == BlendMode.REPLACE)):
+                            m.d.sync += [
+                                pending_mask[n].eq(1),
+                                pending_add[n].eq(current_req.blend == BlendMode.ADDITIVE),
+                                pending_pix[n].eq(current_req.pixel),
+                            ]
+                        with m.Else():
+                            # Blend into an already-touched pixel.
+                            m.d.sync += [
+                                pending_pix[n].color.eq(current_req.pixel.color),
+                                pending_pix[n].intensity.eq(saturating_add(
+                                    pending_pix[n].intensity, current_req.pixel.intensity)),
+                            ]
+
         with m.FSM() as fsm:
 
             with m.State('IDLE'):
@@ -268,6 +355,15 @@ class _FramebufferBackend(wiring.Component):
                 with m.If(self.i.valid):
                     m.d.sync += current_req.eq(self.i.payload)
                     m.next = 'TRANSFORM'
+                if self.write_combine:
+                    # Flush the pending word if the stream has gone quiet.
+                    with m.Elif(pending):
+                        m.d.sync += idle_count.eq(idle_count + 1)
+                        with m.If(idle_count == self.combine_timeout - 1):
+                            m.d.sync += merge_after_flush.eq(0)
+                            m.next = 'COMBINE-FLUSH'
+                    with m.If(self.i.valid | ~pending):
+                        m.d.sync += idle_count.eq(0)
 
             with m.State('TRANSFORM'):
                 m.d.sync += [
@@ -276,55 +372,298 @@ class _FramebufferBackend(wiring.Component):
                 ]
                 m.next = 'CHECK-BOUNDS'
 
-            with m.State('CHECK-BOUNDS'):
-                m.d.sync += [
-                    bus.adr.eq(pixel_addr),
-                    bus.sel.eq(1 << pixel_index)
-                ]
-                with m.If((x_offs < fb_hwords) &
-                          (y_offs < self.fbp.timings.v_active)):
-                    with m.Switch(current_req.blend):
-                        with m.Case(BlendMode.ADDITIVE):
-                            m.next = 'BLEND-READ'
-                        with m.Case(BlendMode.REPLACE):
-                            # Fastpath for REPLACE mode (no RMW needed)
-                            m.d.sync += pixel_write.eq(current_req.pixel)
-                            m.next = 'WRITE'
-                with m.Else():
+            if self.write_combine:
+
+                with m.State('CHECK-BOUNDS'):
+                    with m.If(in_bounds):
+                        with m.If(pending & (pending_adr != pixel_addr)):
+                            # Different word, emit the pending one first.
+                            m.d.sync += merge_after_flush.eq(1)
+                            m.next = 'COMBINE-FLUSH'
+                        with m.Else():
+                            merge()
+                            m.next = 'IDLE'
+                    with m.Else():
+                        m.next = 'IDLE'
+
+                with m.State('COMBINE-FLUSH'):
+                    with m.If(pending_add.any()):
+                        m.next = 'COMBINE-READ'
+                    with m.Else():
+                        # Fastpath if every pixel is REPLACE (no RMW needed)
+                        m.next = 'COMBINE-PROCESS'
+
+                with m.State('COMBINE-READ'):
+                    m.d.comb += [
+                        bus.stb.eq(1),
+                        bus.cyc.eq(1),
+                        bus.we.eq(0),
+                    ]
+                    with m.If(bus.stb & bus.ack):
+                        m.d.sync += word_read.eq(bus.dat_r)
+                        m.next = 'COMBINE-PROCESS'
+
+                with m.State('COMBINE-PROCESS'):
+                    for n in range(self.pixels_per_word):
+                        with m.If(pending_add[n]):
+                            m.d.sync += [
+                                word_write[n].color.eq(pending_pix[n].color),
+                                word_write[n].intensity.eq(saturating_add(
+                                    word_read[n].intensity, pending_pix[n].intensity)),
+                            ]
+                        with m.Else():
+                            m.d.sync += word_write[n].eq(pending_pix[n])
+                    m.next = 'COMBINE-WRITE'
+
+                with m.State('COMBINE-WRITE'):
+                    m.d.comb += [
+                        bus.stb.eq(1),
+                        bus.cyc.eq(1),
+                        bus.we.eq(1),
+                        bus.dat_w.eq(word_write),
+                    ]
+                    with m.If(bus.stb & bus.ack):
+                        m.d.sync += [
+                            pending.eq(0),
+                            pending_mask.eq(0),
+                            pending_add.eq(0),
+                        ]
+                        with m.If(merge_after_flush):
+                            m.next = 'MERGE'
+                        with m.Else():
+                            m.next = 'IDLE'
+
+                with m.State('MERGE'):
+                    merge()
                     m.next = 'IDLE'
 
-            with m.State('BLEND-READ'):
-                m.d.comb += [
-                    bus.stb.eq(1),
-                    bus.cyc.eq(1),
-                    bus.we.eq(0),
+            else:
+
+                with m.State('CHECK-BOUNDS'):
+                    m.d.sync += [
+                        bus.adr.eq(pixel_addr),
+                        bus.sel.eq(1 << pixel_index)
+                    ]
+                    with m.If(in_bounds):
+                        with m.Switch(current_req.blend):
+                            with m.Case(BlendMode.ADDITIVE):
+                                m.next = 'BLEND-READ'
+                            with m.Case(BlendMode.REPLACE):
+                                # Fastpath for REPLACE mode (no RMW needed)
+                                m.d.sync += pixel_write.eq(current_req.pixel)
+                                m.next = 'WRITE'
+                    with m.Else():
+                        m.next = 'IDLE'
+
+                with m.State('BLEND-READ'):
+                    m.d.comb += [
+                        bus.stb.eq(1),
+                        bus.cyc.eq(1),
+                        bus.we.eq(0),
+                    ]
+                    with m.If(bus.stb & bus.ack):
+                        m.d.sync += pixel_read.eq(
+                            bus.dat_r.bit_select(pixel_index*self.pixel_bits, self.pixel_bits))
+                        m.next = 'BLEND-PROCESS'
+
+                with m.State('BLEND-PROCESS'):
+                    m.d.sync += [
+                        pixel_write.color.eq(current_req.pixel.color),
+                        pixel_write.intensity.eq(saturating_add(
+                            pixel_read.intensity, current_req.pixel.intensity)),
+                    ]
+                    m.next = 'WRITE'
+
+                with m.State('WRITE'):
+                    m.d.comb += [
+                        bus.stb.eq(1),
+                        bus.cyc.eq(1),
+                        bus.we.eq(1),
+                        bus.dat_w.eq(Cat([pixel_write]*self.pixels_per_word)),
+                    ]
+                    with m.If(bus.stb & bus.ack):
+                        m.next = 'IDLE'
+
+        if self.write_combine:
+            m.d.comb += self.idle.eq(fsm.ongoing('IDLE') & ~pending)
+        else:
+            m.d.comb += self.idle.eq(fsm.ongoing('IDLE'))
+
+        return ResetInserter({'sync': ~self.fbp.enable})(m)
+
+
+class _SpanFill(wiring.Component):
+
+    """
+    Rectangle fill engine. Use ``FramebufferPlotter`` for the public API, which
+    makes sure this does not race with any cached pixels.
+
+    Each ``FillCmd`` is transformed by the current screen rotation (so spans are
+    always horizontal in framebuffer memory), clipped to the screen, and then
+    written directly to the framebuffer as incrementing bursts of up to ``max_burst``
+    words per row. Partially covered words at the edges of each span are written
+    using byte-select masks, so no read-modify-write is ever needed.
+    """
+
+    def __init__(self, bus_signature, max_burst=16):
+        self.max_burst = max_burst
+        self.pixel_bits = Pixel.as_shape().size
+        self.pixel_bytes = self.pixel_bits // 8
+        self.pixels_per_word = bus_signature.data_width // self.pixel_bits
+        super().__init__({
+            # Incoming fill command stream
+            "i": In(stream.Signature(FillCmd)),
+            # DMA bus for framebuffer access
+            "bus": Out(bus_signature),
+            # Dynamic attributes of framebuffer needed for plotting.
+            "fbp": In(DMAFramebuffer.Properties()),
+        })
+
+    def elaborate(self, platform) -> Module:
+        m = Module()
+
+        bus = self.bus
+
+        # Current fill command being processed
+        cmd = Signal(FillCmd)
+
+        # Opposite corners of the rectangle, mapped to framebuffer coordinates.
+        corner_layout = data.StructLayout({
+            "x": signed(14),
+            "y": signed(14),
+            "offset": OffsetMode,
+        })
+        corner0 = Signal(corner_layout)
+        corner1 = Signal(corner_layout)
+        m.d.comb += [
+            corner0.x.eq(cmd.x),
+            corner0.y.eq(cmd.y),
+            corner1.x.eq(cmd.x + cmd.width - 1),
+            corner1.y.eq(cmd.y + cmd.height - 1),
+        ]
+        fx0, fy0 = _transform_coordinates(m, self.fbp, corner0)
+        fx1, fy1 = _transform_coordinates(m, self.fbp, corner1)
+
+        # Rectangle to fill (inclusive), in framebuffer coordinates.
+        x0 = Signal(signed(16))
+        x1 = Signal(signed(16))
+        y0 = Signal(signed(16))
+        y1 = Signal(signed(16))
+
+        # Word range and byte-select masks of each span.
+        index_bits = exact_log2(self.pixels_per_word)
+        word_mask = 2**self.pixels_per_word - 1
+        first_word = Signal(16)
+        last_word = Signal(16)
+        first_sel = Signal(self.pixels_per_word)
+        last_sel = Signal(self.pixels_per_word)
+
+        fb_hwords = ((self.fbp.timings.h_active * self.pixel_bytes)
+                     // self.pixels_per_word)
+
+        row_adr = Signal.like(bus.adr)
+        word = Signal(16)
+        burst_count = Signal(range(self.max_burst))
+        end_of_row = Signal()
+        end_of_burst = Signal()
+        m.d.comb += [
+            end_of_row.eq(word == last_word),
+            end_of_burst.eq(end_of_row | (burst_count == (self.max_burst - 1))),
+            # Whole words, unless masked at the edges of a span (below).
+            bus.sel.eq(word_mask),
+        ]
+
+        with m.FSM() as fsm:
+
+            with m.State('IDLE'):
+                m.d.comb += self.i.ready.eq(1)
+                with m.If(self.i.valid & (self.i.payload.width != 0) &
+                          (self.i.payload.height != 0)):
+                    m.d.sync += cmd.eq(self.i.payload)
+                    m.next = 'TRANSFORM'
+
+            with m.State('TRANSFORM'):
+                m.d.sync += [
+                    x0.eq(Mux(fx0 < fx1, fx0, fx1)),
+                    x1.eq(Mux(fx0 < fx1, fx1, fx0)),
+                    y0.eq(Mux(fy0 < fy1, fy0, fy1)),
+                    y1.eq(Mux(fy0 < fy1, fy1, fy0)),
                 ]
-                with m.If(bus.stb & bus.ack):
-                    m.d.sync += pixel_read.eq(
-                        bus.dat_r.bit_select(pixel_index*self.pixel_bits, self.pixel_bits))
-                    m.next = 'BLEND-PROCESS'
-
-            with m.State('BLEND-PROCESS'):
-                new_intensity = Signal.like(pixel_read.intensity)
-                with m.If(pixel_read.intensity + current_req.pixel.intensity >= Pixel.intensity_max()):
-                    m.d.comb += new_intensity.eq(Pixel.intensity_max())
-                with m.Else():
-                    m.d.comb += new_intensity.eq(pixel_read.intensity + current_req.pixel.intensity)
+                m.next = 'CLIP'
+
+            with m.State('CLIP'):
+                with m.If(x0 < 0):
+                    m.d.sync += x0.eq(0)
+                with m.If(y0 < 0):
+                    m.d.sync += y0.eq(0)
+                with m.If(x1 >= self.fbp.timings.h_active):
+                    m.d.sync += x1.eq(self.fbp.timings.h_active - 1)
+                with m.If(y1 >= self.fbp.timings.v_active):
+                    m.d.sync += y1.eq(self.fbp.timings.v_active - 1)
+                m.next = 'CHECK'
+
+            with m.State('CHECK'):
                 m.d.sync += [
-                    pixel_write.color.eq(current_req.pixel.color),
-                    pixel_write.intensity.eq(new_intensity),
+                    first_word.eq(x0 >> index_bits),
+                    last_word.eq(x1 >> index_bits),
+                    word.eq(x0 >> index_bits),
+                    first_sel.eq(Const(word_mask, self.pixels_per_word) << x0[:index_bits]),
+                    last_sel.eq(Const(word_mask, self.pixels_per_word) >> ~x1[:index_bits]),
                 ]
-                m.next = 'WRITE'
+                with m.If((x0 > x1) | (y0 > y1)):
+                    # Rectangle is entirely off-screen.
+                    m.next = 'IDLE'
+                with m.Else():
+                    m.next = 'ROW'
+
+            with m.State('ROW'):
+                # NOTE: single multiplier used here!
+                m.d.sync += row_adr.eq(self.fbp.base + y0*fb_hwords)
+                m.next = 'BURST'
 
-            with m.State('WRITE'):
+            with m.State('BURST'):
                 m.d.comb += [
                     bus.stb.eq(1),
                     bus.cyc.eq(1),
                     bus.we.eq(1),
-                    bus.dat_w.eq(Cat([pixel_write]*self.pixels_per_word)),
+                    bus.adr.eq(row_adr + word),
+                    bus.dat_w.eq(Cat([cmd.pixel]*self.pixels_per_word)),
+                    bus.cti.eq(wishbone.CycleType.INCR_BURST),
+                ]
+                with m.If(word == first_word):
+                    m.d.comb += bus.sel.eq(first_sel)
+                    with m.If(end_of_row):
+                        m.d.comb += bus.sel.eq(first_sel & last_sel)
+                with m.Elif(end_of_row):
+                    m.d.comb += bus.sel.eq(last_sel)
+                with m.If(end_of_burst):
+                    m.d.comb += bus.cti.eq(wishbone.CycleType.END_OF_BURST)
+                with m.If(bus.ack):
+                    m.d.sync += [
+                        word.eq(word + 1),
+                        burst_count.eq(burst_count + 1),
+                    ]
+                    with m.If(end_of_burst):
+                        m.d.sync += burst_count.eq(0)
+                        with m.If(end_of_row):
+                            m.next = 'NEXT-ROW'
+                        with m.Else():
+                            # Release the bus between bursts so other masters
+                            # (e.g. video scanout) are not starved.
+                            m.next = 'HOLDOFF'
+
+            with m.State('HOLDOFF'):
+                m.next = 'BURST'
+
+            with m.State('NEXT-ROW'):
+                m.d.sync += [
+                    y0.eq(y0 + 1),
+                    word.eq(first_word),
                 ]
-                with m.If(bus.stb & bus.ack):
+                with m.If(y0 == y1):
                     m.next = 'IDLE'
+                with m.Else():
+                    m.next = 'ROW'
 
         return ResetInserter({'sync': ~self.fbp.enable})(m)
 
@@ -333,45 +672,201 @@ class FramebufferPlotter(wiring.Component):
     """
     Combined cache, arbiter, and plotting logic.
     Takes (one or many) streams of pixels to plot, and DMAs them to a framebuffer.
+
+    With many ports drawing to different parts of the screen (e.g. vectorscope
+    traces at fixed vertical offsets), ``cache_ways > 1`` makes the cache
+    set-associative, so that rows aliasing to the same cache line do not thrash it.
+
+    ``write_combine`` merges requests that land in the same framebuffer word before
+    they hit the cache (see ``_FramebufferBackend``), which is a big win for
+    dense strokes and lines.
+
+    With ``n_lanes > 1``, the plotter is banked into several independent lanes,
+    each with its own ``_FramebufferBackend`` and cache, so that multiple pixels
+    may be blended at the same time. The arbitrated ``PlotRequest`` stream is
+    routed to a lane by hashing the (rotated) framebuffer row and the cache line
+    index within that row, such that every framebuffer cache line is only ever
+    touched by one lane (the caches never need to be kept coherent). This assumes
+    the framebuffer base and row stride are aligned to the cache line size, which
+    is true for all the modelines we support.
+
+    In this case, ``bus`` is an array of ``n_lanes`` DMA buses, each of which should
+    be added to the shared PSRAM bus, for example ``psram.Peripheral.add_master``.
+
+    With ``n_fill_ports > 0``, ``FillCmd`` streams on the ``fill`` ports are used
+    to fill rectangles at close to memory bandwidth (see ``_SpanFill``), instead of
+    plotting them pixel by pixel. Fills are strictly ordered with respect to pixels
+    already accepted on the ``i`` ports: before each fill, incoming pixels are held
+    off, all pending pixels are drawn, and all caches are flushed. The fill then
+    bypasses the caches and writes bursts directly to the bus (the lane 0 bus, if
+    banked). So fills are expensive for small regions, but are ideal for clearing
+    large parts of the screen.
+
+    While ``pause`` is high, no new pixels or fills are accepted. Pixels accepted
+    before that are still drawn. This is used to keep the plotter out of a buffer
+    that is being written by something else (e.g. a bulk ``Persistance`` pass).
     """
-    def __init__(self, bus_signature, n_ports: int = 1, cachesize_words: int = 64):
+    def __init__(self, bus_signature, n_ports: int = 1, cachesize_words: int = 64,
+                 cache_ways: int = 1, n_lanes: int = 1, lane_fifo_depth: int = 4,
+                 write_combine: bool = False, n_fill_ports: int = 0):
+        assert n_lanes >= 1 and (n_lanes & (n_lanes - 1)) == 0, "n_lanes must be a power of 2"
         self.n_ports = n_ports
         self.cachesize_words = cachesize_words
-        super().__init__({
+        self.cache_ways = cache_ways
+        self.n_lanes = n_lanes
+        self.lane_fifo_depth = lane_fifo_depth
+        self.write_combine = write_combine
+        self.n_fill_ports = n_fill_ports
+        members = {
             # One (or many) incoming plot request streams
             "i": In(stream.Signature(PlotRequest)).array(n_ports),
-            # Framebuffer DMA bus
-            "bus": Out(bus_signature),
+            # Framebuffer DMA bus (one per lane if banked)
+            "bus": Out(bus_signature) if n_lanes == 1 else Out(bus_signature).array(n_lanes),
             # Dynamic attributes of framebuffer needed for plotting.
             "fbp": In(DMAFramebuffer.Properties()),
-        })
+            # Hold off new plot requests and fills.
+            "pause": In(1),
+        }
+        if n_fill_ports:
+            # Incoming rectangle fill command streams
+            members["fill"] = In(stream.Signature(FillCmd)).array(n_fill_ports)
+        super().__init__(members)
 
     def elaborate(self, platform) -> Module:
         m = Module()
 
-        # Internal components
-        m.submodules.cache = cache = WishboneL2Cache(
-            addr_width=self.bus.addr_width,
-            cachesize_words=self.cachesize_words,
-            autoflush=True)
-        m.submodules.backend = backend = _FramebufferBackend(
-            bus_signature=cache.master.signature.flip())
         m.submodules.arbiter = arbiter = stream_util.Arbiter(
             n_channels=self.n_ports, shape=PlotRequest)
 
-        # Framebuffer properties
-        wiring.connect(m, wiring.flipped(self.fbp), backend.fbp)
-
         # Plot requests -> arbiter
         for n in range(self.n_ports):
             wiring.connect(m, wiring.flipped(self.i[n]), arbiter.i[n])
-        # Arbiter -> plotting backend
-        wiring.connect(m, arbiter.o, backend.i)
-        # Backend -> cache
-        wiring.connect(m, backend.bus, cache.master)
+
+        # Internal components (cache and backend for each lane)
+        caches = []
+        backends = []
+        for n in range(self.n_lanes):
+            suffix = "" if self.n_lanes == 1 else str(n)
+            bus = self.bus if self.n_lanes == 1 else self.bus[n]
+            cache = WishboneL2Cache(
+                addr_width=bus.addr_width,
+                cachesize_words=self.cachesize_words,
+                ways=self.cache_ways,
+                autoflush=True)
+            backend = _FramebufferBackend(
+                bus_signature=cache.master.signature.flip(),
+                write_combine=self.write_combine)
+            m.submodules["cache"+suffix] = cache
+            m.submodules["backend"+suffix] = backend
+            # Backend -> cache
+            wiring.connect(m, backend.bus, cache.master)
+            caches.append(cache)
+            backends.append(backend)
+
         # Cache -> exposed for connecting to PSRAM DMA
-        wiring.connect(m, cache.slave, wiring.flipped(self.bus))
+        for n in range(self.n_lanes):
+            bus = self.bus if self.n_lanes == 1 else self.bus[n]
+            if n == 0 and self.n_fill_ports:
+                # Fill engine shares the first lane's bus.
+                m.submodules.span_fill = span_fill = _SpanFill(
+                    bus_signature=caches[0].slave.signature)
+                m.submodules.fill_bus_arbiter = fill_bus_arbiter = wishbone.Arbiter(
+                    addr_width=bus.addr_width, data_width=bus.data_width,
+                    granularity=bus.granularity, features={"cti", "bte"})
+                fill_bus_arbiter.add(caches[0].slave)
+                fill_bus_arbiter.add(span_fill.bus)
+                wiring.connect(m, fill_bus_arbiter.bus, wiring.flipped(bus))
+            else:
+                wiring.connect(m, caches[n].slave, wiring.flipped(bus))
 
-        return m
+        # Framebuffer properties
+        wiring.connect(m, wiring.flipped(self.fbp), *[backend.fbp for backend in backends])
 
+        # Arbitrated plot requests, which may be held off while paused or filling.
+        hold = Signal()
+        m.d.comb += hold.eq(self.pause)
+        plot_req = stream.Signature(PlotRequest).create()
+        m.d.comb += [
+            plot_req.payload.eq(arbiter.o.payload),
+            plot_req.valid.eq(arbiter.o.valid & ~hold),
+            arbiter.o.ready.eq(plot_req.ready & ~hold),
+        ]
+
+        lane_fifos = []
+        if self.n_lanes == 1:
+            # Arbiter -> plotting backend
+            wiring.connect(m, plot_req, backends[0].i)
+        else:
+            # Arbiter -> lane router -> per-lane FIFO -> plotting backend.
+            # Lane hash is computed on the framebuffer row and cache line within
+            # that row, so all pixels in the same cache line land in the same lane.
+            final_x, final_y = _transform_coordinates(m, self.fbp, plot_req.payload)
+            line_pixels = backends[0].pixels_per_word * caches[0].burst_len
+            lane = Signal(range(self.n_lanes))
+            m.d.comb += lane.eq(final_y ^ (final_x >> exact_log2(line_pixels)))
+
+            for n in range(self.n_lanes):
+                lane_fifo = stream_util.SyncFIFOBuffered(
+                    shape=PlotRequest, depth=self.lane_fifo_depth)
+                m.submodules[f"lane_fifo{n}"] = lane_fifo
+                m.d.comb += [
+                    lane_fifo.i.payload.eq(plot_req.payload),
+                    lane_fifo.i.valid.eq(plot_req.valid & (lane == n)),
+                ]
+                with m.If(lane == n):
+                    m.d.comb += plot_req.ready.eq(lane_fifo.i.ready)
+                wiring.connect(m, lane_fifo.o, backends[n].i)
+                lane_fifos.append(lane_fifo)
+
+        if not self.n_fill_ports:
+            return m
+
+        m.submodules.fill_arbiter = fill_arbiter = stream_util.Arbiter(
+            n_channels=self.n_fill_ports, shape=FillCmd)
+        for n in range(self.n_fill_ports):
+            wiring.connect(m, wiring.flipped(self.fill[n]), fill_arbiter.i[n])
+        wiring.connect(m, wiring.flipped(self.fbp), span_fill.fbp)
+
+        # Every pixel accepted before the fill has made it to a cache.
+        drained = Cat([backend.idle for backend in backends] +
+                      [~lane_fifo.o.valid for lane_fifo in lane_fifos]).all()
+        flushing = Cat([cache.flush_busy for cache in caches]).any()
+
+        fill_cmd = Signal(FillCmd)
+
+        with m.FSM():
+
+            with m.State('PLOT'):
+                m.d.comb += fill_arbiter.o.ready.eq(~self.pause)
+                with m.If(fill_arbiter.o.valid & ~self.pause):
+                    m.d.sync += fill_cmd.eq(fill_arbiter.o.payload)
+                    m.next = 'FILL-DRAIN'
+
+            with m.State('FILL-DRAIN'):
+                m.d.comb += hold.eq(1)
+                with m.If(drained):
+                    m.d.comb += [cache.flush.eq(1) for cache in caches]
+                    m.next = 'FILL-FLUSH'
+
+            with m.State('FILL-FLUSH'):
+                # Nothing may be left in the caches that could later be written
+                # back over the fill, or be read instead of the filled region.
+                m.d.comb += hold.eq(1)
+                with m.If(~flushing):
+                    m.next = 'FILL-START'
+
+            with m.State('FILL-START'):
+                m.d.comb += [
+                    hold.eq(1),
+                    span_fill.i.valid.eq(1),
+                    span_fill.i.payload.eq(fill_cmd),
+                ]
+                with m.If(span_fill.i.ready):
+                    m.next = 'FILL-WAIT'
 
+            with m.State('FILL-WAIT'):
+                m.d.comb += hold.eq(1)
+                with m.If(span_fill.i.ready):
+                    m.next = 'PLOT'
+
+        return m
@@ -326,8 +326,9 @@ class Spectrogram(wiring.Component):
 
         # Resample input down, so visible area is a fraction of the nyquist (e.g. 192khz/8 = 24kHz visual bandwidth)
         m.submodules.resample = resample = dsp.Resample(fs_in=self.fs, n_up=1, m_down=8 if self.fs > 48000 else 2)
-        m.submodules.analyzer = analyzer = dsp.fft.STFTAnalyzer(shape=ASQ, sz=fftsz)
-        m.submodules.envelope = envelope = dsp.spectral.SpectralEnvelope(shape=ASQ, sz=fftsz)
+        # Real FFT: only the fftsz/2 non-mirrored bins are computed.
+        m.submodules.analyzer = analyzer = dsp.fft.STFTAnalyzer(shape=ASQ, sz=fftsz, real_fft=True)
+        m.submodules.envelope = envelope = dsp.spectral.SpectralEnvelope(shape=ASQ, sz=fftsz//2)
         def log_lut(x):
             # map 0 - 1 (linear) to 0 - 1 (log representing -X dBr to 0dBr)
             # where -X (smallest value) represents 1 LSB of the fixed.SQ.
@@ -350,8 +351,8 @@ class Spectrogram(wiring.Component):
             with m.Else():
                 m.d.sync += f_axis.eq(f_axis+(fixed.Const(1)>>exact_log2(fftsz)))
 
-        # Pen lift when we get to the mirrored half of the spectrum.
-        with m.If(f_axis < fixed.Const(0)):
+        # Pen lift on the first bin, as we jump back to the start of the axis.
+        with m.If(~log.o.payload.first):
             m.d.comb += merge4.i[2].payload.eq(ASQ.max())
         with m.Else():
             m.d.comb += merge4.i[2].payload.eq(0)
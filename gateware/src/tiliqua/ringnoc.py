@@ -38,6 +38,11 @@ N+1 clocks later, with the server busy for N out of N+1 of those clocks.
 To use this, you will want to create your components building on ``ringnoc.Client``
 and ``ringnoc.Server``. An example of this (sharing DSP tiles) is found in
 this repository as ``mac.RingMAC`` (client) and ``mac.RingMACServer``.
+
+As every message travels once around the whole ring, latency grows with the
+number of clients, and a single server is limited to one request per clock.
+``ringnoc.ServerGroup`` splits clients across several shorter rings, each with
+its own server, balanced by the expected load of each client.
 """
 
 from dataclasses import dataclass
@@ -198,8 +203,12 @@ class Server(wiring.Component):
         self.clients = []
         self.process_request = process_request
 
-    def new_client(self):
-        """Create and add a new client to the ring."""
+    def new_client(self, load: float = 1):
+        """Create and add a new client to the ring.
+
+        ``load`` (expected requests per unit time) is only used by :class:`ServerGroup`,
+        it is accepted here so both can be used interchangeably.
+        """
         tag = len(self.clients)
         assert len(self.clients) < self.cfg.max_clients
         client = self.client_class(tag=tag, cfg=self.cfg)
@@ -235,3 +244,43 @@ class Server(wiring.Component):
             ]
 
         return m
+
+class ServerGroup(Elaboratable):
+    """
+    Several independent message rings, each with its own :class:`Server`.
+
+    This has the same ``new_client`` interface as :class:`Server`, however each new
+    client is added to the ring with the lowest total expected ``load`` so far (ties
+    are broken by the number of clients). With ``n_rings`` rings, up to ``n_rings``
+    requests are processed per clock, and each ring is about ``n_rings`` times shorter,
+    so latency drops by about the same factor.
+
+    Only rings that have at least one client are elaborated.
+    """
+
+    def __init__(self, n_rings: int, cfg: Config, process_request, client_class):
+        self.cfg = cfg
+        self.servers = [Server(cfg, process_request, client_class) for _ in range(n_rings)]
+        self.loads = [0] * n_rings
+
+    @property
+    def clients(self):
+        return [client for server in self.servers for client in server.clients]
+
+    def new_client(self, load: float = 1):
+        """Create and add a new client to the least loaded ring."""
+        ring = min(range(len(self.servers)),
+                   key=lambda n: (self.loads[n], len(self.servers[n].clients)))
+        self.loads[ring] += load
+        return self.servers[ring].new_client()
+
+    def elaborate(self, platform):
+        m = Module()
+
+        assert len(self.clients) > 0, "ServerGroup must have at least one client"
+
+        for n, server in enumerate(self.servers):
+            if server.clients:
+                m.submodules[f"server{n}"] = server
+
+        return m
@@ -1,7 +1,10 @@
+from types import SimpleNamespace
+
 from amaranth import *
 from amaranth.lib import wiring
 from amaranth.lib.wiring import In, Out
 from amaranth.lib.memory import Memory
+from amaranth.utils import exact_log2
 
 from amaranth_soc import wishbone
 
@@ -10,35 +13,77 @@ class FakePSRAM(wiring.Component):
     """
     Fake PSRAM core for testbenches. Simulates classic and burst transactions to
     a memory that has a high access latency, like our real PSRAM core.
+
+    By default, every transaction simply takes ``latency_cycles`` to start. If a
+    ``timing`` model (:class:`tiliqua.build.sim.PSRAMTiming`) is specified, this
+    is replaced by a closer model of a real PSRAM part and our controller for it:
+    separate read/write latencies, chip select high time after each transaction,
+    bursts that are split on page crossings and refreshes that delay the start
+    of transactions. ``busy`` is asserted whenever the (fake) PSRAM is not idle,
+    see :func:`measure_utilization`.
     """
 
     def __init__(self, *, addr_width=22, data_width=32,
-                 storage_words=512, latency_cycles=4):
+                 storage_words=512, latency_cycles=4, timing=None):
         self.latency_cycles = latency_cycles
         self.storage_words = storage_words
+        self.timing = timing
         super().__init__({
             "bus": In(wishbone.Signature(
                 addr_width=addr_width,
                 data_width=data_width,
                 granularity=8,
                 features={"cti", "bte"}
-            ))
+            )),
+            "busy": Out(1),
         })
+        self.memory = Memory(shape=unsigned(data_width), depth=storage_words, init=[])
 
     def elaborate(self, platform):
         m = Module()
 
         bus = self.bus
 
-        memory = Memory(shape=unsigned(self.bus.signature.data_width), depth=self.storage_words, init=[])
-        m.submodules.memory = memory
+        # Backing storage, testbenches may inspect it through 'memory.data'.
+        m.submodules.memory = memory = self.memory
         mem_wr_port = memory.write_port(granularity=8)
         mem_rd_port = memory.read_port()
 
-        latency_counter = Signal(range(self.latency_cycles + 1))
+        timing = self.timing
+
+        if timing is None:
+            max_latency = self.latency_cycles
+        else:
+            max_latency = (timing.cs_high_cycles + timing.command_cycles +
+                           max(timing.read_latency_cycles, timing.write_latency_cycles))
+
+        latency_counter = Signal(range(max_latency + 1))
+        latency_target = Signal(range(max_latency + 1))
         in_burst = Signal()
         burst_counter = Signal(8)
 
+        # Cycles to the first word of a (continued) transaction.
+        def latency(extra=0):
+            if timing is None:
+                return self.latency_cycles
+            return extra + timing.command_cycles + Mux(bus.we, timing.write_latency_cycles,
+                                                                timing.read_latency_cycles)
+
+        refreshing = Const(0)
+        if timing is not None:
+            refresh_timer = Signal(range(timing.refresh_interval_cycles))
+            m.d.sync += refresh_timer.eq(Mux(refresh_timer == timing.refresh_interval_cycles - 1,
+                                             0, refresh_timer + 1))
+            refreshing = refresh_timer < timing.refresh_cycles
+
+        page_end = None
+        if timing is not None and timing.page_size_bytes is not None:
+            page_words = timing.page_size_bytes // (self.bus.signature.data_width // 8)
+            page_end = bus.adr[:exact_log2(page_words)] == page_words - 1
+
+        # Where to go after the end of a transaction.
+        done = "IDLE" if timing is None else "RECOVERY"
+
         prev_stb = Signal()
         m.d.sync += prev_stb.eq(bus.stb)
 
@@ -59,7 +104,7 @@ class FakePSRAM(wiring.Component):
 
         m.d.sync += mem_wr_port.en.eq(0)
 
-        with m.FSM():
+        with m.FSM() as fsm:
             with m.State("IDLE"):
                 m.d.sync += [
                     bus.ack.eq(0),
@@ -67,18 +112,24 @@ class FakePSRAM(wiring.Component):
                     in_burst.eq(0),
                     burst_counter.eq(0),
                 ]
-                with m.If(bus.cyc & bus.stb):
+                with m.If(bus.cyc & bus.stb & ~refreshing):
                     is_burst = (bus.cti != wishbone.CycleType.CLASSIC)
-                    m.d.sync += in_burst.eq(is_burst)
+                    m.d.sync += [
+                        in_burst.eq(is_burst),
+                        latency_target.eq(latency()),
+                    ]
                     m.next = "LATENCY"
 
             with m.State("LATENCY"):
                 m.d.sync += latency_counter.eq(latency_counter + 1)
-                with m.If(latency_counter == (self.latency_cycles - 1)):
+                with m.If(latency_counter == (latency_target - 1)):
                     m.next = "RESPOND"
 
             with m.State("RESPOND"):
-                m.d.sync += bus.ack.eq(1)
+                m.d.sync += [
+                    bus.ack.eq(1),
+                    latency_counter.eq(0),
+                ]
 
                 with m.If(bus.we):
                     m.d.sync += mem_wr_port.en.eq(bus.sel)
@@ -91,8 +142,147 @@ class FakePSRAM(wiring.Component):
                     end_of_burst = (bus.cti == wishbone.CycleType.END_OF_BURST)
                     with m.If(end_of_burst):
                         m.d.sync += bus.ack.eq(0)
+                        m.next = done
+                    if page_end is not None:
+                        with m.Elif(bus.ack & page_end):
+                            # Burst is split, the rest of it pays for chip select
+                            # high time, another command, and the latency again.
+                            m.d.sync += [
+                                bus.ack.eq(0),
+                                latency_counter.eq(0),
+                                latency_target.eq(latency(timing.cs_high_cycles)),
+                            ]
+                            m.next = "LATENCY"
+                with m.Else():
+                    m.next = done
+
+            if timing is not None:
+                with m.State("RECOVERY"):
+                    m.d.sync += [
+                        bus.ack.eq(0),
+                        latency_counter.eq(latency_counter + 1),
+                    ]
+                    with m.If(latency_counter >= timing.cs_high_cycles - 1):
                         m.next = "IDLE"
+
+        m.d.comb += self.busy.eq(~fsm.ongoing("IDLE"))
+
+        return m
+
+async def measure_utilization(ctx, psram, n_cycles):
+    """
+    Observe a :class:`FakePSRAM` for ``n_cycles``. Returns the fraction of
+    cycles it was busy, and the fraction of busy cycles that transferred data
+    (the rest being command, latency and recovery overhead).
+    """
+    busy = 0
+    words = 0
+    for _ in range(n_cycles):
+        busy  += ctx.get(psram.busy)
+        words += ctx.get(psram.bus.cyc & psram.bus.stb & psram.bus.ack)
+        await ctx.tick()
+    return SimpleNamespace(busy=busy/n_cycles, efficiency=words/max(busy, 1))
+
+class FakePSRAMController(wiring.Component):
+
+    """
+    Fake PSRAM controller for testbenches of the wishbone front-end. Has the
+    same control/status interface as our real PSRAM controllers (``OSPIPSRAM``),
+    with a similar command, latency, recovery and page crossing overhead, on
+    top of a (small) memory.
+    """
+
+    def __init__(self, *, storage_words=512, command_cycles=3, read_latency_cycles=9,
+                 write_latency_cycles=2, recovery_cycles=3, page_size_bytes=2048):
+        self.storage_words        = storage_words
+        self.command_cycles       = command_cycles
+        self.read_latency_cycles  = read_latency_cycles
+        self.write_latency_cycles = write_latency_cycles
+        self.recovery_cycles      = recovery_cycles
+        self.PAGE_SIZE_BYTES      = page_size_bytes
+        super().__init__({
+            "address":        In(unsigned(32)),
+            "perform_write":  In(unsigned(1)),
+            "start_transfer": In(unsigned(1)),
+            "final_word":     In(unsigned(1)),
+            "idle":           Out(unsigned(1)),
+            "read_ready":     Out(unsigned(1)),
+            "write_ready":    Out(unsigned(1)),
+            "read_data":      Out(unsigned(32)),
+            "write_data":     In(unsigned(32)),
+            "write_mask":     In(unsigned(4)),
+        })
+
+    def elaborate(self, platform):
+        m = Module()
+
+        memory = Memory(shape=unsigned(32), depth=self.storage_words, init=[])
+        m.submodules.memory = memory
+        mem_wr_port = memory.write_port(granularity=8)
+        mem_rd_port = memory.read_port(domain="comb")
+
+        is_write        = Signal()
+        current_address = Signal(32)
+        counter         = Signal(8)
+
+        m.d.comb += [
+            mem_rd_port.addr.eq(current_address >> 2),
+            mem_wr_port.addr.eq(current_address >> 2),
+            mem_wr_port.data.eq(self.write_data),
+            self.read_data.eq(mem_rd_port.data),
+        ]
+
+        m.d.sync += [
+            # Transactions should never run past the storage we have.
+            Assert(~self.read_ready & ~self.write_ready |
+                   ((current_address >> 2) < self.storage_words)),
+        ]
+
+        m.d.sync += counter.eq(counter + 1)
+
+        page_end = (current_address & (self.PAGE_SIZE_BYTES-1)) == (self.PAGE_SIZE_BYTES-4)
+
+        with m.FSM():
+            with m.State("IDLE"):
+                m.d.comb += self.idle.eq(1)
+                with m.If(self.start_transfer):
+                    m.d.sync += [
+                        current_address.eq(self.address),
+                        is_write.eq(self.perform_write),
+                        counter.eq(0),
+                    ]
+                    m.next = "COMMAND"
+
+            with m.State("COMMAND"):
+                with m.If(is_write & (counter == self.command_cycles + self.write_latency_cycles - 1)):
+                    m.next = "DATA"
+                with m.If(~is_write & (counter == self.command_cycles + self.read_latency_cycles - 1)):
+                    m.next = "DATA"
+
+            with m.State("DATA"):
+                with m.If(is_write):
+                    m.d.comb += [
+                        self.write_ready.eq(1),
+                        mem_wr_port.en.eq(~self.write_mask),
+                    ]
                 with m.Else():
+                    m.d.comb += self.read_ready.eq(1)
+                m.d.sync += [
+                    current_address.eq(current_address + 4),
+                    counter.eq(0),
+                ]
+                with m.If(self.final_word):
+                    m.next = "RECOVERY"
+                with m.Elif(page_end):
+                    m.next = "CROSS-PAGE"
+
+            with m.State("CROSS-PAGE"):
+                with m.If(counter == self.recovery_cycles - 1):
+                    m.d.sync += counter.eq(0)
+                    m.next = "COMMAND"
+
+            with m.State("RECOVERY"):
+                with m.If(counter == self.recovery_cycles - 1):
                     m.next = "IDLE"
 
         return m
@@ -48,6 +48,41 @@ async def classic_ack(ctx, bus):
     ctx.set(bus.ack, 0)
     return SimpleNamespace(**result)
 
+async def pipelined_rw(ctx, bus, ops, sel=0xf):
+    """
+    Issue a sequence of wishbone B4 pipelined transactions back-to-back.
+
+    ``ops`` is a list of ``(adr, dat_w)`` tuples, where ``dat_w=None`` is a read.
+    A new transaction is presented every cycle that ``stall`` is deasserted, and
+    ``cyc`` is held until every transaction is acknowledged. Returns a list
+    of ``dat_r`` for each transaction (``None`` for writes).
+    """
+    ctx.set(bus.cyc, 1)
+    ctx.set(bus.sel, sel)
+    issued = 0
+    results = []
+    while len(results) < len(ops):
+        if issued < len(ops):
+            adr, dat_w = ops[issued]
+            ctx.set(bus.stb, 1)
+            ctx.set(bus.adr, adr)
+            ctx.set(bus.we, dat_w is not None)
+            if dat_w is not None:
+                ctx.set(bus.dat_w, dat_w)
+        else:
+            ctx.set(bus.stb, 0)
+        _, _, stb, stall, ack, dat_r = await ctx.tick().sample(
+            bus.stb, bus.stall, bus.ack, bus.dat_r)
+        if ack:
+            _, dat_w = ops[len(results)]
+            results.append(dat_r if dat_w is None else None)
+        if stb and not stall:
+            issued += 1
+    ctx.set(bus.cyc, 0)
+    ctx.set(bus.stb, 0)
+    await ctx.tick()
+    return results
+
 class BusChecker(Elaboratable):
 
     """
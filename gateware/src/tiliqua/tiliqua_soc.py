@@ -64,7 +64,8 @@ class TiliquaSoc(Component):
     def __init__(self, *, firmware_bin_path, ui_name, ui_tag, platform_class, clock_settings,
                  touch=False, finalize_csr_bridge=True, poke_outputs=False, mainram_size=0x4000,
                  fw_location=None, fw_offset=None, cpu_variant="tiliqua_rv32im",
-                 extra_cpu_regions=[], fb_overlay=None):
+                 extra_cpu_regions=[], fb_overlay=None, fb_buffers=1,
+                 fb_skip_empty_tiles=False, persist_skip_empty_tiles=False):
 
         super().__init__({})
 
@@ -76,6 +77,9 @@ class TiliquaSoc(Component):
         self.firmware_bin_path = firmware_bin_path
         self.touch = touch
         self.clock_settings = clock_settings
+        self.fb_buffers = fb_buffers
+        self.fb_skip_empty_tiles = fb_skip_empty_tiles
+        self.persist_skip_empty_tiles = persist_skip_empty_tiles
 
         self.platform_class = platform_class
 
@@ -224,23 +228,30 @@ class TiliquaSoc(Component):
         self.fb = framebuffer.DMAFramebuffer(
                 palette=self.palette_periph.palette,
                 fixed_modeline=self.clock_settings.modeline,
-                overlay=fb_overlay)
-        self.psram_periph.add_master(self.fb.bus)
-
-        # Timing CSRs for video PHY
-        self.framebuffer_periph = framebuffer.Peripheral()
+                overlay=fb_overlay,
+                n_buffers=fb_buffers,
+                skip_empty_tiles=fb_skip_empty_tiles)
+        self.psram_periph.add_master(self.fb.bus, priority=psram.QoSArbiter.REALTIME,
+                                     urgent=self.fb.urgent)
+
+        # Timing (and page flip, if `fb_buffers > 1`) CSRs for video PHY
+        self.framebuffer_periph = framebuffer.Peripheral(n_buffers=fb_buffers)
         self.csr_decoder.add(
                 self.framebuffer_periph.bus, addr=self.fb_periph_base, name="framebuffer_periph")
 
-        # Video persistance DMA effect
+        # Video persistance DMA effect. With multiple framebuffers, this
+        # decays each completed frame into the next back buffer.
         self.persist_periph = persist.Peripheral(
-            bus_dma=self.psram_periph)
+            bus_dma=self.psram_periph, bulk=fb_buffers > 1,
+            skip_empty_tiles=persist_skip_empty_tiles)
         self.csr_decoder.add(self.persist_periph.bus, addr=self.persist_periph_base, name="persist_periph")
 
         # Pixel plotting, blending, rotation backend (no CSR interface)
         self.framebuffer_plotter = plot.FramebufferPlotter(
-            bus_signature=self.psram_periph.bus.signature.flip(), n_ports=3)
-        self.psram_periph.add_master(self.framebuffer_plotter.bus)
+            bus_signature=self.psram_periph.bus.signature.flip(), n_ports=3, n_fill_ports=2)
+        self.psram_periph.add_master(self.framebuffer_plotter.bus,
+                                     priority=psram.QoSArbiter.BEST_EFFORT,
+                                     budget=(256, 1024))
 
         # Pixel plotter CSR interface
         self.pixel_plot = plot.Peripheral()
@@ -362,6 +373,8 @@ class TiliquaSoc(Component):
         wiring.connect(m, self.pixel_plot.o, self.framebuffer_plotter.i[0])
         wiring.connect(m, self.blit.o, self.framebuffer_plotter.i[1])
         wiring.connect(m, self.line.o, self.framebuffer_plotter.i[2])
+        wiring.connect(m, self.blit.fill_o, self.framebuffer_plotter.fill[0])
+        wiring.connect(m, self.line.fill_o, self.framebuffer_plotter.fill[1])
 
         # Connect static/dynamic framebuffer properties to components that need them
         if self.clock_settings.modeline:
@@ -372,13 +385,34 @@ class TiliquaSoc(Component):
                 self.fb.fbp.rotation.eq(self.framebuffer_periph.fbp.rotation),
                 self.fb.fbp.base.eq(self.framebuffer_periph.fbp.base),
             ]
-            wiring.connect(m, wiring.flipped(self.fb.fbp), self.framebuffer_plotter.fbp)
-            wiring.connect(m, wiring.flipped(self.fb.fbp), self.persist_periph.fbp)
         else:
             # Modeline is dynamic and comes from framebuffer peripheral CSRs
             wiring.connect(m, self.framebuffer_periph.fbp, self.fb.fbp)
-            wiring.connect(m, self.framebuffer_periph.fbp, self.framebuffer_plotter.fbp)
-            wiring.connect(m, self.framebuffer_periph.fbp, self.persist_periph.fbp)
+        # Drawing cores always target the back buffer (same as `fb.fbp` if single-buffered)
+        wiring.connect(m, self.fb.draw, self.framebuffer_plotter.fbp)
+        wiring.connect(m, self.fb.draw, self.persist_periph.fbp)
+        # Cores that track empty tiles snoop every nonzero PSRAM write (from any master).
+        shared_bus = self.psram_periph.shared_bus
+        snoop_valid = (shared_bus.cyc & shared_bus.stb & shared_bus.ack &
+                       shared_bus.we & (shared_bus.dat_w != 0))
+        snoopers = []
+        if self.fb_skip_empty_tiles:
+            snoopers.append(self.fb.snoop)
+        if self.persist_skip_empty_tiles:
+            snoopers.append(self.persist_periph.snoop)
+        for snoop in snoopers:
+            m.d.comb += [
+                snoop.valid.eq(snoop_valid),
+                snoop.payload.eq(shared_bus.adr),
+            ]
+        if self.fb_buffers > 1:
+            wiring.connect(m, self.framebuffer_periph.flip, self.fb.flip)
+            m.d.comb += [
+                self.persist_periph.start.eq(self.fb.flip.swapped),
+                self.persist_periph.src_base.eq(self.fb.flip.newest_base),
+                # Don't draw into the new back buffer until it has been seeded.
+                self.framebuffer_plotter.pause.eq(self.persist_periph.busy),
+            ]
 
         # audio interface
         m.submodules.pmod0 = self.pmod0
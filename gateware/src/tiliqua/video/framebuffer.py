@@ -6,9 +6,10 @@
 
 from amaranth import *
 from amaranth.build import *
-from amaranth.lib import data, wiring
+from amaranth.lib import data, stream, wiring
 from amaranth.lib.cdc import FFSynchronizer
 from amaranth.lib.fifo import AsyncFIFOBuffered
+from amaranth.lib.memory import Memory
 from amaranth.lib.wiring import In, Out
 from amaranth.utils import exact_log2
 from amaranth_soc import csr, wishbone
@@ -26,6 +27,42 @@ class DMAFramebuffer(wiring.Component):
        whenever 'burst_threshold_words' space is available in the FIFO.
     - 'dvi' domain: FIFO is drained to the display as required by DVI timings.
     Framebuffer storage: currently fixed at 1byte/pix: 4-bit intensity, 4-bit color.
+
+    With ``n_buffers > 1`` (double or triple buffering), ``n_buffers`` framebuffers
+    are laid out back-to-back in PSRAM starting at ``fbp.base``. One of them (the
+    'front' buffer) is scanned out, and other cores should draw into the 'back' buffer,
+    whose properties are forwarded on ``draw``. A ``flip.request`` presents the back
+    buffer, and takes effect on the next vsync, so the display never tears:
+
+    - Double buffering: the back buffer only changes at vsync, when the old front
+      buffer is handed back for drawing. ``flip.pending`` is high until then, and
+      nothing should be drawn while it is.
+    - Triple buffering: the back buffer changes immediately on ``flip.request``, so
+      drawing does not have to wait for vsync. If another flip is requested before
+      vsync, the newer frame replaces the pending one.
+
+    Every time the back buffer changes, ``flip.swapped`` is strobed and ``flip.newest_base``
+    points at the most recently completed frame, so that a persistence effect can
+    seed the new back buffer from it (see ``raster.persist.Persistance``).
+
+    With ``n_buffers == 1``, ``draw`` is simply a copy of ``fbp``.
+
+    With ``skip_empty_tiles``, scanout bandwidth is reduced by never fetching
+    blank parts of the framebuffer. The framebuffer is split into 'tiles' of
+    ``tile_words`` consecutive words, and a bitmap in BRAM tracks which tiles
+    may contain nonzero pixels. Empty tiles are expanded to zeroes straight into
+    the scanout FIFO, without touching PSRAM. Bits are:
+
+    - Set on any nonzero write to the tile, using ``snoop``, which should see
+      the address of every nonzero write to PSRAM (from any master).
+    - Cleared when a tile is scanned out and all its words were zero.
+
+    Tiles beyond ``max_tiles`` are always fetched.
+
+    ``urgent`` is asserted whenever fewer than ``urgent_threshold_words`` words
+    are left in the scanout FIFO. It is intended to be passed to the PSRAM arbiter
+    (see ``psram.Peripheral.add_master``), so that scanout is served before any
+    other master when the FIFO is about to underrun.
     """
 
     class Properties(wiring.Signature):
@@ -44,6 +81,26 @@ class DMAFramebuffer(wiring.Component):
                 "rotation": Out(Rotation),
             })
 
+    class FlipInterface(wiring.Signature):
+        """
+        Page flip requests and status, for ``n_buffers > 1``.
+        """
+        def __init__(self, n_buffers):
+            super().__init__({
+                # Strobe: present the current back buffer at the next vsync.
+                "request": Out(1),
+                # A flip has been requested but vsync has not happened yet.
+                "pending": In(1),
+                # Index of buffer being scanned out
+                "front": In(range(n_buffers)),
+                # Index of buffer that should be drawn into
+                "back": In(range(n_buffers), init=1),
+                # Strobe: the back buffer has just changed.
+                "swapped": In(1),
+                # Base address of the most recently completed frame.
+                "newest_base": In(22),
+            })
+
     class SimulationInterface(wiring.Signature):
         """
         Enough information for simulation to plot the output of this core to bitmaps.
@@ -59,12 +116,24 @@ class DMAFramebuffer(wiring.Component):
             })
 
     def __init__(self, *, palette, addr_width=22, fifo_depth=512,
-                 burst_threshold_words=128, fixed_modeline=None, overlay=None):
-
+                 burst_threshold_words=128, fixed_modeline=None, overlay=None,
+                 n_buffers=1, skip_empty_tiles=False, tile_words=16, max_tiles=16384,
+                 urgent_threshold_words=None):
+
+        assert n_buffers in [1, 2, 3]
+        # The tile bitmap only tracks a single buffer.
+        assert not (skip_empty_tiles and n_buffers > 1)
+        assert tile_words >= 2 and tile_words <= burst_threshold_words
+        self.n_buffers = n_buffers
+        self.skip_empty_tiles = skip_empty_tiles
+        self.tile_words = tile_words
+        self.max_tiles = max_tiles
         self.fifo_depth = fifo_depth
         assert (Pixel.as_shape().size % 8) == 0
         self.bytes_per_pixel = Pixel.as_shape().size // 8
         self.burst_threshold_words = burst_threshold_words
+        self.urgent_threshold_words = (urgent_threshold_words if urgent_threshold_words is not None
+                                       else fifo_depth // 4)
         self.fixed_modeline = fixed_modeline
         self.palette = palette
         self._overlay = overlay
@@ -75,9 +144,19 @@ class DMAFramebuffer(wiring.Component):
                                            features={"cti", "bte"})),
             # Dynamic timing / modeline information shared with other cores.
             "fbp": In(self.Properties()),
+            # Properties of the buffer that other cores should draw into.
+            "draw": Out(self.Properties()),
             # Enough information to plot the output of this core to images
-            "simif": Out(self.SimulationInterface())
-        })
+            "simif": Out(self.SimulationInterface()),
+            # Scanout FIFO is running low, for the PSRAM arbiter.
+            "urgent": Out(1),
+        } | ({
+            # Page flipping control / status
+            "flip": In(self.FlipInterface(n_buffers)),
+        } if n_buffers > 1 else {}) | ({
+            # Word address of every nonzero write to the backing store.
+            "snoop": In(stream.Signature(unsigned(addr_width), always_ready=True)),
+        } if skip_empty_tiles else {}))
 
     def elaborate(self, platform) -> Module:
         m = Module()
@@ -89,6 +168,8 @@ class DMAFramebuffer(wiring.Component):
         m.submodules.fifo = fifo = AsyncFIFOBuffered(
                 width=32, depth=self.fifo_depth, r_domain='dvi', w_domain='sync')
 
+        m.d.comb += self.urgent.eq(fifo.w_level < self.urgent_threshold_words)
+
         m.submodules.dvi_tgen = dvi_tgen = dvi.DVITimingGen()
 
         # TODO: FFSync needed? (sync -> dvi crossing, but should always be in reset when changed).
@@ -111,10 +192,146 @@ class DMAFramebuffer(wiring.Component):
 
         fb_size_words = (self.fbp.timings.active_pixels * self.bytes_per_pixel) // 4
 
+        # Everything except the base address is shared by all buffers.
+        m.d.comb += [
+            self.draw.enable.eq(self.fbp.enable),
+            self.draw.rotation.eq(self.fbp.rotation),
+        ]
+        for member in self.fbp.timings.signature.members:
+            m.d.comb += getattr(self.draw.timings, member).eq(getattr(self.fbp.timings, member))
+
+        # Base address of the buffer being scanned out, which may only change
+        # on 'frame_start', right before the first burst of each frame.
+        scan_base = Signal.like(self.fbp.base)
+        frame_start = Signal()
+
+        if self.n_buffers == 1:
+            m.d.comb += [
+                scan_base.eq(self.fbp.base),
+                self.draw.base.eq(self.fbp.base),
+            ]
+        else:
+            flip = self.flip
+            buffer_base = Array(self.fbp.base + n*fb_size_words
+                                for n in range(self.n_buffers))
+            # Buffer to be scanned out after the pending flip.
+            next_front = Signal.like(flip.front)
+            m.d.comb += [
+                scan_base.eq(buffer_base[flip.front]),
+                self.draw.base.eq(buffer_base[flip.back]),
+                flip.newest_base.eq(buffer_base[Mux(flip.pending, next_front, flip.front)]),
+            ]
+            m.d.sync += flip.swapped.eq(0)
+            with m.If(frame_start & flip.pending):
+                m.d.sync += [
+                    flip.front.eq(next_front),
+                    flip.pending.eq(0),
+                ]
+                if self.n_buffers == 2:
+                    m.d.sync += [
+                        flip.back.eq(flip.front),
+                        flip.swapped.eq(1),
+                    ]
+                else:
+                    with m.If(flip.request):
+                        # Simultaneous flip request, the old front buffer
+                        # is the only one free.
+                        m.d.sync += [
+                            next_front.eq(flip.back),
+                            flip.back.eq(flip.front),
+                            flip.pending.eq(1),
+                            flip.swapped.eq(1),
+                        ]
+            with m.Elif(flip.request):
+                if self.n_buffers == 2:
+                    with m.If(~flip.pending):
+                        m.d.sync += [
+                            next_front.eq(flip.back),
+                            flip.pending.eq(1),
+                        ]
+                else:
+                    # Draw into whichever buffer is neither scanned out
+                    # nor waiting to be. If a flip is already pending,
+                    # that frame is dropped and drawn over.
+                    m.d.sync += [
+                        next_front.eq(flip.back),
+                        flip.back.eq(Mux(flip.pending, next_front,
+                                         3 - flip.front - flip.back)),
+                        flip.pending.eq(1),
+                        flip.swapped.eq(1),
+                    ]
+
+        if self.skip_empty_tiles:
+            tile_bits = exact_log2(self.tile_words)
+            m.submodules.tile_mem = tile_mem = Memory(
+                shape=1, depth=self.max_tiles, init=[])
+            tile_wr = tile_mem.write_port()
+            tile_rd = tile_mem.read_port(transparent_for=(tile_wr,))
+            # Tile currently being scanned out
+            cur_tile = Signal(range(2**len(dma_addr)))
+            m.d.comb += cur_tile.eq(dma_addr >> tile_bits)
+            start_of_tile = Signal()
+            end_of_tile = Signal()
+            m.d.comb += [
+                start_of_tile.eq(dma_addr[:tile_bits] == 0),
+                end_of_tile.eq(dma_addr[:tile_bits] == (self.tile_words-1)),
+            ]
+            # Snooped writes that may make a tile nonzero.
+            snoop_offset = Signal(len(self.snoop.payload))
+            snoop_tile = Signal(len(self.snoop.payload))
+            snoop_hit = Signal()
+            m.d.comb += [
+                snoop_offset.eq(self.snoop.payload - self.fbp.base),
+                snoop_tile.eq(snoop_offset >> tile_bits),
+                snoop_hit.eq(self.snoop.valid & (snoop_offset < fb_size_words) &
+                             (snoop_tile < self.max_tiles)),
+            ]
+            # Flags accumulated over each tile as it is scanned out, to decide
+            # whether it can be marked empty.
+            tile_nonzero = Signal()
+            tile_touched = Signal()
+            tile_clear = Signal()
+            with m.If(snoop_hit & (snoop_tile == cur_tile)):
+                m.d.sync += tile_touched.eq(1)
+            # While bursting, look up whether the next tile can be skipped.
+            # Only valid after 1 cycle in 'BURST', as the bitmap read is synchronous.
+            lookahead_valid = Signal()
+            next_tile_dirty = Signal()
+            m.d.comb += next_tile_dirty.eq(
+                tile_rd.data | ~lookahead_valid | (cur_tile + 1 >= self.max_tiles))
+            # Write port is shared, with priority: init > set > clear. A dropped
+            # clear only means the tile is fetched for one more frame.
+            init_tile = Signal(range(self.max_tiles))
+            with m.If(snoop_hit):
+                m.d.comb += [
+                    tile_wr.addr.eq(snoop_tile),
+                    tile_wr.data.eq(1),
+                    tile_wr.en.eq(1),
+                ]
+            with m.Elif(tile_clear & (cur_tile < self.max_tiles)):
+                m.d.comb += [
+                    tile_wr.addr.eq(cur_tile),
+                    tile_wr.data.eq(0),
+                    tile_wr.en.eq(1),
+                ]
+
         # Read to FIFO in sync domain
         with m.FSM() as fsm:
+            if self.skip_empty_tiles:
+                with m.State('TILE-INIT'):
+                    # Start with every tile dirty, so everything is fetched
+                    # at least once after each reset.
+                    m.d.comb += [
+                        tile_wr.addr.eq(init_tile),
+                        tile_wr.data.eq(1),
+                        tile_wr.en.eq(1),
+                    ]
+                    m.d.sync += init_tile.eq(init_tile + 1)
+                    with m.If(init_tile == (self.max_tiles - 1)):
+                        m.next = 'WAIT-VSYNC'
             with m.State('WAIT-VSYNC'):
                 with m.If(phy_vsync_sync):
+                    m.d.comb += frame_start.eq(1)
                     m.d.sync += dma_addr.eq(0)
                     m.next = 'WAIT'
             with m.State('BURST'):
@@ -123,7 +340,7 @@ class DMAFramebuffer(wiring.Component):
                     bus.cyc.eq(1),
                     bus.we.eq(0),
                     bus.sel.eq(2**(bus.data_width//8)-1),
-                    bus.adr.eq(self.fbp.base + dma_addr),
+                    bus.adr.eq(scan_base + dma_addr),
                     fifo.w_en.eq(bus.ack),
                     fifo.w_data.eq(bus.dat_r),
                     bus.cti.eq(
@@ -136,6 +353,25 @@ class DMAFramebuffer(wiring.Component):
                         dma_addr.eq(dma_addr+1),
                     ]
 
+                if self.skip_empty_tiles:
+                    m.d.comb += tile_rd.addr.eq(cur_tile + 1)
+                    with m.If(bus.ack):
+                        with m.If(start_of_tile):
+                            m.d.sync += [
+                                tile_nonzero.eq(bus.dat_r != 0),
+                                tile_touched.eq(snoop_hit & (snoop_tile == cur_tile)),
+                            ]
+                        with m.Elif(bus.dat_r != 0):
+                            m.d.sync += tile_nonzero.eq(1)
+                        with m.If(end_of_tile):
+                            m.d.comb += tile_clear.eq(
+                                ~tile_nonzero & (bus.dat_r == 0) & ~tile_touched)
+                    with m.If(end_of_tile & ~next_tile_dirty):
+                        m.d.comb += bus.cti.eq(
+                                wishbone.CycleType.END_OF_BURST)
+                        with m.If(bus.ack):
+                            m.next = 'TILE-SKIP'
+
                 with m.If((fifo.w_level == (self.fifo_depth-1)) |
                           (burst_cnt == self.burst_threshold_words)):
                     m.d.comb += bus.cti.eq(
@@ -150,7 +386,41 @@ class DMAFramebuffer(wiring.Component):
             with m.State('WAIT'):
                 with m.If(fifo.w_level < self.fifo_depth-self.burst_threshold_words):
                     m.d.sync += burst_cnt.eq(0)
-                    m.next = 'BURST'
+                    if self.skip_empty_tiles:
+                        with m.If(start_of_tile):
+                            m.next = 'TILE-LOOKUP'
+                        with m.Else():
+                            m.next = 'BURST'
+                    else:
+                        m.next = 'BURST'
+
+            if self.skip_empty_tiles:
+                with m.State('TILE-LOOKUP'):
+                    m.d.comb += tile_rd.addr.eq(cur_tile)
+                    m.next = 'TILE-DECIDE'
+
+                with m.State('TILE-DECIDE'):
+                    m.d.comb += tile_rd.addr.eq(cur_tile)
+                    with m.If(tile_rd.data | (cur_tile >= self.max_tiles)):
+                        m.next = 'BURST'
+                    with m.Else():
+                        m.next = 'TILE-SKIP'
+
+                with m.State('TILE-SKIP'):
+                    # Empty tile: zeroes straight into the FIFO, no bus access.
+                    m.d.comb += [
+                        fifo.w_en.eq(1),
+                        fifo.w_data.eq(0),
+                    ]
+                    with m.If(fifo.w_rdy):
+                        m.d.sync += dma_addr.eq(dma_addr+1)
+                        with m.If(dma_addr == (fb_size_words-1)):
+                            m.next = 'WAIT-VSYNC'
+                        with m.Elif(end_of_tile):
+                            m.next = 'WAIT'
+
+        if self.skip_empty_tiles:
+            m.d.sync += lookahead_valid.eq(fsm.ongoing('BURST'))
 
         # -- DVI domain pixel stream to PHY --
 
@@ -212,6 +482,11 @@ class Peripheral(wiring.Component):
     """
     CSR peripheral for tweaking framebuffer timing/palette parameters from an SoC.
     Timing values follow the same format as DVIModeline in modeline.py.
+
+    With ``n_buffers > 1``, ``flip`` and ``flip_status`` registers are added for
+    page flipping (see ``DMAFramebuffer``). Firmware should draw a frame, write
+    ``flip``, and (for double buffering) poll ``flip_status.pending`` until it is
+    cleared before drawing the next one.
     """
 
     class HTimingReg(csr.Register, access="w"):
@@ -246,7 +521,17 @@ class Peripheral(wiring.Component):
         # DVI hot plug detect
         hpd: csr.Field(csr.action.R, unsigned(1))
 
-    def __init__(self):
+    class FlipReg(csr.Register, access="w"):
+        # Present the back buffer at the next vsync
+        flip: csr.Field(csr.action.W, unsigned(1))
+
+    class FlipStatusReg(csr.Register, access="r"):
+        pending: csr.Field(csr.action.R, unsigned(1))
+        front:   csr.Field(csr.action.R, unsigned(2))
+        back:    csr.Field(csr.action.R, unsigned(2))
+
+    def __init__(self, n_buffers=1):
+        self.n_buffers = n_buffers
         regs = csr.Builder(addr_width=6, data_width=8)
 
         self._h_timing     = regs.add("h_timing",     self.HTimingReg(),     offset=0x00)
@@ -257,13 +542,18 @@ class Peripheral(wiring.Component):
         self._flags        = regs.add("flags",        self.FlagsReg(),       offset=0x14)
         self._fb_base      = regs.add("fb_base",      self.FBBaseReg(),      offset=0x18)
         self._hpd          = regs.add("hpd",          self.HpdReg(),         offset=0x1C)
+        if n_buffers > 1:
+            self._flip        = regs.add("flip",        self.FlipReg(),        offset=0x20)
+            self._flip_status = regs.add("flip_status", self.FlipStatusReg(),  offset=0x24)
 
         self._bridge = csr.Bridge(regs.as_memory_map())
 
         super().__init__({
             "bus": In(csr.Signature(addr_width=regs.addr_width, data_width=regs.data_width)),
             "fbp": Out(DMAFramebuffer.Properties()),
-        })
+        } | ({
+            "flip": Out(DMAFramebuffer.FlipInterface(n_buffers)),
+        } if n_buffers > 1 else {}))
 
         self.bus.memory_map = self._bridge.bus.memory_map
 
@@ -297,6 +587,14 @@ class Peripheral(wiring.Component):
         with m.If(self._fb_base.f.fb_base.w_stb):
             m.d.sync += self.fbp.base.eq(self._fb_base.f.fb_base.w_data)
 
+        if self.n_buffers > 1:
+            m.d.comb += [
+                self.flip.request.eq(self._flip.f.flip.w_stb & self._flip.f.flip.w_data),
+                self._flip_status.f.pending.r_data.eq(self.flip.pending),
+                self._flip_status.f.front.r_data.eq(self.flip.front),
+                self._flip_status.f.back.r_data.eq(self.flip.back),
+            ]
+
         if sim.is_hw(platform):
             m.d.comb += self._hpd.f.hpd.r_data.eq(platform.request("dvi_hpd").i)
         else:
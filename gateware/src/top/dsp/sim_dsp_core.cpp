@@ -15,6 +15,7 @@
 #include "plot.h"
 #include "i2s.h"
 #include "psram.h"
+#include "clocks.h"
 
 #include <cmath>
 
@@ -74,32 +75,22 @@ int main(int argc, char** argv) {
         i2s_driver.inject_sample(3, (int16_t)10000.0*sin((float)i /  5.0));
     }
 
-    while (contextp->time() < sim_time && !contextp->gotFinish()) {
-
-        uint64_t timestamp_ns = contextp->time() / 1000;
-
-        // Sync clock domain (PSRAM read/write simulation)
-        if (timestamp_ns % (ns_in_sync_cycle/2) == 0) {
-            top->clk_sync = !top->clk_sync;
+    ClockScheduler clocks(contextp, top);
+    // Sync clock domain (PSRAM read/write simulation)
 #ifdef PSRAM_SIM
-            psram_driver.post_edge();
+    clocks.add("sync", &top->clk_sync, SYNC_CLK_HZ,
+               [&] { psram_driver.post_edge(); });
+#else
+    clocks.add("sync", &top->clk_sync, SYNC_CLK_HZ);
 #endif
-        }
-
+    // Audio clock domain (Audio stimulation)
+    clocks.add("audio", &top->clk_audio, AUDIO_CLK_HZ,
+               [&] { i2s_driver.post_edge(); });
+    // Fast clock domain (RAM domain simulation)
+    clocks.add("fast", &top->clk_fast, FAST_CLK_HZ);
 
-        // Audio clock domain (Audio stimulation)
-        if (timestamp_ns % (ns_in_audio_cycle/2) == 0) {
-            top->clk_audio = !top->clk_audio;
-            i2s_driver.post_edge();
-        }
-
-        // Fast clock domain (RAM domain simulation)
-        if (timestamp_ns % (ns_in_fast_cycle/2) == 0) {
-            top->clk_fast = !top->clk_fast;
-        }
-
-        contextp->timeInc(1000);
-        top->eval();
+    while (contextp->time() < sim_time && !contextp->gotFinish()) {
+        clocks.step();
 #if defined VM_TRACE_FST && VM_TRACE_FST == 1
         tfp->dump(contextp->time());
 #endif
@@ -108,6 +99,7 @@ int main(int argc, char** argv) {
 #ifdef PSRAM_SIM
     psram_driver.post_sim();
 #endif
+    clocks.report();
 
 #if defined VM_TRACE_FST && VM_TRACE_FST == 1
     tfp->close();
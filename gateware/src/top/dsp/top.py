@@ -784,11 +784,10 @@ class PSRAMMultiDiffuser(wiring.Component):
 
     Its also useful for stress-testing the memory interface logic.
 
-    With 2x PSRAM-backed diffusers that's 8x simultaneous 48kHz audio streams hitting the
-    PSRAM (4 write streams, 4 read streams). In simulation the PSRAM controller is blocking
-    ~15% of the time. Looking at the traces it seems the cache is bursting twice as often
-    as it really needs to (in theory), so probably tweaking the cache architecture could
-    get the PSRAM bandwidth consumption down considerably.
+    With 2x PSRAM-backed diffusers that's 16x simultaneous 48kHz audio streams hitting the
+    PSRAM (8 write streams, 8 read streams). Rather than a cache per delay line, all
+    PSRAM-backed delay lines are served by a single :class:`dsp.DelayLineEngine`, which
+    only ever issues full bursts and occupies a single PSRAM arbiter port.
     """
 
     i: In(stream.Signature(data.ArrayLayout(ASQ, 4)))
@@ -817,6 +816,8 @@ class PSRAMMultiDiffuser(wiring.Component):
         max_delay = 0x10000
         sram_max_delay = 1024 # if taps are smaller than this, use SRAM delay line.
         spacing   = max_delay*len(self.delay_set[0])
+        # All PSRAM-backed delay lines share one memory engine.
+        self.engine = dsp.DelayLineEngine(addr_width_o=self.bus.addr_width)
         self.delay_lines = {}
         for n in self.delay_set:
             self.delay_lines[n] = []
@@ -824,10 +825,8 @@ class PSRAMMultiDiffuser(wiring.Component):
             for ix, _ in enumerate(self.delay_set[n]):
                 if psram_backed:
                     self.delay_lines[n].append(
-                        dsp.DelayLine(
+                        self.engine.add_delay_line(
                             max_delay=max_delay,
-                            psram_backed=True,
-                            addr_width_o=self.bus.addr_width,
                             base=2*(n*spacing + max_delay*ix),
                         )
                     )
@@ -839,15 +838,6 @@ class PSRAMMultiDiffuser(wiring.Component):
                         )
                     )
 
-        self._arbiter = wishbone.Arbiter(addr_width=self.bus.addr_width,
-                                         data_width=self.bus.data_width,
-                                         granularity=self.bus.granularity,
-                                         features=self.bus.features)
-        for n in self.delay_set:
-            for delayln in self.delay_lines[n]:
-                if delayln.psram_backed:
-                    self._arbiter.add(delayln.bus)
-
         self.diffusers = {}
         for n in self.delay_set:
             self.diffusers[n] = dsp.delay_effect.Diffuser(self.delay_lines[n], delays=self.delay_set[n])
@@ -855,12 +845,14 @@ class PSRAMMultiDiffuser(wiring.Component):
     def elaborate(self, platform):
         m = Module()
 
-        m.submodules.arbiter = self._arbiter
-        wiring.connect(m, self._arbiter.bus, wiring.flipped(self.bus))
+        m.submodules.engine = self.engine
+        wiring.connect(m, self.engine.bus, wiring.flipped(self.bus))
 
         for n in self.delay_set:
             m.submodules += self.diffusers[n]
-            m.submodules += self.delay_lines[n]
+            # PSRAM-backed delay lines are submodules of the engine.
+            m.submodules += [delayln for delayln in self.delay_lines[n]
+                             if not delayln.psram_backed]
 
         wiring.connect(m, wiring.flipped(self.i), self.diffusers[0].i)
         wiring.connect(m, self.diffusers[0].o, self.diffusers[1].i)
@@ -1312,6 +1304,8 @@ def simulation_ports(fragment):
             "write_data":     (fragment.psram_periph.simif.write_data,     None),
             "read_ready":     (fragment.psram_periph.simif.read_ready,     None),
             "write_ready":    (fragment.psram_periph.simif.write_ready,    None),
+            "psram_port_cyc": (fragment.psram_periph.simif_ports.cyc,      None),
+            "psram_port_ack": (fragment.psram_periph.simif_ports.ack,      None),
         }
     return ports
 
@@ -242,7 +242,7 @@ class MacroOscSoc(TiliquaSoc):
             wiring.connect(m, self.scope_periph.o[n], self.plotter.i[n+1])
 
         # Connect framebuffer propreties to plotter backend
-        wiring.connect(m, wiring.flipped(self.fb.fbp), self.plotter.fbp)
+        wiring.connect(m, self.fb.draw, self.plotter.fbp)
 
         m.submodules += self.audio_fifo
 
@@ -578,7 +578,7 @@ class PolySoc(TiliquaSoc):
 
         wiring.connect(m, self.vector_periph.o, self.plotter.i[0])
 
-        wiring.connect(m, wiring.flipped(self.fb.fbp), self.plotter.fbp)
+        wiring.connect(m, self.fb.draw, self.plotter.fbp)
 
         m.submodules.polysynth = polysynth = PolySynth()
         self.synth_periph.synth = polysynth
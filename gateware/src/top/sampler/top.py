@@ -71,7 +71,7 @@ from tiliqua.build import sim
 from tiliqua.build.cli import top_level_cli
 from tiliqua.build.types import BitstreamHelp
 from tiliqua.dsp import ASQ
-from tiliqua.periph import eurorack_pmod, grain_player, delay_line
+from tiliqua.periph import eurorack_pmod, grain_player, delay_line, psram
 from tiliqua.tiliqua_soc import TiliquaSoc
 
 class SamplerPeripheral(wiring.Component):
@@ -146,7 +146,7 @@ class SamplerSoc(TiliquaSoc):
             addr_width_o=self.psram_periph.bus.addr_width,
             base=self.DELAYLN_START,
             write_triggers_read=False)
-        self.psram_periph.add_master(self.delayln.bus)
+        self.psram_periph.add_master(self.delayln.bus, priority=psram.QoSArbiter.REALTIME)
         self.delayln_periph = delay_line.Peripheral(self.delayln, psram_base=self.psram_base)
         self.csr_decoder.add(self.delayln_periph.csr_bus, addr=self.PERIPH_BASE+0x100, name=f"delayln_periph0")
 
@@ -295,7 +295,7 @@ class SIDSoc(TiliquaSoc):
             wiring.connect(m, self.scope_periph.o[n], self.plotter.i[n])
 
         # Connect framebuffer propreties to plotter backend
-        wiring.connect(m, wiring.flipped(self.fb.fbp), self.plotter.fbp)
+        wiring.connect(m, self.fb.draw, self.plotter.fbp)
 
         m.submodules += super().elaborate(platform)
 
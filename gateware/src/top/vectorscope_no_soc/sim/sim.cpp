@@ -9,22 +9,10 @@
 #include "i2s.h"
 #include "psram.h"
 #include "dvi.h"
+#include "clocks.h"
 
 #include <cmath>
 
-int gcd(int a, int b)
-{
-    int temp;
-    while (b != 0)
-    {
-        temp = a % b;
-
-        a = b;
-        b = temp;
-    }
-    return a;
-}
-
 int main(int argc, char** argv) {
     VerilatedContext* contextp = new VerilatedContext;
     contextp->commandArgs(argc, argv);
@@ -48,10 +36,6 @@ int main(int argc, char** argv) {
     printf("pixel clock is: %i KHz (%i ns/cycle)\n",   DVI_CLK_HZ/1000,   ns_in_dvi_cycle);
     printf("audio clock is: %i KHz (%i ns/cycle)\n", AUDIO_CLK_HZ/1000, ns_in_audio_cycle);
 
-    uint64_t clk_gcd = gcd(SYNC_CLK_HZ, DVI_CLK_HZ);
-    uint64_t ns_in_gcd = ns_in_s / clk_gcd;
-    printf("GCD is: %i KHz (%i ns/cycle)\n", clk_gcd/1000, ns_in_gcd);
-
     contextp->timeInc(1);
     top->rst_sync = 1;
     top->rst_dvi = 1;
@@ -81,36 +65,26 @@ int main(int argc, char** argv) {
         i2s_driver.inject_sample(1, (int16_t)10000.0*sin((float)i /  150.0));
     }
 
-    while (contextp->time() < sim_time && !contextp->gotFinish()) {
+    ClockScheduler clocks(contextp, top);
+    // DVI clock domain (PHY output simulation to bitmap image)
+    clocks.add("dvi", &top->clk_dvi, DVI_CLK_HZ,
+               [&] { dvi_driver.post_edge(); });
+    // Sync clock domain (PSRAM read/write simulation)
+    clocks.add("sync", &top->clk_sync, SYNC_CLK_HZ,
+               [&] { psram_driver.post_edge(); });
+    // Audio clock domain (Audio stimulation)
+    clocks.add("audio", &top->clk_audio, AUDIO_CLK_HZ,
+               [&] { i2s_driver.post_edge(); });
 
-        uint64_t timestamp_ns = contextp->time() / 1000;
-
-        // DVI clock domain (PHY output simulation to bitmap image)
-        if (timestamp_ns % (ns_in_dvi_cycle/2) == 0) {
-            top->clk_dvi = !top->clk_dvi;
-            dvi_driver.post_edge();
-        }
-
-        // Sync clock domain (PSRAM read/write simulation)
-        if (timestamp_ns % (ns_in_sync_cycle/2) == 0) {
-            top->clk_sync = !top->clk_sync;
-            psram_driver.post_edge();
-        }
-
-        // Audio clock domain (Audio stimulation)
-        if (timestamp_ns % (ns_in_audio_cycle/2) == 0) {
-            top->clk_audio = !top->clk_audio;
-            i2s_driver.post_edge();
-        }
-
-        contextp->timeInc(1000);
-        top->eval();
+    while (contextp->time() < sim_time && !contextp->gotFinish()) {
+        clocks.step();
 #if VM_TRACE_FST == 1
         tfp->dump(contextp->time());
 #endif
     }
 
     psram_driver.post_sim();
+    clocks.report();
 
 #if VM_TRACE_FST == 1
     tfp->close();
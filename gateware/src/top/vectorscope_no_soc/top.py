@@ -79,11 +79,13 @@ class VectorScopeTop(Elaboratable):
         self.palette = palette.ColorPalette()
         self.fb = framebuffer.DMAFramebuffer(
             fixed_modeline=clock_settings.modeline, palette=self.palette)
-        self.psram_periph.add_master(self.fb.bus)
+        self.psram_periph.add_master(self.fb.bus, priority=psram.QoSArbiter.REALTIME,
+                                     urgent=self.fb.urgent)
 
         # Initiator 2: Persistance / phosphor decay (decays framebuffer intensity)
         self.persist = Persistance(bus_signature=self.fb.bus.signature)
-        self.psram_periph.add_master(self.persist.bus)
+        self.psram_periph.add_master(self.persist.bus, priority=psram.QoSArbiter.BEST_EFFORT,
+                                     budget=(256, 1024))
 
         # Initiator 3: Plotting backend (internal cache, blend writes to framebuffer)
         self.fb_plot = FramebufferPlotter(bus_signature=self.fb.bus.signature, n_ports=1)
@@ -238,6 +240,8 @@ def simulation_ports(fragment):
         "write_data":     (fragment.psram_periph.simif.write_data,     None),
         "read_ready":     (fragment.psram_periph.simif.read_ready,     None),
         "write_ready":    (fragment.psram_periph.simif.write_ready,    None),
+        "psram_port_cyc": (fragment.psram_periph.simif_ports.cyc,      None),
+        "psram_port_ack": (fragment.psram_periph.simif_ports.ack,      None),
         "dvi_de":         (fragment.fb.simif.de,                    None),
         "dvi_vsync":      (fragment.fb.simif.vsync,                 None),
         "dvi_hsync":      (fragment.fb.simif.hsync,                 None),
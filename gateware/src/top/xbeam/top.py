@@ -325,7 +325,7 @@ class XbeamSoc(TiliquaSoc):
             wiring.connect(m, self.scope_periph.o[n], self.plotter.i[n+1])
 
         # Connect framebuffer properties to plotter backend
-        wiring.connect(m, wiring.flipped(self.fb.fbp), self.plotter.fbp)
+        wiring.connect(m, self.fb.draw, self.plotter.fbp)
 
         # FIXME: bit of a hack so we can pluck out peripherals from `tiliqua_soc`
         m.submodules += super().elaborate(platform)
@@ -7,35 +7,45 @@ import unittest
 from amaranth import *
 from amaranth.lib import wiring
 from amaranth.sim import *
+from amaranth_soc import wishbone as soc_wishbone
+from parameterized import parameterized
 
-from tiliqua.test import wishbone, psram
+from tiliqua.test import wishbone, psram, stream
 from tiliqua.cache import WishboneL2Cache
+from tiliqua.raster import plot
 
 class CacheTests(unittest.TestCase):
-    def setUp(self):
-        self.cache = WishboneL2Cache(
+
+    @parameterized.expand([
+        ["direct_mapped", 1, False],
+        ["2way", 2, False],
+        ["4way", 4, False],
+        ["direct_mapped_wbuf", 1, True],
+        ["4way_wbuf", 4, True],
+    ])
+    def test_cache_basic_operations(self, name, ways, writeback_buffer):
+
+        m = Module()
+
+        cache = WishboneL2Cache(
             cachesize_words=64,
             addr_width=22,
             data_width=32,
             granularity=8,
-            burst_len=4
+            burst_len=4,
+            ways=ways,
+            writeback_buffer=writeback_buffer,
         )
-        self.psram = psram.FakePSRAM()
-
-    def test_cache_basic_operations(self):
-
-        m = Module()
-
-        m.submodules.cache = self.cache
-        m.submodules.psram = self.psram
+        m.submodules.cache = cache
+        m.submodules.psram = psram_ = psram.FakePSRAM()
 
-        wiring.connect(m, self.cache.slave, self.psram.bus)
+        wiring.connect(m, cache.slave, psram_.bus)
 
-        m.submodules.m_check = wishbone.BusChecker(self.cache.master, prefix='[usr] ')
-        m.submodules.s_check = wishbone.BusChecker(self.cache.slave, prefix='[ram] ')
+        m.submodules.m_check = wishbone.BusChecker(cache.master, prefix='[usr] ')
+        m.submodules.s_check = wishbone.BusChecker(cache.slave, prefix='[ram] ')
 
         async def testbench(ctx):
-            master = self.cache.master
+            master = cache.master
 
             # Test 1: Simple read miss (should trigger refill)
             await wishbone.classic_rd(ctx, master, adr=0x100)
@@ -50,19 +60,282 @@ class CacheTests(unittest.TestCase):
             data = await wishbone.classic_rd(ctx, master, adr=0x101)
             self.assertEqual(data, 0xdeadbeef)
 
-            # Test 5: Miss to different cache line (should trigger evict + refill)
+            # Test 5: Miss to different cache line (should trigger evict + refill
+            # if direct-mapped, otherwise it is refilled into a different way)
             await wishbone.classic_rd(ctx, master, adr=0x180)
 
             # Test 6: Read back the data flushed earlier
             data = await wishbone.classic_rd(ctx, master, adr=0x101)
             self.assertEqual(data, 0xdeadbeef)
 
+            # Test 7: Write to every way of the same set (and one more, so
+            # something must be evicted), then read everything back.
+            addrs = [0x40*n + 2 for n in range(ways+1)]
+            for n, adr in enumerate(addrs):
+                await wishbone.classic_wr(ctx, master, adr=adr, dat_w=0x1000+n)
+            for n, adr in enumerate(addrs):
+                data = await wishbone.classic_rd(ctx, master, adr=adr)
+                self.assertEqual(data, 0x1000+n)
+
         sim = Simulator(m)
         sim.add_clock(1e-6)  # 1MHz clock
         sim.add_testbench(testbench)
 
-        with sim.write_vcd(vcd_file=open("test_cache_basic.vcd", "w")):
+        with sim.write_vcd(vcd_file=open(f"test_cache_basic_{name}.vcd", "w")):
+            sim.run()
+
+    @parameterized.expand([
+        ["direct_mapped", 1, False],
+        ["4way", 4, False],
+        ["4way_wbuf", 4, True],
+    ])
+    def test_cache_pipelined(self, name, ways, writeback_buffer):
+
+        m = Module()
+
+        cache = WishboneL2Cache(cachesize_words=64, ways=ways, pipelined=True,
+                                writeback_buffer=writeback_buffer)
+        m.submodules.cache = cache
+        m.submodules.psram = psram_ = psram.FakePSRAM()
+        wiring.connect(m, cache.slave, psram_.bus)
+        m.submodules.s_check = wishbone.BusChecker(cache.slave, prefix='[ram] ')
+
+        async def testbench(ctx):
+            master = cache.master
+            # Back-to-back writes and reads, including misses (stalls),
+            # read-after-write and evictions of dirty lines.
+            addrs = [0x100, 0x101, 0x102, 0x180, 0x1c3, 0x103, 0x40, 0x0]
+            ops = [(adr, 0x5000 + adr) for adr in addrs]
+            ops += [(adr, None) for adr in reversed(addrs)]
+            results = await wishbone.pipelined_rw(ctx, master, ops)
+            self.assertEqual(results[len(addrs):],
+                             [0x5000 + adr for adr in reversed(addrs)])
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open(f"test_cache_pipelined_{name}.vcd", "w")):
+            sim.run()
+
+    def test_cache_writeback_buffer_latency(self):
+
+        """
+        Compare the latency of a read miss that must replace a dirty line,
+        with and without the write-back buffer.
+        """
+
+        results = {}
+
+        for writeback_buffer in [False, True]:
+
+            m = Module()
+            cache = WishboneL2Cache(cachesize_words=64, writeback_buffer=writeback_buffer)
+            m.submodules.cache = cache
+            m.submodules.psram = psram_ = psram.FakePSRAM()
+            wiring.connect(m, cache.slave, psram_.bus)
+            m.submodules.s_check = wishbone.BusChecker(cache.slave, prefix='[ram] ')
+            cycles = Signal(32)
+            m.d.sync += cycles.eq(cycles+1)
+
+            async def testbench(ctx):
+                master = cache.master
+                # Dirty the line, then miss on a different line in the same set.
+                await wishbone.classic_wr(ctx, master, adr=0x100, dat_w=0xcafe)
+                start = ctx.get(cycles)
+                await wishbone.classic_rd(ctx, master, adr=0x180)
+                results[writeback_buffer] = ctx.get(cycles) - start
+                # The victim must have made it to the backing store.
+                data = await wishbone.classic_rd(ctx, master, adr=0x100)
+                self.assertEqual(data, 0xcafe)
+
+            sim = Simulator(m)
+            sim.add_clock(1e-6)
+            sim.add_testbench(testbench)
+            sim.run()
+
+            print(f"writeback_buffer={writeback_buffer}: dirty miss took "
+                  f"{results[writeback_buffer]} cycles")
+
+        self.assertLess(results[True], results[False])
+
+    def test_cache_autoflush_writeback_buffer(self):
+
+        """
+        Autoflush should drain dirty lines through the write-back buffer,
+        and invalidate them (so they are refilled from the backing store).
+        """
+
+        m = Module()
+        cache = WishboneL2Cache(cachesize_words=64, writeback_buffer=True, autoflush=True)
+        m.submodules.cache = cache
+        m.submodules.psram = psram_ = psram.FakePSRAM()
+        wiring.connect(m, cache.slave, psram_.bus)
+        m.submodules.s_check = wishbone.BusChecker(cache.slave, prefix='[ram] ')
+
+        # Count line refills on the backing store.
+        slave = cache.slave
+        n_refills = Signal(8)
+        with m.If(slave.cyc & slave.stb & slave.ack & ~slave.we &
+                  (slave.cti == soc_wishbone.CycleType.END_OF_BURST)):
+            m.d.sync += n_refills.eq(n_refills+1)
+
+        async def testbench(ctx):
+            master = cache.master
+            await wishbone.classic_wr(ctx, master, adr=0x101, dat_w=0xf00d)
+            # Wait long enough for line 0 to be flushed and drained.
+            await ctx.tick().repeat(2000)
+            # The dirty word must have made it to the backing store ...
+            self.assertEqual(ctx.get(psram_.memory.data[0x101]), 0xf00d)
+            # ... and the line must have been invalidated, so reading it
+            # back needs another refill.
+            refills = ctx.get(n_refills)
+            data = await wishbone.classic_rd(ctx, master, adr=0x101)
+            self.assertEqual(data, 0xf00d)
+            self.assertEqual(ctx.get(n_refills), refills+1)
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(testbench)
+        sim.run()
+
+    def test_cache_hit_throughput(self):
+
+        """
+        Cycle-accurate comparison of hit throughput (accesses per cycle) of the
+        classic and pipelined master interfaces, once the cache line is resident.
+        """
+
+        N_ACCESSES = 64
+        results = {}
+
+        for pipelined in [False, True]:
+
+            m = Module()
+            cache = WishboneL2Cache(cachesize_words=64, pipelined=pipelined)
+            m.submodules.cache = cache
+            m.submodules.psram = psram_ = psram.FakePSRAM()
+            wiring.connect(m, cache.slave, psram_.bus)
+            cycles = Signal(32)
+            m.d.sync += cycles.eq(cycles+1)
+
+            # Alternate reads / writes to a single (resident) cache line.
+            ops = [(n % 4, None if n % 2 else n) for n in range(N_ACCESSES)]
+
+            async def testbench(ctx):
+                master = cache.master
+                # Refill the line before measuring.
+                if pipelined:
+                    await wishbone.pipelined_rw(ctx, master, [(0, None)])
+                else:
+                    await wishbone.classic_rd(ctx, master, adr=0)
+                start = ctx.get(cycles)
+                if pipelined:
+                    await wishbone.pipelined_rw(ctx, master, ops)
+                else:
+                    # Back-to-back classic transactions, as fast as a
+                    # classic master may issue them.
+                    ctx.set(master.cyc, 1)
+                    ctx.set(master.stb, 1)
+                    ctx.set(master.sel, 0xf)
+                    for adr, dat_w in ops:
+                        ctx.set(master.adr, adr)
+                        ctx.set(master.we, dat_w is not None)
+                        if dat_w is not None:
+                            ctx.set(master.dat_w, dat_w)
+                        await ctx.tick().until(master.ack)
+                    ctx.set(master.cyc, 0)
+                    ctx.set(master.stb, 0)
+                results[pipelined] = N_ACCESSES / (ctx.get(cycles) - start)
+
+            sim = Simulator(m)
+            sim.add_clock(1e-6)
+            sim.add_testbench(testbench)
+            sim.run()
+
+            print(f"pipelined={pipelined}: {results[pipelined]:.2f} accesses/cycle")
+
+        self.assertGreater(results[True], 2*results[False])
+
+    def test_cache_plot_benchmark(self):
+
+        """
+        Benchmark direct-mapped and set-associative caches in front of a
+        ``FramebufferPlotter``, with several plot streams drawing traces to
+        framebuffer rows that alias to the same cache line(s). Reports hit rate
+        and PSRAM cycles (cycles where the backing store bus is busy) per pixel.
+        """
+
+        N_TRACES  = 4
+        N_PIXELS  = 64 # per trace
+        H_ACTIVE  = 64 # 16 words per row at 1 byte/pixel.
+        ROW_STEP  = 4  # 4 rows == 64 words == cachesize_words
+
+        results = {}
+
+        for ways in [1, 2, 4]:
+
+            m = Module()
+            dut = plot.FramebufferPlotter(
+                bus_signature=wishbone.Signature(addr_width=22, data_width=32, granularity=8,
+                                                 features={"cti", "bte"}),
+                n_ports=N_TRACES, cachesize_words=64, cache_ways=ways)
+            m.submodules.dut = dut
+            m.submodules.psram = psram_ = psram.FakePSRAM()
+            wiring.connect(m, dut.bus, psram_.bus)
+
+            done = [False]*N_TRACES
+            stats = {"psram_cycles": 0, "refills": 0}
+
+            def stimulus(n):
+                async def process(ctx):
+                    for x in range(N_PIXELS):
+                        await stream.put(ctx, dut.i[n], {
+                            'x': x,
+                            'y': n*ROW_STEP,
+                            'pixel': {
+                                'color': n,
+                                'intensity': 1,
+                            },
+                            'blend': plot.BlendMode.ADDITIVE,
+                            'offset': plot.OffsetMode.ABSOLUTE,
+                        })
+                    done[n] = True
+                return process
+
+            async def testbench(ctx):
+                ctx.set(dut.fbp.base, 0)
+                ctx.set(dut.fbp.timings.h_active, H_ACTIVE)
+                ctx.set(dut.fbp.timings.v_active, N_TRACES*ROW_STEP)
+                ctx.set(dut.fbp.timings.active_pixels, H_ACTIVE*N_TRACES*ROW_STEP)
+                ctx.set(dut.fbp.enable, 1)
+                while not all(done):
+                    await ctx.tick()
+                    if ctx.get(dut.bus.cyc):
+                        stats["psram_cycles"] += 1
+                    if ctx.get(dut.bus.cyc & dut.bus.stb & dut.bus.ack & ~dut.bus.we &
+                               (dut.bus.cti == wishbone.CycleType.END_OF_BURST)):
+                        stats["refills"] += 1
+
+            sim = Simulator(m)
+            sim.add_clock(1e-6)
+            for n in range(N_TRACES):
+                sim.add_testbench(stimulus(n), background=True)
+            sim.add_testbench(testbench)
             sim.run()
 
+            # ADDITIVE plotting is 2 cache accesses (read, write) per pixel.
+            accesses = 2*N_TRACES*N_PIXELS
+            results[ways] = {
+                "hit_rate": 1 - stats["refills"]/accesses,
+                "psram_cycles_per_pixel": stats["psram_cycles"]/(N_TRACES*N_PIXELS),
+            }
+            print(f"ways={ways}: hit_rate={results[ways]['hit_rate']:.3f} "
+                  f"psram_cycles_per_pixel={results[ways]['psram_cycles_per_pixel']:.2f}")
+
+        # Aliasing traces should thrash less as associativity increases.
+        self.assertGreater(results[4]["hit_rate"], results[1]["hit_rate"])
+        self.assertLess(results[4]["psram_cycles_per_pixel"],
+                        results[1]["psram_cycles_per_pixel"])
+
 if __name__ == "__main__":
     unittest.main()
@@ -2,7 +2,9 @@ import math
 import unittest
 
 from amaranth import *
+from amaranth.lib import wiring
 from amaranth.sim import *
+from parameterized import parameterized
 
 from amaranth_future import fixed
 from tiliqua.dsp import ASQ, cordic
@@ -12,9 +14,39 @@ class CordicTests(unittest.TestCase):
 
     SHAPE = ASQ
 
-    def test_cordic_vector(self):
+    # Test cases: (real, imag, name). Cover all quadrants and some edge cases.
+    VECTORS = [
+        # Quadrant 1
+        (1.0, 0.0, "Positive real axis"),
+        (0.0, 1.0, "Positive imaginary axis"),
+        (0.707, 0.707, "45 degrees"),
+        (0.5, 0.866, "60 degrees"),
+        # Quadrant 2
+        (-1.0, 0.0, "Negative real axis"),
+        (-0.707, 0.707, "135 degrees"),
+        # Quadrant 3
+        (-0.707, -0.707, "225 degrees"),
+        (-0.5, -0.866, "240 degrees"),
+        # Quadrant 4
+        (0.0, -1.0, "Negative imaginary axis"),
+        (0.707, -0.707, "315 degrees"),
+        # Small values
+        (0.1, 0.1, "Small values"),
+        # Near maximum values (considering fixed point range)
+        (1.0, 1.0, "Large values"),
+        (-1.0, 1.0, "Large values"),
+    ]
 
-        dut = cordic.RectToPolarCordic(self.SHAPE)
+    MODES = [
+        ["iterative", dict()],
+        ["pipelined", dict(pipelined=True)],
+        ["pipelined_fold4", dict(pipelined=True, iterations_per_stage=4)],
+    ]
+
+    @parameterized.expand(MODES)
+    def test_cordic_vector(self, mode, kwargs):
+
+        dut = cordic.RectToPolarCordic(self.SHAPE, **kwargs)
 
         async def test_case(ctx, real, imag, name=""):
             # Calculate expected values
@@ -46,29 +78,7 @@ class CordicTests(unittest.TestCase):
             ctx.set(dut.o.ready, 0)
             ctx.set(dut.i.valid, 0)
             await ctx.tick().repeat(2)
-            # Cover all quadrants and some edge cases
-            test_cases = [
-                # Quadrant 1
-                (1.0, 0.0, "Positive real axis"),
-                (0.0, 1.0, "Positive imaginary axis"),
-                (0.707, 0.707, "45 degrees"),
-                (0.5, 0.866, "60 degrees"),
-                # Quadrant 2
-                (-1.0, 0.0, "Negative real axis"),
-                (-0.707, 0.707, "135 degrees"),
-                # Quadrant 3
-                (-0.707, -0.707, "225 degrees"),
-                (-0.5, -0.866, "240 degrees"),
-                # Quadrant 4
-                (0.0, -1.0, "Negative imaginary axis"),
-                (0.707, -0.707, "315 degrees"),
-                # Small values
-                (0.1, 0.1, "Small values"),
-                # Near maximum values (considering fixed point range)
-                (1.0, 1.0, "Large values"),
-                (-1.0, 1.0, "Large values"),
-            ]
-            for real, imag, name in test_cases:
+            for real, imag, name in self.VECTORS:
                 await test_case(ctx, real, imag, name)
                 # Wait a few cycles between tests
                 await ctx.tick().repeat(5)
@@ -76,5 +86,82 @@ class CordicTests(unittest.TestCase):
         sim = Simulator(dut)
         sim.add_clock(1e-6)
         sim.add_testbench(testbench)
-        with sim.write_vcd(vcd_file=open(f"test_cordic.vcd", "w")):
+        with sim.write_vcd(vcd_file=open(f"test_cordic_{mode}.vcd", "w")):
+            sim.run()
+
+    @parameterized.expand(MODES)
+    def test_cordic_polar_to_rect(self, mode, kwargs):
+
+        dut = cordic.PolarToRectCordic(self.SHAPE, **kwargs)
+
+        async def testbench(ctx):
+            ctx.set(dut.o.ready, 0)
+            ctx.set(dut.i.valid, 0)
+            await ctx.tick().repeat(2)
+            for real, imag, name in self.VECTORS:
+                magnitude = math.sqrt(real**2 + imag**2)
+                phase = math.atan2(imag, real)/math.pi
+                await stream.put(ctx, dut.i, {
+                    'magnitude': fixed.Const(magnitude, shape=self.SHAPE, clamp=True),
+                    'phase': fixed.Const(phase, shape=self.SHAPE, clamp=True),
+                })
+                result = await stream.get(ctx, dut.o)
+                # Magnitudes > 1 are clamped on the way in.
+                expected = min(magnitude, 1.0)/magnitude
+                print(f"{name}: got ({result.real.as_float():.4f}, {result.imag.as_float():.4f})")
+                self.assertLess(abs(result.real.as_float() - real*expected), 0.01, name)
+                self.assertLess(abs(result.imag.as_float() - imag*expected), 0.01, name)
+                await ctx.tick().repeat(5)
+
+        sim = Simulator(dut)
+        sim.add_clock(1e-6)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open(f"test_cordic_polar_to_rect_{mode}.vcd", "w")):
+            sim.run()
+
+    @parameterized.expand(MODES[1:])
+    def test_cordic_pipelined_throughput(self, mode, kwargs):
+
+        """
+        Stream a vector every clock through a rect->polar->rect round trip,
+        with some output backpressure, and check nothing is lost or reordered.
+        """
+
+        m = Module()
+        m.submodules.r2p = r2p = cordic.RectToPolarCordic(self.SHAPE, **kwargs)
+        m.submodules.p2r = p2r = cordic.PolarToRectCordic(r2p.internal_shape, **kwargs)
+        wiring.connect(m, r2p.o, p2r.i)
+
+        n_vectors = 64
+        vectors = [(0.7*math.cos(0.3*n), 0.7*math.sin(0.3*n)) for n in range(n_vectors)]
+
+        async def stimulus(ctx):
+            for real, imag in vectors:
+                await stream.put(ctx, r2p.i, {
+                    'real': fixed.Const(real, shape=self.SHAPE),
+                    'imag': fixed.Const(imag, shape=self.SHAPE),
+                })
+
+        async def testbench(ctx):
+            results = []
+            cycles = 0
+            while len(results) < n_vectors:
+                # Stall the output every 8th clock.
+                ctx.set(p2r.o.ready, cycles % 8 != 7)
+                _, _, valid, ready, real, imag = await ctx.tick().sample(
+                    p2r.o.valid, p2r.o.ready, p2r.o.payload.real, p2r.o.payload.imag)
+                if valid and ready:
+                    results.append((real.as_float(), imag.as_float()))
+                cycles += 1
+            for (real, imag), (o_real, o_imag) in zip(vectors, results):
+                self.assertLess(abs(o_real - real), 0.01)
+                self.assertLess(abs(o_imag - imag), 0.01)
+            # Once full, the pipelines only stall for backpressure.
+            self.assertLess(cycles, r2p.latency + p2r.latency + n_vectors*8//7 + 4)
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(stimulus, background=True)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open(f"test_cordic_pipelined_throughput_{mode}.vcd", "w")):
             sim.run()
@@ -27,9 +27,13 @@ class DelayLineTests(unittest.TestCase):
         ["b4_c64_lr_endpoints1", 64,  4, 256, 0,   255],
         ["b4_c64_lr_endpoints2", 64,  4, 256, 255, 0],
         ["b8_c64_lr_long_taps",  64,  8, 256, 150, 220],
+        ["b4_c64_lr_short_taps_packed", 64, 4, 256, 1,   3,   True],
+        ["b4_c64_lr_long_taps_packed",  64, 4, 256, 150, 221, True],
+        ["b4_c64_lr_endpoints1_packed", 64, 4, 256, 0,   255, True],
+        ["b4_c64_lr_endpoints2_packed", 64, 4, 256, 255, 0,   True],
     ])
     def test_psram_delayln(self, name, cachesize_words, cache_burst_len,
-                           max_delay, tap1_delay, tap2_delay):
+                           max_delay, tap1_delay, tap2_delay, packed=False):
 
         cache_kwargs = {
             "burst_len":       cache_burst_len,
@@ -44,6 +48,7 @@ class DelayLineTests(unittest.TestCase):
             addr_width_o=22,
             write_triggers_read=True,
             cache_kwargs=cache_kwargs,
+            packed=packed,
         )
         m.submodules.psram_c = wishbone.BusChecker(dut.bus)
         m.submodules.psram = _psram = psram.FakePSRAM(storage_words=dut.max_delay)
@@ -85,7 +90,12 @@ class DelayLineTests(unittest.TestCase):
             n_write_bursts  = 0
             n_read_bursts   = 0
 
+            # transactions on the internal (pre-cache) bus
+            n_transactions  = 0
+            internal_bus    = dut._arbiter.bus
+
             for _ in range(max_delay*40):
+                n_transactions  += ctx.get(internal_bus.cyc & internal_bus.stb & internal_bus.ack)
                 n_samples_in    += ctx.get(dut.i.valid & dut.i.ready)
                 n_samples_tap1  += ctx.get(tap1.o.valid & tap1.o.ready)
                 n_samples_tap2  += ctx.get(tap2.o.valid & tap2.o.ready)
@@ -105,6 +115,7 @@ class DelayLineTests(unittest.TestCase):
             samples_per_burst = (n_samples_in + n_samples_tap1 + n_samples_tap2) / (n_write_bursts + n_read_bursts)
 
             print("samples_per_burst", samples_per_burst)
+            print("n_transactions", n_transactions)
 
             assert n_samples_in > 100
             assert abs(n_samples_in - n_samples_tap1) < 2
@@ -114,6 +125,10 @@ class DelayLineTests(unittest.TestCase):
                 # arbitrarily chosen based on current cache performance
                 assert samples_per_burst > 2 * cache_burst_len
 
+            if packed:
+                # 1 write per 2 samples, taps only read every second sample.
+                assert n_transactions < 0.6 * (n_samples_in + n_samples_tap1 + n_samples_tap2)
+
         sim = Simulator(m)
         sim.add_clock(1e-6)
         sim.add_process(stimulus_i)
@@ -123,6 +138,97 @@ class DelayLineTests(unittest.TestCase):
         with sim.write_vcd(vcd_file=open(f"test_psram_delayln_{name}.vcd", "w")):
             sim.run()
 
+    @parameterized.expand([
+        ["b4_2lines",  4, 2, 512, [[40, 300], [100, 467]]],
+        ["b8_3lines",  8, 2, 512, [[40, 100], [64, 400], [33, 255]]],
+        ["b8_deep",    8, 4, 512, [[40, 100], [400], [200, 300]]],
+    ])
+    def test_psram_delayln_engine(self, name, burst_len, fifo_bursts,
+                                  max_delay, tap_delays):
+
+        m = Module()
+        m.submodules.dut = dut = dsp.DelayLineEngine(
+            addr_width_o=22, burst_len=burst_len, fifo_bursts=fifo_bursts)
+        m.submodules.psram_c = wishbone.BusChecker(dut.bus)
+        m.submodules.psram = _psram = psram.FakePSRAM(
+            storage_words=max_delay*len(tap_delays))
+        wiring.connect(m, dut.bus, _psram.bus)
+
+        lines = []
+        for n, delays in enumerate(tap_delays):
+            # 2 samples per word, lines packed back-to-back.
+            line = dut.add_delay_line(max_delay=max_delay, base=2*max_delay*n)
+            for delay in delays:
+                line.add_tap(fixed_delay=delay)
+            lines.append(line)
+
+        def stimulus_values(n_line):
+            for n in range(0, sys.maxsize):
+                yield fixed.Const(0.8*math.sin(n*0.2*(n_line+1)), shape=ASQ)
+
+        def stimulus_i(n_line, line):
+            async def _stimulus_i(ctx):
+                s = stimulus_values(n_line)
+                while True:
+                    await stream.put(ctx, line.i, next(s))
+                    await ctx.tick().repeat(8)
+            return _stimulus_i
+
+        def validate_tap(n_line, tap):
+            """Verify tap outputs exactly match a delayed stimulus."""
+            async def _validate_tap(ctx):
+                s = stimulus_values(n_line)
+                n_samples_o = 0
+                while True:
+                    expected_payload = next(s) if n_samples_o >= tap.fixed_delay else fixed.Const(0, shape=ASQ)
+                    tap_out = await stream.get(ctx, tap.o)
+                    assert ctx.get(tap_out == expected_payload)
+                    n_samples_o += 1
+            return _validate_tap
+
+        async def testbench(ctx):
+            n_samples_in   = [0 for _ in lines]
+            n_samples_taps = [[0 for _ in line.taps] for line in lines]
+            n_bursts       = 0
+            n_bus_busy     = 0
+            for _ in range(max_delay*60):
+                for n, line in enumerate(lines):
+                    n_samples_in[n] += ctx.get(line.i.valid & line.i.ready)
+                    for t, tap in enumerate(line.taps):
+                        n_samples_taps[n][t] += ctx.get(tap.o.valid & tap.o.ready)
+                n_bursts   += ctx.get(dut.bus.ack &
+                                      (dut.bus.cti == wishbone.CycleType.END_OF_BURST))
+                n_bus_busy += ctx.get(dut.bus.cyc)
+                await ctx.tick()
+
+            n_samples = sum(n_samples_in) + sum(sum(t) for t in n_samples_taps)
+
+            print()
+            print("n_samples_in",      n_samples_in)
+            print("n_samples_taps",    n_samples_taps)
+            print("n_bursts",          n_bursts)
+            print("samples_per_burst", n_samples / n_bursts)
+            print("bus_utilization",   n_bus_busy / (max_delay*60))
+
+            for n, line in enumerate(lines):
+                assert n_samples_in[n] > 2*max_delay
+                for t in range(len(line.taps)):
+                    assert abs(n_samples_in[n] - n_samples_taps[n][t]) < 2
+
+            # Every burst should move (nearly) a full burst of samples, the
+            # remainder are the initial memory zeroing and partial prefetches.
+            assert n_samples / n_bursts > 1.5 * burst_len
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        for n, line in enumerate(lines):
+            sim.add_testbench(stimulus_i(n, line), background=True)
+            for tap in line.taps:
+                sim.add_testbench(validate_tap(n, tap), background=True)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open(f"test_psram_delayln_engine_{name}.vcd", "w")):
+            sim.run()
+
     def test_sram_delayln(self):
 
         dut = dsp.DelayLine(
@@ -97,6 +97,59 @@ class DSPTests(unittest.TestCase):
         with sim.write_vcd(vcd_file=open(f"test_fir_{name}.vcd", "w")):
             sim.run()
 
+    @parameterized.expand([
+        # name, n_order, stride_i, symmetric, n_mults, macp, expected_latency
+        ["sym_n16",       16, 1, True,  1, False, 10],
+        ["sym_n59",       59, 1, True,  1, False, 32],
+        ["par4_n64",      64, 1, False, 4, False, 18],
+        ["sym_par4_n59",  59, 1, True,  4, False, 10],
+        ["par3_s4_n16",   16, 4, False, 3, False, 4],
+        ["sym_macp_n16",  16, 1, True,  1, True,  17],
+    ])
+    def test_fir_parallel(self, name, n_order, stride_i, symmetric, n_mults, use_macp, expected_latency):
+
+        """Symmetric folding / parallel multiplier FIR modes match ``signal.lfilter``."""
+
+        m = Module()
+        dut = dsp.FIR(fs=48000, filter_cutoff_hz=2000, filter_order=n_order,
+                      stride_i=stride_i, symmetric=symmetric, n_mults=n_mults,
+                      macp=mac.MuxMAC() if use_macp else None)
+        m.submodules.dut = dut
+
+        n_samples = 100
+        def stimulus(n):
+            if n % stride_i != 0:
+                return 0.0
+            return 0.4*(math.sin(n*0.2) + math.sin(n))
+        x = [fixed.Const(stimulus(n), shape=ASQ) for n in range(n_samples)]
+        y_expected = signal.lfilter(dut.taps_float, [1.0], [v.as_float() for v in x])
+
+        async def stimulus_i(ctx):
+            for v in x:
+                await stream.put(ctx, dut.i, v)
+
+        async def testbench(ctx):
+            n_samples_out = 0
+            n_latency = 0
+            ctx.set(dut.o.ready, 1)
+            while n_samples_out < n_samples:
+                if ctx.get(dut.i.valid & dut.i.ready):
+                    n_latency = 0
+                if ctx.get(dut.o.valid & dut.o.ready):
+                    self.assertEqual(n_latency, expected_latency)
+                    self.assertLess(abs(ctx.get(dut.o.payload).as_float() -
+                                        y_expected[n_samples_out]), 0.005)
+                    n_samples_out += 1
+                await ctx.tick()
+                n_latency += 1
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(stimulus_i, background=True)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open(f"test_fir_parallel_{name}.vcd", "w")):
+            sim.run()
+
     @parameterized.expand([
         ["dual_sine_n4_m1",     100, 4,  1, 4,   1,   0.005, lambda n: 0.4*(math.sin(n*0.2) + math.sin(n))],
         # TODO (below this comment): all visually look correct, fix reference alignment and reduce tolerance.
@@ -165,6 +218,70 @@ class DSPTests(unittest.TestCase):
         with sim.write_vcd(vcd_file=open(f"test_resample_{name}.vcd", "w")):
             sim.run()
 
+    @parameterized.expand([
+        ["n2_m1", 2, 1],
+        ["n1_m2", 1, 2],
+        ["n2_m3", 2, 3],
+    ])
+    def test_resample_multichannel(self, name, n_up, m_down):
+
+        """
+        Each channel of a multi-channel :class:`Resample` is bit-exact with
+        a single-channel :class:`Resample` of the same channel.
+        """
+
+        n_channels = 3
+        n_samples = 40
+        stimulus_functions = [
+            lambda n: 0.4*(math.sin(n*0.2) + math.sin(n)),
+            lambda n: 0.8*math.sin(n*0.05),
+            lambda n: 0.5 if (n // 7) % 2 else -0.5,
+        ]
+
+        m = Module()
+        m.submodules.dut = dut = dsp.Resample(fs_in=48000, n_up=n_up, m_down=m_down,
+                                              order_mult=4, n_channels=n_channels)
+        refs = [dsp.Resample(fs_in=48000, n_up=n_up, m_down=m_down, order_mult=4)
+                for _ in range(n_channels)]
+        m.submodules += refs
+
+        async def stimulus_i(ctx):
+            for n in range(n_samples):
+                await stream.put(ctx, dut.i, [
+                    fixed.Const(f(n), shape=ASQ) for f in stimulus_functions])
+
+        def stimulus_ref(c):
+            async def process(ctx):
+                for n in range(n_samples):
+                    await stream.put(ctx, refs[c].i, fixed.Const(stimulus_functions[c](n), shape=ASQ))
+            return process
+
+        async def testbench(ctx):
+            n_out = (n_samples * n_up) // m_down - 1
+            outputs = []
+            ref_outputs = [[] for _ in range(n_channels)]
+            ctx.set(dut.o.ready, 1)
+            for ref in refs:
+                ctx.set(ref.o.ready, 1)
+            while len(outputs) < n_out or min(len(r) for r in ref_outputs) < n_out:
+                if ctx.get(dut.o.valid):
+                    outputs.append([ctx.get(dut.o.payload[c]).as_float() for c in range(n_channels)])
+                for c, ref in enumerate(refs):
+                    if ctx.get(ref.o.valid):
+                        ref_outputs[c].append(ctx.get(ref.o.payload).as_float())
+                await ctx.tick()
+            for c in range(n_channels):
+                self.assertEqual([o[c] for o in outputs[:n_out]], ref_outputs[c][:n_out])
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(stimulus_i, background=True)
+        for c in range(n_channels):
+            sim.add_testbench(stimulus_ref(c), background=True)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open(f"test_resample_multichannel_{name}.vcd", "w")):
+            sim.run()
+
     @parameterized.expand([
         ["mux_mac", mac.MuxMAC],
         ["ring_mac", mac.RingMAC],
@@ -287,6 +404,80 @@ class DSPTests(unittest.TestCase):
         with sim.write_vcd(vcd_file=open("test_matrix.vcd", "w")):
             sim.run()
 
+    @parameterized.expand([
+        ["dense",  False],
+        ["sparse", True],
+    ])
+    def test_matrix_updates(self, name, sparse):
+
+        """
+        8x8 mostly-sparse matrix (similar to the ``Diffuser`` feedback network),
+        with some coefficients rewritten through the ``XY`` port in between
+        samples. Check results against a software model, and that sparse
+        mode only spends time on non-zero terms.
+        """
+
+        coefficients = [[0.0]*8 for _ in range(8)]
+        for n in range(8):
+            coefficients[n][n] = 0.5
+            coefficients[n][(n+3)%8] = -1.0 if n % 2 else 1.0
+        coefficients[2][7] = -0.25
+
+        matrix = dsp.MatrixMix(
+            i_channels=8, o_channels=8,
+            coefficients=coefficients, sparse=sparse)
+
+        updates = [
+            # (o_x, i_y, v)
+            (2, 2, 0.0),
+            (5, 2, 0.0),
+            (0, 7, 0.75),
+            (1, 6, -1.0),
+            (6, 6, 1.0),
+        ]
+
+        def model(x, coefficients):
+            return [max(-1.0, min(1.0, sum(x[i]*coefficients[i][o] for i in range(8))))
+                    for o in range(8)]
+
+        async def testbench(ctx):
+            for n_sample in range(8):
+                if n_sample == 4:
+                    for o_x, i_y, v in updates:
+                        ctx.set(matrix.c.valid, 1)
+                        ctx.set(matrix.c.payload.o_x, o_x)
+                        ctx.set(matrix.c.payload.i_y, i_y)
+                        ctx.set(matrix.c.payload.v, fixed.Const(v, shape=matrix.ctype))
+                        coefficients[i_y][o_x] = v
+                        await ctx.tick()
+                    ctx.set(matrix.c.valid, 0)
+                    # Allow the term list to be rebuilt.
+                    await ctx.tick().repeat(64+4)
+                x = [0.1*math.sin(n_sample*(k+1)) for k in range(8)]
+                await stream.put(ctx, matrix.i, [fixed.Const(v, shape=ASQ) for v in x])
+                start = clocks
+                result = await stream.get(ctx, matrix.o)
+                elapsed = clocks - start
+                for r, e in zip(result, model(x, coefficients)):
+                    self.assertAlmostEqual(r.as_float(), e, places=3)
+                n_terms = sum(c != 0 for row in coefficients for c in row)
+                print(f"{name}: {n_terms} non-zero terms, {elapsed} clocks")
+                if sparse:
+                    self.assertLessEqual(elapsed, n_terms + 4)
+
+        clocks = 0
+        async def clock_counter(ctx):
+            nonlocal clocks
+            async for _ in ctx.tick():
+                clocks += 1
+
+        sim = Simulator(matrix)
+        sim.add_clock(1e-6)
+        sim.add_testbench(testbench)
+        sim.add_testbench(clock_counter, background=True)
+        with sim.write_vcd(vcd_file=open(f"test_matrix_updates_{name}.vcd", "w")):
+            sim.run()
+
     @parameterized.expand([
         ["mux_mac", mac.MuxMAC],
         ["ring_mac", mac.RingMAC],
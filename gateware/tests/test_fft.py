@@ -1,54 +1,65 @@
 import sys
 import unittest
+from functools import partial
 from math import cos, pi, sin
 
 import numpy as np
 from amaranth import *
 from amaranth.lib import wiring
 from amaranth.sim import *
+from amaranth.utils import exact_log2
+from amaranth_soc import wishbone as soc_wishbone
 from parameterized import parameterized
 
 from amaranth_future import fixed
 from tiliqua.dsp import fft
-from tiliqua.test import stream
+from tiliqua.test import psram, stream
 
 FFT_SZ = 16
 
+FFT_STIMULI = [
+    ["r_impulse", FFT_SZ, fixed.SQ(2, 30),
+     lambda n: 1 if n == 0 else 0],
+    ["i_impulse", FFT_SZ, fixed.SQ(2, 30),
+     lambda n: 1j if n == 0 else 0],
+    ["all_zero", FFT_SZ, fixed.SQ(2, 30),
+     lambda n: 0],
+    ["r_all_one", FFT_SZ, fixed.SQ(2, 30),
+     lambda n: 1],
+    ["i_all_one", FFT_SZ, fixed.SQ(2, 30),
+     lambda n: 1j],
+    ["r_alternate", FFT_SZ, fixed.SQ(2, 30),
+     lambda n: 1.0 if n % 2 == 0 else -1.0],
+    ["i_alternate", FFT_SZ, fixed.SQ(2, 30),
+     lambda n: 1j if n % 2 == 0 else -1j],
+    ["e_even", FFT_SZ, fixed.SQ(2, 30),
+     lambda n: cos(8*2*np.pi*n/FFT_SZ) + 1j * sin(8*2*np.pi*n/FFT_SZ)],
+    ["e_fraction", FFT_SZ, fixed.SQ(2, 30),
+     lambda n: cos((43./7)*2*np.pi*n/FFT_SZ) + 1j * sin((43./7)*2*np.pi*n/FFT_SZ)],
+    ["r_cos_fraction", FFT_SZ, fixed.SQ(2, 30),
+     lambda n: cos((43./7)*2*np.pi*n/FFT_SZ)],
+    ["r_cos_fraction_small", FFT_SZ, fixed.SQ(2, 30),
+     lambda n: 0.1*cos((43./7)*2*np.pi*n/FFT_SZ)],
+    ["i_cos_fraction", FFT_SZ, fixed.SQ(2, 30),
+     lambda n: 1j*cos((43./7)*2*np.pi*n/FFT_SZ)],
+    ["r_sin_fraction", FFT_SZ, fixed.SQ(2, 30),
+     lambda n: sin((43./7)*2*np.pi*n/FFT_SZ)],
+    ["i_sin_fraction", FFT_SZ, fixed.SQ(2, 30),
+     lambda n: 1j*sin((43./7)*2*np.pi*n/FFT_SZ)],
+    ["r_pulse", FFT_SZ, fixed.SQ(2, 30),
+     lambda n: 1 if n < 4 else 0],
+]
+
 class FFTTests(unittest.TestCase):
 
-    @parameterized.expand([
-        ["r_impulse", FFT_SZ, fixed.SQ(2, 30),
-         lambda n: 1 if n == 0 else 0],
-        ["i_impulse", FFT_SZ, fixed.SQ(2, 30),
-         lambda n: 1j if n == 0 else 0],
-        ["all_zero", FFT_SZ, fixed.SQ(2, 30),
-         lambda n: 0],
-        ["r_all_one", FFT_SZ, fixed.SQ(2, 30),
-         lambda n: 1],
-        ["i_all_one", FFT_SZ, fixed.SQ(2, 30),
-         lambda n: 1j],
-        ["r_alternate", FFT_SZ, fixed.SQ(2, 30),
-         lambda n: 1.0 if n % 2 == 0 else -1.0],
-        ["i_alternate", FFT_SZ, fixed.SQ(2, 30),
-         lambda n: 1j if n % 2 == 0 else -1j],
-        ["e_even", FFT_SZ, fixed.SQ(2, 30),
-         lambda n: cos(8*2*np.pi*n/FFT_SZ) + 1j * sin(8*2*np.pi*n/FFT_SZ)],
-        ["e_fraction", FFT_SZ, fixed.SQ(2, 30),
-         lambda n: cos((43./7)*2*np.pi*n/FFT_SZ) + 1j * sin((43./7)*2*np.pi*n/FFT_SZ)],
-        ["r_cos_fraction", FFT_SZ, fixed.SQ(2, 30),
-         lambda n: cos((43./7)*2*np.pi*n/FFT_SZ)],
-        ["r_cos_fraction_small", FFT_SZ, fixed.SQ(2, 30),
-         lambda n: 0.1*cos((43./7)*2*np.pi*n/FFT_SZ)],
-        ["i_cos_fraction", FFT_SZ, fixed.SQ(2, 30),
-         lambda n: 1j*cos((43./7)*2*np.pi*n/FFT_SZ)],
-        ["r_sin_fraction", FFT_SZ, fixed.SQ(2, 30),
-         lambda n: sin((43./7)*2*np.pi*n/FFT_SZ)],
-        ["i_sin_fraction", FFT_SZ, fixed.SQ(2, 30),
-         lambda n: 1j*sin((43./7)*2*np.pi*n/FFT_SZ)],
-        ["r_pulse", FFT_SZ, fixed.SQ(2, 30),
-         lambda n: 1 if n < 4 else 0],
+    @parameterized.expand(
+        [[name, sz, shape, f, False] for name, sz, shape, f in FFT_STIMULI] +
+        [[f"{name}_pipelined", sz, shape, f, True] for name, sz, shape, f in FFT_STIMULI] + [
+        # Odd number of stages (ends in a lone radix-2 butterfly).
+        ["e_fraction_pipelined_8", 8, fixed.SQ(2, 30),
+         lambda n: cos((13./7)*2*np.pi*n/8) + 1j * sin((13./7)*2*np.pi*n/8), True],
     ])
-    def test_fft(self, name, sz, shape, stimulus_function):
+    def test_fft(self, name, sz, shape, stimulus_function, pipelined):
 
         """
         For a set of stimuli, verify:
@@ -59,8 +70,8 @@ class FFTTests(unittest.TestCase):
         """
 
         m = Module()
-        dut = fft.FFT(sz=sz, shape=shape)
-        ifft = fft.FFT(sz=sz, shape=shape)
+        dut = fft.FFT(sz=sz, shape=shape, pipelined=pipelined)
+        ifft = fft.FFT(sz=sz, shape=shape, pipelined=pipelined)
         wiring.connect(m, dut.o, ifft.i)
         m.d.comb += ifft.ifft.eq(1)
         m.d.comb += ifft.o.ready.eq(1)
@@ -131,6 +142,215 @@ class FFTTests(unittest.TestCase):
         with sim.write_vcd(vcd_file=open(f"test_fft_{name}.vcd", "w")):
             sim.run()
 
+    @parameterized.expand([
+        ["sz32_ready", 32, False],
+        ["sz64_ready", 64, False],
+        ["sz32_backpressure", 32, True],
+    ])
+    def test_fft_pipelined_throughput(self, name, sz, backpressure):
+
+        """
+        Stream several back-to-back blocks into the pipelined FFT. Verify that
+        (without backpressure) it accepts and produces 1 sample per clock,
+        and that every block matches ``numpy.fft``.
+        """
+
+        shape = fixed.SQ(2, 30)
+        n_blocks = 4
+
+        m = Module()
+        m.submodules.dut = dut = fft.FFT(sz=sz, shape=shape, pipelined=True)
+
+        rng = np.random.default_rng(seed=sz)
+        x = (rng.uniform(-1, 1, size=n_blocks*sz) +
+             1j*rng.uniform(-1, 1, size=n_blocks*sz))
+
+        async def stimulus_i(ctx):
+            # Hold 'valid' for the entire input, no gaps.
+            n = 0
+            while n < len(x):
+                ctx.set(dut.i.valid, 1)
+                ctx.set(dut.i.payload, {
+                    'first': 1 if n % sz == 0 else 0,
+                    'sample': {
+                        'real': fixed.Const(x[n].real, shape=shape),
+                        'imag': fixed.Const(x[n].imag, shape=shape),
+                    }
+                })
+                _, _, ready = await ctx.tick().sample(dut.i.ready)
+                if ready:
+                    n += 1
+            ctx.set(dut.i.valid, 0)
+
+        async def testbench(ctx):
+            cycle = 0
+            i_cycles = []
+            o_cycles = []
+            s_f = []
+            while len(s_f) < len(x):
+                if backpressure:
+                    ctx.set(dut.o.ready, (cycle % 3) != 0)
+                else:
+                    ctx.set(dut.o.ready, 1)
+                _, _, i_valid, i_ready, o_valid, o_ready, first, real, imag = await ctx.tick().sample(
+                    dut.i.valid, dut.i.ready, dut.o.valid, dut.o.ready,
+                    dut.o.payload.first, dut.o.payload.sample.real, dut.o.payload.sample.imag)
+                if i_valid and i_ready:
+                    i_cycles.append(cycle)
+                if o_valid and o_ready:
+                    self.assertEqual(first, 1 if len(s_f) % sz == 0 else 0)
+                    o_cycles.append(cycle)
+                    s_f.append(real.as_float() + 1j*imag.as_float())
+                cycle += 1
+
+            for n in range(n_blocks):
+                s_i_fft = np.fft.fft(x[n*sz:(n+1)*sz], norm="forward")
+                s_freq_delta = np.abs(np.array(s_f[n*sz:(n+1)*sz]) - s_i_fft)
+                self.assertTrue(np.all(s_freq_delta < 1.5e-9))
+
+            print(f"sz={sz} latency={o_cycles[0]-i_cycles[0]} "
+                  f"input={i_cycles[-1]-i_cycles[0]+1} output={o_cycles[-1]-o_cycles[0]+1} cycles")
+            if not backpressure:
+                # 1 sample per clock in and out
+                self.assertEqual(i_cycles[-1] - i_cycles[0] + 1, len(x))
+                self.assertEqual(o_cycles[-1] - o_cycles[0] + 1, len(x))
+                # each block appears about 2 blocks after it was clocked in
+                self.assertLess(o_cycles[0] - i_cycles[0], 3*sz)
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_process(stimulus_i)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open(f"test_fft_pipelined_throughput_{name}.vcd", "w")):
+            sim.run()
+
+    @parameterized.expand([
+        # Square (N1 == N2, shared inner FFT) and rectangular (N1 == 2*N2)
+        ["fwd_sz64", 64, 4, False, 5e-4],
+        ["fwd_sz128", 128, 8, False, 5e-4],
+        # Without normalization, quantization errors are not scaled down.
+        ["inv_sz64", 64, 2, True, 2e-3],
+    ])
+    def test_psram_fft(self, name, sz, tile_width, inverse, tolerance):
+
+        """
+        Stream 2 blocks through the PSRAM-backed FFT and verify each
+        matches ``numpy.fft`` (or its inverse).
+        """
+
+        shape = fixed.SQ(1, 15)
+        n_blocks = 2
+        base = 0x40
+
+        m = Module()
+        dut = fft.PSRAMFFT(
+            bus_signature=soc_wishbone.Signature(
+                addr_width=22, data_width=32, granularity=8, features={"cti", "bte"}),
+            base=base, shape=shape, sz=sz, tile_width=tile_width,
+            default_ifft=inverse)
+        m.submodules.dut = dut
+        m.submodules.psram = psram_ = psram.FakePSRAM(storage_words=base+sz)
+        wiring.connect(m, dut.bus, psram_.bus)
+
+        rng = np.random.default_rng(seed=sz)
+        x = (rng.uniform(-0.5, 0.5, size=n_blocks*sz) +
+             1j*rng.uniform(-0.5, 0.5, size=n_blocks*sz))
+        if inverse:
+            # Frequency-domain input, whose inverse is in range.
+            x = np.concatenate([np.fft.fft(x[n*sz:(n+1)*sz], norm="forward")
+                                for n in range(n_blocks)])
+
+        async def stimulus_i(ctx):
+            for n in range(len(x)):
+                await stream.put(ctx, dut.i, {
+                    'first': 1 if n % sz == 0 else 0,
+                    'sample': {
+                        'real': fixed.Const(x[n].real, shape=shape),
+                        'imag': fixed.Const(x[n].imag, shape=shape),
+                    }
+                })
+
+        async def testbench(ctx):
+            s_o = []
+            ctx.set(dut.o.ready, 1)
+            while len(s_o) < len(x):
+                if ctx.get(dut.o.valid):
+                    self.assertEqual(ctx.get(dut.o.payload.first), 1 if len(s_o) % sz == 0 else 0)
+                    s_o.append(ctx.get(dut.o.payload.sample.real).as_float() +
+                               1j * ctx.get(dut.o.payload.sample.imag).as_float())
+                await ctx.tick()
+            for n in range(n_blocks):
+                block = x[n*sz:(n+1)*sz]
+                if inverse:
+                    expected = np.fft.ifft(block, norm="forward")
+                else:
+                    expected = np.fft.fft(block, norm="forward")
+                delta = np.abs(np.array(s_o[n*sz:(n+1)*sz]) - expected)
+                print(f"Maximum difference from numpy (block {n}):", max(delta))
+                self.assertTrue(np.all(delta < tolerance))
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_process(stimulus_i)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open(f"test_psram_fft_{name}.vcd", "w")):
+            sim.run()
+
+    @parameterized.expand(
+        [[f"{name}_{packing.name.lower()}", sz, shape, f, packing]
+         for name, sz, shape, f in FFT_STIMULI if name.startswith("r_") or name == "all_zero"
+         for packing in fft.RealFFT.Packing])
+    def test_real_fft(self, name, sz, shape, stimulus_function, packing):
+
+        """
+        Verify each block of a :class:`RealFFT` is numerically close to
+        ``numpy.fft.rfft`` of the same real block, with the Nyquist bin
+        packed into the imaginary part of bin 0.
+        """
+
+        m = Module()
+        m.submodules.dut = dut = fft.RealFFT(sz=sz, shape=shape, packing=packing)
+        m.d.comb += dut.o.ready.eq(1)
+
+        n_blocks = 2
+
+        def block(b):
+            # Consecutive blocks differ for most stimuli, so PAIR packing
+            # is checked with different real and imaginary blocks.
+            return np.array([stimulus_function(n + b*sz) for n in range(sz)], dtype=float)
+
+        async def stimulus_i(ctx):
+            for b in range(n_blocks):
+                for n, x in enumerate(block(b)):
+                    await stream.put(ctx, dut.i, {
+                        'first': 1 if n == 0 else 0,
+                        'sample': fixed.Const(x, shape=shape),
+                    })
+
+        async def testbench(ctx):
+            s_f = []
+            while len(s_f) < n_blocks*sz//2:
+                if ctx.get(dut.o.valid & dut.o.ready):
+                    if len(s_f) % (sz//2) == 0:
+                        self.assertEqual(ctx.get(dut.o.payload.first), 1)
+                    s_f.append(ctx.get(dut.o.payload.sample.real).as_float() +
+                               1j * ctx.get(dut.o.payload.sample.imag).as_float())
+                await ctx.tick()
+
+            for b in range(n_blocks):
+                expected = np.fft.rfft(block(b), norm="forward")
+                packed = expected[:sz//2].copy()
+                packed[0] = expected[0].real + 1j * expected[sz//2].real
+                delta = np.abs(np.array(s_f[b*sz//2:(b+1)*sz//2]) - packed)
+                self.assertTrue(np.all(delta < 1e-8))
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(stimulus_i, background=True)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open(f"test_real_fft_{name}.vcd", "w")):
+            sim.run()
+
     @parameterized.expand([
         # 'Small' version of the STFT, with TDM-multiplexed FFT and Window blocks
         ["dual_cosine_small", 128, fft.STFTProcessor, fixed.SQ(2, 30),
@@ -138,6 +358,11 @@ class FFTTests(unittest.TestCase):
         # 'Large' version of the STFT, independent FFT/IFFT and Windowing blocks
         ["dual_cosine_pipelined", 128, fft.STFTProcessorPipelined, fixed.SQ(2, 30),
          lambda n: 0.7*cos(2*pi*n/100) + 0.2*cos(2*pi*n/5)],
+        # As above, both using the pipelined (R2²SDF) FFT core
+        ["dual_cosine_small_sdf", 128, partial(fft.STFTProcessor, pipelined_fft=True), fixed.SQ(2, 30),
+         lambda n: 0.7*cos(2*pi*n/100) + 0.2*cos(2*pi*n/5)],
+        ["dual_cosine_pipelined_sdf", 128, partial(fft.STFTProcessorPipelined, pipelined_fft=True), fixed.SQ(2, 30),
+         lambda n: 0.7*cos(2*pi*n/100) + 0.2*cos(2*pi*n/5)],
     ])
     def test_stft(self, name, sz, cls, shape, stimulus_function):
 
@@ -202,3 +427,92 @@ class FFTTests(unittest.TestCase):
         sim.add_testbench(testbench)
         with sim.write_vcd(vcd_file=open(f"test_stft_{name}.vcd", "w")):
             sim.run()
+
+    @parameterized.expand([
+        ["iterative", False, 48000],
+        ["pipelined", True, 192000],
+    ])
+    def test_stft_multichannel(self, name, pipelined_fft, fs):
+
+        """
+        Resynthesize a different waveform on each channel through a shared
+        FFT, like ``test_stft``. Check blocks are tagged round-robin by channel,
+        and that throughput (at a 60MHz system clock) is enough for real-time
+        operation at ``fs``, and matches the estimate in the docstring.
+        """
+
+        sz = 32
+        n_channels = 2
+        shape = fixed.SQ(2, 30)
+        f_sync = 60e6
+        stimulus_functions = [
+            lambda n: 0.7*cos(2*pi*n/100) + 0.2*cos(2*pi*n/5),
+            lambda n: 0.5*sin(2*pi*n/37) - 0.3*cos(2*pi*n/7),
+        ]
+
+        m = Module()
+        m.submodules.dut = dut = fft.STFTProcessorMultichannel(
+            sz=sz, shape=shape, n_channels=n_channels, pipelined_fft=pipelined_fft)
+        # Passthrough (resynthesize) in frequency domain.
+        wiring.connect(m, dut.o_freq, dut.i_freq)
+        m.d.comb += dut.o.ready.eq(1)
+
+        async def stimulus_i(ctx):
+            # Always valid, so we are limited by processing throughput.
+            n = 0
+            while True:
+                ctx.set(dut.i.valid, 1)
+                for c, f in enumerate(stimulus_functions):
+                    ctx.set(dut.i.payload[c], fixed.Const(f(n), shape=shape))
+                _, _, ready = await ctx.tick().sample(dut.i.ready)
+                if ready:
+                    n += 1
+
+        async def testbench(ctx):
+            N = sz
+            cycle = 0
+            i_cycles = []
+            samples_i = []
+            samples_o = []
+            channels = []
+            while len(samples_o) < 6*N:
+                if ctx.get(dut.i.valid & dut.i.ready):
+                    i_cycles.append(cycle)
+                    samples_i.append([ctx.get(dut.i.payload[c]).as_float()
+                                      for c in range(n_channels)])
+                if ctx.get(dut.o.valid & dut.o.ready):
+                    samples_o.append([ctx.get(dut.o.payload[c]).as_float()
+                                      for c in range(n_channels)])
+                if ctx.get(dut.o_freq.valid & dut.o_freq.ready & dut.o_freq.payload.first):
+                    channels.append(ctx.get(dut.o_freq.payload.channel))
+                await ctx.tick()
+                cycle += 1
+
+            # Each channel reconstructs its own input.
+            s_i = np.array(samples_i[N:2*N], dtype=float)
+            s_o = np.array(samples_o[N:2*N], dtype=float)
+            s_io_delta = np.abs(s_o - s_i)
+            print("Maximum difference between in/out samples:", np.max(s_io_delta))
+            self.assertTrue(np.all(s_io_delta < 1e-7))
+
+            # Blocks are interleaved round-robin
+            self.assertEqual(channels, [n % n_channels for n in range(len(channels))])
+
+            # Steady-state throughput, in input frames per clock.
+            cycles_per_frame = (i_cycles[-1] - i_cycles[2*N]) / (len(i_cycles) - 1 - 2*N)
+            clocks_per_block = cycles_per_frame * (sz//2) / n_channels
+            if pipelined_fft:
+                estimate = 12*sz
+            else:
+                estimate = sz*(6*exact_log2(sz) + 10)
+            print(f"clocks per block: {clocks_per_block:.0f} (estimate {estimate}), "
+                  f"max fs: {f_sync/cycles_per_frame:.0f}")
+            self.assertLess(clocks_per_block, 1.25*estimate)
+            self.assertGreater(f_sync/cycles_per_frame, fs)
+
+        sim = Simulator(m)
+        sim.add_clock(1/f_sync)
+        sim.add_process(stimulus_i)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open(f"test_stft_multichannel_{name}.vcd", "w")):
+            sim.run()
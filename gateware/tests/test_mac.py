@@ -0,0 +1,75 @@
+import unittest
+
+from amaranth import *
+from amaranth.sim import *
+from parameterized import parameterized
+
+from amaranth_future import fixed
+from tiliqua.dsp import mac
+
+class MACTests(unittest.TestCase):
+
+    @parameterized.expand([
+        [f"{n_clients}clients_{lanes}lanes", n_clients, lanes]
+        for n_clients in [4, 8, 16, 32]
+        for lanes in [1, 2, 4]
+    ])
+    def test_ring_mac_benchmark(self, name, n_clients, lanes):
+
+        """
+        Every client issues back-to-back multiplies. Check all results, and
+        report per-client latency and DSP tile utilization.
+        """
+
+        m = Module()
+        m.submodules.server = server = mac.RingMACServer(max_clients=32, lanes=lanes)
+        clients = [server.new_client() for _ in range(n_clients)]
+        m.submodules += clients
+
+        n_requests = 8
+
+        def operands(c, k):
+            return (fixed.Const((c+1)/64, shape=mac.SQNative),
+                    fixed.Const(((k % 7) - 3)/8, shape=mac.SQNative))
+
+        async def testbench(ctx):
+            latencies = [[] for _ in clients]
+            issued = [0 for _ in clients]
+            for c, client in enumerate(clients):
+                a, b = operands(c, 0)
+                ctx.set(client.operands.a, a)
+                ctx.set(client.operands.b, b)
+                ctx.set(client.strobe, 1)
+            cycle = 0
+            while min(len(l) for l in latencies) < n_requests:
+                for c, client in enumerate(clients):
+                    if ctx.get(client.valid) and len(latencies[c]) < n_requests:
+                        a, b = operands(c, len(latencies[c]))
+                        self.assertEqual(ctx.get(client.result.z).as_float(),
+                                         a.as_float() * b.as_float())
+                        latencies[c].append(cycle - issued[c])
+                        # Next request is visible from the next clock.
+                        a, b = operands(c, len(latencies[c]))
+                        ctx.set(client.operands.a, a)
+                        ctx.set(client.operands.b, b)
+                        ctx.set(client.strobe, len(latencies[c]) < n_requests)
+                        issued[c] = cycle + 1
+                await ctx.tick()
+                cycle += 1
+
+            all_latencies = [l for ls in latencies for l in ls]
+            mean_latency = sum(all_latencies) / len(all_latencies)
+            max_latency = max(all_latencies)
+            utilization = len(all_latencies) / (cycle * lanes)
+            print(f"{n_clients:2} clients, {lanes} lanes: latency mean={mean_latency:5.1f} "
+                  f"max={max_latency:3} clocks, DSP utilization={100*utilization:5.1f}%")
+
+            # Latency is set by the length of each ring.
+            ring_len = -(-n_clients // lanes) + 1
+            self.assertLessEqual(max_latency, 2*ring_len + 2)
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open(f"test_ring_mac_benchmark_{name}.vcd", "w")):
+            sim.run()
@@ -0,0 +1,408 @@
+# Copyright (c) 2024 Seb Holzapfel <me@sebholzapfel.com>
+#
+# SPDX-License-Identifier: CERN-OHL-S-2.0
+
+import unittest
+
+from amaranth import *
+from amaranth.lib import wiring
+from amaranth.sim import *
+from amaranth_soc import wishbone
+from parameterized import parameterized
+
+from tiliqua.build.sim import PSRAMTiming
+from tiliqua.periph.psram import Frontend, PortStatistics, QoSArbiter
+from tiliqua.test import psram
+
+class QoSArbiterTests(unittest.TestCase):
+
+    BURST_LEN = 8
+
+    def _run(self, name, masters, n_cycles=4000):
+        """
+        Connect some masters (list of ``add()`` kwargs, plus ``period``, the
+        number of idle cycles between bursts, and ``burst_len``) to a QoSArbiter
+        in front of a FakePSRAM. Every master issues read bursts of ``BURST_LEN``
+        words, unless ``burst_len`` is specified (1 is a classic cycle).
+
+        Returns the number of words transferred by each master, the worst-case
+        number of cycles each master waited for its first ack, and the contents
+        of a :class:`PortStatistics` attached to each master.
+        """
+
+        m = Module()
+        m.submodules.arbiter = arbiter = QoSArbiter(
+            addr_width=22, data_width=32, granularity=8, features={"cti", "bte"})
+        m.submodules.psram = _psram = psram.FakePSRAM(storage_words=64)
+        wiring.connect(m, arbiter.bus, _psram.bus)
+
+        buses = []
+        urgents = []
+        for config in masters:
+            bus = wishbone.Signature(addr_width=22, data_width=32, granularity=8,
+                                     features={"cti", "bte"}).create()
+            urgent = Signal() if config.get("urgent", False) else None
+            arbiter.add(bus, priority=config.get("priority", QoSArbiter.NORMAL),
+                        budget=config.get("budget", None), urgent=urgent)
+            buses.append(bus)
+            urgents.append(urgent)
+
+        port_stats = []
+        for n, bus in enumerate(buses):
+            m.submodules[f"port_stats{n}"] = stats = PortStatistics()
+            m.d.comb += [
+                stats.cyc.eq(bus.cyc),
+                stats.stb.eq(bus.stb),
+                stats.ack.eq(bus.ack),
+                stats.last.eq(bus.cti != wishbone.CycleType.INCR_BURST),
+                stats.collect.eq(1),
+            ]
+            port_stats.append(stats)
+
+        words = [0 for _ in masters]
+        max_wait = [0 for _ in masters]
+
+        def master(n, bus, urgent, period, burst_len):
+            async def _master(ctx):
+                ctx.set(bus.sel, 0b1111)
+                await ctx.tick().repeat(period)
+                while True:
+                    if urgent is not None:
+                        ctx.set(urgent, 1)
+                    ctx.set(bus.cyc, 1)
+                    ctx.set(bus.stb, 1)
+                    wait = 0
+                    beat = 0
+                    while beat < burst_len:
+                        ctx.set(bus.adr, 8*n + beat)
+                        if burst_len == 1:
+                            ctx.set(bus.cti, wishbone.CycleType.CLASSIC)
+                        else:
+                            ctx.set(bus.cti, wishbone.CycleType.END_OF_BURST
+                                    if beat == burst_len - 1 else
+                                    wishbone.CycleType.INCR_BURST)
+                        if ctx.get(bus.ack):
+                            beat += 1
+                            words[n] += 1
+                        elif beat == 0:
+                            wait += 1
+                        await ctx.tick()
+                    max_wait[n] = max(max_wait[n], wait)
+                    ctx.set(bus.cyc, 0)
+                    ctx.set(bus.stb, 0)
+                    if urgent is not None:
+                        ctx.set(urgent, 0)
+                    await ctx.tick().repeat(period)
+            return _master
+
+        stats = []
+
+        async def testbench(ctx):
+            await ctx.tick().repeat(n_cycles)
+            for s in port_stats:
+                stats.append({
+                    "words":         ctx.get(s.words),
+                    "transactions":  ctx.get(s.transactions),
+                    "latency_total": ctx.get(s.latency_total),
+                    "latency_max":   ctx.get(s.latency_max),
+                    "histogram":     [ctx.get(s.histogram[k])
+                                      for k in range(len(PortStatistics.HISTOGRAM_BOUNDS) + 1)],
+                })
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        for n, (bus, urgent, config) in enumerate(zip(buses, urgents, masters)):
+            sim.add_testbench(master(n, bus, urgent, config.get("period", 1),
+                                     config.get("burst_len", self.BURST_LEN)), background=True)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open(f"test_qos_arbiter_{name}.vcd", "w")):
+            sim.run()
+
+        print()
+        print("words", words)
+        print("max_wait", max_wait)
+        print("stats", stats)
+        return words, max_wait, stats
+
+    def test_round_robin(self):
+        # Without any QoS settings, behaves like wishbone.Arbiter
+        words, _, _ = self._run("round_robin", [{}, {}, {}])
+        assert min(words) > 0
+        assert max(words) - min(words) <= self.BURST_LEN
+
+    @parameterized.expand([
+        ["realtime", QoSArbiter.REALTIME, False],
+        ["urgent",   QoSArbiter.BEST_EFFORT, True],
+    ])
+    def test_latency(self, name, priority, urgent):
+        # A sporadic master should only ever wait for the burst in progress,
+        # no matter how many other masters are contending for the bus.
+        words, max_wait, _ = self._run(name, [
+            {"priority": priority, "urgent": urgent, "period": 100},
+            {"priority": QoSArbiter.NORMAL},
+            {"priority": QoSArbiter.NORMAL},
+            {"priority": QoSArbiter.NORMAL},
+        ])
+        assert words[0] > 0
+        burst_cycles = 2*self.BURST_LEN + 8
+        assert max_wait[0] <= burst_cycles
+        # The other masters still share the rest of the bandwidth.
+        assert min(words[1:]) > 0
+        # With a plain round-robin arbiter, a new request waits behind
+        # everyone else requesting the bus.
+        words, max_wait, _ = self._run(f"{name}_baseline", [
+            {"period": 100}, {}, {}, {},
+        ])
+        assert max_wait[0] > burst_cycles
+
+    def test_budget(self):
+        # A best-effort master with a budget cannot hog the bus, but may
+        # use any bandwidth that nobody else wants.
+        window = 512
+        budget = 2*self.BURST_LEN
+        n_cycles = 8*window
+        words, _, _ = self._run("budget", [
+            {"priority": QoSArbiter.REALTIME, "budget": (budget, window)},
+            {"priority": QoSArbiter.NORMAL},
+            {"priority": QoSArbiter.NORMAL},
+        ], n_cycles=n_cycles)
+        n_windows = n_cycles // window + 1
+        assert words[0] <= n_windows * (budget + self.BURST_LEN)
+        assert min(words[1:]) > 2 * words[0]
+        # Alone on the bus, it still gets everything.
+        words, _, _ = self._run("budget_alone", [
+            {"priority": QoSArbiter.REALTIME, "budget": (budget, window)},
+        ], n_cycles=n_cycles)
+        assert words[0] > 4 * n_windows * budget
+
+    def test_port_statistics(self):
+        words, max_wait, stats = self._run("port_statistics", [
+            {"burst_len": 1},
+            {"burst_len": 3, "period": 20},
+            {"burst_len": self.BURST_LEN},
+            {"burst_len": 32, "period": 50},
+        ])
+        for n, burst_len in enumerate([1, 3, self.BURST_LEN, 32]):
+            s = stats[n]
+            # Statistics may be missing the last, incomplete transaction.
+            assert 0 <= words[n] - s["words"] < burst_len
+            assert 0 <= s["words"] - s["transactions"] * burst_len < burst_len
+            assert s["latency_max"] == max_wait[n]
+            assert 0 < s["latency_total"] <= s["transactions"] * max_wait[n]
+            # Every transaction lands in the same histogram bucket.
+            bucket = sum(burst_len > bound for bound in PortStatistics.HISTOGRAM_BOUNDS)
+            assert s["histogram"][bucket] == s["transactions"]
+            assert sum(s["histogram"]) == s["transactions"]
+
+
+class FrontendTests(unittest.TestCase):
+
+    def _run(self, name, merge_bursts, burst_len, page_size_bytes=256,
+             region_words=128, bursts_per_cycle=4):
+        """
+        2 masters first write, then read back adjacent memory regions in
+        sequential bursts, through a QoSArbiter and the wishbone Frontend
+        in front of a FakePSRAMController. Master 0 keeps the bus for
+        ``bursts_per_cycle`` bursts at a time, master 1 releases it after
+        every burst.
+
+        Returns the number of cycles taken, bursts issued, and the number
+        of PSRAM commands, merged bursts and wasted speculative words
+        (counts of the corresponding Frontend strobes).
+        """
+
+        m = Module()
+        m.submodules.arbiter = arbiter = QoSArbiter(
+            addr_width=22, data_width=32, granularity=8, features={"cti", "bte"})
+        m.submodules.frontend = frontend = Frontend(
+            addr_width=22, page_size_bytes=page_size_bytes, merge_bursts=merge_bursts)
+        m.submodules.psram = _psram = psram.FakePSRAMController(
+            storage_words=4*region_words, page_size_bytes=page_size_bytes)
+        wiring.connect(m, arbiter.bus, frontend.bus)
+        m.d.comb += [
+            frontend.enable.eq(1),
+            _psram.address.eq(frontend.address),
+            _psram.perform_write.eq(frontend.perform_write),
+            _psram.start_transfer.eq(frontend.start_transfer),
+            _psram.final_word.eq(frontend.final_word),
+            _psram.write_data.eq(frontend.write_data),
+            _psram.write_mask.eq(frontend.write_mask),
+            frontend.idle.eq(_psram.idle),
+            frontend.read_ready.eq(_psram.read_ready),
+            frontend.write_ready.eq(_psram.write_ready),
+            frontend.read_data.eq(_psram.read_data),
+        ]
+
+        buses = []
+        for _ in range(2):
+            bus = wishbone.Signature(addr_width=22, data_width=32, granularity=8,
+                                     features={"cti", "bte"}).create()
+            arbiter.add(bus)
+            buses.append(bus)
+
+        def pattern(adr, n):
+            return (adr * 0x9E3779B1 + n) & 0xFFFFFFFF
+
+        n_bursts = [0]
+        done = [False, False]
+
+        def master(n, bus, bursts_per_cycle):
+            async def _master(ctx):
+                ctx.set(bus.sel, 0b1111)
+                base = n*region_words
+                for we in [1, 0]:
+                    ctx.set(bus.we, we)
+                    adrs = list(range(base, base+region_words, burst_len))
+                    for k, start in enumerate(adrs):
+                        ctx.set(bus.cyc, 1)
+                        ctx.set(bus.stb, 1)
+                        beat = 0
+                        length = min(burst_len, base + region_words - start)
+                        while beat < length:
+                            adr = start + beat
+                            ctx.set(bus.adr, adr)
+                            ctx.set(bus.dat_w, pattern(adr, we))
+                            ctx.set(bus.cti, wishbone.CycleType.END_OF_BURST
+                                    if beat == length - 1 else
+                                    wishbone.CycleType.INCR_BURST)
+                            if ctx.get(bus.ack):
+                                if not we:
+                                    self.assertEqual(ctx.get(bus.dat_r), pattern(adr, 1))
+                                beat += 1
+                            await ctx.tick()
+                        n_bursts[0] += 1
+                        if (k + 1) % bursts_per_cycle == 0 or k == len(adrs) - 1:
+                            ctx.set(bus.cyc, 0)
+                            ctx.set(bus.stb, 0)
+                            await ctx.tick()
+                done[n] = True
+            return _master
+
+        stats = {"command": 0, "merged": 0, "wasted": 0}
+
+        async def testbench(ctx):
+            cycles = 0
+            while not all(done):
+                for k in stats:
+                    stats[k] += ctx.get(getattr(frontend, k))
+                await ctx.tick()
+                cycles += 1
+            stats["cycles"] = cycles
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(master(0, buses[0], bursts_per_cycle), background=True)
+        sim.add_testbench(master(1, buses[1], 1), background=True)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open(f"test_psram_frontend_{name}.vcd", "w")):
+            sim.run()
+
+        stats["bursts"] = n_bursts[0]
+        print()
+        print(name, stats)
+        return stats
+
+    @parameterized.expand([
+        ["b8",  8],
+        ["b12", 12], # bursts cross page boundaries
+    ])
+    def test_frontend(self, name, burst_len):
+        baseline = self._run(f"{name}_baseline", merge_bursts=False, burst_len=burst_len)
+        assert baseline["merged"] == 0
+        assert baseline["wasted"] == 0
+        assert baseline["command"] == baseline["bursts"]
+
+        merged = self._run(f"{name}_merged", merge_bursts=True, burst_len=burst_len)
+        assert merged["bursts"] == baseline["bursts"]
+        assert merged["command"] + merged["merged"] == merged["bursts"]
+        assert merged["wasted"] <= merged["command"]
+        # Sequential bursts that did not release the bus were merged.
+        assert merged["merged"] > merged["bursts"] // 4
+        assert merged["cycles"] < baseline["cycles"]
+
+
+class FakePSRAMTimingTests(unittest.TestCase):
+
+    def _run(self, name, psram_id, bursts, burst_len=32):
+        """
+        Write, then read back ``bursts`` (a list of start addresses) on a
+        FakePSRAM using the timing model of ``psram_id`` (or the default,
+        simpler model if None). Returns cycles taken and utilization.
+        """
+
+        timing = PSRAMTiming.get(psram_id) if psram_id is not None else None
+
+        m = Module()
+        m.submodules.dut = dut = psram.FakePSRAM(storage_words=1024, timing=timing)
+
+        bus = dut.bus
+
+        def pattern(adr):
+            return (adr * 0x9E3779B1) & 0xFFFFFFFF
+
+        async def testbench(ctx):
+            ctx.set(bus.sel, 0b1111)
+            cycles = 0
+            busy = 0
+            words = 0
+            for we in [1, 0]:
+                ctx.set(bus.we, we)
+                for start in bursts:
+                    ctx.set(bus.cyc, 1)
+                    ctx.set(bus.stb, 1)
+                    beat = 0
+                    while beat < burst_len:
+                        adr = start + beat
+                        ctx.set(bus.adr, adr)
+                        ctx.set(bus.dat_w, pattern(adr))
+                        ctx.set(bus.cti, wishbone.CycleType.END_OF_BURST
+                                if beat == burst_len - 1 else
+                                wishbone.CycleType.INCR_BURST)
+                        busy += ctx.get(dut.busy)
+                        if ctx.get(bus.ack):
+                            if not we:
+                                self.assertEqual(ctx.get(bus.dat_r), pattern(adr))
+                            beat += 1
+                            words += 1
+                        await ctx.tick()
+                        cycles += 1
+                    ctx.set(bus.cyc, 0)
+                    ctx.set(bus.stb, 0)
+                    # Finish the trailing write before moving on.
+                    ctx.set(bus.we, 0)
+                    await ctx.tick()
+                    ctx.set(bus.we, we)
+                    cycles += 1
+            # Same measurement, using the helper.
+            utilization = await psram.measure_utilization(ctx, dut, 16)
+            assert utilization.busy < 1
+            print()
+            print(name, "cycles", cycles, "busy", busy/cycles, "efficiency", words/busy)
+            self.result = (cycles, words/busy)
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open(f"test_fake_psram_timing_{name}.vcd", "w")):
+            sim.run()
+        return self.result
+
+    @parameterized.expand([
+        ["aps256xxn", "APS256XXN-OBR", True],
+        ["7kl1282ga", "7KL1282GAHY02", False],
+    ])
+    def test_timing(self, name, psram_id, has_pages):
+        bursts_in_page = [0, 64, 128, 192]
+        bursts_across_page = [496, 560, 624, 688]
+        cycles_in_page, efficiency = self._run(
+            f"{name}_in_page", psram_id, bursts_in_page)
+        cycles_across_page, _ = self._run(
+            f"{name}_across_page", psram_id, bursts_across_page)
+        cycles_simple, efficiency_simple = self._run(
+            f"{name}_simple", None, bursts_in_page)
+        # Timing model is more pessimistic than the default.
+        assert cycles_in_page > cycles_simple
+        assert efficiency < efficiency_simple
+        # Page crossings split bursts, if the part has pages.
+        if has_pages:
+            assert cycles_across_page > cycles_in_page
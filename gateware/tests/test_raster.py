@@ -9,11 +9,12 @@ from amaranth import *
 from amaranth.sim import *
 from amaranth.lib import wiring
 
-from tiliqua.test import wishbone, stream, csr as csr_util
+from tiliqua.test import wishbone, stream, psram, csr as csr_util
 from tiliqua.raster import persist, stroke, plot, blit, line
 from tiliqua.video import framebuffer, modeline, palette
 
 from amaranth_soc import csr
+from amaranth_soc import wishbone as soc_wishbone
 from amaranth_soc.csr import wishbone as csr_wishbone
 
 
@@ -61,6 +62,346 @@ class RasterTests(unittest.TestCase):
         with sim.write_vcd(vcd_file=open("test_persist.vcd", "w")):
             sim.run()
 
+    def test_persist_bulk(self):
+
+        """
+        Bulk mode: one decayed copy of the whole frame per 'start' strobe.
+        """
+
+        m = Module()
+        dut = persist.Persistance(
+            bus_signature=soc_wishbone.Signature(addr_width=22, data_width=32, granularity=8,
+                                                 features={"cti", "bte"}),
+            holdoff_default=0, bulk=True)
+        check = wishbone.BusChecker(dut.bus, prefix='[bus] ')
+        m.submodules += [dut, check]
+
+        FB_WORDS = 40 # Not a multiple of the FIFO depth
+        SRC_BASE = 0x000
+        DST_BASE = 0x100
+
+        mem = {}
+        for n in range(FB_WORDS):
+            mem[SRC_BASE+n] = 0xf5f5f5f5
+            mem[DST_BASE+n] = 0x12345678
+        writes = []
+
+        async def responder(ctx):
+            while True:
+                stb = ctx.get(dut.bus.stb)
+                ctx.set(dut.bus.ack, stb)
+                if stb:
+                    adr = ctx.get(dut.bus.adr)
+                    if ctx.get(dut.bus.we):
+                        mem[adr] = ctx.get(dut.bus.dat_w)
+                        writes.append(adr)
+                    else:
+                        ctx.set(dut.bus.dat_r, mem.get(adr, 0))
+                await ctx.tick()
+
+        async def testbench(ctx):
+            ctx.set(dut.fbp.base, DST_BASE)
+            ctx.set(dut.fbp.timings.active_pixels, FB_WORDS*4)
+            ctx.set(dut.fbp.enable, 1)
+            await ctx.tick().repeat(100)
+            # Nothing happens until we are told to start.
+            self.assertEqual(ctx.get(dut.busy), 0)
+            self.assertEqual(writes, [])
+            ctx.set(dut.src_base, SRC_BASE)
+            ctx.set(dut.start, 1)
+            await ctx.tick()
+            ctx.set(dut.start, 0)
+            self.assertEqual(ctx.get(dut.busy), 1)
+            await ctx.tick().until(~dut.busy)
+            await ctx.tick().repeat(100)
+            self.assertEqual(sorted(writes), list(range(DST_BASE, DST_BASE+FB_WORDS)))
+            for n in range(FB_WORDS):
+                self.assertEqual(mem[SRC_BASE+n], 0xf5f5f5f5)
+                self.assertEqual(mem[DST_BASE+n], 0xe5e5e5e5)
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(responder, background=True)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open("test_persist_bulk.vcd", "w")):
+            sim.run()
+
+    def test_persist_bulk_frame_time(self):
+
+        """
+        A bulk pass over a whole frame (with the default ``holdoff``) must
+        complete well within one frame period, as it runs once per flip.
+        """
+
+        mode = modeline.DVIModeline.all_timings()["640x480p59.94"]
+        SYNC_HZ = 60e6
+        frame_cycles = int(SYNC_HZ / mode.refresh_rate)
+
+        fb_words = mode.active_pixels // 4
+        SRC_BASE = 0
+        DST_BASE = fb_words
+
+        m = Module()
+        dut = persist.Persistance(
+            bus_signature=soc_wishbone.Signature(addr_width=22, data_width=32, granularity=8,
+                                                 features={"cti", "bte"}),
+            bulk=True)
+        m.submodules.dut = dut
+        m.submodules.psram = psram_ = psram.FakePSRAM(storage_words=2*fb_words)
+        wiring.connect(m, dut.bus, psram_.bus)
+
+        async def testbench(ctx):
+            for n in [0, 1, fb_words-1]:
+                ctx.set(psram_.memory.data[SRC_BASE+n], 0xf5f5f5f5)
+            ctx.set(dut.fbp.base, DST_BASE)
+            ctx.set(dut.fbp.timings.active_pixels, mode.active_pixels)
+            ctx.set(dut.fbp.enable, 1)
+            ctx.set(dut.src_base, SRC_BASE)
+            await ctx.tick().repeat(4)
+            ctx.set(dut.start, 1)
+            self.assertEqual(ctx.get(dut.busy), 1)
+            await ctx.tick()
+            ctx.set(dut.start, 0)
+            cycles = 1
+            while ctx.get(dut.busy):
+                await ctx.tick()
+                cycles += 1
+            print()
+            print(f"bulk pass: {cycles} cycles, frame period: {frame_cycles} cycles")
+            self.assertLess(cycles, frame_cycles)
+            for n in [0, 1, fb_words-1]:
+                self.assertEqual(ctx.get(psram_.memory.data[DST_BASE+n]), 0xe5e5e5e5)
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(testbench)
+        sim.run()
+
+    def test_persist_skip_empty_tiles(self):
+
+        """
+        Persistence traffic on a sparse framebuffer, with and without empty tile skipping.
+        """
+
+        FB_WORDS = 128 # 8 tiles of 16 words
+
+        def run(skip_empty_tiles):
+
+            m = Module()
+            dut = persist.Persistance(
+                bus_signature=soc_wishbone.Signature(addr_width=22, data_width=32, granularity=8,
+                                                     features={"cti", "bte"}),
+                holdoff_default=16, skip_empty_tiles=skip_empty_tiles)
+            check = wishbone.BusChecker(dut.bus, prefix='[bus] ')
+            m.submodules += [dut, check]
+
+            # Something drawn in tile 3 only.
+            mem = {3*16+n: 0x30303030 for n in range(4)}
+            accesses = []
+
+            async def responder(ctx):
+                while True:
+                    stb = ctx.get(dut.bus.stb)
+                    ctx.set(dut.bus.ack, stb)
+                    if stb:
+                        adr = ctx.get(dut.bus.adr)
+                        if ctx.get(dut.bus.we):
+                            mem[adr] = ctx.get(dut.bus.dat_w)
+                        else:
+                            ctx.set(dut.bus.dat_r, mem.get(adr, 0))
+                        accesses.append(adr)
+                    await ctx.tick()
+
+            async def testbench(ctx):
+                ctx.set(dut.fbp.base, 0)
+                ctx.set(dut.fbp.timings.active_pixels, FB_WORDS*4)
+                ctx.set(dut.fbp.enable, 1)
+                await ctx.tick().repeat(40000)
+                # Fully decayed.
+                self.assertTrue(all(mem.get(n, 0) == 0 for n in range(FB_WORDS)))
+                # Something new is drawn in tile 5.
+                mem[5*16+2] = 0x20202020
+                if skip_empty_tiles:
+                    ctx.set(dut.snoop.valid, 1)
+                    ctx.set(dut.snoop.payload, 5*16+2)
+                    await ctx.tick()
+                    ctx.set(dut.snoop.valid, 0)
+                accesses.clear()
+                await ctx.tick().repeat(40000)
+                self.assertEqual(mem[5*16+2], 0)
+
+            sim = Simulator(m)
+            sim.add_clock(1e-6)
+            sim.add_testbench(responder, background=True)
+            sim.add_testbench(testbench)
+            with sim.write_vcd(vcd_file=open(
+                    f"test_persist_skip_empty_tiles_{int(skip_empty_tiles)}.vcd", "w")):
+                sim.run()
+
+            return accesses
+
+        accesses_all = run(skip_empty_tiles=False)
+        accesses_skip = run(skip_empty_tiles=True)
+
+        print()
+        print(f"persistence bus words: all tiles: {len(accesses_all)}, "
+              f"skip empty tiles: {len(accesses_skip)}")
+
+        # Only the newly drawn tile is ever touched, and only until it decays.
+        self.assertEqual(set(adr//16 for adr in accesses_skip), {5})
+        self.assertTrue(len(accesses_skip)*10 < len(accesses_all))
+
+    def test_framebuffer_flip(self):
+
+        m = Module()
+        m.domains.dvi = ClockDomain()
+        dut = framebuffer.DMAFramebuffer(
+            palette=palette.ColorPalette(), n_buffers=2)
+        m.submodules += [dut, dut.palette]
+
+        BASE = 0x100
+        FB_WORDS = 16
+
+        scanned = []
+
+        async def responder(ctx):
+            while True:
+                stb = ctx.get(dut.bus.stb)
+                ctx.set(dut.bus.ack, stb)
+                if stb:
+                    scanned.append(ctx.get(dut.bus.adr))
+                await ctx.tick()
+
+        async def testbench(ctx):
+            ctx.set(dut.fbp.base, BASE)
+            for name, value in [
+                    ("h_active", 16), ("h_sync_start", 18),
+                    ("h_sync_end", 20), ("h_total", 24),
+                    ("v_active", 4), ("v_sync_start", 5),
+                    ("v_sync_end", 6), ("v_total", 8),
+                    ("active_pixels", FB_WORDS*4)]:
+                ctx.set(getattr(dut.fbp.timings, name), value)
+            ctx.set(dut.fbp.enable, 1)
+            # Scan out buffer 0, draw into buffer 1
+            await ctx.tick().repeat(1000)
+            self.assertTrue(len(scanned) > 0)
+            self.assertTrue(all(BASE <= adr < BASE+FB_WORDS for adr in scanned))
+            self.assertEqual(ctx.get(dut.draw.base), BASE+FB_WORDS)
+            # Flip takes effect at the next vsync
+            ctx.set(dut.flip.request, 1)
+            await ctx.tick()
+            ctx.set(dut.flip.request, 0)
+            self.assertEqual(ctx.get(dut.flip.pending), 1)
+            self.assertEqual(ctx.get(dut.draw.base), BASE+FB_WORDS)
+            await ctx.tick().until(dut.flip.swapped)
+            self.assertEqual(ctx.get(dut.flip.pending), 0)
+            self.assertEqual(ctx.get(dut.flip.front), 1)
+            self.assertEqual(ctx.get(dut.flip.back), 0)
+            self.assertEqual(ctx.get(dut.flip.newest_base), BASE+FB_WORDS)
+            self.assertEqual(ctx.get(dut.draw.base), BASE)
+            # Every frame is now scanned out of buffer 1
+            scanned.clear()
+            await ctx.tick().repeat(1000)
+            self.assertEqual(sorted(set(scanned)),
+                             list(range(BASE+FB_WORDS, BASE+2*FB_WORDS)))
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_clock(1e-6, domain="dvi")
+        sim.add_testbench(responder, background=True)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open("test_framebuffer_flip.vcd", "w")):
+            sim.run()
+
+    def test_framebuffer_skip_empty_tiles(self):
+
+        """
+        Scanout output must be identical with and without empty tile skipping,
+        including after new pixels are written to an empty tile.
+        """
+
+        FB_WORDS = 128 # 8 tiles of 16 words
+        FRAME_CYCLES = 72*12
+        N_FRAMES = 8
+
+        def run(skip_empty_tiles):
+
+            m = Module()
+            m.domains.dvi = ClockDomain()
+            dut = framebuffer.DMAFramebuffer(
+                palette=palette.ColorPalette(), skip_empty_tiles=skip_empty_tiles)
+            m.submodules += [dut, dut.palette]
+
+            mem = {5: 0xf3f3f3f3, 100: 0xf7000000}
+            reads = []
+            frames = []
+
+            async def responder(ctx):
+                while True:
+                    stb = ctx.get(dut.bus.stb)
+                    ctx.set(dut.bus.ack, stb)
+                    if stb:
+                        adr = ctx.get(dut.bus.adr)
+                        ctx.set(dut.bus.dat_r, mem.get(adr, 0))
+                        reads.append(adr)
+                    await ctx.tick()
+
+            async def display(ctx):
+                pixels = []
+                async for clk_edge, rst, de, vsync, r, g, b in ctx.tick("dvi").sample(
+                        dut.simif.de, dut.simif.vsync, dut.simif.r, dut.simif.g, dut.simif.b):
+                    if de:
+                        pixels.append((r, g, b))
+                    if vsync and len(pixels):
+                        frames.append(pixels)
+                        pixels = []
+
+            async def testbench(ctx):
+                for name, value in [
+                        ("h_active", 64), ("h_sync_start", 66),
+                        ("h_sync_end", 68), ("h_total", 72),
+                        ("v_active", 8), ("v_sync_start", 9),
+                        ("v_sync_end", 10), ("v_total", 12),
+                        ("active_pixels", FB_WORDS*4)]:
+                    ctx.set(getattr(dut.fbp.timings, name), value)
+                ctx.set(dut.fbp.enable, 1)
+                await ctx.tick().repeat(FRAME_CYCLES*N_FRAMES//2)
+                # Something else draws into an empty tile.
+                mem[40] = 0x11111111
+                if skip_empty_tiles:
+                    ctx.set(dut.snoop.valid, 1)
+                    ctx.set(dut.snoop.payload, 40)
+                    await ctx.tick()
+                    ctx.set(dut.snoop.valid, 0)
+                reads.clear()
+                await ctx.tick().repeat(FRAME_CYCLES*N_FRAMES//2)
+
+            sim = Simulator(m)
+            sim.add_clock(1e-6)
+            sim.add_clock(1e-6, domain="dvi")
+            sim.add_testbench(responder, background=True)
+            sim.add_process(display, background=True)
+            sim.add_testbench(testbench)
+            with sim.write_vcd(vcd_file=open(
+                    f"test_framebuffer_skip_empty_tiles_{int(skip_empty_tiles)}.vcd", "w")):
+                sim.run()
+
+            return reads, frames
+
+        reads_all, frames_all = run(skip_empty_tiles=False)
+        reads_skip, frames_skip = run(skip_empty_tiles=True)
+
+        print()
+        print(f"scanout reads (last {N_FRAMES//2} frames): "
+              f"all tiles: {len(reads_all)}, skip empty tiles: {len(reads_skip)}")
+
+        # Only 3 (of 8) tiles contain anything.
+        self.assertTrue(len(reads_skip)*2 < len(reads_all))
+        self.assertEqual(set(adr//16 for adr in reads_skip), {0, 2, 6})
+        # Identical picture on the last frame.
+        self.assertEqual(frames_all[-1], frames_skip[-1])
+        self.assertEqual(len(frames_skip[-1]), FB_WORDS*4)
+
     def test_stroke(self):
 
         m = Module()
@@ -164,6 +505,412 @@ class RasterTests(unittest.TestCase):
         with sim.write_vcd(vcd_file=open("test_plot_backend.vcd", "w")):
             sim.run()
 
+    def test_plot_backend_write_combine(self):
+
+        m = Module()
+        fb = framebuffer.DMAFramebuffer(
+            fixed_modeline=self.MODELINE, palette=palette.ColorPalette())
+        dut = plot._FramebufferBackend(
+            wishbone.Signature(addr_width=fb.bus.addr_width, data_width=32, granularity=8),
+            write_combine=True)
+        wiring.connect(m, wiring.flipped(fb.fbp), dut.fbp)
+        check = wishbone.BusChecker(dut.bus, prefix='[bus] ')
+        m.submodules += [dut, fb, fb.palette, check]
+
+        def req(x, color, intensity, blend):
+            return {
+                'x': x,
+                'y': 0,
+                'pixel': {
+                    'color': color,
+                    'intensity': intensity,
+                },
+                'blend': blend,
+                'offset': plot.OffsetMode.ABSOLUTE,
+            }
+
+        async def testbench(ctx):
+            ctx.set(fb.fbp.enable, 1)
+
+            # Several requests to the same word should be merged into a single RMW.
+            await stream.put(ctx, dut.i, req(0, 0xa, 0x2, plot.BlendMode.ADDITIVE))
+            await stream.put(ctx, dut.i, req(1, 0xa, 0xb, plot.BlendMode.ADDITIVE))
+            await stream.put(ctx, dut.i, req(2, 0x3, 0x4, plot.BlendMode.REPLACE))
+            await stream.put(ctx, dut.i, req(2, 0x5, 0x1, plot.BlendMode.ADDITIVE))
+            await stream.put(ctx, dut.i, req(0, 0xc, 0x3, plot.BlendMode.ADDITIVE))
+            # Read cycle (get current word value)
+            ctx.set(dut.bus.dat_r, 0x00009100)
+            result = await wishbone.classic_ack(ctx, dut.bus)
+            self.assertEqual(result.we, 0)
+            self.assertEqual(result.adr, 0x0)
+            self.assertEqual(result.sel, 0b0111)
+            # Write cycle (all merged pixels, blended)
+            result = await wishbone.classic_ack(ctx, dut.bus)
+            self.assertEqual(result.we, 1)
+            self.assertEqual(result.adr, 0x0)
+            self.assertEqual(result.sel, 0b0111)
+            self.assertEqual(result.dat_w & 0x00ffffff, 0x55fa5c)
+
+            # A word with only REPLACE pixels needs no read.
+            for x in range(4, 8):
+                await stream.put(ctx, dut.i, req(x, x, 0xf, plot.BlendMode.REPLACE))
+            result = await wishbone.classic_ack(ctx, dut.bus)
+            self.assertEqual(result.we, 1)
+            self.assertEqual(result.adr, 0x1)
+            self.assertEqual(result.sel, 0b1111)
+            self.assertEqual(result.dat_w, 0xf7f6f5f4)
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open("test_plot_backend_write_combine.vcd", "w")):
+            sim.run()
+
+    def test_plotter_write_combine_benchmark(self):
+
+        """
+        Compare cycles spent (and PSRAM bus cycles) plotting a dense trace,
+        where neighbouring pixels share a framebuffer word, with and without
+        write-combining.
+        """
+
+        N_PIXELS = 256
+        H_ACTIVE = 64
+
+        results = {}
+
+        for write_combine in [False, True]:
+
+            m = Module()
+            dut = plot.FramebufferPlotter(
+                bus_signature=soc_wishbone.Signature(
+                    addr_width=22, data_width=32, granularity=8, features={"cti", "bte"}),
+                write_combine=write_combine)
+            m.submodules.dut = dut
+            m.submodules.psram = psram_ = psram.FakePSRAM()
+            wiring.connect(m, dut.bus, psram_.bus)
+
+            stats = {"cycles": 0, "psram_cycles": 0}
+            done = [False]
+
+            async def stimulus(ctx):
+                # Each pixel is plotted twice, like a slowly moving trace.
+                for n in range(N_PIXELS):
+                    await stream.put(ctx, dut.i[0], {
+                        'x': (n//2) % H_ACTIVE,
+                        'y': (n//2) // H_ACTIVE,
+                        'pixel': {
+                            'color': 1,
+                            'intensity': 1,
+                        },
+                        'blend': plot.BlendMode.ADDITIVE,
+                        'offset': plot.OffsetMode.ABSOLUTE,
+                    })
+                done[0] = True
+
+            async def testbench(ctx):
+                ctx.set(dut.fbp.base, 0)
+                ctx.set(dut.fbp.timings.h_active, H_ACTIVE)
+                ctx.set(dut.fbp.timings.v_active, 16)
+                ctx.set(dut.fbp.timings.active_pixels, H_ACTIVE*16)
+                ctx.set(dut.fbp.enable, 1)
+                while not done[0]:
+                    await ctx.tick()
+                    stats["cycles"] += 1
+                    if ctx.get(dut.bus.cyc):
+                        stats["psram_cycles"] += 1
+
+            sim = Simulator(m)
+            sim.add_clock(1e-6)
+            sim.add_testbench(stimulus, background=True)
+            sim.add_testbench(testbench)
+            sim.run()
+
+            results[write_combine] = stats
+            print(f"write_combine={write_combine}: {stats['cycles']/N_PIXELS:.2f} cycles/pixel, "
+                  f"{stats['psram_cycles']/N_PIXELS:.2f} psram cycles/pixel")
+
+        self.assertLess(results[True]["cycles"], results[False]["cycles"])
+        self.assertLessEqual(results[True]["psram_cycles"], results[False]["psram_cycles"])
+
+    def test_span_fill(self):
+
+        """
+        Fill a rectangle that is not word-aligned, checking the addresses,
+        byte-select masks and burst lengths emitted by the fill engine.
+        """
+
+        m = Module()
+        dut = plot._SpanFill(
+            soc_wishbone.Signature(addr_width=22, data_width=32, granularity=8,
+                                   features={"cti", "bte"}),
+            max_burst=2)
+        m.submodules.dut = dut
+
+        H_ACTIVE = 64 # 16 words per row at 1 byte/pixel.
+
+        writes = []
+
+        async def responder(ctx):
+            # Zero-wait-state slave that records every write.
+            while True:
+                stb = ctx.get(dut.bus.stb)
+                ctx.set(dut.bus.ack, stb)
+                if stb:
+                    writes.append((ctx.get(dut.bus.adr), ctx.get(dut.bus.sel),
+                                   ctx.get(dut.bus.dat_w),
+                                   ctx.get(dut.bus.cti == soc_wishbone.CycleType.END_OF_BURST)))
+                await ctx.tick()
+
+        async def testbench(ctx):
+            ctx.set(dut.fbp.base, 0x100)
+            ctx.set(dut.fbp.timings.h_active, H_ACTIVE)
+            ctx.set(dut.fbp.timings.v_active, 16)
+            ctx.set(dut.fbp.enable, 1)
+            await stream.put(ctx, dut.i, {
+                'x': 3,
+                'y': 1,
+                'width': 10,
+                'height': 2,
+                'pixel': {
+                    'color': 0x5,
+                    'intensity': 0xa,
+                },
+            })
+            await ctx.tick().until(dut.i.ready)
+            # Partially off-screen (clipped) fill.
+            await stream.put(ctx, dut.i, {
+                'x': H_ACTIVE-2,
+                'y': 15,
+                'width': 10,
+                'height': 10,
+                'pixel': {
+                    'color': 0x1,
+                    'intensity': 0x1,
+                },
+            })
+            await ctx.tick().until(dut.i.ready)
+            await ctx.tick().repeat(4)
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(responder, background=True)
+        sim.add_testbench(testbench)
+        with sim.write_vcd(vcd_file=open("test_span_fill.vcd", "w")):
+            sim.run()
+
+        expected = []
+        for row in [1, 2]:
+            expected += [
+                (0x100 + row*16 + 0, 0b1000, 0xa5a5a5a5, False),
+                (0x100 + row*16 + 1, 0b1111, 0xa5a5a5a5, True),
+                (0x100 + row*16 + 2, 0b1111, 0xa5a5a5a5, False),
+                (0x100 + row*16 + 3, 0b0001, 0xa5a5a5a5, True),
+            ]
+        expected += [
+            (0x100 + 15*16 + 15, 0b1100, 0x11111111, True),
+        ]
+        self.assertEqual(writes, expected)
+
+    def test_plotter_fill(self):
+
+        """
+        Fills must be ordered with respect to plotted pixels, and not be
+        overwritten by stale cache lines afterward.
+        """
+
+        m = Module()
+        dut = plot.FramebufferPlotter(
+            bus_signature=soc_wishbone.Signature(
+                addr_width=22, data_width=32, granularity=8, features={"cti", "bte"}),
+            n_fill_ports=1)
+        m.submodules.dut = dut
+        m.submodules.psram = psram_ = psram.FakePSRAM()
+        wiring.connect(m, dut.bus, psram_.bus)
+
+        H_ACTIVE = 64
+
+        # Shadow copy of everything written to the backing store.
+        shadow = {}
+
+        async def snoop(ctx):
+            bus = dut.bus
+            while True:
+                await ctx.tick()
+                if ctx.get(bus.cyc & bus.stb & bus.ack & bus.we):
+                    shadow[ctx.get(bus.adr)] = ctx.get(bus.dat_w)
+
+        def pixel(x, y, value):
+            return {
+                'x': x,
+                'y': y,
+                'pixel': {
+                    'color': value & 0xf,
+                    'intensity': value >> 4,
+                },
+                'blend': plot.BlendMode.REPLACE,
+                'offset': plot.OffsetMode.ABSOLUTE,
+            }
+
+        async def testbench(ctx):
+            ctx.set(dut.fbp.base, 0)
+            ctx.set(dut.fbp.timings.h_active, H_ACTIVE)
+            ctx.set(dut.fbp.timings.v_active, 16)
+            ctx.set(dut.fbp.timings.active_pixels, H_ACTIVE*16)
+            ctx.set(dut.fbp.enable, 1)
+            # Dirty some cache lines
+            for x in range(16):
+                await stream.put(ctx, dut.i[0], pixel(x, 0, 0x11))
+            # Fill over them
+            await stream.put(ctx, dut.fill[0], {
+                'x': 0,
+                'y': 0,
+                'width': 16,
+                'height': 2,
+                'pixel': {
+                    'color': 0x2,
+                    'intensity': 0x2,
+                },
+            })
+            # Plot on top of the fill
+            await stream.put(ctx, dut.i[0], pixel(2, 1, 0x33))
+            # Wait for autoflush to write everything back.
+            await ctx.tick().repeat(20000)
+            for adr in range(4):
+                self.assertEqual(shadow[adr], 0x22222222)
+            self.assertEqual(shadow[16], 0x22332222)
+            for adr in range(17, 20):
+                self.assertEqual(shadow[adr], 0x22222222)
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(snoop, background=True)
+        sim.add_testbench(testbench)
+        sim.run()
+
+    def test_plotter_pause(self):
+
+        """
+        While paused, no pixels or fills are accepted (or drawn).
+        """
+
+        m = Module()
+        dut = plot.FramebufferPlotter(
+            bus_signature=soc_wishbone.Signature(
+                addr_width=22, data_width=32, granularity=8, features={"cti", "bte"}),
+            n_fill_ports=1)
+        m.submodules.dut = dut
+        m.submodules.psram = psram_ = psram.FakePSRAM()
+        wiring.connect(m, dut.bus, psram_.bus)
+
+        async def testbench(ctx):
+            ctx.set(dut.fbp.base, 0)
+            ctx.set(dut.fbp.timings.h_active, 64)
+            ctx.set(dut.fbp.timings.v_active, 16)
+            ctx.set(dut.fbp.timings.active_pixels, 64*16)
+            ctx.set(dut.fbp.enable, 1)
+            ctx.set(dut.pause, 1)
+            ctx.set(dut.i[0].payload, {
+                'x': 1,
+                'y': 0,
+                'pixel': {
+                    'color': 0x1,
+                    'intensity': 0x1,
+                },
+                'blend': plot.BlendMode.REPLACE,
+                'offset': plot.OffsetMode.ABSOLUTE,
+            })
+            ctx.set(dut.i[0].valid, 1)
+            ctx.set(dut.fill[0].valid, 1)
+            for _ in range(200):
+                await ctx.tick()
+                # Nothing accepted, nothing touches the bus.
+                self.assertEqual(ctx.get(dut.i[0].ready), 0)
+                self.assertEqual(ctx.get(dut.fill[0].ready), 0)
+                self.assertEqual(ctx.get(dut.bus.cyc), 0)
+            ctx.set(dut.fill[0].valid, 0)
+            ctx.set(dut.pause, 0)
+            await ctx.tick().until(dut.i[0].ready)
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(testbench)
+        sim.run()
+
+    def test_plotter_lanes_benchmark(self):
+
+        """
+        Benchmark pixel throughput of a ``FramebufferPlotter`` as the number of
+        lanes grows. All lanes share a single (fake) PSRAM through a wishbone
+        arbiter, in the same way as ``psram.Peripheral.add_master``.
+        """
+
+        N_TRACES  = 4
+        N_PIXELS  = 128 # per trace
+        H_ACTIVE  = 64  # 16 words per row at 1 byte/pixel.
+        ROW_STEP  = 5
+        SYNC_HZ   = 60e6
+
+        results = {}
+
+        for n_lanes in [1, 2, 4]:
+
+            m = Module()
+            bus_signature = soc_wishbone.Signature(
+                addr_width=22, data_width=32, granularity=8, features={"cti", "bte"})
+            dut = plot.FramebufferPlotter(
+                bus_signature=bus_signature, n_ports=N_TRACES, n_lanes=n_lanes)
+            m.submodules.dut = dut
+            m.submodules.arbiter = arbiter = soc_wishbone.Arbiter(
+                addr_width=22, data_width=32, granularity=8, features={"cti", "bte"})
+            for bus in ([dut.bus] if n_lanes == 1 else dut.bus):
+                arbiter.add(bus)
+            m.submodules.psram = psram_ = psram.FakePSRAM()
+            wiring.connect(m, arbiter.bus, psram_.bus)
+
+            done = [False]*N_TRACES
+            cycles = [0]
+
+            def stimulus(n):
+                async def process(ctx):
+                    for x in range(N_PIXELS):
+                        await stream.put(ctx, dut.i[n], {
+                            'x': x % H_ACTIVE,
+                            'y': n*ROW_STEP,
+                            'pixel': {
+                                'color': n,
+                                'intensity': 1,
+                            },
+                            'blend': plot.BlendMode.ADDITIVE,
+                            'offset': plot.OffsetMode.ABSOLUTE,
+                        })
+                    done[n] = True
+                return process
+
+            async def testbench(ctx):
+                ctx.set(dut.fbp.base, 0)
+                ctx.set(dut.fbp.timings.h_active, H_ACTIVE)
+                ctx.set(dut.fbp.timings.v_active, N_TRACES*ROW_STEP)
+                ctx.set(dut.fbp.timings.active_pixels, H_ACTIVE*N_TRACES*ROW_STEP)
+                ctx.set(dut.fbp.enable, 1)
+                while not all(done):
+                    await ctx.tick()
+                    cycles[0] += 1
+
+            sim = Simulator(m)
+            sim.add_clock(1/SYNC_HZ)
+            for n in range(N_TRACES):
+                sim.add_testbench(stimulus(n), background=True)
+            sim.add_testbench(testbench)
+            sim.run()
+
+            results[n_lanes] = N_TRACES*N_PIXELS/cycles[0]
+            print(f"n_lanes={n_lanes}: {results[n_lanes]:.3f} pixels/cycle, "
+                  f"{results[n_lanes]*SYNC_HZ/1e6:.1f} Mpixels/sec @ {SYNC_HZ/1e6:.0f}MHz")
+
+        self.assertGreater(results[2], results[1])
+        self.assertGreater(results[4], results[2])
+
     def test_blit_peripheral(self):
 
         """
@@ -249,6 +996,46 @@ class RasterTests(unittest.TestCase):
         with sim.write_vcd(vcd_file=open("test_blit_peripheral.vcd", "w")):
             sim.run()
 
+    def test_line_peripheral_fill(self):
+
+        m = Module()
+        dut = line.Peripheral()
+        decoder = csr.Decoder(addr_width=28, data_width=8)
+        decoder.add(dut.csr_bus, addr=0, name="dut")
+        bridge = csr_wishbone.WishboneCSRBridge(decoder.bus, data_width=32)
+        m.submodules += [dut, decoder, bridge]
+
+        async def test_stimulus(ctx):
+
+            async def csr_write(ctx, register, fields):
+                await csr_util.wb_csr_w_dict(
+                        ctx, dut.csr_bus, bridge.wb_bus, register, fields)
+
+            await csr_write(ctx, "fill_size", {
+                "width": 100,
+                "height": 20,
+            })
+
+            await csr_write(ctx, "fill", {
+                "pixel": 0xf1,
+                "x": 10,
+                "y": -5,
+            })
+
+        async def test_response(ctx):
+            fill = await stream.get(ctx, dut.fill_o)
+            self.assertEqual(fill.x, 10)
+            self.assertEqual(fill.y, -5)
+            self.assertEqual(fill.width, 100)
+            self.assertEqual(fill.height, 20)
+            self.assertEqual(fill.pixel.as_value(), 0xf1)
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_testbench(test_stimulus, background=True)
+        sim.add_testbench(test_response)
+        sim.run()
+
     def test_line_peripheral(self):
 
         """